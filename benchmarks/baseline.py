@@ -0,0 +1,84 @@
+"""Stored baselines and regression checks shared by the benchmark scripts."""
+
+import json
+from pathlib import Path
+from typing import Dict, List
+
+BASELINE_DIR = Path(__file__).parent / "baselines"
+
+
+def load_baseline(name: str) -> Dict[str, Dict[str, float]]:
+    """
+    Load a stored baseline.
+
+    Args:
+        name: Baseline name (file stem under ``benchmarks/baselines``)
+
+    Returns:
+        Mapping of benchmark name to recorded metrics (empty if missing)
+    """
+    path = BASELINE_DIR / f"{name}.json"
+    if not path.exists():
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_baseline(name: str, results: Dict[str, Dict[str, float]]) -> Path:
+    """
+    Store results as the new baseline.
+
+    Args:
+        name: Baseline name
+        results: Mapping of benchmark name to metrics
+
+    Returns:
+        Path of the written baseline file
+    """
+    BASELINE_DIR.mkdir(parents=True, exist_ok=True)
+    path = BASELINE_DIR / f"{name}.json"
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2, sort_keys=True)
+        f.write("\n")
+    return path
+
+
+def find_regressions(
+    results: Dict[str, Dict[str, float]],
+    baseline: Dict[str, Dict[str, float]],
+    metric: str,
+    tolerance: float,
+    higher_is_better: bool = True,
+) -> List[str]:
+    """
+    Compare results against a baseline.
+
+    Args:
+        results: Mapping of benchmark name to metrics
+        baseline: Stored baseline in the same shape
+        metric: Metric to compare
+        tolerance: Allowed relative slowdown (0.2 = 20%)
+        higher_is_better: Whether larger metric values are improvements
+
+    Returns:
+        Human-readable descriptions of regressed benchmarks
+    """
+    regressions = []
+    for name, metrics in results.items():
+        reference = baseline.get(name, {}).get(metric)
+        if not reference or metric not in metrics:
+            continue
+
+        current = metrics[metric]
+        if higher_is_better:
+            regressed = current < reference * (1 - tolerance)
+        else:
+            regressed = current > reference * (1 + tolerance)
+
+        if regressed:
+            change = (current - reference) / reference * 100
+            regressions.append(
+                f"{name}: {metric} {current:.4g} vs baseline {reference:.4g} "
+                f"({change:+.1f}%)"
+            )
+    return regressions
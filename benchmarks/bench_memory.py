@@ -0,0 +1,85 @@
+"""Memory-scaling benchmarks for large unread backlogs.
+
+Drives ``download_all_unread_media`` through ``FakeTelegramClient`` at
+increasing backlog sizes and reports tracemalloc peaks, peak RSS and the top
+allocators of each phase. Exits non-zero when peak memory per message exceeds
+the budget.
+
+Usage:
+    python benchmarks/bench_memory.py                        # 10k, 100k, 1M
+    python benchmarks/bench_memory.py --messages 10000 --messages 100000
+    python benchmarks/bench_memory.py --budget 2048 --top 10
+"""
+
+import argparse
+import asyncio
+import sys
+import tempfile
+from pathlib import Path
+from typing import List, Optional
+
+from telegram_media_downloader.testing import (
+    DEFAULT_BUDGET_BYTES_PER_MESSAGE,
+    measure_session_memory,
+)
+
+DEFAULT_MESSAGE_COUNTS = [10_000, 100_000, 1_000_000]
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Run the memory benchmarks."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--messages",
+        type=int,
+        action="append",
+        help="Backlog size to measure (repeatable, default: 10k, 100k, 1M).",
+    )
+    parser.add_argument("--channels", type=int, default=1)
+    parser.add_argument("--top", type=int, default=5)
+    parser.add_argument(
+        "--budget",
+        type=int,
+        default=DEFAULT_BUDGET_BYTES_PER_MESSAGE,
+        help="Allowed peak traced bytes per message.",
+    )
+    args = parser.parse_args(argv)
+
+    over_budget = []
+    for message_count in args.messages or DEFAULT_MESSAGE_COUNTS:
+        with tempfile.TemporaryDirectory(prefix="tmd-memory-") as download_path:
+            report = asyncio.run(
+                measure_session_memory(
+                    message_count,
+                    Path(download_path),
+                    channels=args.channels,
+                    top=args.top,
+                )
+            )
+
+        print(f"\n{'='*60}")
+        print(
+            f"{report.message_count} messages: "
+            f"{report.peak_bytes_per_message:.0f} B/message peak "
+            f"(budget {args.budget} B)"
+        )
+        print(f"{'='*60}")
+        for phase in report.phases:
+            print(
+                f"{phase.name:<18} peak {phase.peak_bytes / 1024**2:9.1f} MiB  "
+                f"retained {phase.retained_bytes / 1024**2:9.1f} MiB  "
+                f"RSS high-water {phase.peak_rss_kb / 1024:9.1f} MiB"
+            )
+            for allocator in phase.top_allocators:
+                print(f"    {allocator}")
+
+        if report.peak_bytes_per_message > args.budget:
+            over_budget.append(report.message_count)
+
+    for message_count in over_budget:
+        print(f"OVER BUDGET at {message_count} messages")
+    return 1 if over_budget else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
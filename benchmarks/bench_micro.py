@@ -0,0 +1,220 @@
+"""Micro-benchmarks for per-message pure-Python functions.
+
+Times the namers, sanitizers, filters and ``format_file_size`` with realistic
+and adversarial inputs (long emoji titles, runs of ``__``, documents with many
+attributes) and compares ns/call against ``baselines/micro.json``.
+
+Usage:
+    python benchmarks/bench_micro.py
+    python benchmarks/bench_micro.py --filter sanitize
+    python benchmarks/bench_micro.py --update-baseline
+"""
+
+import argparse
+import sys
+import tempfile
+import timeit
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from baseline import find_regressions, load_baseline, save_baseline
+from telethon.tl.types import (
+    Document,
+    DocumentAttributeAnimated,
+    DocumentAttributeFilename,
+    DocumentAttributeVideo,
+    Message,
+    MessageMediaDocument,
+    MessageMediaPhoto,
+    PeerChannel,
+    Photo,
+    PhotoSize,
+)
+
+from telegram_media_downloader import (
+    ChannelPrefixNamer,
+    DefaultMediaFilter,
+    ImageOnlyFilter,
+    MediaDownloader,
+    TimestampFileNamer,
+    VideoOnlyFilter,
+)
+from telegram_media_downloader.utils.helpers import format_file_size, sanitize_filename
+
+DATE = datetime(2024, 5, 17, 13, 45, 12, tzinfo=timezone.utc)
+
+# Channel titles seen in the wild, from benign to pathological
+TITLES = {
+    "plain": "Daily Photography Digest",
+    "emoji": "🔥📸 Best Shots 🌅🌄 of the Week ✨" * 8,
+    "underscores": "news__" * 200,
+    "punctuation": "[HD] <Movies> & {Series} | 2024 :: ~*~ " * 10,
+    "cjk": "每日新闻频道 — 最新图片与视频合集" * 6,
+}
+
+FILENAMES = {
+    "plain": "holiday_photo_2024.jpg",
+    "invalid_chars": 'a<b>c:d"e/f\\g|h?i*j' * 20,
+    "underscores": "_" * 4000 + "file.mp4",
+}
+
+
+def _message(media: Any) -> Message:
+    return Message(id=123456, peer_id=PeerChannel(1), date=DATE, media=media)
+
+
+def _document(mime_type: str, attribute_count: int) -> MessageMediaDocument:
+    attributes: List[Any] = [
+        DocumentAttributeAnimated() for _ in range(attribute_count)
+    ]
+    attributes.append(DocumentAttributeVideo(12.5, 1920, 1080))
+    attributes.append(DocumentAttributeFilename("clip.final.render.mov"))
+    return MessageMediaDocument(
+        document=Document(
+            id=1,
+            access_hash=1,
+            file_reference=b"",
+            date=DATE,
+            mime_type=mime_type,
+            size=50_000_000,
+            dc_id=2,
+            attributes=attributes,
+        )
+    )
+
+
+MESSAGES = {
+    "photo": _message(
+        MessageMediaPhoto(
+            photo=Photo(
+                id=1,
+                access_hash=1,
+                file_reference=b"",
+                date=DATE,
+                sizes=[PhotoSize("y", 1280, 960, 300_000)],
+                dc_id=2,
+            )
+        )
+    ),
+    "video": _message(_document("video/mp4", 2)),
+    # No usable MIME type and many attributes forces the attribute scan
+    "doc_many_attrs": _message(_document("", 64)),
+    "text": _message(None),
+}
+
+
+def build_benchmarks(download_path: Path) -> Dict[str, Callable[[], Any]]:
+    """Build the benchmark callables keyed by name."""
+    timestamp_namer = TimestampFileNamer()
+    prefix_namer = ChannelPrefixNamer()
+    media_downloader = MediaDownloader(
+        connection=None,  # type: ignore[arg-type]
+        download_path=download_path,
+        media_filter=DefaultMediaFilter(),
+        file_namer=timestamp_namer,
+    )
+    filters = {
+        "default": DefaultMediaFilter(),
+        "image": ImageOnlyFilter(),
+        "video": VideoOnlyFilter(),
+    }
+
+    benchmarks: Dict[str, Callable[[], Any]] = {}
+
+    def add(name: str, func: Callable[..., Any], *args: Any) -> None:
+        benchmarks[name] = lambda: func(*args)
+
+    for kind, message in MESSAGES.items():
+        add(
+            f"timestamp_namer[{kind}]",
+            timestamp_namer.generate_filename,
+            message,
+            "chan",
+        )
+        add(
+            f"prefix_namer[{kind}]",
+            prefix_namer.generate_filename,
+            message,
+            TITLES["emoji"],
+        )
+        for filter_name, media_filter in filters.items():
+            add(
+                f"{filter_name}_filter[{kind}]",
+                media_filter.should_download,
+                message,
+            )
+
+    for kind, title in TITLES.items():
+        add(f"prefix_namer._sanitize_name[{kind}]", prefix_namer._sanitize_name, title)
+        add(
+            f"media_downloader._sanitize_channel_name[{kind}]",
+            media_downloader._sanitize_channel_name,
+            title,
+        )
+
+    for kind, filename in FILENAMES.items():
+        add(f"sanitize_filename[{kind}]", sanitize_filename, filename)
+
+    for size in (0, 1023, 5 * 1024**3, 10**18):
+        add(f"format_file_size[{size}]", format_file_size, size)
+
+    return benchmarks
+
+
+def time_call(func: Callable[[], Any], repeat: int) -> Tuple[float, int]:
+    """
+    Time a callable, returning the best ns/call over ``repeat`` runs.
+
+    Args:
+        func: Zero-argument callable
+        repeat: Number of timing runs
+
+    Returns:
+        Tuple of (best ns per call, calls per run)
+    """
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    best = min(timer.repeat(repeat=repeat, number=number))
+    return best / number * 1e9, number
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Run the micro-benchmarks."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--filter", default="", help="Only run matching names.")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--tolerance", type=float, default=0.3)
+    parser.add_argument("--update-baseline", action="store_true")
+    args = parser.parse_args(argv)
+
+    results: Dict[str, Dict[str, float]] = {}
+    with tempfile.TemporaryDirectory(prefix="tmd-micro-") as download_path:
+        benchmarks = build_benchmarks(Path(download_path))
+        for name, func in benchmarks.items():
+            if args.filter not in name:
+                continue
+            ns_per_call, number = time_call(func, args.repeat)
+            results[name] = {"ns_per_call": ns_per_call}
+            print(f"{name:<55} {ns_per_call:12.1f} ns/call  (x{number})")
+
+    if args.update_baseline:
+        baseline = load_baseline("micro")
+        baseline.update(results)
+        print(f"Baseline updated: {save_baseline('micro', baseline)}")
+        return 0
+
+    regressions = find_regressions(
+        results,
+        load_baseline("micro"),
+        "ns_per_call",
+        args.tolerance,
+        higher_is_better=False,
+    )
+    for regression in regressions:
+        print(f"REGRESSION {regression}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
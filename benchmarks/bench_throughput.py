@@ -0,0 +1,174 @@
+"""End-to-end throughput benchmarks for ``download_all_unread_media``.
+
+Drives the real downloader against ``FakeTelegramClient`` with configurable
+latency, bandwidth, file sizes, channel counts and flood-wait injection, and
+compares files/s against the stored baseline in ``baselines/throughput.json``.
+
+Usage:
+    python benchmarks/bench_throughput.py                  # all scenarios
+    python benchmarks/bench_throughput.py --scale 0.1      # quick run
+    python benchmarks/bench_throughput.py --scenario photos_1x10k --latency 0.005
+    python benchmarks/bench_throughput.py --update-baseline
+"""
+
+import argparse
+import asyncio
+import sys
+import tempfile
+import time
+from dataclasses import dataclass, field, replace
+from typing import Dict, List, Optional
+
+from baseline import find_regressions, load_baseline, save_baseline
+
+from telegram_media_downloader import TelegramConfig, TelegramMediaDownloader
+from telegram_media_downloader.testing import (
+    FakeChannelSpec,
+    FakeTelegramClient,
+    SimulatedNetwork,
+)
+
+MB = 1024 * 1024
+GB = 1024 * MB
+
+
+@dataclass
+class Scenario:
+    """A benchmark scenario."""
+
+    name: str
+    channels: int
+    messages_per_channel: int
+    media_kind: str
+    file_size: int
+    network: SimulatedNetwork = field(default_factory=SimulatedNetwork)
+
+    def build_channels(self, scale: float) -> List[FakeChannelSpec]:
+        """Build channel specifications, scaling the message counts."""
+        count = max(1, round(self.messages_per_channel * scale))
+        return [
+            FakeChannelSpec(
+                title=f"{self.name} channel {index}",
+                message_count=count,
+                media_kind=self.media_kind,
+                file_size=self.file_size,
+            )
+            for index in range(self.channels)
+        ]
+
+
+SCENARIOS: Dict[str, Scenario] = {
+    scenario.name: scenario
+    for scenario in [
+        Scenario("photos_1x10k", 1, 10_000, "photo", 200_000),
+        Scenario("channels_500x20", 500, 20, "mixed", 500_000),
+        Scenario(
+            "videos_50x1gb",
+            1,
+            50,
+            "video",
+            GB,
+            SimulatedNetwork(bandwidth=20 * GB),
+        ),
+        Scenario(
+            "photos_flood_wait",
+            1,
+            2_000,
+            "photo",
+            200_000,
+            SimulatedNetwork(flood_wait_rate=0.01, flood_wait_seconds=0.01),
+        ),
+    ]
+}
+
+
+async def run_scenario(
+    scenario: Scenario, scale: float, download_path: str
+) -> Dict[str, float]:
+    """
+    Run a single scenario and measure throughput.
+
+    Args:
+        scenario: Scenario to run
+        scale: Multiplier applied to message counts
+        download_path: Directory for (sparse) downloaded files
+
+    Returns:
+        Mapping of metric name to value
+    """
+    client = FakeTelegramClient(scenario.build_channels(scale), scenario.network)
+    downloader = TelegramMediaDownloader(
+        config=TelegramConfig(
+            api_id=1, api_hash="benchmark", phone_number="+10000000000"
+        ),
+        download_path=download_path,
+    )
+    downloader.connection.client = client
+
+    started = time.perf_counter()
+    session = await downloader.download_all_unread_media(mark_as_read=True)
+    wall_time = time.perf_counter() - started
+
+    return {
+        "wall_time_s": wall_time,
+        "files": float(session.total_downloaded),
+        "files_per_s": session.total_downloaded / wall_time,
+        "mb_per_s": client.counters.bytes_served / MB / wall_time,
+        "requests": float(client.counters.requests),
+        "flood_waits": float(client.counters.flood_waits),
+        "errors": float(session.total_errors),
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Run the throughput benchmarks."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--scenario",
+        action="append",
+        choices=sorted(SCENARIOS),
+        help="Scenario to run (repeatable, default: all).",
+    )
+    parser.add_argument("--scale", type=float, default=1.0)
+    parser.add_argument("--latency", type=float, help="Override request latency (s).")
+    parser.add_argument("--bandwidth", type=float, help="Override bandwidth (B/s).")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    parser.add_argument("--update-baseline", action="store_true")
+    args = parser.parse_args(argv)
+
+    results: Dict[str, Dict[str, float]] = {}
+    for name in args.scenario or list(SCENARIOS):
+        scenario = SCENARIOS[name]
+        if args.latency is not None:
+            scenario.network = replace(scenario.network, latency=args.latency)
+        if args.bandwidth is not None:
+            scenario.network = replace(scenario.network, bandwidth=args.bandwidth)
+
+        with tempfile.TemporaryDirectory(prefix="tmd-bench-") as download_path:
+            metrics = asyncio.run(run_scenario(scenario, args.scale, download_path))
+
+        key = f"{name}@{args.scale:g}"
+        results[key] = metrics
+        print(
+            f"{key:<28} {metrics['wall_time_s']:8.2f}s "
+            f"{metrics['files_per_s']:10.1f} files/s "
+            f"{metrics['mb_per_s']:10.1f} MB/s "
+            f"({int(metrics['files'])} files, {int(metrics['flood_waits'])} flood waits)"
+        )
+
+    if args.update_baseline:
+        baseline = load_baseline("throughput")
+        baseline.update(results)
+        print(f"Baseline updated: {save_baseline('throughput', baseline)}")
+        return 0
+
+    regressions = find_regressions(
+        results, load_baseline("throughput"), "files_per_s", args.tolerance
+    )
+    for regression in regressions:
+        print(f"REGRESSION {regression}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
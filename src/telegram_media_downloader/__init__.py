@@ -19,12 +19,15 @@ from .core.media_downloader import MediaDownloader
 # Filter exports
 from .filters.default_filter import DefaultMediaFilter
 from .filters.image_filter import ImageOnlyFilter
+from .filters.size_filter import SizeFilter
 from .filters.video_filter import VideoOnlyFilter
 from .models.channel_stats import ChannelStats
 from .models.download_session import DownloadSession
+from .models.error_log import ErrorLog
 
 # Model exports
 from .models.media_info import MediaInfo
+from .models.work_task import WorkTask
 from .namers.channel_prefix_namer import ChannelPrefixNamer
 
 # Namer exports
@@ -33,10 +36,18 @@ from .protocols.file_namer import FileNamer
 
 # Protocol exports
 from .protocols.media_filter import MediaFilter
+from .protocols.work_queue import WorkQueue
+
+# Storage exports
+from .storage.history import SessionHistory
+from .storage.work_queue import SQLiteWorkQueue
 from .utils.helpers import create_download_summary_file, print_session_summary
 
 # Utility exports
 from .utils.logging import setup_logging
+from .utils.media import PhotoSizePolicy
+from .utils.progress import ProgressTracker
+from .utils.tracing import JsonFileSpanExporter, Tracer
 
 __all__ = [
     # Core
@@ -49,18 +60,29 @@ __all__ = [
     "MediaInfo",
     "ChannelStats",
     "DownloadSession",
+    "ErrorLog",
+    "WorkTask",
     # Protocols
     "MediaFilter",
     "FileNamer",
+    "WorkQueue",
     # Filters
     "DefaultMediaFilter",
     "VideoOnlyFilter",
     "ImageOnlyFilter",
+    "SizeFilter",
     # Namers
     "TimestampFileNamer",
     "ChannelPrefixNamer",
+    # Storage
+    "SessionHistory",
+    "SQLiteWorkQueue",
     # Utils
     "setup_logging",
     "print_session_summary",
     "create_download_summary_file",
+    "Tracer",
+    "JsonFileSpanExporter",
+    "ProgressTracker",
+    "PhotoSizePolicy",
 ]
@@ -2,10 +2,14 @@
 
 import os
 from pathlib import Path
-from typing import List
+from typing import Any, Dict, List, Optional
 
 import yaml
 
+# Hard caps of part downloads: Telegram serves parts of up to 512 KB
+DEFAULT_MAX_PART_SIZE = 512 * 1024
+DEFAULT_MAX_PARTS_IN_FLIGHT = 16
+
 
 class TelegramConfig:
     """Configuration for Telegram connection."""
@@ -16,6 +20,8 @@ class TelegramConfig:
         api_hash: str,
         phone_number: str,
         session_name: str = "telegram_session",
+        max_part_size: int = DEFAULT_MAX_PART_SIZE,
+        max_parts_in_flight: int = DEFAULT_MAX_PARTS_IN_FLIGHT,
     ) -> None:
         """
         Initialize Telegram configuration.
@@ -25,11 +31,17 @@ class TelegramConfig:
             api_hash: Telegram API hash from https://my.telegram.org/apps
             phone_number: Phone number with country code (e.g., +1234567890)
             session_name: Name for the session file
+            max_part_size: Largest part size in bytes that part downloads
+                may use
+            max_parts_in_flight: Most part requests that part downloads may
+                have in flight
         """
         self.api_id = api_id
         self.api_hash = api_hash
         self.phone_number = phone_number
         self.session_name = session_name
+        self.max_part_size = max_part_size
+        self.max_parts_in_flight = max_parts_in_flight
 
     @classmethod
     def from_env(cls) -> "TelegramConfig":
@@ -44,20 +56,96 @@ class TelegramConfig:
             api_hash=os.getenv("TELEGRAM_API_HASH", ""),
             phone_number=os.getenv("TELEGRAM_PHONE", ""),
             session_name=os.getenv("TELEGRAM_SESSION", "telegram_session"),
+            max_part_size=int(
+                os.getenv("TELEGRAM_MAX_PART_SIZE", str(DEFAULT_MAX_PART_SIZE))
+            ),
+            max_parts_in_flight=int(
+                os.getenv(
+                    "TELEGRAM_MAX_PARTS_IN_FLIGHT", str(DEFAULT_MAX_PARTS_IN_FLIGHT)
+                )
+            ),
         )
 
+    @classmethod
+    def accounts_from_env(cls, path: Optional[Path] = None) -> List["TelegramConfig"]:
+        """
+        Create one configuration per account.
+
+        An explicit YAML file is always used. Otherwise config.yaml in the
+        working directory takes precedence over the environment variables,
+        which describe a single account.
+
+        Args:
+            path: YAML file to read the accounts from
+
+        Returns:
+            List of account configurations
+        """
+        if path is not None:
+            return cls.accounts_from_yaml(path)
+        config_path = Path("config.yaml")
+        if config_path.exists():
+            return cls.accounts_from_yaml(config_path)
+        return [cls.from_env()]
+
     @classmethod
     def from_yaml(cls, path: Path) -> "TelegramConfig":
         """
         Create configuration from a YAML file.
+
+        When the file lists several accounts, the first one is returned.
+        """
+        return cls.accounts_from_yaml(path)[0]
+
+    @classmethod
+    def accounts_from_yaml(cls, path: Path) -> List["TelegramConfig"]:
+        """
+        Create one configuration per account listed in a YAML file.
+
+        Accounts are listed under ``accounts``; top-level keys are defaults
+        shared by every account (e.g. ``api_id`` and ``api_hash``). A file
+        without ``accounts`` describes a single account.
+
+        Args:
+            path: YAML file path
+
+        Returns:
+            List of account configurations
+
+        Raises:
+            ValueError: If two accounts share a session name
         """
         with open(path, "r", encoding="utf-8") as f:
-            data = yaml.safe_load(f)
+            data = yaml.safe_load(f) or {}
+
+        accounts = data.pop("accounts", None)
+        if not accounts:
+            return [cls._from_mapping(data)]
+
+        default_session = data.get("session_name", "telegram_session")
+        configs = [
+            cls._from_mapping(
+                {**data, "session_name": f"{default_session}_{index}", **account}
+            )
+            for index, account in enumerate(accounts)
+        ]
+        session_names = [config.session_name for config in configs]
+        if len(set(session_names)) != len(session_names):
+            raise ValueError("Every account in config.yaml needs its own session_name")
+        return configs
+
+    @classmethod
+    def _from_mapping(cls, data: Dict[str, Any]) -> "TelegramConfig":
+        """Create configuration from parsed YAML values."""
         return cls(
             api_id=int(data.get("api_id", 0)),
             api_hash=data.get("api_hash", ""),
             phone_number=data.get("phone_number", ""),
             session_name=data.get("session_name", "telegram_session"),
+            max_part_size=int(data.get("max_part_size", DEFAULT_MAX_PART_SIZE)),
+            max_parts_in_flight=int(
+                data.get("max_parts_in_flight", DEFAULT_MAX_PARTS_IN_FLIGHT)
+            ),
         )
 
     def validate(self) -> List[str]:
@@ -83,6 +171,19 @@ class TelegramConfig:
         if not self.session_name:
             errors.append("SESSION_NAME cannot be empty")
 
+        # Parts must be multiples of 4 KB that divide 1 MB
+        if (
+            not 4096 <= self.max_part_size <= DEFAULT_MAX_PART_SIZE
+            or (1024 * 1024) % self.max_part_size
+            or self.max_part_size % 4096
+        ):
+            errors.append(
+                "MAX_PART_SIZE must be a power of two between 4096 and 524288 bytes"
+            )
+
+        if self.max_parts_in_flight < 1:
+            errors.append("MAX_PARTS_IN_FLIGHT must be at least 1")
+
         return errors
 
     def __repr__(self) -> str:
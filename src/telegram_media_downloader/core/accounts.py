@@ -0,0 +1,480 @@
+"""Download orchestration across several Telegram accounts.
+
+Flood limits apply per account, so channels visible to more than one of the
+configured accounts are spread across them. Each channel is assigned to the
+least-loaded account that can see it, and is moved to another account when
+its account hits a flood wait.
+"""
+
+import asyncio
+import math
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from types import TracebackType
+from typing import Any, Callable, Deque, Dict, List, Optional, Sequence, Tuple, Union
+
+from telethon.errors import FloodWaitError
+
+from ..config.settings import TelegramConfig
+from ..models.channel_stats import ChannelStats
+from ..models.download_session import DownloadSession
+from ..models.error_log import ErrorLog
+from ..protocols.file_namer import FileNamer
+from ..protocols.media_filter import MediaFilter
+from ..utils.logging import get_logger
+from ..utils.media import PhotoSizePolicy, group_albums
+from ..utils.progress import ProgressTracker
+from ..utils.tracing import Tracer
+from .auto_tuner import AutoTuner
+from .downloader import TelegramMediaDownloader
+from .part_downloader import HedgePolicy
+from .read_acks import DEFAULT_ACK_EVERY, DEFAULT_ACK_INTERVAL, ReadAcknowledger
+from .retry import RetryPolicy, RetryQueue
+from .stall_watchdog import DEFAULT_STALL_TIMEOUT
+
+
+class AccountScheduler:
+    """Tracks the load and flood waits of each account."""
+
+    def __init__(
+        self, accounts: int, clock: Callable[[], float] = time.monotonic
+    ) -> None:
+        """
+        Initialize account scheduler.
+
+        Args:
+            accounts: Number of accounts
+            clock: Monotonic clock in seconds
+        """
+        self.loads = [0] * accounts
+        self.blocked_until = [0.0] * accounts
+        self.clock = clock
+
+    def wait_time(self, account: int) -> float:
+        """Get the seconds left in an account's flood wait."""
+        return max(0.0, self.blocked_until[account] - self.clock())
+
+    def assign(self, candidates: Sequence[int], weight: int) -> int:
+        """
+        Assign work to the least-loaded candidate account.
+
+        Accounts in a flood wait are only used when every candidate is
+        waiting, in which case the one that is available first is chosen.
+
+        Args:
+            candidates: Accounts that can take the work
+            weight: Load the work adds to the chosen account
+
+        Returns:
+            Chosen account
+        """
+        available = [account for account in candidates if not self.wait_time(account)]
+        if available:
+            account = min(available, key=lambda a: (self.loads[a], a))
+        else:
+            account = min(candidates, key=lambda a: (self.blocked_until[a], a))
+        self.loads[account] += weight
+        return account
+
+    def release(self, account: int, weight: int) -> None:
+        """Remove finished or moved work from an account's load."""
+        self.loads[account] -= weight
+
+    def block(self, account: int, seconds: float) -> None:
+        """Record a flood wait on an account."""
+        self.blocked_until[account] = max(
+            self.blocked_until[account], self.clock() + seconds
+        )
+
+
+@dataclass
+class _ChannelJob:
+    """A channel and the accounts that can see it."""
+
+    channel_id: int
+    name: str
+    dialogs: Dict[int, Any] = field(default_factory=dict)
+    unread: Dict[int, int] = field(default_factory=dict)
+    stats: Optional[ChannelStats] = None
+    # Downloads left once listed (messages of the account that listed them)
+    pending: Optional[Deque[Tuple[List[Any], int]]] = None
+
+    @property
+    def weight(self) -> int:
+        """Get the number of unread messages the channel adds to a load."""
+        return max(self.unread.values(), default=0)
+
+    @property
+    def candidates(self) -> List[int]:
+        """
+        Get the accounts the channel can be assigned to.
+
+        Before the unread messages are listed, only accounts that see the
+        whole unread backlog qualify. Afterwards any account that can see the
+        channel can fetch the remaining messages by id.
+        """
+        if self.pending is not None:
+            return sorted(self.dialogs)
+        return sorted(a for a, count in self.unread.items() if count == self.weight)
+
+
+class _AccountsReadAcknowledger(ReadAcknowledger):
+    """Read acknowledger that marks channels as read on every account."""
+
+    def __init__(
+        self,
+        downloaders: List[TelegramMediaDownloader],
+        jobs: Dict[int, _ChannelJob],
+        every: int,
+        interval: float,
+        tracer: Tracer,
+    ) -> None:
+        """
+        Initialize read acknowledger.
+
+        Args:
+            downloaders: Per-account downloaders
+            jobs: Channel jobs by channel id
+            every: Handled messages between acknowledgements
+            interval: Seconds between acknowledgements
+            tracer: Span tracer
+        """
+        super().__init__(
+            downloaders[0].channel_manager,
+            every=every,
+            interval=interval,
+            tracer=tracer,
+        )
+        self.downloaders = downloaders
+        self.jobs = jobs
+
+    async def _send(self, dialog: Any, max_id: int) -> None:
+        """Mark a channel as read on every account subscribed to it."""
+        job = self.jobs[dialog.entity.id]
+        await asyncio.gather(
+            *(
+                self.downloaders[account].channel_manager.mark_read_up_to(
+                    account_dialog, max_id
+                )
+                for account, account_dialog in job.dialogs.items()
+            )
+        )
+
+
+class MultiAccountDownloader:
+    """Downloads unread media using several accounts side by side.
+
+    Channels are listed and downloaded by the per-account downloaders, with
+    the same album grouping, retries and circuit breakers as a single
+    account. A flood wait ends the channel's pass on its account and the
+    downloads left, including the one that hit the flood wait, continue on
+    another account.
+    """
+
+    def __init__(
+        self,
+        configs: List[TelegramConfig],
+        download_path: Union[str, Path] = "downloads",
+        media_filter: Optional[MediaFilter] = None,
+        file_namer: Optional[FileNamer] = None,
+        tracer: Optional[Tracer] = None,
+        progress: Optional[ProgressTracker] = None,
+        downloaders: Optional[List[TelegramMediaDownloader]] = None,
+        photo_size_policy: Optional[PhotoSizePolicy] = None,
+        preview: bool = False,
+        ack_every: int = DEFAULT_ACK_EVERY,
+        ack_interval: float = DEFAULT_ACK_INTERVAL,
+        retry_policy: Optional[RetryPolicy] = None,
+        stall_timeout: Optional[float] = DEFAULT_STALL_TIMEOUT,
+        parts_in_flight: int = 0,
+        hedge_policy: Optional[HedgePolicy] = None,
+        auto_tuner: Optional[AutoTuner] = None,
+        verify_integrity: bool = False,
+    ) -> None:
+        """
+        Initialize multi-account downloader.
+
+        Args:
+            configs: One Telegram configuration per account
+            download_path: Base directory for downloads
+            media_filter: Media filtering strategy shared by all accounts
+            file_namer: File naming strategy shared by all accounts
+            tracer: Span tracer (tracing disabled when None)
+            progress: Live progress tracker
+            downloaders: Pre-built per-account downloaders (for testing)
+            photo_size_policy: Size variant of photos to download
+            preview: Save small previews instead of the original media
+            ack_every: Processed messages between read acknowledgements
+            ack_interval: Seconds between read acknowledgements
+            retry_policy: Retries of failed downloads on each account
+            stall_timeout: Seconds without progress after which a download is
+                cancelled and retried (never when None)
+            parts_in_flight: Download files in parts with up to this many part
+                requests in flight (whole files are downloaded when 0)
+            hedge_policy: Hedging of slow part requests (never when None)
+            auto_tuner: Tunes part downloads per data center for all accounts
+            verify_integrity: Verify original media against Telegram's hashes
+
+        See ``TelegramMediaDownloader`` for the download options.
+        """
+        self.tracer = tracer or Tracer()
+        self.progress = progress
+        self.downloaders = downloaders or [
+            TelegramMediaDownloader(
+                config=config,
+                download_path=str(download_path),
+                media_filter=media_filter,
+                file_namer=file_namer,
+                tracer=self.tracer,
+                progress=progress,
+                preview=preview,
+                photo_size_policy=photo_size_policy,
+                ack_every=ack_every,
+                ack_interval=ack_interval,
+                retry_policy=retry_policy,
+                stall_timeout=stall_timeout,
+                parts_in_flight=parts_in_flight,
+                hedge_policy=hedge_policy,
+                auto_tuner=auto_tuner,
+                verify_integrity=verify_integrity,
+            )
+            for config in configs
+        ]
+        self.scheduler = AccountScheduler(len(self.downloaders))
+        self.logger = get_logger(self.__class__.__name__)
+
+        self._queues: List[Deque[_ChannelJob]] = []
+        self._retries: List[RetryQueue] = []
+        self._read_acks: Optional[_AccountsReadAcknowledger] = None
+        self._finished: List[List[ChannelStats]] = []
+        self._errors: List[ErrorLog] = []
+        self._outstanding = 0
+        self._changed = asyncio.Condition()
+
+    async def __aenter__(self) -> "MultiAccountDownloader":
+        """Connect every account."""
+        for downloader in self.downloaders:
+            await downloader.connection.connect()
+        if self.progress is not None:
+            self.progress.start()
+        return self
+
+    async def __aexit__(
+        self, exc_type: type, exc_val: Exception, exc_tb: Optional[TracebackType]
+    ) -> None:
+        """Disconnect every account."""
+        if self.progress is not None:
+            await self.progress.stop()
+        for downloader in self.downloaders:
+            await downloader.connection.disconnect()
+        self.tracer.flush()
+
+    async def download_all_unread_media(
+        self, mark_as_read: bool = True
+    ) -> DownloadSession:
+        """
+        Download unread media from the channels of all accounts.
+
+        Args:
+            mark_as_read: Whether to mark messages as read after processing
+
+        Returns:
+            DownloadSession merged from the per-account results
+        """
+        start_time = datetime.now()
+        accounts = len(self.downloaders)
+        self._queues = [deque() for _ in range(accounts)]
+        self._retries = [RetryQueue(d.retry_policy) for d in self.downloaders]
+        self._finished = [[] for _ in range(accounts)]
+        self._errors = [ErrorLog() for _ in range(accounts)]
+        jobs = await self._discover_channels()
+        self.logger.info(
+            f"Found {len(jobs)} channels across {accounts} accounts to process"
+        )
+        if mark_as_read:
+            first = self.downloaders[0]
+            self._read_acks = _AccountsReadAcknowledger(
+                self.downloaders,
+                {job.channel_id: job for job in jobs},
+                every=first.ack_every,
+                interval=first.ack_interval,
+                tracer=self.tracer,
+            )
+        self._outstanding = len(jobs)
+        for job in sorted(jobs, key=lambda j: j.weight, reverse=True):
+            self._enqueue(job)
+
+        await asyncio.gather(
+            *(self._run_account(account) for account in range(accounts))
+        )
+        if self._read_acks is not None:
+            await self._read_acks.flush()
+
+        end_time = datetime.now()
+        session = DownloadSession.merge(
+            DownloadSession(
+                total_channels=len(stats),
+                total_unread=sum(s.unread_count for s in stats),
+                total_media=sum(s.media_count for s in stats),
+                total_downloaded=sum(s.downloaded_count for s in stats),
+                channel_stats=stats,
+                start_time=start_time,
+                end_time=end_time,
+                errors=errors,
+            )
+            for stats, errors in zip(self._finished, self._errors)
+        )
+        self.logger.info(f"Multi-account download session completed: {session}")
+        return session
+
+    async def _discover_channels(self) -> List[_ChannelJob]:
+        """List the channels of every account, keyed by channel id."""
+        results = await asyncio.gather(
+            *(d.channel_manager.get_all_channels() for d in self.downloaders),
+            return_exceptions=True,
+        )
+        jobs: Dict[int, _ChannelJob] = {}
+        for account, result in enumerate(results):
+            if isinstance(result, BaseException):
+                error_msg = f"Failed to list channels of account {account}: {result}"
+                self.logger.error(error_msg)
+                self._errors[account].add(error_msg, type(result).__name__)
+                continue
+            for dialog in result:
+                channel_id = dialog.entity.id
+                job = jobs.get(channel_id)
+                if job is None:
+                    name = getattr(dialog, "title", "Unknown")
+                    job = jobs[channel_id] = _ChannelJob(channel_id, name)
+                job.dialogs[account] = dialog
+                job.unread[account] = dialog.unread_count
+        return list(jobs.values())
+
+    def _enqueue(self, job: _ChannelJob) -> None:
+        """Queue a channel on the least-loaded account that can take it."""
+        account = self.scheduler.assign(job.candidates, job.weight)
+        self._queues[account].append(job)
+
+    async def _run_account(self, account: int) -> None:
+        """Process the channels queued on one account until all are done.
+
+        Downloads deferred for a retry are retried once every channel was
+        processed.
+        """
+        while True:
+            async with self._changed:
+                await self._changed.wait_for(
+                    lambda: bool(self._queues[account]) or not self._outstanding
+                )
+                if not self._queues[account]:
+                    break
+                job = self._queues[account].popleft()
+
+            delay = self.scheduler.wait_time(account)
+            if delay:
+                self.logger.info(f"Account {account} waiting {delay:.0f}s (flood wait)")
+                await asyncio.sleep(delay)
+
+            failed_over = False
+            try:
+                await self._process_channel(account, job)
+            except FloodWaitError as e:
+                failed_over = True
+                await self._fail_over(account, job, e.seconds)
+            except Exception as e:
+                error_msg = f"Error processing channel {job.name}: {e}"
+                self.logger.error(error_msg)
+                if job.stats is None:
+                    job.stats = ChannelStats(name=job.name, start_time=datetime.now())
+                job.stats.add_error(error_msg, type(e).__name__)
+            finally:
+                if not failed_over:
+                    await self._finish(account, job)
+
+        await self.downloaders[account]._retry_failed(
+            self._retries[account], self._read_acks
+        )
+
+    async def _finish(self, account: int, job: _ChannelJob) -> None:
+        """Record a processed channel and wake up the other accounts."""
+        self.scheduler.release(account, job.weight)
+        if job.stats is not None:
+            job.stats.end_time = datetime.now()
+            self._finished[account].append(job.stats)
+        async with self._changed:
+            self._outstanding -= 1
+            self._changed.notify_all()
+
+    async def _fail_over(self, account: int, job: _ChannelJob, seconds: int) -> None:
+        """Move a channel and the account's queue away from a flood wait."""
+        self.logger.warning(
+            f"Account {account} hit a {seconds}s flood wait in {job.name}, "
+            f"moving its channels to other accounts"
+        )
+        self.scheduler.block(account, seconds)
+        if job.stats is None:
+            job.stats = ChannelStats(name=job.name, start_time=datetime.now())
+        job.stats.add_error(
+            f"Flood wait of {seconds}s on account {account}", "FloodWaitError"
+        )
+
+        # Downloads the account deferred, such as the one that hit the flood
+        # wait, go along with the channel
+        deferred = self._retries[account].take(job.channel_id)
+        if deferred and job.pending is not None:
+            job.stats.retry_count += len(deferred)
+            job.pending.extendleft(
+                (retry.messages, retry.attempt) for retry in reversed(deferred)
+            )
+
+        async with self._changed:
+            moved = [job, *self._queues[account]]
+            self._queues[account].clear()
+            for moved_job in moved:
+                self.scheduler.release(account, moved_job.weight)
+                self._enqueue(moved_job)
+            self._changed.notify_all()
+
+    async def _process_channel(self, account: int, job: _ChannelJob) -> None:
+        """Download a channel's remaining media on one account."""
+        downloader = self.downloaders[account]
+        dialog = job.dialogs[account]
+        retries = self._retries[account]
+        with self.tracer.span(
+            "process_channel", {"channel": job.name, "account": account}
+        ):
+            if job.stats is None:
+                job.stats = ChannelStats(name=job.name, start_time=datetime.now())
+            if job.pending is None:
+                self.logger.info(f"Processing channel: {job.name}")
+                messages = await downloader._list_media_messages(
+                    dialog, job.name, job.stats, self._read_acks
+                )
+                job.pending = deque((group, 0) for group in group_albums(messages))
+            else:
+                # Messages are fetched again, as file references and access
+                # hashes are only valid for the account that fetched them
+                self.logger.info(
+                    f"Resuming {job.name} with {len(job.pending)} downloads"
+                )
+                job.pending = await downloader._refresh_pending(
+                    dialog, [], job.pending, retries, self._read_acks
+                )
+
+            await downloader._download_pending(
+                dialog,
+                job.name,
+                job.stats,
+                job.pending,
+                self._read_acks,
+                retries,
+                on_flood_wait=self._raise_flood_wait,
+            )
+
+    @staticmethod
+    async def _raise_flood_wait(seconds: float) -> None:
+        """End a channel's pass so it fails over to another account."""
+        raise FloodWaitError(request=None, capture=math.ceil(seconds))
@@ -0,0 +1,212 @@
+"""AIMD tuning of part sizes and part requests in flight."""
+
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Optional
+
+from ..storage.checkpoints import CheckpointStore
+from ..utils.logging import get_logger
+
+DEFAULT_TUNING_FILENAME = "transfer_tuning.json"
+
+# Key of the tuned limits in the checkpoint store
+TUNING_JOB_KEY = "transfer_tuning"
+
+# Part sizes are powers of two, so they stay valid Telegram part sizes
+MIN_TUNED_PART_SIZE = 32 * 1024
+INITIAL_PART_SIZE = 128 * 1024
+INITIAL_IN_FLIGHT = 2
+
+
+@dataclass
+class TransferLimits:
+    """Tuned part size and part requests in flight of a data center."""
+
+    part_size: int
+    in_flight: int
+
+
+@dataclass
+class _Feedback:
+    """Part request feedback of a data center since its last adjustment."""
+
+    started: float
+    parts: int = 0
+    bytes: int = 0
+    rtt_total: float = 0.0
+    throughput: float = 0.0  # bytes per second of the previous window
+    min_rtt: Dict[int, float] = field(default_factory=dict)  # per part size
+
+
+class AutoTuner:
+    """Tunes part size and part requests in flight per data center.
+
+    Limits follow AIMD (additive increase, multiplicative decrease) over
+    windows of ``window`` part requests. After a window whose round trips
+    stay within ``rtt_tolerance`` times the fastest seen for the part size,
+    one more part request may be in flight and the part size doubles, as
+    long as throughput did not drop. Flood waits and inflated round trips
+    halve the part requests in flight (and the part size once a single
+    request is left). Limits never exceed the hard caps and are saved per
+    data center, so the next run starts from them.
+    """
+
+    def __init__(
+        self,
+        max_part_size: int,
+        max_in_flight: int,
+        store: Optional[CheckpointStore] = None,
+        window: int = 16,
+        rtt_tolerance: float = 2.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """
+        Initialize auto-tuner.
+
+        Args:
+            max_part_size: Hard cap of the part size in bytes
+            max_in_flight: Hard cap of the part requests in flight
+            store: Checkpoint store the tuned limits are saved in
+            window: Part requests between adjustments
+            rtt_tolerance: Ratio of the window's mean round trip to the
+                fastest one above which the network counts as congested
+            clock: Monotonic clock in seconds
+        """
+        self.max_part_size = max_part_size
+        self.max_in_flight = max_in_flight
+        self.store = store
+        self.window = window
+        self.rtt_tolerance = rtt_tolerance
+        self.clock = clock
+        self.logger = get_logger(self.__class__.__name__)
+
+        self._limits: Dict[int, TransferLimits] = {}
+        self._feedback: Dict[int, _Feedback] = {}
+        if store is not None:
+            for record in store.get(TUNING_JOB_KEY) or []:
+                self._limits[record["dc_id"]] = self._clamp(
+                    TransferLimits(record["part_size"], record["in_flight"])
+                )
+
+    def limits(self, dc_id: int) -> TransferLimits:
+        """
+        Get the current limits of a data center.
+
+        Args:
+            dc_id: Data center id
+
+        Returns:
+            Tuned limits (initial limits for a data center not seen before)
+        """
+        limits = self._limits.get(dc_id)
+        if limits is None:
+            limits = self._limits[dc_id] = self._clamp(
+                TransferLimits(INITIAL_PART_SIZE, INITIAL_IN_FLIGHT)
+            )
+        return limits
+
+    def record_part(self, dc_id: int, part_size: int, size: int, rtt: float) -> None:
+        """
+        Record a finished part request.
+
+        Args:
+            dc_id: Data center id
+            part_size: Part size the request was made with
+            size: Bytes received
+            rtt: Seconds from sending the request to receiving the part
+        """
+        limits = self.limits(dc_id)
+        if part_size != limits.part_size:
+            return  # requested before the last adjustment
+        feedback = self._get_feedback(dc_id)
+        feedback.parts += 1
+        feedback.bytes += size
+        feedback.rtt_total += rtt
+        if feedback.parts >= self.window:
+            self._adjust(dc_id, limits, feedback)
+
+    def record_flood(self, dc_id: int) -> None:
+        """Back off after a part request of a data center hit a flood wait."""
+        self._decrease(dc_id, self.limits(dc_id), "flood wait")
+
+    def _get_feedback(self, dc_id: int) -> _Feedback:
+        """Get the feedback of a data center's current window."""
+        feedback = self._feedback.get(dc_id)
+        if feedback is None:
+            feedback = self._feedback[dc_id] = _Feedback(started=self.clock())
+        return feedback
+
+    def _adjust(self, dc_id: int, limits: TransferLimits, feedback: _Feedback) -> None:
+        """Adjust the limits of a data center at the end of a window."""
+        elapsed = max(self.clock() - feedback.started, 1e-9)
+        throughput = feedback.bytes / elapsed
+        mean_rtt = feedback.rtt_total / feedback.parts
+        min_rtt = feedback.min_rtt.setdefault(limits.part_size, mean_rtt)
+        feedback.min_rtt[limits.part_size] = min(min_rtt, mean_rtt)
+
+        if mean_rtt > self.rtt_tolerance * min_rtt:
+            self._decrease(dc_id, limits, f"round trips up to {mean_rtt:.2f}s")
+            return
+        if throughput >= feedback.throughput:
+            self._set(
+                dc_id,
+                TransferLimits(limits.part_size * 2, limits.in_flight + 1),
+                f"{throughput / 1024:.0f} KB/s",
+            )
+        self._next_window(dc_id, throughput)
+
+    def _decrease(self, dc_id: int, limits: TransferLimits, reason: str) -> None:
+        """Halve the parts in flight, or the part size once one is left."""
+        if limits.in_flight > 1:
+            decreased = TransferLimits(limits.part_size, limits.in_flight // 2)
+        else:
+            decreased = TransferLimits(limits.part_size // 2, 1)
+        self._set(dc_id, decreased, reason)
+        self._next_window(dc_id, 0.0)
+
+    def _next_window(self, dc_id: int, throughput: float) -> None:
+        """Start a new feedback window."""
+        feedback = self._get_feedback(dc_id)
+        feedback.started = self.clock()
+        feedback.parts = 0
+        feedback.bytes = 0
+        feedback.rtt_total = 0.0
+        feedback.throughput = throughput
+
+    def _set(self, dc_id: int, limits: TransferLimits, reason: str) -> None:
+        """Apply new limits to a data center and save them if they changed."""
+        limits = self._clamp(limits)
+        if limits == self._limits.get(dc_id):
+            return
+        self._limits[dc_id] = limits
+        self.logger.debug(
+            f"DC {dc_id}: {limits.part_size // 1024} KB parts, "
+            f"{limits.in_flight} in flight ({reason})"
+        )
+        self.save()
+
+    def _clamp(self, limits: TransferLimits) -> TransferLimits:
+        """Keep limits within the hard caps."""
+        part_size = MIN_TUNED_PART_SIZE
+        while part_size * 2 <= min(limits.part_size, self.max_part_size):
+            part_size *= 2
+        return TransferLimits(
+            part_size=min(part_size, self.max_part_size),
+            in_flight=max(1, min(limits.in_flight, self.max_in_flight)),
+        )
+
+    def save(self) -> None:
+        """Save the tuned limits of every data center."""
+        if self.store is None:
+            return
+        self.store.put(
+            TUNING_JOB_KEY,
+            [
+                {
+                    "dc_id": dc_id,
+                    "part_size": limits.part_size,
+                    "in_flight": limits.in_flight,
+                }
+                for dc_id, limits in sorted(self._limits.items())
+            ],
+        )
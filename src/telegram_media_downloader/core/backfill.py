@@ -0,0 +1,357 @@
+"""Historical backfill of a channel's message history."""
+
+import asyncio
+import math
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+from ..models.channel_stats import ChannelStats
+from ..models.download_session import DownloadSession
+from ..models.error_log import ErrorLog
+from ..storage.checkpoints import CheckpointStore
+from ..utils.logging import get_logger
+from .downloader import TelegramMediaDownloader
+from .retry import PERMANENT, TRANSIENT, classify_error
+
+DEFAULT_CHECKPOINT_FILENAME = "backfill_checkpoints.json"
+
+
+@dataclass
+class BackfillPartition:
+    """A contiguous message id range of a backfill and its progress."""
+
+    first_id: int
+    last_id: int
+    done_up_to: int = 0  # every id up to here has been handled
+    failed_ids: List[int] = field(default_factory=list)
+    attempts: Dict[int, int] = field(default_factory=dict)  # per failed id
+
+    def __post_init__(self) -> None:
+        """Start before the first message."""
+        self.done_up_to = max(self.done_up_to, self.first_id - 1)
+        # JSON checkpoints store the ids as strings
+        self.attempts = {int(i): n for i, n in self.attempts.items()}
+
+    @property
+    def is_complete(self) -> bool:
+        """Check if every message of the partition has been handled."""
+        return self.done_up_to >= self.last_id and not self.failed_ids
+
+    @property
+    def remaining(self) -> int:
+        """Get the number of message ids left to handle."""
+        return max(0, self.last_id - self.done_up_to)
+
+
+def split_id_range(
+    first_id: int, last_id: int, partitions: int
+) -> List[Tuple[int, int]]:
+    """
+    Split an inclusive id range into contiguous partitions of similar size.
+
+    Args:
+        first_id: Lowest message id
+        last_id: Highest message id
+        partitions: Maximum number of partitions
+
+    Returns:
+        List of inclusive (first_id, last_id) pairs in ascending order
+    """
+    if last_id < first_id:
+        return []
+    size = math.ceil((last_id - first_id + 1) / max(1, partitions))
+    return [
+        (start, min(start + size - 1, last_id))
+        for start in range(first_id, last_id + 1, size)
+    ]
+
+
+class ChannelBackfill:
+    """Downloads the media of a channel's history between two ids or dates.
+
+    The id range is split into partitions that are paged concurrently with
+    ``offset_id``/``max_id``. Each partition records the highest message id
+    below which everything has been handled, so an interrupted backfill
+    resumes where every partition stopped; failed messages are retried on
+    the next run until they fail permanently or more than
+    ``retry_policy.max_attempts`` times. Checkpoints are keyed by the requested range, so a resumed
+    backfill keeps the id range resolved by its first run even when new
+    messages were posted since.
+    """
+
+    def __init__(
+        self,
+        downloader: TelegramMediaDownloader,
+        channel_name: str,
+        min_id: Optional[int] = None,
+        max_id: Optional[int] = None,
+        start_date: Optional[datetime] = None,
+        end_date: Optional[datetime] = None,
+        partitions: int = 8,
+        workers: int = 4,
+        checkpoint_path: Optional[Union[str, Path]] = None,
+        checkpoint_every: int = 50,
+    ) -> None:
+        """
+        Initialize channel backfill.
+
+        Args:
+            downloader: Connected downloader whose components are reused
+            channel_name: Title of the channel to backfill
+            min_id: Lowest message id to include
+            max_id: Highest message id to include
+            start_date: Include messages sent at or after this date
+            end_date: Include messages sent before this date
+            partitions: Number of id range partitions
+            workers: Number of partitions paged concurrently
+            checkpoint_path: Checkpoint file (defaults to
+                backfill_checkpoints.json in the download directory)
+            checkpoint_every: Messages handled per partition between
+                checkpoint writes
+        """
+        self.downloader = downloader
+        self.channel_name = channel_name
+        self.min_id = min_id
+        self.max_id = max_id
+        self.start_date = start_date
+        self.end_date = end_date
+        self.partitions = partitions
+        self.workers = workers
+        self.checkpoints = CheckpointStore(
+            checkpoint_path or downloader.download_path / DEFAULT_CHECKPOINT_FILENAME
+        )
+        self.checkpoint_every = checkpoint_every
+        self.logger = get_logger(self.__class__.__name__)
+
+        self._job_key = ""
+        self._plan: List[BackfillPartition] = []
+
+    async def _find_channel(self) -> Any:
+        """Find the dialog of the channel to backfill."""
+        for dialog in await self.downloader.channel_manager.get_all_channels():
+            if dialog.title == self.channel_name:
+                return dialog
+        raise ValueError(f"Channel not found: {self.channel_name}")
+
+    async def resolve_id_range(self, channel: Any) -> Tuple[int, int]:
+        """
+        Resolve the requested ids and dates to an inclusive id range.
+
+        Args:
+            channel: Channel dialog object
+
+        Returns:
+            (first_id, last_id); empty when first_id > last_id
+        """
+        manager = self.downloader.channel_manager
+        first_id = self.min_id or 1
+        if self.start_date is not None:
+            after = await manager.get_first_message_id_after(channel, self.start_date)
+            if not after:
+                return 1, 0
+            first_id = max(first_id, after)
+        last_id = self.max_id or await manager.get_latest_message_id(channel)
+        if self.end_date is not None:
+            before = await manager.get_last_message_id_before(channel, self.end_date)
+            last_id = min(last_id, before)
+        return first_id, last_id
+
+    def get_job_key(self, channel: Any) -> str:
+        """
+        Get the checkpoint key of the requested range.
+
+        Unset bounds are part of the key as such, rather than resolved, so
+        the key does not change as the channel grows.
+
+        Args:
+            channel: Channel dialog object
+
+        Returns:
+            Key such as ``"1000001:1-latest"``
+        """
+        key = f"{channel.entity.id}:{self.min_id or 1}-{self.max_id or 'latest'}"
+        if self.start_date is not None or self.end_date is not None:
+            start = self.start_date.isoformat() if self.start_date else ""
+            end = self.end_date.isoformat() if self.end_date else ""
+            key += f":{start}/{end}"
+        return key
+
+    def _save_checkpoint(self) -> None:
+        """Write the progress of every partition."""
+        self.checkpoints.put(self._job_key, [asdict(p) for p in self._plan])
+
+    async def _run_partition(
+        self, channel: Any, partition: BackfillPartition, stats: ChannelStats
+    ) -> None:
+        """Page through one partition and download its media."""
+        manager = self.downloader.channel_manager
+        media_downloader = self.downloader.media_downloader
+
+        # Retry messages that failed in a previous run; they stay in the
+        # checkpoint until they succeed or are given up
+        messages: List[Any] = []
+        if partition.failed_ids:
+            messages = await manager.get_messages_by_id(
+                channel.entity.id, list(partition.failed_ids)
+            )
+            existing = {m.id for m in messages}
+            partition.failed_ids = [i for i in partition.failed_ids if i in existing]
+            partition.attempts = {
+                i: n for i, n in partition.attempts.items() if i in existing
+            }
+
+        def forget(message: Any) -> None:
+            if message.id in partition.failed_ids:
+                partition.failed_ids.remove(message.id)
+            partition.attempts.pop(message.id, None)
+
+        def deferred(message: Any) -> None:
+            if message.id not in partition.failed_ids:
+                partition.failed_ids.append(message.id)
+
+        def failed(message: Any, kind: str) -> None:
+            attempts = partition.attempts.get(message.id, 0) + 1
+            retries = self.downloader.retry_policy.max_attempts
+            if kind != PERMANENT and attempts <= retries:
+                deferred(message)
+                partition.attempts[message.id] = attempts
+                return
+            self.logger.warning(
+                f"Giving up on message {message.id} in {channel.title} "
+                f"after {attempts} attempts ({kind})"
+            )
+            forget(message)
+
+        async def handle(message: Any) -> None:
+            stats.unread_count += 1
+            if not self.downloader.media_filter.should_download(message):
+                if self.downloader.is_deferred(message):
+                    # Retried by the next run, without counting as an attempt
+                    deferred(message)
+                return
+            stats.media_count += 1
+            if self.downloader.progress is not None:
+                self.downloader.progress.add_expected(channel.title, 1)
+            try:
+                media_info = await media_downloader.download_media_from_message(
+                    message, channel.title
+                )
+            except Exception as e:
+                error_msg = f"Error downloading message {message.id}: {e}"
+                self.logger.error(error_msg)
+                stats.add_error(error_msg, type(e).__name__)
+                failed(message, classify_error(e))
+                return
+            if media_info:
+                stats.downloaded_count += 1
+                stats.bytes_downloaded += media_info.file_size or 0
+                forget(message)
+            else:
+                # Retried up to the limit, as the cause is not known here
+                stats.add_error(
+                    f"Failed to download message {message.id}", "DownloadFailed"
+                )
+                failed(message, TRANSIENT)
+
+        for message in messages:
+            await handle(message)
+        if messages:
+            self._save_checkpoint()
+
+        handled = 0
+        async for message in manager.iter_message_range(
+            channel, partition.done_up_to + 1, partition.last_id
+        ):
+            await handle(message)
+            partition.done_up_to = message.id
+            handled += 1
+            if handled % self.checkpoint_every == 0:
+                self._save_checkpoint()
+
+        partition.done_up_to = partition.last_id
+        self._save_checkpoint()
+
+    async def run(self) -> DownloadSession:
+        """
+        Run (or resume) the backfill.
+
+        Returns:
+            DownloadSession covering the messages handled in this run
+        """
+        start_time = datetime.now()
+        session_errors = ErrorLog()
+        stats = ChannelStats(name=self.channel_name, start_time=start_time)
+
+        try:
+            channel = await self._find_channel()
+            self._job_key = self.get_job_key(channel)
+
+            saved = self.checkpoints.get(self._job_key)
+            if saved is not None:
+                # The partitions span the id range resolved by the first run
+                self._plan = [BackfillPartition(**record) for record in saved]
+                first_id = self._plan[0].first_id if self._plan else 1
+                last_id = self._plan[-1].last_id if self._plan else 0
+                self.logger.info(f"Resuming backfill {self._job_key}")
+            else:
+                first_id, last_id = await self.resolve_id_range(channel)
+                self._plan = [
+                    BackfillPartition(first, last)
+                    for first, last in split_id_range(
+                        first_id, last_id, self.partitions
+                    )
+                ]
+                self._save_checkpoint()
+
+            pending = [p for p in self._plan if not p.is_complete]
+            self.logger.info(
+                f"Backfilling {self.channel_name} messages {first_id}-{last_id}: "
+                f"{len(pending)}/{len(self._plan)} partitions, "
+                f"{sum(p.remaining for p in pending)} ids remaining"
+            )
+
+            semaphore = asyncio.Semaphore(self.workers)
+
+            async def run_limited(partition: BackfillPartition) -> None:
+                async with semaphore:
+                    with self.downloader.tracer.span(
+                        "backfill_partition",
+                        {
+                            "channel": self.channel_name,
+                            "first_id": partition.first_id,
+                            "last_id": partition.last_id,
+                        },
+                    ):
+                        await self._run_partition(channel, partition, stats)
+
+            results = await asyncio.gather(
+                *(run_limited(p) for p in pending), return_exceptions=True
+            )
+            for partition, result in zip(pending, results):
+                if isinstance(result, Exception):
+                    error_msg = (
+                        f"Partition {partition.first_id}-{partition.last_id} "
+                        f"stopped at {partition.done_up_to}: {result}"
+                    )
+                    self.logger.error(error_msg)
+                    session_errors.add(error_msg, type(result).__name__)
+            self._save_checkpoint()
+
+        except Exception as e:
+            error_msg = f"Backfill failed: {e}"
+            self.logger.error(error_msg)
+            session_errors.add(error_msg, type(e).__name__)
+
+        stats.end_time = datetime.now()
+        return DownloadSession(
+            total_channels=1,
+            total_unread=stats.unread_count,
+            total_media=stats.media_count,
+            total_downloaded=stats.downloaded_count,
+            channel_stats=[stats],
+            start_time=start_time,
+            end_time=stats.end_time,
+            errors=session_errors,
+        )
@@ -1,22 +1,34 @@
 """Channel and message management."""
 
 import logging
-from typing import Any, List
+from datetime import datetime
+from typing import Any, AsyncIterator, List, Optional, Tuple
 
+from telethon.errors import FloodWaitError
+from telethon.tl.types import PeerChannel
+
+from ..utils.tracing import Tracer
 from .connection import TelegramConnection
 
+# Maximum number of message ids per messages.GetMessages request
+GET_MESSAGES_BATCH_SIZE = 100
+
 
 class ChannelManager:
     """Manages Telegram channels and messages."""
 
-    def __init__(self, connection: TelegramConnection) -> None:
+    def __init__(
+        self, connection: TelegramConnection, tracer: Optional[Tracer] = None
+    ) -> None:
         """
         Initialize channel manager.
 
         Args:
             connection: Telegram connection instance
+            tracer: Span tracer (tracing disabled when None)
         """
         self.connection = connection
+        self.tracer = tracer or Tracer()
         self.logger = logging.getLogger(self.__class__.__name__)
 
     async def get_all_channels(self) -> List[Any]:
@@ -30,9 +42,11 @@ class ChannelManager:
             client = self.connection.get_client()
             channels = []
 
-            async for dialog in client.iter_dialogs():
-                if dialog.is_channel:
-                    channels.append(dialog)
+            with self.tracer.span("iter_dialogs") as span:
+                async for dialog in client.iter_dialogs():
+                    if dialog.is_channel:
+                        channels.append(dialog)
+                span.set_attribute("channels", len(channels))
 
             self.logger.info(f"Found {len(channels)} channels")
             return channels
@@ -63,23 +77,166 @@ class ChannelManager:
             client = self.connection.get_client()
             messages = []
 
-            async for message in client.iter_messages(
-                channel.entity, limit=unread_count
-            ):
-                messages.append(message)
+            with self.tracer.span(
+                "iter_messages", {"channel": channel.title, "limit": unread_count}
+            ) as span:
+                async for message in client.iter_messages(
+                    channel.entity, limit=unread_count
+                ):
+                    messages.append(message)
+                span.set_attribute("messages", len(messages))
 
             return messages
 
+        except FloodWaitError:
+            raise
+
         except Exception as e:
             self.logger.error(
                 f"Error getting unread messages from {channel.title}: {e}"
             )
             return []
 
+    async def get_messages_by_id(self, channel_id: int, ids: List[int]) -> List[Any]:
+        """
+        Fetch messages of a channel by id, in batches of up to 100 ids.
+
+        Args:
+            channel_id: Channel id
+            ids: Message ids
+
+        Returns:
+            Message objects in the order of ``ids``; deleted messages are
+            left out
+        """
+        client = self.connection.get_client()
+        messages: List[Any] = []
+        for offset in range(0, len(ids), GET_MESSAGES_BATCH_SIZE):
+            batch = ids[offset : offset + GET_MESSAGES_BATCH_SIZE]
+            with self.tracer.span(
+                "get_messages", {"channel_id": channel_id, "ids": len(batch)}
+            ):
+                fetched = await client.get_messages(PeerChannel(channel_id), ids=batch)
+            messages.extend(message for message in fetched if message is not None)
+        return messages
+
+    def get_unread_range(self, channel: Any) -> Optional[Tuple[int, int]]:
+        """
+        Get the ids of the unread messages of a channel from its dialog.
+
+        No request is made; the range comes from the dialog's read state.
+
+        Args:
+            channel: Channel dialog object
+
+        Returns:
+            (first_id, last_id) of the unread messages, or None if all are read
+        """
+        if not channel.unread_count:
+            return None
+        first_id = channel.dialog.read_inbox_max_id + 1
+        last_id = channel.dialog.top_message
+        if first_id > last_id:
+            return None
+        return first_id, last_id
+
+    async def get_latest_message_id(self, channel: Any) -> int:
+        """
+        Get the id of the newest message in a channel.
+
+        Args:
+            channel: Channel dialog object
+
+        Returns:
+            Newest message id, or 0 for an empty channel
+        """
+        client = self.connection.get_client()
+        async for message in client.iter_messages(channel.entity, limit=1):
+            return int(message.id)
+        return 0
+
+    async def iter_messages_after(
+        self, channel: Any, min_id: int
+    ) -> AsyncIterator[Any]:
+        """
+        Iterate over messages newer than ``min_id``, oldest first.
+
+        Args:
+            channel: Channel dialog object
+            min_id: Messages with an id above this are yielded
+
+        Yields:
+            Message objects in ascending id order
+        """
+        client = self.connection.get_client()
+        async for message in client.iter_messages(
+            channel.entity, min_id=min_id, reverse=True
+        ):
+            yield message
+
+    async def get_first_message_id_after(self, channel: Any, date: datetime) -> int:
+        """
+        Get the id of the oldest message sent at or after ``date``.
+
+        Args:
+            channel: Channel dialog object
+            date: Start date
+
+        Returns:
+            Message id, or 0 if no message was sent since ``date``
+        """
+        client = self.connection.get_client()
+        async for message in client.iter_messages(
+            channel.entity, offset_date=date, reverse=True, limit=1
+        ):
+            return int(message.id)
+        return 0
+
+    async def get_last_message_id_before(self, channel: Any, date: datetime) -> int:
+        """
+        Get the id of the newest message sent before ``date``.
+
+        Args:
+            channel: Channel dialog object
+            date: End date
+
+        Returns:
+            Message id, or 0 if no message was sent before ``date``
+        """
+        client = self.connection.get_client()
+        async for message in client.iter_messages(
+            channel.entity, offset_date=date, limit=1
+        ):
+            return int(message.id)
+        return 0
+
+    async def iter_message_range(
+        self, channel: Any, first_id: int, last_id: int
+    ) -> AsyncIterator[Any]:
+        """
+        Iterate over messages with ids from ``first_id`` to ``last_id``.
+
+        Args:
+            channel: Channel dialog object
+            first_id: Lowest message id (inclusive)
+            last_id: Highest message id (inclusive)
+
+        Yields:
+            Message objects in ascending id order
+        """
+        client = self.connection.get_client()
+        async for message in client.iter_messages(
+            channel.entity, offset_id=first_id - 1, max_id=last_id + 1, reverse=True
+        ):
+            yield message
+
     async def mark_messages_as_read(self, channel: Any, messages: List[Any]) -> None:
         """
         Mark messages as read in a channel.
 
+        Everything up to the highest message id is marked as read, whatever
+        the order of ``messages``.
+
         Args:
             channel: Channel dialog object
             messages: List of message objects to mark as read
@@ -89,7 +246,11 @@ class ChannelManager:
                 return
 
             client = self.connection.get_client()
-            await client.send_read_acknowledge(channel.entity, messages[0])
+            max_id = max(message.id for message in messages)
+            with self.tracer.span(
+                "send_read_acknowledge", {"channel": channel.title, "max_id": max_id}
+            ):
+                await client.send_read_acknowledge(channel.entity, max_id=max_id)
 
             self.logger.info(
                 f"Marked {len(messages)} messages as read in {channel.title}"
@@ -98,6 +259,24 @@ class ChannelManager:
         except Exception as e:
             self.logger.error(f"Error marking messages as read in {channel.title}: {e}")
 
+    async def mark_read_up_to(self, channel: Any, max_id: int) -> None:
+        """
+        Mark every message up to and including ``max_id`` as read.
+
+        Args:
+            channel: Channel dialog object
+            max_id: Highest message id to mark as read
+        """
+        try:
+            client = self.connection.get_client()
+            with self.tracer.span(
+                "send_read_acknowledge", {"channel": channel.title, "max_id": max_id}
+            ):
+                await client.send_read_acknowledge(channel.entity, max_id=max_id)
+
+        except Exception as e:
+            self.logger.error(f"Error marking messages as read in {channel.title}: {e}")
+
     async def get_channel_info(self, channel: Any) -> dict:
         """
         Get detailed information about a channel.
@@ -1,9 +1,10 @@
 """Telegram connection management."""
 
 import logging
-from typing import Optional
+from typing import List, Optional
 
 from telethon import TelegramClient
+from telethon.sessions import StringSession
 
 from ..config.settings import TelegramConfig
 
@@ -20,6 +21,7 @@ class TelegramConnection:
         """
         self.config = config
         self.client: Optional[TelegramClient] = None
+        self.part_senders: List[TelegramClient] = []
         self.logger = logging.getLogger(self.__class__.__name__)
 
     async def connect(self) -> None:
@@ -39,8 +41,74 @@ class TelegramConnection:
             self.logger.error(f"Failed to connect to Telegram: {e}")
             raise RuntimeError(f"Telegram connection failed: {e}") from e
 
+    async def reconnect(self) -> None:
+        """
+        Re-establish a dropped connection, reusing the existing client.
+
+        Registered event handlers are kept.
+
+        Raises:
+            RuntimeError: If reconnection fails
+        """
+        if self.client is None:
+            await self.connect()
+            return
+        try:
+            await self.client.connect()
+            self.logger.info("Reconnected to Telegram")
+        except Exception as e:
+            self.logger.error(f"Failed to reconnect to Telegram: {e}")
+            raise RuntimeError(f"Telegram reconnection failed: {e}") from e
+
+    async def open_part_senders(self, count: int) -> None:
+        """
+        Open extra connections for file part requests.
+
+        The connections share the client's session (and authorization) but
+        receive no updates.
+
+        Args:
+            count: Number of extra connections
+
+        Raises:
+            RuntimeError: If a connection fails
+        """
+        session = StringSession.save(self.get_client().session)
+        try:
+            for _ in range(count):
+                sender = TelegramClient(
+                    StringSession(session),
+                    self.config.api_id,
+                    self.config.api_hash,
+                    receive_updates=False,
+                )
+                await sender.connect()
+                self.part_senders.append(sender)
+            self.logger.info(f"Opened {count} extra connections for file parts")
+        except Exception as e:
+            self.logger.error(f"Failed to open connections for file parts: {e}")
+            raise RuntimeError(f"Telegram connection failed: {e}") from e
+
+    def get_part_senders(self) -> List[TelegramClient]:
+        """
+        Get the clients that file part requests can be sent on.
+
+        Returns:
+            The client followed by the extra connections
+
+        Raises:
+            RuntimeError: If client is not connected
+        """
+        return [self.get_client(), *self.part_senders]
+
     async def disconnect(self) -> None:
         """Close connection to Telegram."""
+        for sender in self.part_senders:
+            try:
+                await sender.disconnect()
+            except Exception as e:
+                self.logger.warning(f"Error during disconnect: {e}")
+        self.part_senders = []
         if self.client:
             try:
                 await self.client.disconnect()
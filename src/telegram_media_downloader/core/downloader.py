@@ -1,22 +1,58 @@
 """Main downloader orchestrator."""
 
 import logging
+import shutil
+from collections import deque
 from datetime import datetime
 from pathlib import Path
 from types import TracebackType
-from typing import Any, Optional
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Deque,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Tuple,
+)
 
 from ..config.settings import TelegramConfig
 from ..filters.default_filter import DefaultMediaFilter
 from ..models.channel_stats import ChannelStats
+from ..models.download_plan import ChannelPlan, DownloadPlan
 from ..models.download_session import DownloadSession
+from ..models.error_log import ErrorLog
 from ..namers.timestamp_namer import TimestampFileNamer
 from ..protocols.file_namer import FileNamer
 from ..protocols.media_filter import MediaFilter
 from ..utils.logging import get_logger
+from ..utils.media import (
+    PhotoSizePolicy,
+    get_album_id,
+    get_media_size,
+    get_mime_type,
+    group_albums,
+)
+from ..utils.progress import ProgressTracker
+from ..utils.tracing import Tracer
+from .auto_tuner import AutoTuner
 from .channel_manager import ChannelManager
 from .connection import TelegramConnection
+from .integrity import CorruptDownloadError, IntegrityVerifier
 from .media_downloader import MediaDownloader
+from .part_downloader import HedgePolicy, PartDownloader
+from .read_acks import DEFAULT_ACK_EVERY, DEFAULT_ACK_INTERVAL, ReadAcknowledger
+from .retry import (
+    FILE_REFERENCE_EXPIRED,
+    FLOOD,
+    RetryJob,
+    RetryPolicy,
+    RetryQueue,
+    classify_error,
+)
+from .stall_watchdog import DEFAULT_STALL_TIMEOUT, DownloadStalledError
 
 
 class TelegramMediaDownloader:
@@ -29,6 +65,19 @@ class TelegramMediaDownloader:
         media_filter: Optional[MediaFilter] = None,
         file_namer: Optional[FileNamer] = None,
         fail_fast: bool = False,
+        tracer: Optional[Tracer] = None,
+        progress: Optional[ProgressTracker] = None,
+        shard: Optional[Tuple[int, int]] = None,
+        preview: bool = False,
+        photo_size_policy: Optional[PhotoSizePolicy] = None,
+        ack_every: int = DEFAULT_ACK_EVERY,
+        ack_interval: float = DEFAULT_ACK_INTERVAL,
+        retry_policy: Optional[RetryPolicy] = None,
+        stall_timeout: Optional[float] = DEFAULT_STALL_TIMEOUT,
+        parts_in_flight: int = 0,
+        hedge_policy: Optional[HedgePolicy] = None,
+        auto_tuner: Optional[AutoTuner] = None,
+        verify_integrity: bool = False,
     ) -> None:
         """
         Initialize the main downloader.
@@ -39,6 +88,30 @@ class TelegramMediaDownloader:
             media_filter: Media filtering strategy (defaults to DefaultMediaFilter)
             file_namer: File naming strategy (defaults to TimestampFileNamer)
             fail_fast: Whether to fail fast on error
+            tracer: Span tracer (tracing disabled when None)
+            progress: Live progress tracker (rendered while the downloader is
+                open as an async context manager)
+            shard: (index, count) to only process the channels assigned to
+                one of ``count`` sharded workers
+            preview: Save small previews instead of the original media (see
+                ``download_originals``)
+            photo_size_policy: Size variant of photos to download (defaults
+                to the largest)
+            ack_every: Processed messages between read acknowledgements
+            ack_interval: Seconds between read acknowledgements
+            retry_policy: Retries of failed downloads (see ``RetryQueue``)
+            stall_timeout: Seconds without progress after which a download is
+                cancelled and retried (see ``StallWatchdog``; never when None)
+            parts_in_flight: Download files in parts with up to this many part
+                requests in flight (whole files are downloaded when 0)
+            hedge_policy: Hedging of slow part requests (see
+                ``PartDownloader``; never when None)
+            auto_tuner: Tunes the part size and part requests in flight per
+                data center (enables part downloads)
+            verify_integrity: Hash original media while it is written and
+                retry downloads that do not match Telegram's file hashes
+
+        Part downloads never exceed the caps in ``config``.
         """
         self.config = config
         self.download_path = Path(download_path)
@@ -46,24 +119,65 @@ class TelegramMediaDownloader:
         self.file_namer = file_namer or TimestampFileNamer()
         self.logger = get_logger(self.__class__.__name__)
         self.fail_fast = fail_fast
+        self.tracer = tracer or Tracer()
+        self.progress = progress
+        self.shard = shard
+        self.ack_every = ack_every
+        self.ack_interval = ack_interval
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.hedge_policy = hedge_policy
 
         # Initialize core components
         self.connection = TelegramConnection(config)
-        self.channel_manager = ChannelManager(self.connection)
+        self.channel_manager = ChannelManager(self.connection, tracer=self.tracer)
+        self.part_downloader = (
+            PartDownloader(
+                self.connection,
+                part_size=config.max_part_size,
+                max_in_flight=min(
+                    parts_in_flight or config.max_parts_in_flight,
+                    config.max_parts_in_flight,
+                ),
+                hedge_policy=hedge_policy,
+                tracer=self.tracer,
+                auto_tuner=auto_tuner,
+            )
+            if parts_in_flight > 0 or auto_tuner is not None
+            else None
+        )
         self.media_downloader = MediaDownloader(
-            self.connection, self.download_path, self.media_filter, self.file_namer
+            self.connection,
+            self.download_path,
+            self.media_filter,
+            self.file_namer,
+            tracer=self.tracer,
+            progress=self.progress,
+            preview=preview,
+            photo_size_policy=photo_size_policy,
+            stall_timeout=stall_timeout,
+            part_downloader=self.part_downloader,
+            integrity_verifier=(
+                IntegrityVerifier(self.connection) if verify_integrity else None
+            ),
         )
 
     async def __aenter__(self) -> "TelegramMediaDownloader":
         """Async context manager entry."""
         await self.connection.connect()
+        if self.part_downloader is not None and self.hedge_policy is not None:
+            await self.connection.open_part_senders(self.hedge_policy.senders)
+        if self.progress is not None:
+            self.progress.start()
         return self
 
     async def __aexit__(
         self, exc_type: type, exc_val: Exception, exc_tb: Optional[TracebackType]
     ) -> None:
         """Async context manager exit."""
+        if self.progress is not None:
+            await self.progress.stop()
         await self.connection.disconnect()
+        self.tracer.flush()
 
     async def download_all_unread_media(
         self, mark_as_read: bool = True
@@ -77,8 +191,13 @@ class TelegramMediaDownloader:
         Returns:
             DownloadSession with summary information
         """
+        with self.tracer.span("download_session", {"mark_as_read": mark_as_read}):
+            return await self._download_all_unread_media(mark_as_read)
+
+    async def _download_all_unread_media(self, mark_as_read: bool) -> DownloadSession:
+        """Run a download session inside the active span."""
         start_time = datetime.now()
-        session_errors: list[str] = []
+        session_errors = ErrorLog()
         channel_stats: list[ChannelStats] = []
 
         try:
@@ -86,21 +205,24 @@ class TelegramMediaDownloader:
 
             # Get all channels
             channels = await self.channel_manager.get_all_channels()
+            if self.shard is not None:
+                channels = self._select_shard(channels, *self.shard)
             self.logger.info(f"Found {len(channels)} channels to process")
 
             # Process each channel
             total_unread = 0
             total_media = 0
             total_downloaded = 0
+            read_acks = self._create_read_acks() if mark_as_read else None
+            retries = RetryQueue(self.retry_policy)
 
             for channel in channels:
                 try:
-                    stats = await self._process_channel(channel, mark_as_read)
+                    stats = await self._process_channel(channel, read_acks, retries)
                     channel_stats.append(stats)
 
                     total_unread += stats.unread_count
                     total_media += stats.media_count
-                    total_downloaded += stats.downloaded_count
 
                     if self.fail_fast and (stats.has_errors or stats.error_count > 0):
                         raise RuntimeError(
@@ -110,18 +232,21 @@ class TelegramMediaDownloader:
                 except Exception as e:
                     error_msg = f"Failed to process channel {getattr(channel, 'title', 'Unknown')}: {e}"
                     self.logger.error(error_msg)
-                    session_errors.append(error_msg)
+                    session_errors.add(error_msg, type(e).__name__)
 
                     # Add error stats for failed channel
-                    channel_stats.append(
-                        ChannelStats(
-                            name=getattr(channel, "title", "Unknown"),
-                            errors=[error_msg],
-                        )
+                    failed_stats = ChannelStats(
+                        name=getattr(channel, "title", "Unknown")
                     )
+                    failed_stats.add_error(error_msg, type(e).__name__)
+                    channel_stats.append(failed_stats)
                     if self.fail_fast:
                         break
 
+            await self._retry_failed(retries, read_acks)
+            if read_acks is not None:
+                await read_acks.flush()
+            total_downloaded = sum(stats.downloaded_count for stats in channel_stats)
             end_time = datetime.now()
 
             session = DownloadSession(
@@ -141,7 +266,7 @@ class TelegramMediaDownloader:
         except Exception as e:
             error_msg = f"Download session failed: {e}"
             self.logger.error(error_msg)
-            session_errors.append(error_msg)
+            session_errors.add(error_msg, type(e).__name__)
 
             return DownloadSession(
                 total_channels=0,
@@ -151,76 +276,412 @@ class TelegramMediaDownloader:
                 channel_stats=list(channel_stats),
                 start_time=start_time,
                 end_time=datetime.now(),
-                errors=list(session_errors),
+                errors=session_errors,
             )
 
-    async def _process_channel(self, channel, mark_as_read: bool) -> ChannelStats:
+    @staticmethod
+    def _select_shard(channels: List[Any], index: int, count: int) -> List[Any]:
+        """Keep the channels assigned to shard ``index`` of ``count``."""
+        from .sharding import shard_for
+
+        return [ch for ch in channels if shard_for(ch.entity.id, count) == index]
+
+    def is_deferred(self, message: Any) -> bool:
+        """
+        Check if the media filter left a message for a later run.
+
+        Deferred messages (e.g. over a ``SizeFilter`` channel budget) were
+        rejected by ``should_download`` but must not be handled as unwanted:
+        they are not marked as read or checkpointed past.
+
+        Args:
+            message: Message rejected by the media filter
+
+        Returns:
+            True if the message was deferred
+        """
+        is_deferred = getattr(self.media_filter, "is_deferred", None)
+        return bool(is_deferred is not None and is_deferred(message))
+
+    def _create_read_acks(self) -> ReadAcknowledger:
+        """Create the read acknowledger of a download session."""
+        return ReadAcknowledger(
+            self.channel_manager,
+            every=self.ack_every,
+            interval=self.ack_interval,
+            tracer=self.tracer,
+        )
+
+    async def _process_channel(
+        self,
+        channel,
+        read_acks: Optional[ReadAcknowledger],
+        retries: RetryQueue,
+    ) -> ChannelStats:
         """
         Process a single channel.
 
         Args:
             channel: Channel dialog object
-            mark_as_read: Whether to mark messages as read
+            read_acks: Read acknowledger processed messages are recorded with
+                (messages are not marked as read when None)
+            retries: Queue that failed downloads are deferred to
 
         Returns:
             ChannelStats object with processing results
         """
         channel_name = getattr(channel, "title", "Unknown")
+        start_time = datetime.now()
+        with self.tracer.span("process_channel", {"channel": channel_name}):
+            stats = await self._process_channel_messages(
+                channel, channel_name, read_acks, retries
+            )
+        stats.start_time = start_time
+        stats.end_time = datetime.now()
+        return stats
+
+    async def _process_channel_messages(
+        self,
+        channel,
+        channel_name: str,
+        read_acks: Optional[ReadAcknowledger],
+        retries: RetryQueue,
+    ) -> ChannelStats:
+        """Process a single channel inside the active span."""
         self.logger.info(f"Processing channel: {channel_name}")
 
         stats = ChannelStats(name=channel_name)
 
         try:
-            # Get unread messages
-            unread_messages = await self.channel_manager.get_unread_messages(channel)
-            stats.unread_count = len(unread_messages)
-
-            if not unread_messages:
-                self.logger.info(f"No unread messages in {channel_name}")
+            await self._wait_out_flood(retries)
+            media_messages = await self._list_media_messages(
+                channel, channel_name, stats, read_acks
+            )
+            if not media_messages:
                 return stats
 
-            # Filter messages with media
-            media_messages = [
-                msg for msg in unread_messages if self.media_filter.should_download(msg)
-            ]
-            stats.media_count = len(media_messages)
+            # Download media from each message, and each album as one job
+            pending = deque((group, 0) for group in group_albums(media_messages))
+            await self._download_pending(
+                channel, channel_name, stats, pending, read_acks, retries
+            )
 
+            self.logger.info(f"Channel {channel_name} processed: {stats}")
+            return stats
+
+        except Exception as e:
+            error_msg = f"Error processing channel {channel_name}: {e}"
+            self.logger.error(error_msg)
+            stats.add_error(error_msg, type(e).__name__)
+            return stats
+
+    async def _list_media_messages(
+        self,
+        channel: Any,
+        channel_name: str,
+        stats: ChannelStats,
+        read_acks: Optional[ReadAcknowledger],
+    ) -> List[Any]:
+        """
+        List the unread messages of a channel that have media to download.
+
+        Messages without such media are recorded as handled, except those the
+        media filter deferred (e.g. over a channel budget): they hold the
+        read checkpoint, so a later run lists them again.
+
+        Args:
+            channel: Channel dialog object
+            channel_name: Name of the channel
+            stats: Stats of the channel
+            read_acks: Read acknowledger of the session
+
+        Returns:
+            Media messages, oldest first
+        """
+        unread_messages = await self.channel_manager.get_unread_messages(channel)
+        stats.unread_count = len(unread_messages)
+
+        if not unread_messages:
+            self.logger.info(f"No unread messages in {channel_name}")
+            return []
+
+        # Filter messages with media, oldest first so read checkpoints advance
+        unread_messages = sorted(unread_messages, key=lambda msg: msg.id)
+        media_messages = [
+            msg for msg in unread_messages if self.media_filter.should_download(msg)
+        ]
+        media_ids = {msg.id for msg in media_messages}
+        deferred_ids = {
+            msg.id
+            for msg in unread_messages
+            if msg.id not in media_ids and self.is_deferred(msg)
+        }
+        if deferred_ids:
             self.logger.info(
-                f"Found {len(media_messages)} media messages in {channel_name}"
+                f"Deferred {len(deferred_ids)} media messages in {channel_name} "
+                f"to a later run"
             )
+        if read_acks is not None:
+            read_acks.track(channel, (msg.id for msg in unread_messages))
+            for msg in unread_messages:
+                if msg.id not in media_ids and msg.id not in deferred_ids:
+                    await read_acks.record(channel, msg.id)
+        stats.media_count = len(media_messages)
+        if self.progress is not None:
+            self.progress.add_expected(channel_name, len(media_messages))
+
+        self.logger.info(
+            f"Found {len(media_messages)} media messages in {channel_name}"
+        )
+        return media_messages
 
-            # Download media from each message
-            for message in media_messages:
-                try:
-                    media_info = (
-                        await self.media_downloader.download_media_from_message(
-                            message, channel_name
-                        )
-                    )
-                    if media_info:
-                        stats.downloaded_count += 1
-                    else:
-                        stats.add_error(f"Failed to download message {message.id}")
+    async def _download_pending(
+        self,
+        channel: Any,
+        channel_name: str,
+        stats: ChannelStats,
+        pending: Deque[Tuple[List[Any], int]],
+        read_acks: Optional[ReadAcknowledger],
+        retries: RetryQueue,
+        on_flood_wait: Optional[Callable[[float], Awaitable[None]]] = None,
+    ) -> None:
+        """
+        Download the pending messages and albums of a channel.
 
-                except Exception as e:
-                    error_msg = f"Error downloading message {message.id}: {e}"
-                    self.logger.error(error_msg)
-                    stats.add_error(error_msg)
+        Downloads are taken from ``pending`` as they are made, so if an
+        exception ends the pass, ``pending`` holds the downloads left.
 
-            # Mark messages as read if requested
-            if mark_as_read and unread_messages:
-                await self.channel_manager.mark_messages_as_read(
-                    channel, unread_messages
+        Args:
+            channel: Channel dialog object
+            channel_name: Name of the channel
+            stats: Stats of the channel
+            pending: Downloads to make, with their retry counts
+            read_acks: Read acknowledger of the session
+            retries: Queue that failed downloads are deferred to
+            on_flood_wait: Called with the seconds left instead of pausing
+                while the account is in a flood wait; may raise to end the
+                pass
+        """
+        while pending:
+            await self._wait_out_flood(retries, on_flood_wait)
+            if retries.breaker.is_open(channel.entity.id):
+                skipped = sum(len(group) for group, _ in pending)
+                stats.skipped_count += skipped
+                stats.add_error(
+                    f"Circuit open for {channel_name}: skipped {skipped} messages",
+                    "CircuitOpen",
                 )
+                pending.clear()
+                break
+            group, attempt = pending.popleft()
+            results = await self._download_group(
+                channel, group, channel_name, stats, retries, attempt
+            )
 
-            self.logger.info(f"Channel {channel_name} processed: {stats}")
-            return stats
+            # Checkpoint the messages handled so far as read
+            if read_acks is not None:
+                for message, success in zip(group, results):
+                    await read_acks.record(channel, message.id, success)
+
+            # An expired file reference means the rest of the listing is
+            # stale too, so refresh it all before carrying on
+            expired = retries.take_expired(channel.entity.id)
+            if expired:
+                stats.retry_count += len(expired)
+                refreshed = list(
+                    await self._refresh_pending(
+                        channel, expired, pending, retries, read_acks
+                    )
+                )
+                pending.clear()
+                pending.extend(refreshed)
+
+    async def _wait_out_flood(
+        self,
+        retries: RetryQueue,
+        on_flood_wait: Optional[Callable[[float], Awaitable[None]]] = None,
+    ) -> None:
+        """
+        Pause until a flood wait a download hit is over.
+
+        Any request made during a flood wait is refused, and may extend it.
+
+        Args:
+            retries: Queue that failed downloads are deferred to
+            on_flood_wait: Called with the seconds left instead of pausing
+        """
+        wait = retries.flood_wait_remaining()
+        if not wait:
+            return
+        if on_flood_wait is not None:
+            await on_flood_wait(wait)
+            return
+        self.logger.warning(f"Pausing downloads for {wait:.0f}s (flood wait)")
+        await retries.sleep(wait)
+
+    async def _download_message(
+        self,
+        media_downloader: MediaDownloader,
+        message: Any,
+        channel_name: str,
+        stats: ChannelStats,
+    ) -> bool:
+        """Download the media of one message and record the outcome."""
+        try:
+            media_info = await media_downloader.download_media_from_message(
+                message, channel_name
+            )
+            if media_info:
+                stats.downloaded_count += 1
+                stats.bytes_downloaded += media_info.file_size or 0
+                return True
+            stats.add_error(
+                f"Failed to download message {message.id}", "DownloadFailed"
+            )
 
         except Exception as e:
-            error_msg = f"Error processing channel {channel_name}: {e}"
+            error_msg = f"Error downloading message {message.id}: {e}"
             self.logger.error(error_msg)
-            stats.add_error(error_msg)
-            return stats
+            stats.add_error(error_msg, type(e).__name__)
+        return False
+
+    async def download_originals(
+        self, preview_files: Iterable[Path]
+    ) -> DownloadSession:
+        """
+        Download the original media of previews saved in preview mode.
+
+        The message reference is read from the metadata file of each preview
+        and the messages are re-fetched by id, so expired file references do
+        not matter.
+
+        Args:
+            preview_files: Preview files
+
+        Returns:
+            DownloadSession with results
+        """
+        start_time = datetime.now()
+        session_errors = ErrorLog()
+        originals = MediaDownloader(
+            self.connection,
+            self.download_path,
+            self.media_filter,
+            self.file_namer,
+            tracer=self.tracer,
+            progress=self.progress,
+            photo_size_policy=self.media_downloader.photo_size_policy,
+        )
+
+        wanted: Dict[Tuple[int, str], List[int]] = {}
+        for path in preview_files:
+            try:
+                metadata = MediaDownloader.read_metadata(path)
+                key = (int(metadata["Channel ID"]), metadata["Channel"])
+                wanted.setdefault(key, []).append(int(metadata["Message ID"]))
+            except (OSError, KeyError, ValueError) as e:
+                error_msg = f"No original media reference for {path}: {e}"
+                self.logger.error(error_msg)
+                session_errors.add(error_msg, type(e).__name__)
+
+        channel_stats = []
+        for (channel_id, channel_name), ids in wanted.items():
+            stats = ChannelStats(name=channel_name, start_time=datetime.now())
+            try:
+                messages = await self.channel_manager.get_messages_by_id(
+                    channel_id, ids
+                )
+            except Exception as e:
+                error_msg = f"Error fetching messages from {channel_name}: {e}"
+                self.logger.error(error_msg)
+                stats.add_error(error_msg, type(e).__name__)
+                messages = []
+
+            stats.media_count = len(messages)
+            if len(messages) < len(ids):
+                stats.add_error(
+                    f"{len(ids) - len(messages)} messages no longer exist",
+                    "MessageDeleted",
+                )
+            for message in messages:
+                await self._download_message(originals, message, channel_name, stats)
+            stats.end_time = datetime.now()
+            channel_stats.append(stats)
+
+        return DownloadSession(
+            total_channels=len(channel_stats),
+            total_unread=0,
+            total_media=sum(s.media_count for s in channel_stats),
+            total_downloaded=sum(s.downloaded_count for s in channel_stats),
+            channel_stats=channel_stats,
+            start_time=start_time,
+            end_time=datetime.now(),
+            errors=session_errors,
+        )
+
+    async def plan_unread_media(
+        self,
+        channel_names: Optional[List[str]] = None,
+        bytes_per_second: Optional[float] = None,
+    ) -> DownloadPlan:
+        """
+        Plan a download session without downloading anything.
+
+        Unread messages are listed and filtered as in a real session, and
+        sizes are read from the message media (``document.size`` and photo
+        sizes). Files that already exist on disk are not counted.
+
+        Args:
+            channel_names: Channels to plan for (all channels when None)
+            bytes_per_second: Historical throughput for the duration estimate
+
+        Returns:
+            DownloadPlan with per-channel and total sizes
+        """
+        with self.tracer.span("plan_session"):
+            channels = await self.channel_manager.get_all_channels()
+            if channel_names is not None:
+                channels = [
+                    ch for ch in channels if getattr(ch, "title", "") in channel_names
+                ]
+
+            channel_plans = []
+            for channel in channels:
+                channel_name = getattr(channel, "title", "Unknown")
+                plan = ChannelPlan(name=channel_name)
+                for message in await self.channel_manager.get_unread_messages(channel):
+                    plan.candidate_count += 1
+                    if not self.media_filter.should_download(message):
+                        continue
+                    target = self.media_downloader.get_target_path(
+                        message, channel_name
+                    )
+                    if target.exists():
+                        plan.existing_count += 1
+                        continue
+                    plan.add_media(
+                        get_mime_type(message),
+                        get_media_size(
+                            message, self.media_downloader.photo_size_policy
+                        ),
+                    )
+                channel_plans.append(plan)
+
+        try:
+            free_bytes: Optional[int] = shutil.disk_usage(self.download_path).free
+        except OSError as e:
+            self.logger.warning(f"Could not read free space: {e}")
+            free_bytes = None
+
+        download_plan = DownloadPlan(
+            download_path=self.download_path,
+            channels=channel_plans,
+            free_bytes=free_bytes,
+            bytes_per_second=bytes_per_second,
+        )
+        for warning in download_plan.get_warnings():
+            self.logger.warning(warning)
+        return download_plan
 
     async def download_from_specific_channels(
         self, channel_names: list[str], mark_as_read: bool = True
@@ -247,19 +708,24 @@ class TelegramMediaDownloader:
             self.logger.warning(f"No matching channels found for: {channel_names}")
 
         # Process filtered channels
-        session_errors = []
+        session_errors = ErrorLog()
         channel_stats = []
         total_unread = 0
         total_media = 0
         total_downloaded = 0
 
+        read_acks = self._create_read_acks() if mark_as_read else None
+        retries = RetryQueue(self.retry_policy)
         for channel in target_channels:
-            stats = await self._process_channel(channel, mark_as_read)
+            stats = await self._process_channel(channel, read_acks, retries)
             channel_stats.append(stats)
 
             total_unread += stats.unread_count
             total_media += stats.media_count
-            total_downloaded += stats.downloaded_count
+        await self._retry_failed(retries, read_acks)
+        if read_acks is not None:
+            await read_acks.flush()
+        total_downloaded = sum(stats.downloaded_count for stats in channel_stats)
 
         return DownloadSession(
             total_channels=len(target_channels),
@@ -271,3 +737,161 @@ class TelegramMediaDownloader:
             end_time=datetime.now(),
             errors=session_errors,
         )
+
+    async def _download_group(
+        self,
+        dialog: Any,
+        messages: List[Any],
+        channel_name: str,
+        stats: ChannelStats,
+        retries: RetryQueue,
+        attempt: int = 0,
+    ) -> List[bool]:
+        """
+        Download a single message or the members of an album.
+
+        Failures that a retry may resolve are deferred to the retry queue;
+        other failures are recorded in the channel stats.
+
+        Args:
+            dialog: Channel dialog object
+            messages: A single message or the members of an album
+            channel_name: Name of the channel
+            stats: Stats of the channel
+            retries: Queue that failed downloads are deferred to
+            attempt: Retries already made
+
+        Returns:
+            Whether each message was downloaded
+        """
+        channel_id = dialog.entity.id
+        try:
+            if len(messages) > 1:
+                media_infos = await self.media_downloader.download_album(
+                    messages, channel_name
+                )
+            else:
+                media_infos = [
+                    await self.media_downloader.download_media_from_message(
+                        messages[0], channel_name
+                    )
+                ]
+        except Exception as e:
+            if isinstance(e, DownloadStalledError):
+                stats.stalled_count += 1
+            if isinstance(e, CorruptDownloadError):
+                stats.corrupted_count += 1
+            # Flood waits and expired references say nothing about the channel
+            if classify_error(e) not in (FLOOD, FILE_REFERENCE_EXPIRED):
+                retries.breaker.record_failure(channel_id)
+            if not retries.defer(dialog, channel_name, stats, messages, e, attempt):
+                if len(messages) > 1:
+                    album_id = get_album_id(messages[0])
+                    error_msg = f"Error downloading album {album_id}: {e}"
+                else:
+                    error_msg = f"Error downloading message {messages[0].id}: {e}"
+                self.logger.error(error_msg)
+                stats.add_error(error_msg, type(e).__name__)
+            return [False] * len(messages)
+
+        retries.breaker.record_success(channel_id)
+        for message, media_info in zip(messages, media_infos):
+            if media_info:
+                stats.downloaded_count += 1
+                stats.bytes_downloaded += media_info.file_size or 0
+                if attempt:
+                    stats.recovered_count += 1
+            else:
+                stats.add_error(
+                    f"Failed to download message {message.id}", "DownloadFailed"
+                )
+        return [media_info is not None for media_info in media_infos]
+
+    async def _retry_failed(
+        self, retries: RetryQueue, read_acks: Optional[ReadAcknowledger]
+    ) -> None:
+        """Retry the deferred downloads of a session until none are left."""
+        if not len(retries):
+            return
+        self.logger.info(f"Retrying {len(retries)} failed downloads")
+
+        async def retry(jobs: List[RetryJob]) -> None:
+            # The jobs of a batch all belong to the same channel
+            job = jobs[0]
+            dialog, channel_name, stats = job.dialog, job.channel_name, job.stats
+            if jobs[0].kind == FILE_REFERENCE_EXPIRED:
+                pending = await self._refresh_pending(
+                    dialog, jobs, deque(), retries, read_acks
+                )
+            else:
+                pending = deque((job.messages, job.attempt) for job in jobs)
+
+            for messages, attempt in pending:
+                if self.progress is not None:
+                    self.progress.add_expected(channel_name, len(messages))
+                results = await self._download_group(
+                    dialog, messages, channel_name, stats, retries, attempt
+                )
+                if read_acks is not None:
+                    for message, success in zip(messages, results):
+                        await read_acks.record(dialog, message.id, success)
+
+        with self.tracer.span("retry_failed", {"jobs": len(retries)}):
+            await retries.drain(retry)
+
+    async def _refresh_pending(
+        self,
+        dialog: Any,
+        expired: List[RetryJob],
+        pending: Deque[Tuple[List[Any], int]],
+        retries: RetryQueue,
+        read_acks: Optional[ReadAcknowledger],
+    ) -> Deque[Tuple[List[Any], int]]:
+        """
+        Fetch fresh copies of stale messages in bulk.
+
+        The messages of downloads that failed with an expired file reference
+        and of the downloads still pending in the channel are re-fetched by id
+        in batched requests. Deleted messages are dropped and count as
+        handled.
+
+        Args:
+            dialog: Channel dialog object
+            expired: Jobs that failed with an expired file reference
+            pending: Downloads not yet attempted, with their retry counts
+            retries: Queue that failed downloads are deferred to
+            read_acks: Read acknowledger of the session
+
+        Returns:
+            Downloads to make with refreshed messages, the expired jobs first
+            (in the order given)
+        """
+        queued = [(job.messages, job.attempt) for job in expired] + list(pending)
+        ids = [message.id for group, _ in queued for message in group]
+        self.logger.info(f"Refreshing {len(ids)} messages")
+        try:
+            with self.tracer.span("refresh_file_references", {"messages": len(ids)}):
+                messages = await self.channel_manager.get_messages_by_id(
+                    dialog.entity.id, ids
+                )
+        except Exception as e:
+            for job in expired:
+                if not retries.defer(
+                    dialog, job.channel_name, job.stats, job.messages, e, job.attempt
+                ):
+                    error_msg = f"Error refreshing message {job.messages[0].id}: {e}"
+                    self.logger.error(error_msg)
+                    job.stats.add_error(error_msg, type(e).__name__)
+            return pending
+
+        refreshed = {message.id: message for message in messages}
+        result: Deque[Tuple[List[Any], int]] = deque()
+        for group, attempt in queued:
+            for message in group:
+                if message.id not in refreshed and read_acks is not None:
+                    # Deleted messages have nothing left to download
+                    await read_acks.record(dialog, message.id)
+            fresh = [refreshed[m.id] for m in group if m.id in refreshed]
+            if fresh:
+                result.append((fresh, attempt))
+        return result
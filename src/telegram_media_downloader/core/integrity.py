@@ -0,0 +1,209 @@
+"""Inline integrity checks of downloaded files."""
+
+import hashlib
+from typing import Any, BinaryIO, List, Optional
+
+from telethon.errors import FloodWaitError, RPCError
+from telethon.tl.functions.upload import GetFileHashesRequest
+
+from ..protocols.telegram_message import TelegramMessage
+from ..utils.logging import get_logger
+from .connection import TelegramConnection
+from .part_downloader import get_file_location
+
+# Telegram hashes files in blocks of 128 KB (upload.getFileHashes)
+FILE_HASH_BLOCK_SIZE = 128 * 1024
+
+
+class CorruptDownloadError(Exception):
+    """Raised when a downloaded file does not match Telegram's hashes."""
+
+
+class HashingWriter:
+    """Binary file wrapper that hashes data as it is written.
+
+    Besides the SHA-256 of the whole file, the SHA-256 of each block of
+    ``block_size`` bytes is kept for comparison with the hashes Telegram
+    reports, so a file is never read back to be verified. Writes must be
+    sequential, as they are for Telethon and PartDownloader downloads.
+    """
+
+    def __init__(self, file: BinaryIO, block_size: int = FILE_HASH_BLOCK_SIZE):
+        """
+        Initialize hashing writer.
+
+        Args:
+            file: Binary file the data is written to
+            block_size: Bytes per block hash
+        """
+        self.file = file
+        self.block_size = block_size
+        self.size = 0
+        self.block_hashes: List[bytes] = []
+        self._sha256 = hashlib.sha256()
+        self._block = hashlib.sha256()
+        self._block_filled = 0
+
+    def write(self, data: bytes) -> int:
+        """
+        Hash and write data.
+
+        Args:
+            data: Next bytes of the file
+
+        Returns:
+            Number of bytes written
+        """
+        view = memoryview(data)
+        self._sha256.update(view)
+        while view:
+            take = min(len(view), self.block_size - self._block_filled)
+            self._block.update(view[:take])
+            self._block_filled += take
+            view = view[take:]
+            if self._block_filled == self.block_size:
+                self.block_hashes.append(self._block.digest())
+                self._block = hashlib.sha256()
+                self._block_filled = 0
+        self.file.write(data)
+        self.size += len(data)
+        return len(data)
+
+    def flush(self) -> None:
+        """Flush the wrapped file."""
+        self.file.flush()
+
+    def hexdigest(self) -> str:
+        """Get the SHA-256 of the data written so far as hex."""
+        return self._sha256.hexdigest()
+
+    def block_digest(self, offset: int, limit: int) -> Optional[bytes]:
+        """
+        Get the SHA-256 of a block written so far.
+
+        Args:
+            offset: Offset of the block in bytes
+            limit: Length of the block in bytes
+
+        Returns:
+            Digest of the block (the last one may be short), or None if the
+            range is not a block of this writer or was not written
+        """
+        if limit != self.block_size or offset % self.block_size:
+            return None
+        index = offset // self.block_size
+        if index < len(self.block_hashes):
+            return self.block_hashes[index]
+        if index == len(self.block_hashes) and self._block_filled:
+            return self._block.copy().digest()
+        return None
+
+
+class IntegrityVerifier:
+    """Checks downloaded files against the hashes Telegram reports.
+
+    Hashes are requested with ``upload.getFileHashes`` once a download
+    finished and compared with the block hashes of its HashingWriter. Files
+    Telegram reports no hashes for (or refuses to) are not verified.
+    """
+
+    def __init__(self, connection: TelegramConnection) -> None:
+        """
+        Initialize integrity verifier.
+
+        Args:
+            connection: Telegram connection the hashes are requested on
+        """
+        self.connection = connection
+        self.logger = get_logger(self.__class__.__name__)
+
+    async def verify(
+        self,
+        message: TelegramMessage,
+        writer: HashingWriter,
+        photo_size: Optional[Any] = None,
+    ) -> bool:
+        """
+        Verify a finished download.
+
+        Args:
+            message: Telegram message object
+            writer: Writer the download was written through
+            photo_size: Size variant of a photo (defaults to the largest)
+
+        Returns:
+            True if the file matches Telegram's hashes, False if Telegram
+            reported none
+
+        Raises:
+            CorruptDownloadError: If the file is short or a block differs
+            FloodWaitError: If Telegram asks to wait before sending hashes
+        """
+        location, dc_id, size = get_file_location(message, photo_size)
+        hashes = await self.get_file_hashes(location, dc_id, size)
+        if not hashes:
+            self.logger.debug(f"No file hashes for message {message.id}")
+            return False
+
+        for file_hash in hashes:
+            if file_hash.offset >= writer.size:
+                raise CorruptDownloadError(
+                    f"Message {message.id}: got {writer.size} bytes, "
+                    f"Telegram hashed data at offset {file_hash.offset}"
+                )
+            digest = writer.block_digest(file_hash.offset, file_hash.limit)
+            if digest is not None and digest != file_hash.hash:
+                raise CorruptDownloadError(
+                    f"Message {message.id}: bytes {file_hash.offset}-"
+                    f"{file_hash.offset + file_hash.limit} do not match "
+                    f"Telegram's hash"
+                )
+        return True
+
+    async def get_file_hashes(self, location: Any, dc_id: int, size: int) -> List[Any]:
+        """
+        Get Telegram's block hashes of a file.
+
+        Args:
+            location: Input file location
+            dc_id: Data center the file is stored in
+            size: File size in bytes
+
+        Returns:
+            FileHash objects in order of offset (empty if unavailable)
+
+        Raises:
+            FloodWaitError: If Telegram asks to wait, so the download is
+                retried after the wait
+        """
+        client = self.connection.get_client()
+        hashes: List[Any] = []
+        offset = 0
+        while offset < size:
+            try:
+                batch = await self._invoke(
+                    client, dc_id, GetFileHashesRequest(location, offset)
+                )
+            except FloodWaitError:
+                raise
+            except RPCError as e:
+                self.logger.debug(f"File hashes unavailable: {e}")
+                return []
+            if not batch:
+                break
+            hashes.extend(batch)
+            offset = batch[-1].offset + batch[-1].limit
+        return hashes
+
+    async def _invoke(self, client: Any, dc_id: int, request: Any) -> Any:
+        """Send a request to the data center a file is stored in."""
+        home_dc = getattr(getattr(client, "session", None), "dc_id", dc_id)
+        if dc_id == home_dc or not hasattr(client, "_borrow_exported_sender"):
+            return await client(request)
+        # Telethon has no public API for requests to another data center;
+        # its own file downloads borrow an exported sender the same way
+        sender = await client._borrow_exported_sender(dc_id)
+        try:
+            return await client._call(sender, request)
+        finally:
+            await client._return_exported_sender(sender)
@@ -1,16 +1,36 @@
 """Media downloading functionality."""
 
+import asyncio
 import logging
 from pathlib import Path
-from typing import Optional
+from typing import Any, Dict, List, Optional, Sequence, Union
 
-from telethon.tl.types import MessageMediaDocument, MessageMediaPhoto
+from telethon.errors import FloodWaitError
 
 from ..models.media_info import MediaInfo
 from ..protocols.file_namer import FileNamer
 from ..protocols.media_filter import MediaFilter
 from ..protocols.telegram_message import TelegramMessage
+from ..utils.media import (
+    PhotoSizePolicy,
+    get_album_id,
+    get_inline_thumbnail,
+    get_mime_type,
+    get_preview_sizes,
+)
+from ..utils.progress import ProgressTracker
+from ..utils.tracing import Tracer
 from .connection import TelegramConnection
+from .integrity import HashingWriter, IntegrityVerifier
+from .part_downloader import PartDownloader
+from .retry import PERMANENT, classify_error
+from .stall_watchdog import StallWatchdog
+
+# Subdirectory of each channel directory that previews are saved in
+PREVIEW_DIRNAME = "previews"
+
+# Prefix of the shared metadata file written for each album
+ALBUM_METADATA_PREFIX = "album_"
 
 
 class MediaDownloader:
@@ -22,6 +42,13 @@ class MediaDownloader:
         download_path: Path,
         media_filter: MediaFilter,
         file_namer: FileNamer,
+        tracer: Optional[Tracer] = None,
+        progress: Optional[ProgressTracker] = None,
+        preview: bool = False,
+        photo_size_policy: Optional[PhotoSizePolicy] = None,
+        stall_timeout: Optional[float] = None,
+        part_downloader: Optional[PartDownloader] = None,
+        integrity_verifier: Optional[IntegrityVerifier] = None,
     ) -> None:
         """
         Initialize media downloader.
@@ -31,18 +58,39 @@ class MediaDownloader:
             download_path: Base path for downloads
             media_filter: Media filtering strategy
             file_namer: File naming strategy
+            tracer: Span tracer (tracing disabled when None)
+            progress: Progress tracker fed by download progress callbacks
+            preview: Save a small JPEG preview (inline thumbnail, smallest
+                photo size or video thumbnail) instead of the original media
+            photo_size_policy: Size variant of photos to download (defaults
+                to the largest)
+            stall_timeout: Seconds without progress after which a download is
+                cancelled with DownloadStalledError (never when None)
+            part_downloader: Downloads original media in parallel parts
+                (``client.download_media`` is used when None)
+            integrity_verifier: Hashes original media while it is written
+                and checks it against Telegram's hashes (never when None)
         """
         self.connection = connection
         self.download_path = download_path
         self.media_filter = media_filter
         self.file_namer = file_namer
+        self.tracer = tracer or Tracer()
+        self.progress = progress
+        self.preview = preview
+        self.photo_size_policy = photo_size_policy or PhotoSizePolicy()
+        self.stall_watchdog = (
+            StallWatchdog(stall_timeout) if stall_timeout is not None else None
+        )
+        self.part_downloader = part_downloader
+        self.integrity_verifier = integrity_verifier
         self.logger = logging.getLogger(self.__class__.__name__)
 
         # Ensure download path exists
         self.download_path.mkdir(parents=True, exist_ok=True)
 
     async def download_media_from_message(
-        self, message: TelegramMessage, channel_name: str
+        self, message: TelegramMessage, channel_name: str, save_metadata: bool = True
     ) -> Optional[MediaInfo]:
         """
         Download media from a single message.
@@ -50,23 +98,54 @@ class MediaDownloader:
         Args:
             message: Telegram message object
             channel_name: Name of the channel
+            save_metadata: Whether to write the metadata file of the download
 
         Returns:
             MediaInfo object if successful, None if failed
+
+        Raises:
+            Exception: Errors that a retry may resolve, such as flood waits,
+                connection errors and expired file references (see
+                ``classify_error``)
         """
+        media_info = None
+        try:
+            with self.tracer.span(
+                "download_media_from_message",
+                {"channel": channel_name, "message_id": message.id},
+                sampling_point=True,
+            ):
+                media_info = await self._download_media_from_message(
+                    message, channel_name, save_metadata
+                )
+        finally:
+            # Raised errors end the attempt too; a retry is expected anew
+            if self.progress is not None:
+                self.progress.file_finished(
+                    channel_name, message.id, success=media_info is not None
+                )
+        return media_info
+
+    async def _download_media_from_message(
+        self, message: TelegramMessage, channel_name: str, save_metadata: bool
+    ) -> Optional[MediaInfo]:
+        """Download media from a single message inside the active span."""
         try:
             # Check if we should download this media
             if not self.media_filter.should_download(message):
                 self.logger.debug(f"Skipping message {message.id} - filtered out")
                 return None
 
-            # Create channel-specific directory
-            channel_dir = self.download_path / self._sanitize_channel_name(channel_name)
-            channel_dir.mkdir(exist_ok=True)
-
-            # Generate filename
-            filename = self.file_namer.generate_filename(message, channel_name)
-            filepath = channel_dir / filename
+            # Create channel-specific directory and generate filename
+            filepath = self.get_target_path(message, channel_name)
+            filepath.parent.mkdir(parents=True, exist_ok=True)
+            filename = filepath.name
+            preview_of = (
+                self.file_namer.generate_filename(message, channel_name)
+                if self.preview
+                else None
+            )
+            channel_id = getattr(getattr(message, "peer_id", None), "channel_id", None)
 
             # Check if file already exists
             if filepath.exists():
@@ -79,13 +158,79 @@ class MediaDownloader:
                     date=message.date,
                     text=message.text,
                     mime_type=self._get_mime_type(message),
+                    channel_id=channel_id,
+                    preview_of=preview_of,
+                    album_id=get_album_id(message),
                 )
 
             # Download the file
             self.logger.info(f"Downloading: {filename}")
             client = self.connection.get_client()
+            progress_callback = (
+                self.progress.callback(channel_name, message.id)
+                if self.progress is not None
+                else None
+            )
 
-            downloaded_file = await client.download_media(message, file=str(filepath))
+            photo_size = None if self.preview else self.select_photo_size(message)
+            thumb = (
+                photo_size
+                if photo_size is not None and not self.photo_size_policy.is_default
+                else None
+            )
+
+            writer: Optional[HashingWriter] = None
+
+            async def fetch(file: Any, progress_callback: Any) -> Any:
+                if self.part_downloader is not None:
+                    return await self.part_downloader.download(
+                        message, file, photo_size, progress_callback
+                    )
+                if thumb is not None:
+                    return await client.download_media(
+                        message,
+                        file=file,
+                        thumb=thumb,
+                        progress_callback=progress_callback,
+                    )
+                return await client.download_media(
+                    message, file=file, progress_callback=progress_callback
+                )
+
+            async def transfer(progress_callback: Any) -> Any:
+                nonlocal writer
+                if self.preview:
+                    return await self._download_preview(
+                        message, filepath, progress_callback
+                    )
+                if self.integrity_verifier is None:
+                    return await fetch(str(filepath), progress_callback)
+
+                # Hash the file as it is written instead of reading it back
+                with open(filepath, "wb") as f:
+                    writer = HashingWriter(f)
+                    downloaded = await fetch(writer, progress_callback)
+                if not downloaded:
+                    filepath.unlink(missing_ok=True)
+                    return None
+                await self.integrity_verifier.verify(message, writer, photo_size)
+                return str(filepath)
+
+            with self.tracer.span("download_media", {"preview": self.preview}) as span:
+                if thumb is not None:
+                    span.set_attribute("photo_size", thumb.type)
+                try:
+                    if self.stall_watchdog is not None:
+                        downloaded_file = await self.stall_watchdog.run(
+                            transfer, progress_callback
+                        )
+                    else:
+                        downloaded_file = await transfer(progress_callback)
+                except BaseException:
+                    # A partial file would be taken for a finished download
+                    filepath.unlink(missing_ok=True)
+                    raise
+                span.set_attribute("downloaded", bool(downloaded_file))
 
             if not downloaded_file:
                 self.logger.error(f"Failed to download message {message.id}")
@@ -101,17 +246,207 @@ class MediaDownloader:
                 text=message.text,
                 mime_type=self._get_mime_type(message),
                 file_size=filepath.stat().st_size if filepath.exists() else None,
+                channel_id=channel_id,
+                preview_of=preview_of,
+                photo_size=photo_size.type if photo_size is not None else None,
+                album_id=get_album_id(message),
+                sha256=writer.hexdigest() if writer is not None else None,
             )
 
             # Save message metadata
-            await self._save_metadata(media_info)
+            if save_metadata:
+                with self.tracer.span("save_metadata"):
+                    await self._save_metadata(media_info)
 
             self.logger.info(f"Successfully downloaded: {filename}")
             return media_info
 
+        except FloodWaitError:
+            # Let the caller back off or move the download to another account
+            raise
+
         except Exception as e:
             self.logger.error(f"Error downloading media from message {message.id}: {e}")
+            if classify_error(e) != PERMANENT:
+                # Let the caller retry errors that may go away
+                raise
+            return None
+
+    async def download_album(
+        self, messages: Sequence[TelegramMessage], channel_name: str
+    ) -> List[Optional[MediaInfo]]:
+        """
+        Download the members of an album concurrently.
+
+        Instead of a metadata file per member, one shared record named after
+        the album id is written next to the files, with the album caption
+        stored once.
+
+        Args:
+            messages: Messages of one album
+            channel_name: Name of the channel
+
+        Returns:
+            MediaInfo (or None if failed) of each message, in order
+
+        Raises:
+            Exception: The first error of a member download that a retry may
+                resolve
+        """
+        album_id = get_album_id(messages[0])
+        with self.tracer.span(
+            "download_album",
+            {"channel": channel_name, "album_id": album_id, "size": len(messages)},
+        ):
+            results = await asyncio.gather(
+                *(
+                    self.download_media_from_message(
+                        message, channel_name, save_metadata=False
+                    )
+                    for message in messages
+                ),
+                return_exceptions=True,
+            )
+            for result in results:
+                if isinstance(result, BaseException):
+                    raise result
+
+            media_infos: List[Optional[MediaInfo]] = [
+                result for result in results if not isinstance(result, BaseException)
+            ]
+            downloaded = [info for info in media_infos if info is not None]
+            if downloaded:
+                caption = next((m.text for m in messages if m.text), None)
+                with self.tracer.span("save_metadata"):
+                    await self._save_album_metadata(downloaded, caption)
+        return media_infos
+
+    def get_target_path(self, message: TelegramMessage, channel_name: str) -> Path:
+        """
+        Get the path the media of a message is downloaded to.
+
+        Previews are saved as JPEG files in the ``previews`` subdirectory of
+        the channel directory.
+
+        Args:
+            message: Telegram message object
+            channel_name: Name of the channel
+
+        Returns:
+            Target file path (not created)
+        """
+        channel_dir = self.download_path / self._sanitize_channel_name(channel_name)
+        filename = self.file_namer.generate_filename(message, channel_name)
+        if self.preview:
+            return channel_dir / PREVIEW_DIRNAME / f"{Path(filename).stem}.jpg"
+        return channel_dir / filename
+
+    def select_photo_size(self, message: TelegramMessage) -> Optional[Any]:
+        """
+        Select the photo size variant the policy downloads for a message.
+
+        Args:
+            message: Telegram message object
+
+        Returns:
+            Chosen photo size, or None if the media is not a photo
+        """
+        photo = getattr(message.media, "photo", None)
+        if photo is None:
             return None
+        return self.photo_size_policy.select(photo)
+
+    async def _download_preview(
+        self, message: TelegramMessage, filepath: Path, progress_callback: Any
+    ) -> Optional[str]:
+        """
+        Save the smallest available preview of a message's media.
+
+        Inline thumbnails are written without a request; otherwise the
+        smallest photo size or document thumbnail is downloaded.
+
+        Args:
+            message: Telegram message object
+            filepath: Preview file path
+            progress_callback: Download progress callback
+
+        Returns:
+            Path of the saved preview, or None if the media has no preview
+        """
+        inline = get_inline_thumbnail(message.media)
+        if inline is not None:
+            filepath.write_bytes(inline)
+            return str(filepath)
+
+        sizes = get_preview_sizes(message.media)
+        if not sizes:
+            self.logger.warning(f"No preview available for message {message.id}")
+            return None
+
+        client = self.connection.get_client()
+        result = await client.download_media(
+            message,
+            file=str(filepath),
+            thumb=sizes[0],
+            progress_callback=progress_callback,
+        )
+        return str(result) if result else None
+
+    @staticmethod
+    def read_metadata(path: Union[str, Path]) -> Dict[str, str]:
+        """
+        Read a metadata file written next to a downloaded file.
+
+        Args:
+            path: Downloaded file or its metadata file
+
+        Returns:
+            Metadata fields by name (e.g. "Message ID")
+        """
+        info_file = Path(path).with_suffix(".txt")
+        if not info_file.exists():
+            album_fields = MediaDownloader._read_album_metadata(Path(path))
+            if album_fields is not None:
+                return album_fields
+
+        fields: Dict[str, str] = {}
+        with open(info_file, "r", encoding="utf-8") as f:
+            for line in f:
+                name, separator, value = line.rstrip("\n").partition(": ")
+                if separator and name not in fields:
+                    fields[name] = value
+        return fields
+
+    @staticmethod
+    def _read_album_metadata(path: Path) -> Optional[Dict[str, str]]:
+        """
+        Read the fields of a file from the album record listing it.
+
+        Args:
+            path: Downloaded file
+
+        Returns:
+            Album fields merged with the file's own fields, or None if no
+            album record lists the file
+        """
+        for record in sorted(path.parent.glob(f"{ALBUM_METADATA_PREFIX}*.txt")):
+            album: Dict[str, str] = {}
+            members: List[Dict[str, str]] = []
+            with open(record, "r", encoding="utf-8") as f:
+                for line in f:
+                    name, separator, value = line.rstrip("\n").partition(": ")
+                    if not separator:
+                        continue
+                    if name == "Text":
+                        album[name] = value
+                        break
+                    if name == "Message ID":
+                        members.append({})
+                    (members[-1] if members else album)[name] = value
+            for member in members:
+                if member.get("Filename") == path.name:
+                    return {**album, **member}
+        return None
 
     def _sanitize_channel_name(self, name: str) -> str:
         """
@@ -152,11 +487,7 @@ class MediaDownloader:
         Returns:
             MIME type string or None
         """
-        if isinstance(message.media, MessageMediaDocument):
-            return message.media.document.mime_type
-        elif isinstance(message.media, MessageMediaPhoto):
-            return "image/jpeg"
-        return None
+        return get_mime_type(message)
 
     async def _save_metadata(self, media_info: MediaInfo) -> None:
         """
@@ -175,9 +506,59 @@ class MediaDownloader:
                 f.write(f"Filename: {media_info.filename}\n")
                 f.write(f"MIME Type: {media_info.mime_type or 'Unknown'}\n")
                 f.write(f"File Size: {media_info.file_size or 'Unknown'} bytes\n")
+                if media_info.channel_id is not None:
+                    f.write(f"Channel ID: {media_info.channel_id}\n")
+                if media_info.preview_of is not None:
+                    f.write(f"Preview Of: {media_info.preview_of}\n")
+                if media_info.photo_size is not None:
+                    f.write(f"Photo Size: {media_info.photo_size}\n")
+                if media_info.album_id is not None:
+                    f.write(f"Album ID: {media_info.album_id}\n")
+                if media_info.sha256 is not None:
+                    f.write(f"SHA-256: {media_info.sha256}\n")
                 f.write(f"Text: {media_info.text or 'No text content'}\n")
 
         except Exception as e:
             self.logger.warning(
                 f"Failed to save metadata for {media_info.filename}: {e}"
             )
+
+    async def _save_album_metadata(
+        self, media_infos: List[MediaInfo], caption: Optional[str]
+    ) -> None:
+        """
+        Save one metadata file shared by the downloaded members of an album.
+
+        Args:
+            media_infos: MediaInfo objects of the album members
+            caption: Album caption
+        """
+        first = media_infos[0]
+        info_file = (
+            first.filepath.parent / f"{ALBUM_METADATA_PREFIX}{first.album_id}.txt"
+        )
+        try:
+            with open(info_file, "w", encoding="utf-8") as f:
+                f.write(f"Album ID: {first.album_id}\n")
+                f.write(f"Channel: {first.channel_name}\n")
+                if first.channel_id is not None:
+                    f.write(f"Channel ID: {first.channel_id}\n")
+                f.write(f"Date: {first.date}\n")
+                f.write(f"Files: {len(media_infos)}\n")
+                for media_info in media_infos:
+                    f.write(f"Message ID: {media_info.message_id}\n")
+                    f.write(f"Filename: {media_info.filename}\n")
+                    f.write(f"MIME Type: {media_info.mime_type or 'Unknown'}\n")
+                    f.write(f"File Size: {media_info.file_size or 'Unknown'} bytes\n")
+                    if media_info.preview_of is not None:
+                        f.write(f"Preview Of: {media_info.preview_of}\n")
+                    if media_info.photo_size is not None:
+                        f.write(f"Photo Size: {media_info.photo_size}\n")
+                    if media_info.sha256 is not None:
+                        f.write(f"SHA-256: {media_info.sha256}\n")
+                f.write(f"Text: {caption or 'No text content'}\n")
+
+        except Exception as e:
+            self.logger.warning(
+                f"Failed to save metadata for album {first.album_id}: {e}"
+            )
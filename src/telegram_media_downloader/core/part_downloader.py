@@ -0,0 +1,430 @@
+"""Part-wise downloads with hedged part requests."""
+
+import asyncio
+import time
+from collections import deque
+from contextlib import ExitStack
+from dataclasses import dataclass
+from pathlib import Path
+from typing import (
+    Any,
+    BinaryIO,
+    Callable,
+    Deque,
+    Dict,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    Union,
+)
+
+from telethon.errors import FloodWaitError
+from telethon.tl.types import (
+    InputDocumentFileLocation,
+    InputPhotoFileLocation,
+    MessageMediaDocument,
+    MessageMediaPhoto,
+)
+
+from ..protocols.telegram_message import TelegramMessage
+from ..utils.logging import get_logger
+from ..utils.media import get_downloadable_photo_sizes, get_photo_size_bytes
+from ..utils.tracing import Tracer
+from .auto_tuner import AutoTuner
+from .connection import TelegramConnection
+
+# Telegram serves files in parts of up to 512 KB; part sizes must be
+# multiples of 4 KB that divide 1 MB
+PART_SIZE = 512 * 1024
+MIN_PART_SIZE = 4 * 1024
+_MEGABYTE = 1024 * 1024
+DEFAULT_PARTS_IN_FLIGHT = 4
+
+
+@dataclass(frozen=True)
+class HedgePolicy:
+    """When slow part requests are duplicated on another sender."""
+
+    percentile: float = 0.95  # requests slower than this percentile are hedged
+    budget: float = 0.05  # maximum share of part requests that are hedged
+    min_samples: int = 20  # latencies recorded before hedging starts
+    window: int = 200  # recent latencies the percentile is taken over
+    senders: int = 1  # extra connections opened for hedged requests
+
+
+class LatencyTracker:
+    """Percentiles of the most recent part request latencies."""
+
+    def __init__(self, window: int) -> None:
+        """
+        Initialize latency tracker.
+
+        Args:
+            window: Number of recent latencies kept
+        """
+        self._samples: Deque[float] = deque(maxlen=window)
+
+    def __len__(self) -> int:
+        """Get the number of latencies kept."""
+        return len(self._samples)
+
+    def record(self, seconds: float) -> None:
+        """Record the latency of a finished request."""
+        self._samples.append(seconds)
+
+    def percentile(self, q: float) -> Optional[float]:
+        """
+        Get a percentile of the recent latencies.
+
+        Args:
+            q: Percentile as a fraction (e.g. 0.95)
+
+        Returns:
+            Latency in seconds, or None if nothing was recorded
+        """
+        if not self._samples:
+            return None
+        ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class InFlightLimit:
+    """Semaphore whose limit can change while requests are waiting."""
+
+    def __init__(self, limit: int) -> None:
+        """
+        Initialize limit.
+
+        Args:
+            limit: Requests allowed in flight
+        """
+        self.limit = limit
+        self.active = 0
+        self._changed = asyncio.Condition()
+
+    async def __aenter__(self) -> None:
+        """Wait for a free slot and take it."""
+        async with self._changed:
+            await self._changed.wait_for(lambda: self.active < self.limit)
+            self.active += 1
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        """Release the slot."""
+        async with self._changed:
+            self.active -= 1
+            self._changed.notify_all()
+
+    async def set_limit(self, limit: int) -> None:
+        """Change the limit; requests in flight above it finish normally."""
+        if limit == self.limit:
+            return
+        async with self._changed:
+            self.limit = limit
+            self._changed.notify_all()
+
+
+def get_file_location(
+    message: TelegramMessage, photo_size: Optional[Any] = None
+) -> Tuple[Any, int, int]:
+    """
+    Get the file location a message's media is downloaded from.
+
+    Args:
+        message: Telegram message object
+        photo_size: Size variant of a photo (defaults to the largest)
+
+    Returns:
+        (input file location, data center id, size in bytes)
+
+    Raises:
+        ValueError: If the message has no photo or document
+    """
+    media = message.media
+    if isinstance(media, MessageMediaDocument) and media.document is not None:
+        document = media.document
+        location: Any = InputDocumentFileLocation(
+            id=document.id,
+            access_hash=document.access_hash,
+            file_reference=document.file_reference,
+            thumb_size="",
+        )
+        return location, document.dc_id, document.size
+
+    if isinstance(media, MessageMediaPhoto) and media.photo is not None:
+        photo = media.photo
+        if photo_size is None:
+            photo_size = get_downloadable_photo_sizes(photo)[-1]
+        location = InputPhotoFileLocation(
+            id=photo.id,
+            access_hash=photo.access_hash,
+            file_reference=photo.file_reference,
+            thumb_size=photo_size.type,
+        )
+        return location, photo.dc_id, get_photo_size_bytes(photo_size)
+
+    raise ValueError(f"Message {message.id} has no downloadable file")
+
+
+class PartDownloader:
+    """Downloads files in parts, several at a time, hedging slow requests.
+
+    Parts are fetched with ``iter_download`` from the connection's senders
+    (the client and any extra connections sharing its session) and written
+    in order. ``max_in_flight`` limits the part requests of all downloads
+    together. A part request still running after the recent ``percentile``
+    latency is sent again on the next sender; the first copy to return is
+    used and the other is cancelled. Hedges are capped at ``budget`` of all
+    part requests, so a network that is slow overall is not flooded with
+    duplicates.
+
+    With an ``auto_tuner``, each data center has its own part size and limit
+    of part requests in flight, tuned from the requests' feedback.
+    """
+
+    def __init__(
+        self,
+        connection: TelegramConnection,
+        part_size: int = PART_SIZE,
+        max_in_flight: int = DEFAULT_PARTS_IN_FLIGHT,
+        hedge_policy: Optional[HedgePolicy] = None,
+        tracer: Optional[Tracer] = None,
+        clock: Callable[[], float] = time.monotonic,
+        auto_tuner: Optional[AutoTuner] = None,
+    ) -> None:
+        """
+        Initialize part downloader.
+
+        Args:
+            connection: Telegram connection whose senders fetch the parts
+            part_size: Bytes per part request (a multiple of 4 KB that
+                divides 1 MB, at most 512 KB)
+            max_in_flight: Part requests in flight across all downloads
+            hedge_policy: When to hedge slow part requests (never when None)
+            tracer: Span tracer (tracing disabled when None)
+            clock: Monotonic clock in seconds
+            auto_tuner: Tunes the part size and part requests in flight per
+                data center, in place of ``part_size`` and ``max_in_flight``
+
+        Raises:
+            ValueError: If the part size is not a valid Telegram part size
+        """
+        if (
+            not MIN_PART_SIZE <= part_size <= PART_SIZE
+            or part_size % MIN_PART_SIZE
+            or _MEGABYTE % part_size
+        ):
+            raise ValueError(
+                f"Part size must be a multiple of {MIN_PART_SIZE} bytes that "
+                f"divides 1 MB, up to {PART_SIZE} bytes"
+            )
+        self.connection = connection
+        self.part_size = part_size
+        self.max_in_flight = max_in_flight
+        self.hedge_policy = hedge_policy
+        self.tracer = tracer or Tracer()
+        self.clock = clock
+        self.auto_tuner = auto_tuner
+        self.logger = get_logger(self.__class__.__name__)
+
+        self.latencies = LatencyTracker(hedge_policy.window if hedge_policy else 1)
+        self.requests = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+
+        self._slots: Dict[int, InFlightLimit] = {}
+        self._next_sender = 0
+
+    async def download(
+        self,
+        message: TelegramMessage,
+        file: Union[str, Path, BinaryIO],
+        photo_size: Optional[Any] = None,
+        progress_callback: Optional[Callable[[int, int], Any]] = None,
+    ) -> Union[str, BinaryIO]:
+        """
+        Download the media of a message to a file.
+
+        Args:
+            message: Telegram message object
+            file: Target file path, or a binary file-like object written
+                to (and left open)
+            photo_size: Size variant of a photo (defaults to the largest)
+            progress_callback: Called with (bytes received, total bytes)
+                after each part is written
+
+        Returns:
+            Path of the downloaded file, or the file-like object
+        """
+        location, dc_id, size = get_file_location(message, photo_size)
+        part_size, _ = self._limits(dc_id)
+        offsets = iter(range(0, size, part_size))
+        pending: Deque["asyncio.Future[bytes]"] = deque()
+
+        def fill() -> None:
+            while len(pending) < self._limits(dc_id)[1]:
+                offset = next(offsets, None)
+                if offset is None:
+                    return
+                pending.append(
+                    asyncio.ensure_future(
+                        self._fetch_part(location, dc_id, offset, size, part_size)
+                    )
+                )
+
+        received = 0
+        try:
+            with ExitStack() as stack:
+                f: Any = file
+                if isinstance(file, (str, Path)):
+                    f = stack.enter_context(open(file, "wb"))
+                fill()
+                while pending:
+                    data = await pending.popleft()
+                    f.write(data)
+                    received += len(data)
+                    fill()
+                    if progress_callback is not None:
+                        result = progress_callback(received, size)
+                        if asyncio.iscoroutine(result):
+                            await result
+        finally:
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+        if isinstance(file, (str, Path)):
+            return str(file)
+        return file
+
+    def _limits(self, dc_id: int) -> Tuple[int, int]:
+        """Get the part size and part requests in flight for a data center."""
+        if self.auto_tuner is None:
+            return self.part_size, self.max_in_flight
+        limits = self.auto_tuner.limits(dc_id)
+        return limits.part_size, limits.in_flight
+
+    def _slots_of(self, dc_id: int) -> InFlightLimit:
+        """Get the in-flight limit part requests to a data center share."""
+        key = dc_id if self.auto_tuner is not None else 0
+        slots = self._slots.get(key)
+        if slots is None:
+            slots = self._slots[key] = InFlightLimit(self._limits(dc_id)[1])
+        return slots
+
+    def _senders(self) -> List[Any]:
+        """Get the clients part requests can be sent on."""
+        return self.connection.get_part_senders()
+
+    def _hedge_delay(self) -> Optional[float]:
+        """Get how long a part request may run before it is hedged."""
+        policy = self.hedge_policy
+        if policy is None or len(self.latencies) < policy.min_samples:
+            return None
+        if self.hedges + 1 > policy.budget * self.requests:
+            return None
+        return self.latencies.percentile(policy.percentile)
+
+    async def _fetch_part(
+        self, location: Any, dc_id: int, offset: int, size: int, part_size: int
+    ) -> bytes:
+        """Fetch one part, hedging the request if it is slow."""
+        slots = self._slots_of(dc_id)
+        try:
+            async with slots:
+                data = await self._fetch_hedged(
+                    location, dc_id, offset, size, part_size
+                )
+        except FloodWaitError:
+            if self.auto_tuner is not None:
+                self.auto_tuner.record_flood(dc_id)
+                await slots.set_limit(self._limits(dc_id)[1])
+            raise
+        return data
+
+    async def _fetch_hedged(
+        self, location: Any, dc_id: int, offset: int, size: int, part_size: int
+    ) -> bytes:
+        """Fetch one part in a slot, hedging the request if it is slow."""
+        senders = self._senders()
+        sender = senders[self._next_sender % len(senders)]
+        self._next_sender += 1
+        started = self.clock()
+        self.requests += 1
+        primary = self._send(sender, location, dc_id, offset, size, part_size)
+        requests: Set["asyncio.Future[bytes]"] = {primary}
+        try:
+            delay = self._hedge_delay()
+            if delay is not None:
+                done, _ = await asyncio.wait(requests, timeout=delay)
+                if not done and self._hedge_delay() is not None:
+                    self.hedges += 1
+                    self.requests += 1
+                    self.logger.debug(f"Hedging part request at offset {offset}")
+                    backup = senders[(senders.index(sender) + 1) % len(senders)]
+                    requests.add(
+                        self._send(backup, location, dc_id, offset, size, part_size)
+                    )
+
+            # The first copy to succeed wins; a failure only counts once
+            # every copy has failed
+            waiting = set(requests)
+            while True:
+                done, waiting = await asyncio.wait(
+                    waiting, return_when=asyncio.FIRST_COMPLETED
+                )
+                succeeded = [r for r in done if r.exception() is None]
+                if succeeded or not waiting:
+                    break
+            if not succeeded:
+                return done.pop().result()  # raises the error
+            winner = primary if primary in succeeded else succeeded[0]
+            if winner is not primary:
+                self.hedge_wins += 1
+            data = winner.result()
+        finally:
+            for request in requests:
+                request.cancel()
+            await asyncio.gather(*requests, return_exceptions=True)
+
+        rtt = self.clock() - started
+        self.latencies.record(rtt)
+        if self.auto_tuner is not None:
+            self.auto_tuner.record_part(dc_id, part_size, len(data), rtt)
+            await self._slots_of(dc_id).set_limit(self._limits(dc_id)[1])
+        return data
+
+    def _send(
+        self,
+        sender: Any,
+        location: Any,
+        dc_id: int,
+        offset: int,
+        size: int,
+        part_size: int,
+    ) -> "asyncio.Future[bytes]":
+        """Start a part request on a sender."""
+        return asyncio.ensure_future(
+            self._request(sender, location, dc_id, offset, size, part_size)
+        )
+
+    async def _request(
+        self,
+        sender: Any,
+        location: Any,
+        dc_id: int,
+        offset: int,
+        size: int,
+        part_size: int,
+    ) -> bytes:
+        """Request a single part from a sender."""
+        with self.tracer.span("get_file_part", {"offset": offset}):
+            async for chunk in sender.iter_download(
+                location,
+                offset=offset,
+                limit=1,
+                request_size=part_size,
+                file_size=size,
+                dc_id=dc_id,
+            ):
+                return bytes(chunk)
+        return bytes()
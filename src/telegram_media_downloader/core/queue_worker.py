@@ -0,0 +1,233 @@
+"""Download jobs shared by several hosts through a work queue.
+
+Discovery splits the unread messages of every channel into message ranges
+and enqueues them. Any number of ``QueueWorker`` instances, on one or more
+hosts, then lease ranges from the queue, download their media and
+acknowledge them. Files are written to the same download directory, so the
+hosts are expected to share a storage mount.
+"""
+
+import asyncio
+import os
+import socket
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from ..models.channel_stats import ChannelStats
+from ..models.download_session import DownloadSession
+from ..models.error_log import ErrorLog
+from ..models.work_task import WorkTask
+from ..protocols.work_queue import WorkQueue
+from ..utils.logging import get_logger
+from .downloader import TelegramMediaDownloader
+
+DEFAULT_CHUNK_SIZE = 200
+DEFAULT_LEASE_SECONDS = 300.0
+
+
+async def enqueue_unread_ranges(
+    downloader: TelegramMediaDownloader,
+    queue: WorkQueue,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> int:
+    """
+    Enqueue the unread messages of every channel as message ranges.
+
+    Ranges come from each dialog's read state, so no messages are fetched.
+    Messages already queued by an earlier discovery are skipped.
+
+    Args:
+        downloader: Connected downloader
+        queue: Work queue to add tasks to
+        chunk_size: Message ids per task
+
+    Returns:
+        Number of tasks added
+    """
+    logger = get_logger("QueueDiscovery")
+    added = 0
+    for channel in await downloader.channel_manager.get_all_channels():
+        unread_range = downloader.channel_manager.get_unread_range(channel)
+        if unread_range is None:
+            continue
+        first_id = max(unread_range[0], queue.queued_up_to(channel.entity.id) + 1)
+        for start in range(first_id, unread_range[1] + 1, chunk_size):
+            end = min(start + chunk_size - 1, unread_range[1])
+            if queue.enqueue(channel.entity.id, channel.title, start, end):
+                added += 1
+    logger.info(f"Enqueued {added} tasks")
+    return added
+
+
+class QueueWorker:
+    """Leases message ranges from a work queue and downloads their media.
+
+    A range is acknowledged once all of its media was downloaded. If any
+    download failed, the range is released for another attempt instead.
+    Ranges finish in any order, so a channel is only marked as read up to
+    the end of the ranges below which every range is done (and up to the
+    first failure of the range that follows them).
+    """
+
+    def __init__(
+        self,
+        downloader: TelegramMediaDownloader,
+        queue: WorkQueue,
+        worker_id: Optional[str] = None,
+        lease_seconds: float = DEFAULT_LEASE_SECONDS,
+        mark_as_read: bool = True,
+    ) -> None:
+        """
+        Initialize queue worker.
+
+        Args:
+            downloader: Connected downloader
+            queue: Work queue to lease tasks from
+            worker_id: Identifier recorded with leases (defaults to host:pid)
+            lease_seconds: Lease duration; leases are renewed while a task runs
+            mark_as_read: Whether to mark each finished range as read
+        """
+        self.downloader = downloader
+        self.queue = queue
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+        self.lease_seconds = lease_seconds
+        self.mark_as_read = mark_as_read
+        self.logger = get_logger(self.__class__.__name__)
+
+        self._channels: Dict[int, Any] = {}
+        self._stats: Dict[int, ChannelStats] = {}
+
+    async def run(self) -> DownloadSession:
+        """
+        Process tasks until the queue has none left to lease.
+
+        Returns:
+            DownloadSession covering the tasks this worker processed
+        """
+        start_time = datetime.now()
+        errors = ErrorLog()
+        self._channels = {
+            channel.entity.id: channel
+            for channel in await self.downloader.channel_manager.get_all_channels()
+        }
+
+        while True:
+            task = self.queue.lease(self.worker_id, self.lease_seconds)
+            if task is None:
+                break
+            try:
+                await self._run_task(task)
+            except Exception as e:
+                error_msg = f"Task {task} failed: {e}"
+                self.logger.error(error_msg)
+                errors.add(error_msg, type(e).__name__)
+                self.queue.fail(task, error_msg)
+
+        channel_stats = list(self._stats.values())
+        session = DownloadSession(
+            total_channels=len(channel_stats),
+            total_unread=sum(s.unread_count for s in channel_stats),
+            total_media=sum(s.media_count for s in channel_stats),
+            total_downloaded=sum(s.downloaded_count for s in channel_stats),
+            channel_stats=channel_stats,
+            start_time=start_time,
+            end_time=datetime.now(),
+            errors=errors,
+        )
+        self.logger.info(f"Worker {self.worker_id} finished: {session}")
+        return session
+
+    async def _run_task(self, task: WorkTask) -> None:
+        """Download one leased range, renewing the lease while it runs."""
+        channel = self._channels.get(task.channel_id)
+        if channel is None:
+            raise LookupError(f"Channel {task.channel_name} is not visible")
+
+        stats = self._stats.get(task.channel_id)
+        if stats is None:
+            stats = self._stats[task.channel_id] = ChannelStats(
+                name=task.channel_name, start_time=datetime.now()
+            )
+
+        self.logger.info(f"Processing {task} (attempt {task.attempts})")
+        heartbeat = asyncio.create_task(self._renew_lease(task))
+        try:
+            failed_ids = await self._download_range(channel, task, stats)
+        finally:
+            heartbeat.cancel()
+        stats.end_time = datetime.now()
+
+        if failed_ids:
+            error_msg = f"{len(failed_ids)} downloads of {task} failed"
+            self.logger.warning(error_msg)
+            self.queue.fail(task, error_msg)
+        elif not self.queue.ack(task):
+            self.logger.warning(f"Lease on {task} was lost before it finished")
+            return
+        if not self.mark_as_read:
+            return
+
+        read_up_to = self.queue.done_up_to(task.channel_id)
+        if failed_ids and read_up_to == task.first_id - 1:
+            # Every earlier range is done, so so are the messages before the
+            # first failure
+            read_up_to = failed_ids[0] - 1
+        if read_up_to:
+            await self.downloader.channel_manager.mark_read_up_to(channel, read_up_to)
+
+    async def _download_range(
+        self, channel: Any, task: WorkTask, stats: ChannelStats
+    ) -> List[int]:
+        """
+        Download the media of the messages in a task's range.
+
+        Args:
+            channel: Channel dialog object
+            task: Leased task
+            stats: Stats of the channel
+
+        Returns:
+            Ids of the messages whose media failed to download or was
+            deferred by the media filter, ascending
+        """
+        failed_ids: List[int] = []
+        downloader = self.downloader
+        async for message in downloader.channel_manager.iter_message_range(
+            channel, task.first_id, task.last_id
+        ):
+            stats.unread_count += 1
+            if not downloader.media_filter.should_download(message):
+                if downloader.is_deferred(message):
+                    # Left for a later run, so the range is not done
+                    self.logger.info(f"Deferred message {message.id} of {task}")
+                    failed_ids.append(message.id)
+                continue
+            stats.media_count += 1
+            try:
+                media_info = (
+                    await downloader.media_downloader.download_media_from_message(
+                        message, task.channel_name
+                    )
+                )
+                if media_info:
+                    stats.downloaded_count += 1
+                    stats.bytes_downloaded += media_info.file_size or 0
+                else:
+                    failed_ids.append(message.id)
+                    stats.add_error(
+                        f"Failed to download message {message.id}", "DownloadFailed"
+                    )
+            except Exception as e:
+                failed_ids.append(message.id)
+                error_msg = f"Error downloading message {message.id}: {e}"
+                self.logger.error(error_msg)
+                stats.add_error(error_msg, type(e).__name__)
+        return failed_ids
+
+    async def _renew_lease(self, task: WorkTask) -> None:
+        """Keep renewing a task's lease until cancelled."""
+        while True:
+            await asyncio.sleep(self.lease_seconds / 3)
+            if not self.queue.renew(task, self.lease_seconds):
+                self.logger.warning(f"Could not renew the lease on {task}")
+                return
@@ -0,0 +1,147 @@
+"""Batched, checkpointed read acknowledgements."""
+
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set
+
+from ..utils.logging import get_logger
+from ..utils.tracing import Tracer
+from .channel_manager import ChannelManager
+
+DEFAULT_ACK_EVERY = 100
+DEFAULT_ACK_INTERVAL = 30.0
+
+
+@dataclass
+class _ChannelAcks:
+    """Read acknowledgement state of a single channel."""
+
+    dialog: Any
+    message_ids: List[int] = field(default_factory=list)  # ascending
+    handled: Set[int] = field(default_factory=set)
+    position: int = 0  # index of the first message not yet checkpointed
+    checkpoint: int = 0  # highest id below which every message was handled
+    acknowledged: int = 0
+
+    def advance(self) -> None:
+        """Move the checkpoint over the handled messages that follow it."""
+        while (
+            self.position < len(self.message_ids)
+            and self.message_ids[self.position] in self.handled
+        ):
+            self.checkpoint = self.message_ids[self.position]
+            self.handled.discard(self.checkpoint)
+            self.position += 1
+
+
+class ReadAcknowledger:
+    """Marks processed messages as read while channels are being downloaded.
+
+    Each channel's checkpoint is the highest message id up to which every
+    tracked message was handled successfully, so a failed message holds the
+    checkpoint back for the rest of the run and is listed again next time.
+    Checkpoints are sent every ``every`` handled messages or ``interval``
+    seconds, whichever comes first; pending checkpoints of all channels are
+    coalesced into one acknowledgement per channel and sent concurrently.
+    """
+
+    def __init__(
+        self,
+        channel_manager: ChannelManager,
+        every: int = DEFAULT_ACK_EVERY,
+        interval: float = DEFAULT_ACK_INTERVAL,
+        tracer: Optional[Tracer] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """
+        Initialize read acknowledger.
+
+        Args:
+            channel_manager: Channel manager used to send acknowledgements
+            every: Handled messages between acknowledgements
+            interval: Seconds between acknowledgements
+            tracer: Span tracer (tracing disabled when None)
+            clock: Monotonic clock in seconds
+        """
+        self.channel_manager = channel_manager
+        self.every = every
+        self.interval = interval
+        self.tracer = tracer or Tracer()
+        self.clock = clock
+        self.logger = get_logger(self.__class__.__name__)
+
+        self._channels: Dict[Any, _ChannelAcks] = {}
+        self._handled_since_flush = 0
+        self._last_flush = clock()
+
+    def track(self, dialog: Any, message_ids: Iterable[int]) -> None:
+        """
+        Register the messages of a channel that will be processed.
+
+        Args:
+            dialog: Channel dialog object
+            message_ids: Ids of the messages to process
+        """
+        acks = self._channels.get(dialog.entity.id)
+        if acks is None:
+            acks = self._channels[dialog.entity.id] = _ChannelAcks(dialog)
+        acks.message_ids = sorted(
+            set(acks.message_ids[acks.position :]) | set(message_ids)
+        )
+        acks.position = 0
+        acks.advance()
+
+    async def record(self, dialog: Any, message_id: int, success: bool = True) -> None:
+        """
+        Record the outcome of a processed message.
+
+        Sends the pending acknowledgements when they are due.
+
+        Args:
+            dialog: Channel dialog object
+            message_id: Id of the processed message
+            success: Whether the message was handled successfully
+        """
+        acks = self._channels.get(dialog.entity.id)
+        if acks is None:
+            return
+        if success:
+            acks.handled.add(message_id)
+            acks.advance()
+        self._handled_since_flush += 1
+
+        if (
+            self._handled_since_flush >= self.every
+            or self.clock() - self._last_flush >= self.interval
+        ):
+            await self.flush()
+
+    def get_checkpoint(self, dialog: Any) -> int:
+        """Get the id up to which a channel's messages can be marked as read."""
+        acks = self._channels.get(dialog.entity.id)
+        return acks.checkpoint if acks is not None else 0
+
+    async def flush(self) -> None:
+        """Send the checkpoints that advanced since the last acknowledgement."""
+        self._handled_since_flush = 0
+        self._last_flush = self.clock()
+        due = [
+            acks
+            for acks in self._channels.values()
+            if acks.checkpoint > acks.acknowledged
+        ]
+        if not due:
+            return
+
+        with self.tracer.span("flush_read_acks", {"channels": len(due)}):
+            for acks in due:
+                acks.acknowledged = acks.checkpoint
+            await asyncio.gather(
+                *(self._send(acks.dialog, acks.checkpoint) for acks in due)
+            )
+        self.logger.debug(f"Acknowledged read messages in {len(due)} channels")
+
+    async def _send(self, dialog: Any, max_id: int) -> None:
+        """Mark a channel's messages up to ``max_id`` as read."""
+        await self.channel_manager.mark_read_up_to(dialog, max_id)
@@ -0,0 +1,347 @@
+"""Deferred retries of failed downloads."""
+
+import asyncio
+import heapq
+import itertools
+import random
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from telethon.errors import (
+    FileReferenceExpiredError,
+    FileReferenceInvalidError,
+    FloodWaitError,
+    RpcCallFailError,
+    ServerError,
+    TimedOutError,
+)
+
+from ..models.channel_stats import ChannelStats
+from ..utils.logging import get_logger
+from .integrity import CorruptDownloadError
+
+# Error kinds returned by classify_error
+TRANSIENT = "transient"
+FLOOD = "flood"
+FILE_REFERENCE_EXPIRED = "file_reference_expired"
+PERMANENT = "permanent"
+ERROR_KINDS = (TRANSIENT, FLOOD, FILE_REFERENCE_EXPIRED, PERMANENT)
+
+_TRANSIENT_ERRORS = (
+    ConnectionError,
+    TimeoutError,
+    asyncio.TimeoutError,
+    asyncio.IncompleteReadError,
+    ServerError,
+    TimedOutError,
+    RpcCallFailError,
+    CorruptDownloadError,
+)
+_FILE_REFERENCE_ERRORS = (FileReferenceExpiredError, FileReferenceInvalidError)
+
+
+def classify_error(error: BaseException) -> str:
+    """
+    Classify a download error by how it should be retried.
+
+    Args:
+        error: Exception raised by a download
+
+    Returns:
+        One of ``ERROR_KINDS``
+    """
+    if isinstance(error, FloodWaitError):
+        return FLOOD
+    if isinstance(error, _FILE_REFERENCE_ERRORS):
+        return FILE_REFERENCE_EXPIRED
+    if isinstance(error, _TRANSIENT_ERRORS):
+        return TRANSIENT
+    return PERMANENT
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """How often and when failed downloads are retried."""
+
+    max_attempts: int = 3  # retries per download after the first failure
+    base_delay: float = 2.0  # seconds before the first retry
+    max_delay: float = 300.0
+    breaker_threshold: int = 5  # consecutive failures that open a circuit
+    breaker_cooldown: float = 300.0  # seconds before an open circuit is retried
+
+    def backoff(self, attempt: int, rng: random.Random) -> float:
+        """
+        Get the delay before a retry, doubling with each attempt.
+
+        Half of the delay is random jitter, so retries of downloads that
+        failed together are spread out.
+
+        Args:
+            attempt: Retry number, starting at 1
+            rng: Random number generator for the jitter
+
+        Returns:
+            Delay in seconds
+        """
+        delay = min(self.max_delay, self.base_delay * 2.0 ** (attempt - 1))
+        return delay / 2 + rng.uniform(0, delay / 2)
+
+
+class CircuitBreaker:
+    """Stops downloads from channels that keep failing.
+
+    A circuit opens after ``threshold`` consecutive failures and stays open
+    for ``cooldown`` seconds. Afterwards one download is let through; a
+    failure opens the circuit again and a success closes it.
+    """
+
+    def __init__(
+        self,
+        threshold: int,
+        cooldown: float,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        """
+        Initialize circuit breaker.
+
+        Args:
+            threshold: Consecutive failures that open a circuit
+            cooldown: Seconds an open circuit stays open
+            clock: Monotonic clock in seconds
+        """
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.clock = clock
+        self._failures: Dict[Any, int] = {}
+        self._opened_at: Dict[Any, float] = {}
+
+    def is_open(self, key: Any) -> bool:
+        """Check if downloads for a key are currently blocked."""
+        opened_at = self._opened_at.get(key)
+        return opened_at is not None and self.clock() - opened_at < self.cooldown
+
+    def record_success(self, key: Any) -> None:
+        """Close the circuit of a key."""
+        self._failures.pop(key, None)
+        self._opened_at.pop(key, None)
+
+    def record_failure(self, key: Any) -> None:
+        """Count a failure, opening the circuit at the threshold."""
+        failures = self._failures.get(key, 0) + 1
+        self._failures[key] = failures
+        if failures >= self.threshold:
+            self._opened_at[key] = self.clock()
+
+
+@dataclass
+class RetryJob:
+    """Messages whose download failed and is waiting to be retried."""
+
+    dialog: Any
+    channel_name: str
+    stats: ChannelStats
+    messages: List[Any]  # a single message or the members of an album
+    attempt: int
+    kind: str
+    error: str
+    due: float = 0.0
+
+
+@dataclass(order=True)
+class _Entry:
+    due: float
+    sequence: int
+    job: RetryJob = field(compare=False)
+
+
+class RetryQueue:
+    """Failed downloads waiting for a retry, ordered by when they are due.
+
+    Downloads are deferred rather than retried inline, so a failing message
+    does not hold up the rest of its channel; the queue is drained once the
+    first pass over the channels is done.
+
+    Downloads that failed with an expired file reference are due at once:
+    they only need their messages fetched again, which is done in bulk for
+    all such downloads of a channel (see ``take_expired``).
+    """
+
+    def __init__(
+        self,
+        policy: Optional[RetryPolicy] = None,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], Awaitable[Any]] = asyncio.sleep,
+        rng: Optional[random.Random] = None,
+    ) -> None:
+        """
+        Initialize retry queue.
+
+        Args:
+            policy: Retry policy (defaults to RetryPolicy())
+            clock: Monotonic clock in seconds
+            sleep: Coroutine function used to wait for due retries
+            rng: Random number generator for the backoff jitter
+        """
+        self.policy = policy or RetryPolicy()
+        self.clock = clock
+        self.sleep = sleep
+        self.rng = rng or random.Random()
+        self.breaker = CircuitBreaker(
+            self.policy.breaker_threshold, self.policy.breaker_cooldown, clock
+        )
+        self.logger = get_logger(self.__class__.__name__)
+
+        self._heap: List[_Entry] = []
+        self._sequence = itertools.count()
+        self._flood_wait_until = 0.0
+
+    def __len__(self) -> int:
+        """Get the number of deferred jobs."""
+        return len(self._heap)
+
+    def defer(
+        self,
+        dialog: Any,
+        channel_name: str,
+        stats: ChannelStats,
+        messages: List[Any],
+        error: BaseException,
+        attempt: int = 0,
+    ) -> bool:
+        """
+        Schedule a retry of a failed download if its error allows one.
+
+        Args:
+            dialog: Channel dialog object
+            channel_name: Name of the channel
+            stats: Stats of the channel
+            messages: Messages of the failed download
+            error: Exception raised by the download
+            attempt: Retries already made
+
+        Returns:
+            True if a retry was scheduled, False if the download should be
+            recorded as failed
+        """
+        kind = classify_error(error)
+        if kind == PERMANENT or attempt >= self.policy.max_attempts:
+            return False
+
+        delay = self.policy.backoff(attempt + 1, self.rng)
+        if kind == FILE_REFERENCE_EXPIRED:
+            delay = 0.0
+        elif isinstance(error, FloodWaitError):
+            delay = max(delay, float(error.seconds))
+            self._flood_wait_until = max(
+                self._flood_wait_until, self.clock() + error.seconds
+            )
+        job = RetryJob(
+            dialog=dialog,
+            channel_name=channel_name,
+            stats=stats,
+            messages=messages,
+            attempt=attempt + 1,
+            kind=kind,
+            error=f"{type(error).__name__}: {error}",
+            due=self.clock() + delay,
+        )
+        heapq.heappush(self._heap, _Entry(job.due, next(self._sequence), job))
+        self.logger.warning(
+            f"Retrying message {messages[0].id} in {channel_name} in {delay:.1f}s "
+            f"(attempt {job.attempt}, {kind}): {error}"
+        )
+        return True
+
+    def flood_wait_remaining(self) -> float:
+        """Get the seconds left in the last flood wait a download hit."""
+        return max(0.0, self._flood_wait_until - self.clock())
+
+    def pop_due(self) -> Tuple[float, Optional[RetryJob]]:
+        """
+        Take the next job if it is due.
+
+        Returns:
+            (seconds until the next job is due, job if due now)
+        """
+        if not self._heap:
+            return 0.0, None
+        wait = self._heap[0].due - self.clock()
+        if wait > 0:
+            return wait, None
+        return 0.0, heapq.heappop(self._heap).job
+
+    def take_expired(self, channel_id: int) -> List[RetryJob]:
+        """
+        Take every job of a channel that failed with an expired file reference.
+
+        Args:
+            channel_id: Channel id
+
+        Returns:
+            Jobs removed from the queue, oldest first
+        """
+        return self.take(channel_id, FILE_REFERENCE_EXPIRED)
+
+    def take(self, channel_id: int, kind: Optional[str] = None) -> List[RetryJob]:
+        """
+        Take the jobs of a channel out of the queue.
+
+        Args:
+            channel_id: Channel id
+            kind: Error kind of the jobs to take (all jobs when None)
+
+        Returns:
+            Jobs removed from the queue, oldest first
+        """
+        taken = [
+            entry
+            for entry in self._heap
+            if (kind is None or entry.job.kind == kind)
+            and entry.job.dialog.entity.id == channel_id
+        ]
+        if taken:
+            self._heap = [entry for entry in self._heap if entry not in taken]
+            heapq.heapify(self._heap)
+        return [entry.job for entry in sorted(taken)]
+
+    async def drain(self, retry: Callable[[List[RetryJob]], Awaitable[None]]) -> None:
+        """
+        Retry deferred downloads as they become due until none are left.
+
+        A job that failed with an expired file reference is retried together
+        with all other such jobs of its channel. Jobs of channels whose
+        circuit is open are dropped and counted as skipped. No job is
+        retried while a flood wait is in progress. ``retry`` may defer jobs
+        again.
+
+        Args:
+            retry: Coroutine function that retries a batch of jobs of one
+                channel
+        """
+        while self._heap:
+            flood_wait = self.flood_wait_remaining()
+            if flood_wait:
+                await self.sleep(flood_wait)
+                continue
+            wait, job = self.pop_due()
+            if job is None:
+                await self.sleep(wait)
+                continue
+
+            channel_id = job.dialog.entity.id
+            if self.breaker.is_open(channel_id):
+                job.stats.skipped_count += len(job.messages)
+                job.stats.add_error(
+                    f"Skipped retry of message {job.messages[0].id}: "
+                    f"circuit open for {job.channel_name} ({job.error})",
+                    "CircuitOpen",
+                )
+                continue
+
+            jobs = [job]
+            if job.kind == FILE_REFERENCE_EXPIRED:
+                jobs.extend(self.take_expired(channel_id))
+            for job in jobs:
+                job.stats.retry_count += 1
+            await retry(jobs)
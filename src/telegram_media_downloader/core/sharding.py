@@ -0,0 +1,351 @@
+"""Multi-process sharded download sessions.
+
+A single process is bound by one core for MTProto encryption and message
+parsing. ``ShardedDownloader`` runs one ``TelegramMediaDownloader`` per
+worker process, each with its own copy of the Telegram session and its own
+connection, and merges their results into a single ``DownloadSession``.
+"""
+
+import asyncio
+import hashlib
+import logging
+import multiprocessing
+import os
+import shutil
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, List, Optional, Tuple, Union
+
+from ..config.settings import TelegramConfig
+from ..models.download_session import DownloadSession
+from ..protocols.file_namer import FileNamer
+from ..protocols.media_filter import MediaFilter
+from ..storage.checkpoints import CheckpointStore
+from ..utils.logging import get_logger, setup_logging
+from ..utils.media import PhotoSizePolicy
+from .auto_tuner import DEFAULT_TUNING_FILENAME, AutoTuner
+from .downloader import TelegramMediaDownloader
+from .part_downloader import HedgePolicy
+from .read_acks import DEFAULT_ACK_EVERY, DEFAULT_ACK_INTERVAL
+from .retry import RetryPolicy
+from .stall_watchdog import DEFAULT_STALL_TIMEOUT
+
+
+def shard_for(key: int, shards: int) -> int:
+    """
+    Assign a key to a shard with rendezvous hashing.
+
+    The assignment is stable across runs and processes, and changing the
+    number of shards only moves the keys of added or removed shards.
+
+    Args:
+        key: Key to assign (e.g. a channel id)
+        shards: Number of shards
+
+    Returns:
+        Shard index in ``range(shards)``
+    """
+    return max(
+        range(shards),
+        key=lambda shard: hashlib.blake2b(
+            f"{key}:{shard}".encode(), digest_size=8
+        ).digest(),
+    )
+
+
+def session_file(session_name: str) -> Path:
+    """Get the file Telethon stores a named session in."""
+    if session_name.endswith(".session"):
+        return Path(session_name)
+    return Path(f"{session_name}.session")
+
+
+def worker_session_name(session_name: str, index: int) -> str:
+    """Get the session name used by a worker process."""
+    base = (
+        session_name[: -len(".session")]
+        if session_name.endswith(".session")
+        else session_name
+    )
+    return f"{base}.worker{index}"
+
+
+def prepare_worker_session(config: TelegramConfig, index: int) -> TelegramConfig:
+    """
+    Get the configuration of a worker, copying the session file if needed.
+
+    Worker session files are only created once, so the entity cache each
+    worker builds up is kept between runs.
+
+    Args:
+        config: Configuration of the logged-in account
+        index: Worker index
+
+    Returns:
+        Configuration using the worker's session copy
+
+    Raises:
+        FileNotFoundError: If neither the worker nor the main session exists
+    """
+    name = worker_session_name(config.session_name, index)
+    target = session_file(name)
+    if not target.exists():
+        source = session_file(config.session_name)
+        if not source.exists():
+            raise FileNotFoundError(
+                f"Session file {source} not found; log in once without "
+                f"multiple processes first"
+            )
+        shutil.copy2(source, target)
+    return TelegramConfig(
+        api_id=config.api_id,
+        api_hash=config.api_hash,
+        phone_number=config.phone_number,
+        session_name=name,
+        max_part_size=config.max_part_size,
+        max_parts_in_flight=config.max_parts_in_flight,
+    )
+
+
+def worker_tuning_file(download_path: Union[str, Path], index: int) -> Path:
+    """Get the file a worker process keeps its auto-tuned limits in."""
+    tuning_file = Path(DEFAULT_TUNING_FILENAME)
+    return Path(download_path) / f"{tuning_file.stem}.worker{index}{tuning_file.suffix}"
+
+
+@dataclass
+class _ShardSpec:
+    """Everything a worker process needs to run its shard (picklable)."""
+
+    config: TelegramConfig
+    index: int
+    count: int
+    download_path: str
+    media_filter: Optional[MediaFilter]
+    file_namer: Optional[FileNamer]
+    photo_size_policy: Optional[PhotoSizePolicy]
+    fail_fast: bool
+    mark_as_read: bool
+    log_level: int
+    client_factory: Optional[Callable[[], Any]]
+    preview: bool = False
+    ack_every: int = DEFAULT_ACK_EVERY
+    ack_interval: float = DEFAULT_ACK_INTERVAL
+    retry_policy: Optional[RetryPolicy] = None
+    stall_timeout: Optional[float] = DEFAULT_STALL_TIMEOUT
+    parts_in_flight: int = 0
+    hedge_policy: Optional[HedgePolicy] = None
+    auto_tune: bool = False
+    verify_integrity: bool = False
+
+
+def _run_shard(spec: _ShardSpec) -> DownloadSession:
+    """Worker process entry point."""
+    setup_logging(
+        logging.getLevelName(spec.log_level),
+        format_string=(
+            f"%(asctime)s - worker {spec.index} - %(name)s - "
+            "%(levelname)s - %(message)s"
+        ),
+    )
+    return asyncio.run(_download_shard(spec))
+
+
+async def _download_shard(spec: _ShardSpec) -> DownloadSession:
+    """Download the channels assigned to one shard."""
+    auto_tuner = None
+    if spec.auto_tune:
+        # Each worker keeps its own limits, as the workers would otherwise
+        # overwrite each other's file
+        store = CheckpointStore(worker_tuning_file(spec.download_path, spec.index))
+        auto_tuner = AutoTuner(
+            spec.config.max_part_size, spec.config.max_parts_in_flight, store
+        )
+    downloader = TelegramMediaDownloader(
+        config=spec.config,
+        download_path=spec.download_path,
+        media_filter=spec.media_filter,
+        file_namer=spec.file_namer,
+        fail_fast=spec.fail_fast,
+        photo_size_policy=spec.photo_size_policy,
+        shard=(spec.index, spec.count),
+        preview=spec.preview,
+        ack_every=spec.ack_every,
+        ack_interval=spec.ack_interval,
+        retry_policy=spec.retry_policy,
+        stall_timeout=spec.stall_timeout,
+        parts_in_flight=spec.parts_in_flight,
+        hedge_policy=spec.hedge_policy,
+        auto_tuner=auto_tuner,
+        verify_integrity=spec.verify_integrity,
+    )
+    if spec.client_factory is not None:
+        downloader.connection.client = spec.client_factory()
+        return await downloader.download_all_unread_media(spec.mark_as_read)
+    async with downloader:
+        return await downloader.download_all_unread_media(spec.mark_as_read)
+
+
+class ShardedDownloader:
+    """Runs a download session across a pool of worker processes.
+
+    Channels are assigned to workers by rendezvous hashing of their ids, so
+    each channel is handled by the same worker on every run.
+    """
+
+    def __init__(
+        self,
+        config: TelegramConfig,
+        download_path: Union[str, Path] = "downloads",
+        processes: Optional[int] = None,
+        media_filter: Optional[MediaFilter] = None,
+        file_namer: Optional[FileNamer] = None,
+        fail_fast: bool = False,
+        client_factory: Optional[Callable[[], Any]] = None,
+        photo_size_policy: Optional[PhotoSizePolicy] = None,
+        preview: bool = False,
+        ack_every: int = DEFAULT_ACK_EVERY,
+        ack_interval: float = DEFAULT_ACK_INTERVAL,
+        retry_policy: Optional[RetryPolicy] = None,
+        stall_timeout: Optional[float] = DEFAULT_STALL_TIMEOUT,
+        parts_in_flight: int = 0,
+        hedge_policy: Optional[HedgePolicy] = None,
+        auto_tune: bool = False,
+        verify_integrity: bool = False,
+    ) -> None:
+        """
+        Initialize sharded downloader.
+
+        Args:
+            config: Telegram configuration of a logged-in account
+            download_path: Base directory for downloads
+            processes: Number of worker processes (defaults to the CPU count)
+            media_filter: Custom media filter (must be picklable)
+            file_namer: Custom file namer (must be picklable)
+            fail_fast: Stop a worker on its first channel error
+            client_factory: Picklable factory for a client used instead of
+                connecting (for tests and benchmarks)
+            photo_size_policy: Size variant of photos to download
+            preview: Save small previews instead of the original media
+            ack_every: Processed messages between read acknowledgements
+            ack_interval: Seconds between read acknowledgements
+            retry_policy: Retries of failed downloads in each worker
+            stall_timeout: Seconds without progress after which a download is
+                cancelled and retried (never when None)
+            parts_in_flight: Download files in parts with up to this many part
+                requests in flight (whole files are downloaded when 0)
+            hedge_policy: Hedging of slow part requests (never when None)
+            auto_tune: Tune part downloads per data center in each worker,
+                keeping the limits in a file per worker
+            verify_integrity: Verify original media against Telegram's hashes
+
+        See ``TelegramMediaDownloader`` for the download options.
+        """
+        self.config = config
+        self.download_path = Path(download_path)
+        self.processes = processes or os.cpu_count() or 1
+        self.media_filter = media_filter
+        self.file_namer = file_namer
+        self.fail_fast = fail_fast
+        self.client_factory = client_factory
+        self.photo_size_policy = photo_size_policy
+        self.preview = preview
+        self.ack_every = ack_every
+        self.ack_interval = ack_interval
+        self.retry_policy = retry_policy
+        self.stall_timeout = stall_timeout
+        self.parts_in_flight = parts_in_flight
+        self.hedge_policy = hedge_policy
+        self.auto_tune = auto_tune
+        self.verify_integrity = verify_integrity
+        self.logger = get_logger(self.__class__.__name__)
+
+    async def download_all_unread_media(
+        self, mark_as_read: bool = True
+    ) -> DownloadSession:
+        """
+        Download unread media from all channels using every worker.
+
+        Args:
+            mark_as_read: Whether to mark messages as read after downloading
+
+        A worker that fails (e.g. its session is missing or unauthorised, or
+        its process crashed) is recorded as a session error; the sessions of
+        the other workers are still merged.
+
+        Returns:
+            DownloadSession merged from all workers
+        """
+        start_time = datetime.now()
+        specs: List[_ShardSpec] = []
+        failures: List[Tuple[int, BaseException]] = []
+        for index in range(self.processes):
+            config = self.config
+            if self.client_factory is None:
+                try:
+                    config = prepare_worker_session(self.config, index)
+                except OSError as e:
+                    failures.append((index, e))
+                    continue
+            specs.append(
+                _ShardSpec(
+                    config=config,
+                    index=index,
+                    count=self.processes,
+                    download_path=str(self.download_path),
+                    media_filter=self.media_filter,
+                    file_namer=self.file_namer,
+                    photo_size_policy=self.photo_size_policy,
+                    fail_fast=self.fail_fast,
+                    mark_as_read=mark_as_read,
+                    log_level=logging.getLogger().getEffectiveLevel(),
+                    client_factory=self.client_factory,
+                    preview=self.preview,
+                    ack_every=self.ack_every,
+                    ack_interval=self.ack_interval,
+                    retry_policy=self.retry_policy,
+                    stall_timeout=self.stall_timeout,
+                    parts_in_flight=self.parts_in_flight,
+                    hedge_policy=self.hedge_policy,
+                    auto_tune=self.auto_tune,
+                    verify_integrity=self.verify_integrity,
+                )
+            )
+
+        self.logger.info(f"Starting download session with {self.processes} workers")
+        loop = asyncio.get_running_loop()
+        with ProcessPoolExecutor(
+            max_workers=self.processes,
+            mp_context=multiprocessing.get_context("spawn"),
+        ) as pool:
+            results = await asyncio.gather(
+                *(loop.run_in_executor(pool, _run_shard, spec) for spec in specs),
+                return_exceptions=True,
+            )
+
+        sessions: List[DownloadSession] = []
+        for spec, result in zip(specs, results):
+            if isinstance(result, BaseException):
+                failures.append((spec.index, result))
+            else:
+                sessions.append(result)
+        if sessions:
+            session = DownloadSession.merge(sessions)
+        else:
+            session = DownloadSession(
+                total_channels=0,
+                total_unread=0,
+                total_media=0,
+                total_downloaded=0,
+                channel_stats=[],
+                start_time=start_time,
+                end_time=datetime.now(),
+            )
+        for index, error in sorted(failures, key=lambda failure: failure[0]):
+            error_msg = f"Worker {index} failed: {error}"
+            self.logger.error(error_msg)
+            session.add_session_error(error_msg, type(error).__name__)
+        self.logger.info(f"Sharded download session completed: {session}")
+        return session
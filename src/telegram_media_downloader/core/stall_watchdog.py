@@ -0,0 +1,129 @@
+"""Detection of downloads that stop making progress."""
+
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Optional, TypeVar
+
+from ..utils.logging import get_logger
+
+# Seconds without progress after which a download is cancelled
+DEFAULT_STALL_TIMEOUT = 120.0
+
+ProgressCallback = Callable[[int, int], Any]
+T = TypeVar("T")
+
+
+class DownloadStalledError(TimeoutError):
+    """Raised when a download made no progress within the stall timeout."""
+
+    def __init__(self, stalled_for: float) -> None:
+        """
+        Initialize error.
+
+        Args:
+            stalled_for: Seconds the download went without progress
+        """
+        super().__init__(f"No download progress for {stalled_for:.0f}s")
+        self.stalled_for = stalled_for
+
+
+@dataclass(slots=True)
+class _Watched:
+    """Progress of a single watched download."""
+
+    received: int
+    last_progress: float
+
+
+class StallWatchdog:
+    """Cancels downloads that stop receiving bytes.
+
+    Each download runs in its own task while the watchdog waits on it, and
+    the bytes received are tracked through the download's progress callback.
+    A download that receives nothing for ``timeout`` seconds, including
+    before its first chunk, is cancelled and ``DownloadStalledError`` is
+    raised instead. The error is a ``TimeoutError``, so the download is
+    retried like any other transient failure.
+    """
+
+    def __init__(
+        self, timeout: float, clock: Callable[[], float] = time.monotonic
+    ) -> None:
+        """
+        Initialize stall watchdog.
+
+        Args:
+            timeout: Seconds without progress after which a download is
+                cancelled
+            clock: Monotonic clock in seconds
+        """
+        self.timeout = timeout
+        self.clock = clock
+        self.stalls = 0
+        self.logger = get_logger(self.__class__.__name__)
+
+        self._in_flight: Dict[int, _Watched] = {}
+        self._next_id = 0
+
+    @property
+    def in_flight(self) -> int:
+        """Get the number of downloads being watched."""
+        return len(self._in_flight)
+
+    async def run(
+        self,
+        download: Callable[[ProgressCallback], Awaitable[T]],
+        progress_callback: Optional[ProgressCallback] = None,
+    ) -> T:
+        """
+        Run a download, cancelling it if it stalls.
+
+        Args:
+            download: Coroutine function that starts the download with the
+                progress callback it should report to
+            progress_callback: Callback that progress is passed on to
+
+        Returns:
+            Result of the download
+
+        Raises:
+            DownloadStalledError: If the download made no progress for
+                ``timeout`` seconds
+        """
+        transfer_id = self._next_id
+        self._next_id += 1
+        watched = self._in_flight[transfer_id] = _Watched(0, self.clock())
+
+        def on_progress(received: int, total: int) -> Any:
+            if received > watched.received:
+                watched.received = received
+                watched.last_progress = self.clock()
+            if progress_callback is not None:
+                return progress_callback(received, total)
+            return None
+
+        task = asyncio.ensure_future(download(on_progress))
+        try:
+            while True:
+                remaining = watched.last_progress + self.timeout - self.clock()
+                if remaining <= 0:
+                    break
+                done, _ = await asyncio.wait({task}, timeout=remaining)
+                if done:
+                    return task.result()
+
+            stalled_for = self.clock() - watched.last_progress
+            self.stalls += 1
+            self.logger.warning(
+                f"Cancelling download stalled at {watched.received} bytes "
+                f"for {stalled_for:.0f}s"
+            )
+            raise DownloadStalledError(stalled_for)
+        finally:
+            del self._in_flight[transfer_id]
+            if not task.done():
+                task.cancel()
+                await asyncio.wait({task})
+                if not task.cancelled():
+                    task.exception()  # retrieved, so it is not logged as unhandled
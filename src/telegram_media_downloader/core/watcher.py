@@ -0,0 +1,403 @@
+"""Real-time watch mode driven by Telegram update events."""
+
+import asyncio
+import json
+import os
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set, Tuple, Union
+
+from telethon import events
+from telethon.tl.types import PeerChannel
+from telethon.utils import get_peer_id
+
+from ..models.channel_stats import ChannelStats
+from ..models.download_session import DownloadSession
+from ..models.error_log import ErrorLog
+from ..utils.logging import get_logger
+from .downloader import TelegramMediaDownloader
+from .retry import PERMANENT, classify_error
+
+DEFAULT_STATE_FILENAME = "watch_state.json"
+
+
+@dataclass
+class _WatchedChannel:
+    """Watch state of a single channel."""
+
+    dialog: Any
+    name: str
+    stats: ChannelStats
+    last_seen: int = 0  # highest message id queued or skipped
+    acknowledged: int = 0
+    seen: Set[int] = field(default_factory=set)  # queued or skipped since start
+    in_flight: Set[int] = field(default_factory=set)  # queued or failed
+    attempts: Dict[int, int] = field(default_factory=dict)  # failures per id
+
+    @property
+    def checkpoint(self) -> int:
+        """Highest message id below which every message has been handled."""
+        if self.in_flight:
+            return min(self.in_flight) - 1
+        return self.last_seen
+
+    def prune(self) -> None:
+        """Forget handled ids at or below the checkpoint."""
+        checkpoint = self.checkpoint
+        self.seen = {message_id for message_id in self.seen if message_id > checkpoint}
+
+
+class ChannelWatcher:
+    """Downloads media from new channel messages as they arrive.
+
+    New messages are received as ``NewMessage`` update events and handed to a
+    pool of download workers. The highest message id handled per channel is
+    checkpointed to a state file; on start-up, after every reconnect and
+    periodically, messages newer than the checkpoint are fetched from history
+    so updates missed while offline are still downloaded. Live updates that
+    arrive during a catch-up are held until it finishes, so they cannot move
+    the checkpoint past the backlog. Failed downloads hold the checkpoint
+    back and are downloaded again by the next catch-up, up to the retries of
+    the downloader's ``retry_policy``; permanent errors are not retried.
+    Messages the media filter deferred (see
+    ``TelegramMediaDownloader.is_deferred``) hold the checkpoint back too.
+    """
+
+    def __init__(
+        self,
+        downloader: TelegramMediaDownloader,
+        channel_names: Optional[List[str]] = None,
+        mark_as_read: bool = True,
+        state_path: Optional[Union[str, Path]] = None,
+        workers: int = 4,
+        catch_up_interval: float = 300.0,
+        reconnect_delay: float = 5.0,
+        max_reconnect_delay: float = 300.0,
+    ) -> None:
+        """
+        Initialize channel watcher.
+
+        Args:
+            downloader: Connected downloader whose components are reused
+            channel_names: Titles of channels to watch (all channels when None)
+            mark_as_read: Whether to mark handled messages as read
+            state_path: Checkpoint file (defaults to watch_state.json in the
+                download directory)
+            workers: Number of concurrent downloads
+            catch_up_interval: Seconds between history catch-ups while connected
+            reconnect_delay: Initial delay before reconnecting
+            max_reconnect_delay: Maximum delay between reconnect attempts
+        """
+        self.downloader = downloader
+        self.channel_names = channel_names
+        self.mark_as_read = mark_as_read
+        self.state_path = Path(
+            state_path or downloader.download_path / DEFAULT_STATE_FILENAME
+        )
+        self.workers = workers
+        self.catch_up_interval = catch_up_interval
+        self.reconnect_delay = reconnect_delay
+        self.max_reconnect_delay = max_reconnect_delay
+        self.logger = get_logger(self.__class__.__name__)
+
+        self._channels: Dict[int, _WatchedChannel] = {}
+        self._queue: "asyncio.Queue[Tuple[_WatchedChannel, Any]]" = asyncio.Queue(
+            maxsize=workers * 100
+        )
+        self._session_errors = ErrorLog()
+        self._catching_up = False
+        self._held: List[Tuple[_WatchedChannel, Any]] = []
+
+    # State
+
+    def _load_state(self) -> Dict[str, int]:
+        """Load per-channel checkpoints."""
+        try:
+            with open(self.state_path, "r", encoding="utf-8") as f:
+                return {str(k): int(v) for k, v in json.load(f).items()}
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            self.logger.warning(f"Ignoring unreadable watch state: {e}")
+            return {}
+
+    def _save_state(self) -> None:
+        """Atomically write per-channel checkpoints."""
+        state = {
+            str(peer_id): channel.checkpoint
+            for peer_id, channel in self._channels.items()
+        }
+        self.state_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.state_path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(state, f)
+        os.replace(tmp_path, self.state_path)
+
+    async def _setup_channels(self) -> None:
+        """Resolve watched channels and their starting checkpoints."""
+        dialogs = await self.downloader.channel_manager.get_all_channels()
+        if self.channel_names is not None:
+            dialogs = [d for d in dialogs if d.title in self.channel_names]
+            missing = set(self.channel_names) - {d.title for d in dialogs}
+            if missing:
+                self.logger.warning(f"Channels not found: {sorted(missing)}")
+
+        state = self._load_state()
+        for dialog in dialogs:
+            peer_id = get_peer_id(PeerChannel(dialog.entity.id))
+            if str(peer_id) in state:
+                last_seen = state[str(peer_id)]
+            else:
+                # New channels are watched from now on; use the one-shot mode
+                # for their existing unread backlog
+                last_seen = await self.downloader.channel_manager.get_latest_message_id(
+                    dialog
+                )
+            self._channels[peer_id] = _WatchedChannel(
+                dialog=dialog,
+                name=dialog.title,
+                stats=ChannelStats(name=dialog.title, start_time=datetime.now()),
+                last_seen=last_seen,
+                acknowledged=last_seen,
+            )
+        self._save_state()
+        self.logger.info(f"Watching {len(self._channels)} channels")
+
+    # Pipeline
+
+    async def _enqueue(self, channel: _WatchedChannel, message: Any) -> None:
+        """Queue a new or failed message for download, ignoring duplicates."""
+        if message.id in channel.seen or message.id <= channel.checkpoint:
+            return
+        channel.seen.add(message.id)
+        channel.last_seen = max(channel.last_seen, message.id)
+
+        if message.id in channel.in_flight:
+            # Failed or deferred before; already counted
+            if self._defer(channel, message):
+                return
+            channel.stats.retry_count += 1
+            await self._queue.put((channel, message))
+            return
+
+        channel.stats.unread_count += 1
+        if not self.downloader.media_filter.should_download(message):
+            if not self._defer(channel, message):
+                await self._acknowledge(channel)
+            return
+
+        channel.in_flight.add(message.id)
+        channel.stats.media_count += 1
+        if self.downloader.progress is not None:
+            self.downloader.progress.add_expected(channel.name, 1)
+        await self._queue.put((channel, message))
+
+    def _defer(self, channel: _WatchedChannel, message: Any) -> bool:
+        """
+        Hold back a message the media filter deferred, like a failed download.
+
+        Args:
+            channel: Watched channel
+            message: Message to check
+
+        Returns:
+            True if the message was deferred
+        """
+        if not self.downloader.is_deferred(message):
+            return False
+        channel.in_flight.add(message.id)
+        channel.seen.discard(message.id)
+        return True
+
+    async def _on_new_message(self, event: Any) -> None:
+        """Handle a NewMessage update."""
+        channel = self._channels.get(event.chat_id)
+        if channel is None:
+            return
+        if self._catching_up:
+            # Queued after the backlog, so it cannot overtake it
+            self._held.append((channel, event.message))
+            return
+        await self._enqueue(channel, event.message)
+
+    async def _worker(self) -> None:
+        """Download queued messages."""
+        while True:
+            channel, message = await self._queue.get()
+            try:
+                await self._download(channel, message)
+            finally:
+                self._queue.task_done()
+
+    async def _download(self, channel: _WatchedChannel, message: Any) -> None:
+        """Download a single message and advance the channel checkpoint.
+
+        A failed message stays in flight, holding the checkpoint back, and is
+        listed again by the next catch-up. Once it failed permanently or ran
+        out of retries, it is given up on so it no longer holds the
+        checkpoint.
+        """
+        stats = channel.stats
+        kind = PERMANENT  # no media info without an error
+        try:
+            media_info = (
+                await self.downloader.media_downloader.download_media_from_message(
+                    message, channel.name
+                )
+            )
+        except Exception as e:
+            error_msg = f"Error downloading message {message.id}: {e}"
+            self.logger.error(error_msg)
+            stats.add_error(error_msg, type(e).__name__)
+            kind = classify_error(e)
+            media_info = None
+        else:
+            if not media_info:
+                stats.add_error(
+                    f"Failed to download message {message.id}", "DownloadFailed"
+                )
+
+        if media_info:
+            stats.downloaded_count += 1
+            stats.bytes_downloaded += media_info.file_size or 0
+        else:
+            attempts = channel.attempts.get(message.id, 0) + 1
+            retries = self.downloader.retry_policy.max_attempts
+            if kind != PERMANENT and attempts <= retries:
+                channel.attempts[message.id] = attempts
+                channel.seen.discard(message.id)
+                return
+            self.logger.warning(
+                f"Giving up on message {message.id} in {channel.name} "
+                f"after {attempts} attempts ({kind})"
+            )
+
+        channel.attempts.pop(message.id, None)
+        channel.in_flight.discard(message.id)
+        await self._acknowledge(channel)
+        self._save_state()
+
+    async def _acknowledge(self, channel: _WatchedChannel) -> None:
+        """Mark messages up to the checkpoint as read."""
+        checkpoint = channel.checkpoint
+        if self.mark_as_read and checkpoint > channel.acknowledged:
+            channel.acknowledged = checkpoint
+            await self.downloader.channel_manager.mark_read_up_to(
+                channel.dialog, checkpoint
+            )
+
+    async def catch_up(self) -> None:
+        """Queue messages newer than each channel's checkpoint from history.
+
+        Failed messages are listed again, as they hold the checkpoint back.
+        Live updates received meanwhile are queued once every channel was
+        listed.
+        """
+        self._catching_up = True
+        try:
+            for channel in list(self._channels.values()):
+                channel.prune()
+                try:
+                    async for (
+                        message
+                    ) in self.downloader.channel_manager.iter_messages_after(
+                        channel.dialog, channel.checkpoint
+                    ):
+                        await self._enqueue(channel, message)
+                except Exception as e:
+                    error_msg = f"Catch-up failed for {channel.name}: {e}"
+                    self.logger.error(error_msg)
+                    self._session_errors.add(error_msg, type(e).__name__)
+        finally:
+            self._catching_up = False
+            held, self._held = self._held, []
+            for channel, message in held:
+                await self._enqueue(channel, message)
+
+    # Lifecycle
+
+    async def _reconnect(self, stop: asyncio.Event) -> None:
+        """Reconnect with exponential backoff until connected or stopped."""
+        delay = self.reconnect_delay
+        while not stop.is_set():
+            self.logger.warning(f"Connection lost, reconnecting in {delay:.0f}s")
+            try:
+                await asyncio.wait_for(stop.wait(), timeout=delay)
+                return
+            except asyncio.TimeoutError:
+                pass
+            try:
+                await self.downloader.connection.reconnect()
+                return
+            except RuntimeError:
+                delay = min(delay * 2, self.max_reconnect_delay)
+
+    async def run(self, stop: Optional[asyncio.Event] = None) -> DownloadSession:
+        """
+        Watch channels until ``stop`` is set.
+
+        Args:
+            stop: Event that ends the watch (runs until cancelled when None)
+
+        Returns:
+            DownloadSession covering everything handled while watching
+        """
+        stop = stop or asyncio.Event()
+        start_time = datetime.now()
+
+        with self.downloader.tracer.span("watch_setup"):
+            await self._setup_channels()
+
+        client = self.downloader.connection.get_client()
+        entities = [channel.dialog.entity for channel in self._channels.values()]
+        event_filter = events.NewMessage(chats=entities)
+        client.add_event_handler(self._on_new_message, event_filter)
+        workers = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+        stop_task = asyncio.create_task(stop.wait())
+
+        try:
+            while not stop.is_set():
+                await self.catch_up()
+
+                client = self.downloader.connection.get_client()
+                disconnected = client.disconnected
+                await asyncio.wait(
+                    {disconnected, stop_task},
+                    timeout=self.catch_up_interval,
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+                if disconnected.done() and not stop.is_set():
+                    if not disconnected.cancelled() and disconnected.exception():
+                        self.logger.warning(f"Disconnected: {disconnected.exception()}")
+                    await self._reconnect(stop)
+        finally:
+            client.remove_event_handler(self._on_new_message, event_filter)
+            stop_task.cancel()
+
+            # Let queued downloads finish before stopping the workers
+            if not self._queue.empty() or any(
+                channel.in_flight for channel in self._channels.values()
+            ):
+                self.logger.info("Finishing queued downloads")
+            await self._queue.join()
+            for worker in workers:
+                worker.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+            self._save_state()
+
+        end_time = datetime.now()
+        channel_stats = [channel.stats for channel in self._channels.values()]
+        for stats in channel_stats:
+            stats.end_time = end_time
+
+        return DownloadSession(
+            total_channels=len(channel_stats),
+            total_unread=sum(s.unread_count for s in channel_stats),
+            total_media=sum(s.media_count for s in channel_stats),
+            total_downloaded=sum(s.downloaded_count for s in channel_stats),
+            channel_stats=channel_stats,
+            start_time=start_time,
+            end_time=end_time,
+            errors=self._session_errors,
+        )
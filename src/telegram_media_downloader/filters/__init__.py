@@ -2,6 +2,7 @@
 
 from .default_filter import DefaultMediaFilter
 from .image_filter import ImageOnlyFilter
+from .size_filter import SizeFilter
 from .video_filter import VideoOnlyFilter
 
-__all__ = ["DefaultMediaFilter", "VideoOnlyFilter", "ImageOnlyFilter"]
+__all__ = ["DefaultMediaFilter", "VideoOnlyFilter", "ImageOnlyFilter", "SizeFilter"]
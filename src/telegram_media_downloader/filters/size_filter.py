@@ -0,0 +1,136 @@
+"""Size-aware media filter implementation."""
+
+from typing import Dict, Optional, Set, Tuple
+
+from ..protocols.media_filter import MediaFilter
+from ..protocols.telegram_message import TelegramMessage
+from ..utils.media import (
+    PhotoSizePolicy,
+    get_media_duration,
+    get_media_resolution,
+    get_media_size,
+)
+from .default_filter import DefaultMediaFilter
+
+
+class SizeFilter:
+    """Filter that limits media by size, duration and resolution.
+
+    All checks use message metadata (``document.size``, photo sizes and
+    ``DocumentAttributeVideo``), so rejected media is never transferred.
+    Media whose metadata lacks a value passes the corresponding check.
+
+    The per-channel byte budget is consumed by accepted messages in the
+    order they are checked, so a new filter instance should be used for each
+    run. Messages rejected only because the budget ran out are deferred
+    rather than unwanted (see ``is_deferred``), so they can be left for a
+    later run.
+    """
+
+    def __init__(
+        self,
+        media_filter: Optional[MediaFilter] = None,
+        min_bytes: Optional[int] = None,
+        max_bytes: Optional[int] = None,
+        max_duration: Optional[float] = None,
+        max_resolution: Optional[int] = None,
+        channel_budget_bytes: Optional[int] = None,
+        photo_size_policy: Optional[PhotoSizePolicy] = None,
+    ) -> None:
+        """
+        Initialize size filter.
+
+        Args:
+            media_filter: Filter applied first (defaults to DefaultMediaFilter)
+            min_bytes: Minimum media size in bytes
+            max_bytes: Maximum media size in bytes
+            max_duration: Maximum video duration in seconds
+            max_resolution: Maximum resolution as the shorter side in pixels
+                (e.g. 1080 accepts 1920x1080 and 1080x1920)
+            channel_budget_bytes: Maximum bytes accepted per channel
+            photo_size_policy: Photo size policy of the download, so photos
+                are measured by the variant that is actually fetched
+        """
+        self.media_filter = media_filter or DefaultMediaFilter()
+        self.min_bytes = min_bytes
+        self.max_bytes = max_bytes
+        self.max_duration = max_duration
+        self.max_resolution = max_resolution
+        self.channel_budget_bytes = channel_budget_bytes
+        self.photo_size_policy = photo_size_policy
+
+        self._spent: Dict[int, int] = {}
+        self._accepted: Set[Tuple[int, int]] = set()
+        self._deferred: Set[Tuple[int, int]] = set()
+
+    def should_download(self, message: TelegramMessage) -> bool:
+        """
+        Check if message media passes the inner filter and every limit.
+
+        Args:
+            message: Telegram message object
+
+        Returns:
+            True if the media should be downloaded
+        """
+        if not self.media_filter.should_download(message):
+            return False
+
+        size = get_media_size(message, self.photo_size_policy)
+        if self.min_bytes is not None and size < self.min_bytes:
+            return False
+        if self.max_bytes is not None and size > self.max_bytes:
+            return False
+
+        if self.max_duration is not None:
+            duration = get_media_duration(message)
+            if duration is not None and duration > self.max_duration:
+                return False
+
+        if self.max_resolution is not None:
+            resolution = get_media_resolution(message)
+            if resolution is not None and min(resolution) > self.max_resolution:
+                return False
+
+        if self.channel_budget_bytes is not None:
+            return self._charge_budget(message, size)
+        return True
+
+    def is_deferred(self, message: TelegramMessage) -> bool:
+        """
+        Check if a message was rejected only by its channel's budget.
+
+        Args:
+            message: Telegram message object checked before
+
+        Returns:
+            True if the media passed every other check
+        """
+        return _message_key(message) in self._deferred
+
+    def _charge_budget(self, message: TelegramMessage, size: int) -> bool:
+        """Accept a message if it fits in the remaining budget of its channel."""
+        key = _message_key(message)
+        channel_id = key[0]
+        # Messages are checked again right before their download
+        if key in self._accepted:
+            return True
+
+        assert self.channel_budget_bytes is not None
+        spent = self._spent.get(channel_id, 0)
+        if spent + size > self.channel_budget_bytes:
+            self._deferred.add(key)
+            return False
+        self._spent[channel_id] = spent + size
+        self._accepted.add(key)
+        return True
+
+    def get_spent_bytes(self, channel_id: int) -> int:
+        """Get the bytes of a channel's budget used so far."""
+        return self._spent.get(channel_id, 0)
+
+
+def _message_key(message: TelegramMessage) -> Tuple[int, int]:
+    """Get the (channel id, message id) a message is tracked by."""
+    channel_id = getattr(getattr(message, "peer_id", None), "channel_id", 0)
+    return channel_id, message.id
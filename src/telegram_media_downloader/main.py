@@ -3,23 +3,67 @@
 import argparse
 import asyncio
 import os
+import signal
+import sqlite3
 import sys
+from datetime import datetime, timezone
 from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
 
 from .config.settings import TelegramConfig
+from .core.accounts import MultiAccountDownloader
+from .core.auto_tuner import DEFAULT_TUNING_FILENAME, AutoTuner
+from .core.backfill import ChannelBackfill
 from .core.downloader import TelegramMediaDownloader
-from .utils.helpers import create_download_summary_file, print_session_summary
+from .core.media_downloader import PREVIEW_DIRNAME
+from .core.part_downloader import HedgePolicy
+from .core.queue_worker import (
+    DEFAULT_CHUNK_SIZE,
+    DEFAULT_LEASE_SECONDS,
+    QueueWorker,
+    enqueue_unread_ranges,
+)
+from .core.read_acks import DEFAULT_ACK_EVERY, DEFAULT_ACK_INTERVAL
+from .core.retry import RetryPolicy
+from .core.sharding import ShardedDownloader
+from .core.stall_watchdog import DEFAULT_STALL_TIMEOUT
+from .core.watcher import ChannelWatcher
+from .filters.size_filter import SizeFilter
+from .models.download_session import DownloadSession
+from .storage.checkpoints import CheckpointStore
+from .storage.history import (
+    DEFAULT_HISTORY_FILENAME,
+    SessionHistory,
+    render_channel_throughput,
+    render_daily_throughput,
+)
+from .storage.work_queue import DEFAULT_WORK_QUEUE_FILENAME, SQLiteWorkQueue
+from .utils.helpers import (
+    create_download_summary_file,
+    parse_file_size,
+    print_download_plan,
+    print_session_summary,
+)
 from .utils.logging import setup_colored_logging
+from .utils.media import PhotoSizePolicy
+from .utils.profiling import (
+    DEFAULT_SLOW_CALLBACK_THRESHOLD,
+    PROFILE_MODES,
+    SlowCallbackDetector,
+    default_profile_output,
+    profile_session,
+)
+from .utils.progress import PROGRESS_MODES, create_progress_tracker
+from .utils.tracing import (
+    JsonFileSpanExporter,
+    Tracer,
+    load_spans,
+    render_trace_summary,
+)
 
 
-async def main() -> None:
-    """Main application entry point."""
-    # Setup logging
-    setup_colored_logging("INFO")
-
-    print("🚀 Telegram Media Downloader")
-    print("=" * 50)
-
+def build_parser() -> argparse.ArgumentParser:
+    """Build the command line argument parser."""
     parser = argparse.ArgumentParser(description="Telegram Media Downloader")
     parser.add_argument(
         "--download-path",
@@ -30,15 +74,592 @@ async def main() -> None:
             "Default: telegram_downloads or $TELEGRAM_DOWNLOAD_PATH."
         ),
     )
+    parser.add_argument(
+        "--config",
+        type=str,
+        default=None,
+        help=(
+            "YAML file with the account settings. Default: config.yaml in the "
+            "working directory if present, otherwise environment variables."
+        ),
+    )
+    parser.add_argument(
+        "--trace-file",
+        type=str,
+        default=os.getenv("TELEGRAM_TRACE_FILE"),
+        help="Append OpenTelemetry JSON spans for the session to this file.",
+    )
+    parser.add_argument(
+        "--trace-sample-rate",
+        type=float,
+        default=float(os.getenv("TELEGRAM_TRACE_SAMPLE_RATE", "1.0")),
+        help="Fraction of per-message spans to record (0.0-1.0). Default: 1.0.",
+    )
+    parser.add_argument(
+        "--history-file",
+        type=str,
+        default=os.getenv("TELEGRAM_HISTORY_FILE"),
+        help=(
+            "SQLite file each session is appended to. "
+            f"Default: {DEFAULT_HISTORY_FILENAME} in the download directory."
+        ),
+    )
+    parser.add_argument(
+        "--progress",
+        choices=PROGRESS_MODES,
+        default=os.getenv(
+            "TELEGRAM_PROGRESS", "tty" if sys.stderr.isatty() else "none"
+        ),
+        help=(
+            "Live progress output: tty (in-place lines on stderr), json (one "
+            "JSON line per update on stdout) or none. Default: tty on a terminal."
+        ),
+    )
+    parser.add_argument(
+        "--progress-interval",
+        type=float,
+        default=0.5,
+        help="Seconds between progress updates. Default: 0.5.",
+    )
+    parser.add_argument(
+        "--min-size",
+        type=parse_file_size,
+        default=None,
+        help="Skip media smaller than this (e.g. 50KB).",
+    )
+    parser.add_argument(
+        "--max-size",
+        type=parse_file_size,
+        default=None,
+        help="Skip media larger than this (e.g. 500MB).",
+    )
+    parser.add_argument(
+        "--max-duration",
+        type=float,
+        default=None,
+        help="Skip videos longer than this many seconds.",
+    )
+    parser.add_argument(
+        "--max-resolution",
+        type=int,
+        default=None,
+        help="Skip media whose shorter side exceeds this many pixels (e.g. 1080).",
+    )
+    parser.add_argument(
+        "--channel-budget",
+        type=parse_file_size,
+        default=None,
+        help="Download at most this much per channel in a run (e.g. 2GB).",
+    )
+    parser.add_argument(
+        "--photo-size",
+        type=PhotoSizePolicy.parse,
+        default=PhotoSizePolicy(),
+        help=(
+            "Photo size variant to download: largest, max-dimension=PIXELS, "
+            "max-bytes=SIZE or type=LETTER (e.g. type=x). Default: largest."
+        ),
+    )
+    parser.add_argument(
+        "--preview",
+        action="store_true",
+        help=(
+            "Save a small JPEG preview of each media item instead of the "
+            "original; fetch originals later with the originals command."
+        ),
+    )
+    parser.add_argument(
+        "--ack-every",
+        type=int,
+        default=DEFAULT_ACK_EVERY,
+        help=(
+            "Mark processed messages as read after every this many messages. "
+            f"Default: {DEFAULT_ACK_EVERY}."
+        ),
+    )
+    parser.add_argument(
+        "--ack-interval",
+        type=float,
+        default=DEFAULT_ACK_INTERVAL,
+        help=(
+            "Mark processed messages as read at least this often, in seconds. "
+            f"Default: {DEFAULT_ACK_INTERVAL:.0f}."
+        ),
+    )
+    parser.add_argument(
+        "--max-retries",
+        type=int,
+        default=RetryPolicy.max_attempts,
+        help=(
+            "Retry downloads that fail with network errors, flood waits or "
+            "expired file references up to this many times, with exponential "
+            f"backoff. Default: {RetryPolicy.max_attempts}."
+        ),
+    )
+    parser.add_argument(
+        "--stall-timeout",
+        type=float,
+        default=DEFAULT_STALL_TIMEOUT,
+        metavar="SECONDS",
+        help=(
+            "Cancel and retry downloads that receive no data for this many "
+            f"seconds (0 to disable). Default: {DEFAULT_STALL_TIMEOUT:.0f}."
+        ),
+    )
+    parser.add_argument(
+        "--parallel-parts",
+        type=int,
+        default=0,
+        metavar="N",
+        help=(
+            "Download files in 512 KB parts with up to N part requests in "
+            "flight. Default: 0 (whole files through download_media)."
+        ),
+    )
+    parser.add_argument(
+        "--hedge-budget",
+        type=float,
+        default=HedgePolicy.budget,
+        metavar="FRACTION",
+        help=(
+            "With --parallel-parts, resend part requests slower than the recent "
+            "p95 on a second connection, for at most this share of part "
+            f"requests (0 to disable). Default: {HedgePolicy.budget}."
+        ),
+    )
+    parser.add_argument(
+        "--auto-tune",
+        action="store_true",
+        help=(
+            "Download files in parts and tune the part size and parts in flight "
+            "per data center from throughput, round trips and flood waits, up "
+            "to max_part_size and max_parts_in_flight in config.yaml. Tuned "
+            f"values are kept in {DEFAULT_TUNING_FILENAME} in the download "
+            "directory."
+        ),
+    )
+    parser.add_argument(
+        "--verify",
+        action="store_true",
+        help=(
+            "Hash original media with SHA-256 while it is written, record the "
+            "hash in its metadata and retry downloads that do not match the "
+            "hashes Telegram reports for the file."
+        ),
+    )
+    parser.add_argument(
+        "--processes",
+        type=int,
+        default=int(os.getenv("TELEGRAM_PROCESSES", "1")),
+        help=(
+            "Split channels across this many worker processes, each with its "
+            "own session copy and connection. Default: 1."
+        ),
+    )
+
+    parser.add_argument(
+        "--profile",
+        choices=PROFILE_MODES,
+        default=None,
+        help=(
+            "Profile the whole session with cProfile or a sampling profiler. "
+            "Also enables the slow callback detector."
+        ),
+    )
+    parser.add_argument(
+        "--profile-output",
+        type=str,
+        default=None,
+        help=(
+            "Profile output file. Default: profile.prof (cprofile) or "
+            "profile.collapsed (sample) next to download_summary.txt."
+        ),
+    )
+    parser.add_argument(
+        "--slow-callback-threshold",
+        type=float,
+        default=None,
+        help=(
+            "Log event loop callbacks blocking longer than this many seconds. "
+            f"Default with --profile: {DEFAULT_SLOW_CALLBACK_THRESHOLD}."
+        ),
+    )
+
+    subparsers = parser.add_subparsers(dest="command")
+    trace_parser = subparsers.add_parser(
+        "trace-summary", help="Summarise the critical path of a traced session."
+    )
+    trace_parser.add_argument("trace_file", help="Trace file written by --trace-file")
+    trace_parser.add_argument(
+        "--trace-id", default=None, help="Trace to summarise (default: latest)."
+    )
+
+    history_parser = subparsers.add_parser(
+        "history", help="Query past sessions recorded in the history file."
+    )
+    history_commands = history_parser.add_subparsers(
+        dest="history_command", required=True
+    )
+    throughput_parser = history_commands.add_parser(
+        "throughput", help="MB/s, files and errors per day."
+    )
+    throughput_parser.add_argument("--days", type=int, default=30)
+    slowest_parser = history_commands.add_parser(
+        "slowest", help="Channels with the lowest throughput."
+    )
+    slowest_parser.add_argument("--days", type=int, default=7)
+    slowest_parser.add_argument("--limit", type=int, default=10)
+    sessions_parser = history_commands.add_parser(
+        "sessions", help="List recent sessions."
+    )
+    sessions_parser.add_argument("--limit", type=int, default=20)
+    export_parser = history_commands.add_parser(
+        "export", help="Write a session as JSON to stdout."
+    )
+    export_parser.add_argument(
+        "session_id", type=int, nargs="?", help="Session id (default: latest)."
+    )
+
+    watch_parser = subparsers.add_parser(
+        "watch", help="Keep running and download media from new messages."
+    )
+    watch_parser.add_argument(
+        "--channel",
+        action="append",
+        dest="channels",
+        help="Channel title to watch (repeatable, default: all channels).",
+    )
+    watch_parser.add_argument(
+        "--workers", type=int, default=4, help="Concurrent downloads. Default: 4."
+    )
+    watch_parser.add_argument(
+        "--catch-up-interval",
+        type=float,
+        default=300.0,
+        help="Seconds between history checks for missed updates. Default: 300.",
+    )
+    watch_parser.add_argument(
+        "--state-file",
+        default=None,
+        help="Checkpoint file. Default: watch_state.json in the download directory.",
+    )
+
+    backfill_parser = subparsers.add_parser(
+        "backfill", help="Download the media of a channel's history."
+    )
+    backfill_parser.add_argument("channel", help="Channel title")
+    backfill_parser.add_argument(
+        "--from-date",
+        type=parse_date,
+        default=None,
+        help="Include messages sent on or after this date (YYYY-MM-DD, UTC).",
+    )
+    backfill_parser.add_argument(
+        "--to-date",
+        type=parse_date,
+        default=None,
+        help="Include messages sent before this date (YYYY-MM-DD, UTC).",
+    )
+    backfill_parser.add_argument("--min-id", type=int, default=None)
+    backfill_parser.add_argument("--max-id", type=int, default=None)
+    backfill_parser.add_argument(
+        "--partitions",
+        type=int,
+        default=8,
+        help="Number of id range partitions. Default: 8.",
+    )
+    backfill_parser.add_argument(
+        "--workers",
+        type=int,
+        default=4,
+        help="Partitions paged concurrently. Default: 4.",
+    )
+    backfill_parser.add_argument(
+        "--checkpoint-file",
+        default=None,
+        help=(
+            "Checkpoint file. "
+            "Default: backfill_checkpoints.json in the download directory."
+        ),
+    )
+
+    plan_parser = subparsers.add_parser(
+        "plan", help="Estimate size and duration of a download without downloading."
+    )
+    plan_parser.add_argument(
+        "--channel",
+        action="append",
+        dest="channels",
+        help="Channel title to plan for (repeatable, default: all channels).",
+    )
+
+    originals_parser = subparsers.add_parser(
+        "originals", help="Download the original media of saved previews."
+    )
+    originals_parser.add_argument(
+        "paths",
+        nargs="+",
+        type=Path,
+        help="Preview files, or directories to search for previews.",
+    )
+
+    queue_parser = subparsers.add_parser(
+        "queue", help="Share a download job between hosts through a work queue."
+    )
+    queue_parser.add_argument(
+        "--queue-file",
+        default=os.getenv("TELEGRAM_QUEUE_FILE"),
+        help=(
+            "SQLite work queue on storage shared by every host. "
+            f"Default: {DEFAULT_WORK_QUEUE_FILENAME} in the download directory."
+        ),
+    )
+    queue_commands = queue_parser.add_subparsers(dest="queue_command", required=True)
+    enqueue_parser = queue_commands.add_parser(
+        "enqueue", help="Enqueue the unread messages of every channel."
+    )
+    enqueue_parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=DEFAULT_CHUNK_SIZE,
+        help=f"Message ids per task. Default: {DEFAULT_CHUNK_SIZE}.",
+    )
+    work_parser = queue_commands.add_parser(
+        "work", help="Download queued message ranges until none are left."
+    )
+    work_parser.add_argument(
+        "--lease-seconds",
+        type=float,
+        default=DEFAULT_LEASE_SECONDS,
+        help=(
+            "Lease duration; tasks of a worker that stops renewing are "
+            f"handed out again. Default: {DEFAULT_LEASE_SECONDS:.0f}."
+        ),
+    )
+    work_parser.add_argument(
+        "--worker-id", default=None, help="Worker name. Default: host:pid."
+    )
+    queue_commands.add_parser("status", help="Show the number of tasks per state.")
+
+    return parser
+
+
+def parse_date(value: str) -> datetime:
+    """Parse an ISO date or datetime, assuming UTC when no zone is given."""
+    date = datetime.fromisoformat(value)
+    if date.tzinfo is None:
+        date = date.replace(tzinfo=timezone.utc)
+    return date
+
+
+async def run_watch(
+    downloader: TelegramMediaDownloader, args: argparse.Namespace
+) -> DownloadSession:
+    """Run watch mode until interrupted."""
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    signals: Tuple[signal.Signals, ...] = (signal.SIGINT, signal.SIGTERM)
+    try:
+        for sig in signals:
+            loop.add_signal_handler(sig, stop.set)
+    except (NotImplementedError, RuntimeError):
+        signals = ()  # Windows: Ctrl+C interrupts the loop instead
+
+    watcher = ChannelWatcher(
+        downloader,
+        channel_names=args.channels,
+        state_path=args.state_file,
+        workers=args.workers,
+        catch_up_interval=args.catch_up_interval,
+    )
+    print("\n👀 Watching channels for new media (Ctrl+C to stop)...")
+    try:
+        return await watcher.run(stop)
+    finally:
+        for sig in signals:
+            loop.remove_signal_handler(sig)
+
+
+def history_path(args: argparse.Namespace) -> Path:
+    """Get the session history file for the parsed arguments."""
+    if args.history_file:
+        return Path(args.history_file)
+    return Path(args.download_path) / DEFAULT_HISTORY_FILENAME
+
+
+def download_options(args: argparse.Namespace) -> Dict[str, Any]:
+    """Get the download options shared by every way of running a session."""
+    return {
+        "preview": args.preview,
+        "ack_every": args.ack_every,
+        "ack_interval": args.ack_interval,
+        "retry_policy": RetryPolicy(max_attempts=args.max_retries),
+        "stall_timeout": args.stall_timeout or None,
+        "parts_in_flight": args.parallel_parts,
+        "hedge_policy": (
+            HedgePolicy(budget=args.hedge_budget) if args.hedge_budget else None
+        ),
+        "verify_integrity": args.verify,
+    }
+
+
+def create_auto_tuner(
+    args: argparse.Namespace, config: TelegramConfig
+) -> Optional[AutoTuner]:
+    """Create an auto-tuner that keeps its limits in the download directory."""
+    if not args.auto_tune:
+        return None
+    store = CheckpointStore(Path(args.download_path) / DEFAULT_TUNING_FILENAME)
+    return AutoTuner(config.max_part_size, config.max_parts_in_flight, store)
+
+
+def create_media_filter(args: argparse.Namespace) -> Optional[SizeFilter]:
+    """Create a size filter if any size limit was given."""
+    limits = {
+        "min_bytes": args.min_size,
+        "max_bytes": args.max_size,
+        "max_duration": args.max_duration,
+        "max_resolution": args.max_resolution,
+        "channel_budget_bytes": args.channel_budget,
+    }
+    if all(value is None for value in limits.values()):
+        return None
+    return SizeFilter(**limits, photo_size_policy=args.photo_size)
+
+
+def collect_preview_files(paths: List[Path]) -> List[Path]:
+    """Expand directories to the preview files saved below them."""
+    files: List[Path] = []
+    for path in paths:
+        if path.is_dir():
+            files.extend(
+                preview
+                for preview in sorted(path.rglob("*.jpg"))
+                if preview.parent.name == PREVIEW_DIRNAME
+            )
+        else:
+            files.append(path)
+    return files
+
+
+def queue_path(args: argparse.Namespace) -> Path:
+    """Get the work queue file for the parsed arguments."""
+    if args.queue_file:
+        return Path(args.queue_file)
+    return Path(args.download_path) / DEFAULT_WORK_QUEUE_FILENAME
+
+
+def run_history_command(args: argparse.Namespace) -> None:
+    """Run a ``history`` subcommand."""
+    path = history_path(args)
+    if not path.exists():
+        print(f"❌ No session history at {path}")
+        sys.exit(1)
+
+    with SessionHistory(path) as history:
+        if args.history_command == "throughput":
+            print(render_daily_throughput(history.throughput_by_day(args.days)))
+        elif args.history_command == "slowest":
+            print(
+                render_channel_throughput(
+                    history.slowest_channels(args.days, args.limit)
+                )
+            )
+        elif args.history_command == "sessions":
+            for row in history.list_sessions(args.limit):
+                print(
+                    f"{row['id']:>5}  {row['start_time'][:19]}  "
+                    f"{row['total_downloaded']:>6} files  "
+                    f"{row['total_errors']:>5} errors"
+                )
+        else:
+            session_id: Optional[int] = args.session_id or history.latest_session_id()
+            if session_id is None:
+                print("❌ No sessions recorded")
+                sys.exit(1)
+            try:
+                history.export_session(session_id, sys.stdout)
+            except KeyError as e:
+                print(f"❌ {e.args[0]}")
+                sys.exit(1)
+            print()
+
+
+def report_session(session: DownloadSession, args: argparse.Namespace) -> None:
+    """Print, save and record the summary of a finished session."""
+    # Print summary
+    print_session_summary(session)
+
+    # Save summary to file
+    summary_file = Path(args.download_path) / "download_summary.txt"
+    create_download_summary_file(session, str(summary_file))
+    print("\n📋 Session summary saved to:")
+    print(summary_file)
+
+    # Append to session history
+    try:
+        with SessionHistory(history_path(args)) as history:
+            session_id = history.record(session)
+        print(f"🗂️  Session #{session_id} recorded in {history.path}")
+    except sqlite3.Error as e:
+        print(f"⚠️  Could not record session history: {e}")
+
+    # Final status
+    if session.total_downloaded > 0:
+        print(f"\n✅ Successfully downloaded {session.total_downloaded} files!")
+    else:
+        print("\n ℹ️  No new media files found to download.")
+
+
+async def main() -> None:
+    """Main application entry point."""
+    # Setup logging
+    setup_colored_logging("INFO")
+
+    parser = build_parser()
     args, _ = parser.parse_known_args()
+    if args.config and not Path(args.config).is_file():
+        parser.error(f"config file not found: {args.config}")
+    if args.command == "watch" and args.channel_budget is not None:
+        # The budget would be used up once and never reset while watching
+        parser.error("--channel-budget applies to a single run, not to watch")
+
+    if args.command == "trace-summary":
+        try:
+            spans = load_spans(args.trace_file)
+        except (OSError, ValueError) as e:
+            print(f"❌ Could not read trace file: {e}")
+            sys.exit(1)
+        print(render_trace_summary(spans, args.trace_id))
+        return
+    if args.command == "history":
+        run_history_command(args)
+        return
+    if args.command == "queue" and args.queue_command == "status":
+        with SQLiteWorkQueue(queue_path(args)) as queue:
+            for state, count in queue.counts().items():
+                print(f"{state:<8} {count:>8}")
+        return
+
+    print("🚀 Telegram Media Downloader")
+    print("=" * 50)
+
     download_path = args.download_path
+    tracer = Tracer(
+        JsonFileSpanExporter(args.trace_file) if args.trace_file else None,
+        sample_rate=args.trace_sample_rate,
+    )
+    progress = create_progress_tracker(args.progress, args.progress_interval)
 
     try:
-        # Load configuration from environment
-        config = TelegramConfig.from_env()
+        # Load configuration from --config, config.yaml or the environment
+        accounts = TelegramConfig.accounts_from_env(
+            Path(args.config) if args.config else None
+        )
+        config = accounts[0]
 
         # Validate configuration
-        errors = config.validate()
+        errors = [error for account in accounts for error in account.validate()]
         if errors:
             print("❌ Configuration errors:")
             for error in errors:
@@ -57,35 +678,116 @@ async def main() -> None:
             sys.exit(1)
 
         print("📱 Connecting with phone:")
-        print(config.phone_number)
+        for account in accounts:
+            print(account.phone_number)
         print("📁 Downloads will be saved to:")
         print(Path(download_path).absolute())
 
+        media_filter = create_media_filter(args)
+
+        if len(accounts) > 1 and args.command is None:
+            print(f"\n🔍 Scanning channels with {len(accounts)} accounts...")
+            async with MultiAccountDownloader(
+                accounts,
+                download_path,
+                media_filter=media_filter,
+                tracer=tracer,
+                progress=progress,
+                photo_size_policy=args.photo_size,
+                **download_options(args),
+                auto_tuner=create_auto_tuner(args, config),
+            ) as multi_downloader:
+                session = await multi_downloader.download_all_unread_media(
+                    mark_as_read=True
+                )
+            report_session(session, args)
+            return
+
+        if args.processes > 1 and args.command is None:
+            print(f"\n🔍 Scanning channels with {args.processes} processes...")
+            session = await ShardedDownloader(
+                config,
+                download_path,
+                processes=args.processes,
+                media_filter=media_filter,
+                photo_size_policy=args.photo_size,
+                **download_options(args),
+                auto_tune=args.auto_tune,
+            ).download_all_unread_media(mark_as_read=True)
+            report_session(session, args)
+            return
+
         # Initialize and run downloader
         async with TelegramMediaDownloader(
-            config=config, download_path=download_path
+            config=config,
+            download_path=download_path,
+            media_filter=media_filter,
+            tracer=tracer,
+            progress=progress,
+            photo_size_policy=args.photo_size,
+            **download_options(args),
+            auto_tuner=create_auto_tuner(args, config),
         ) as downloader:
 
-            print("\n🔍 Scanning channels for unread media...")
-            session = await downloader.download_all_unread_media(mark_as_read=True)
-
-            # Print summary
-            print_session_summary(session)
+            if args.command == "plan":
+                print("\n🔍 Planning download of unread media...")
+                bytes_per_second = None
+                if history_path(args).exists():
+                    with SessionHistory(history_path(args)) as history:
+                        bytes_per_second = history.average_bytes_per_second()
+                plan = await downloader.plan_unread_media(
+                    args.channels, bytes_per_second
+                )
+                print_download_plan(plan)
+                return
 
-            # Save summary to file
-            summary_file = Path(download_path) / "download_summary.txt"
-            create_download_summary_file(session, str(summary_file))
-            print("\n📋 Session summary saved to:")
-            print(summary_file)
+            if args.command == "queue" and args.queue_command == "enqueue":
+                with SQLiteWorkQueue(queue_path(args)) as queue:
+                    added = await enqueue_unread_ranges(
+                        downloader, queue, args.chunk_size
+                    )
+                print(f"\n📥 Enqueued {added} tasks in {queue.path}")
+                return
 
-            # Final status
-            if session.total_downloaded > 0:
+            if args.command == "watch":
+                session = await run_watch(downloader, args)
+            elif args.command == "originals":
+                preview_files = collect_preview_files(args.paths)
                 print(
-                    f"\n✅ Successfully downloaded "
-                    f"{session.total_downloaded} files!"
+                    f"\n🖼️  Downloading originals of {len(preview_files)} previews..."
                 )
+                session = await downloader.download_originals(preview_files)
+            elif args.command == "queue":
+                print(f"\n📥 Working through {queue_path(args)}...")
+                with SQLiteWorkQueue(queue_path(args)) as queue:
+                    session = await QueueWorker(
+                        downloader,
+                        queue,
+                        worker_id=args.worker_id,
+                        lease_seconds=args.lease_seconds,
+                    ).run()
+            elif args.command == "backfill":
+                print(f"\n📚 Backfilling {args.channel}...")
+                session = await ChannelBackfill(
+                    downloader,
+                    args.channel,
+                    min_id=args.min_id,
+                    max_id=args.max_id,
+                    start_date=args.from_date,
+                    end_date=args.to_date,
+                    partitions=args.partitions,
+                    workers=args.workers,
+                    checkpoint_path=args.checkpoint_file,
+                ).run()
             else:
-                print("\n ℹ️  No new media files found to download.")
+                print("\n🔍 Scanning channels for unread media...")
+                session = await downloader.download_all_unread_media(mark_as_read=True)
+
+            report_session(session, args)
+
+        if args.trace_file:
+            print("\n🧭 Trace written to:")
+            print(args.trace_file)
 
     except KeyboardInterrupt:
         print("\n\n⏹️  Download interrupted by user.")
@@ -96,10 +798,35 @@ async def main() -> None:
         sys.exit(1)
 
 
+async def _main_with_slow_callback_detector(threshold: float) -> None:
+    """Run the application while logging slow event loop callbacks."""
+    detector = SlowCallbackDetector(threshold)
+    detector.start()
+    try:
+        await main()
+    finally:
+        detector.stop()
+
+
 def cli_main() -> None:
     """CLI entry point wrapper."""
+    args, _ = build_parser().parse_known_args()
+    profile_output = None
+    if args.profile:
+        profile_output = args.profile_output or default_profile_output(
+            args.profile, args.download_path
+        )
+
+    threshold = args.slow_callback_threshold
+    if args.profile and threshold is None:
+        threshold = DEFAULT_SLOW_CALLBACK_THRESHOLD
+
     try:
-        asyncio.run(main())
+        with profile_session(args.profile, profile_output):
+            if threshold:
+                asyncio.run(_main_with_slow_callback_detector(threshold))
+            else:
+                asyncio.run(main())
     except KeyboardInterrupt:
         print("\n\n⏹️  Application interrupted.")
         sys.exit(0)
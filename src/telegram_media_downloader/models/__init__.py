@@ -1,7 +1,18 @@
 """Data models module."""
 
 from .channel_stats import ChannelStats
+from .download_plan import ChannelPlan, DownloadPlan
 from .download_session import DownloadSession
+from .error_log import ErrorLog
 from .media_info import MediaInfo
+from .work_task import WorkTask
 
-__all__ = ["ChannelStats", "DownloadSession", "MediaInfo"]
+__all__ = [
+    "ChannelStats",
+    "ChannelPlan",
+    "DownloadPlan",
+    "DownloadSession",
+    "ErrorLog",
+    "MediaInfo",
+    "WorkTask",
+]
@@ -1,10 +1,13 @@
 """Data models for channel statistics."""
 
 from dataclasses import dataclass, field
-from typing import List
+from datetime import datetime
+from typing import Optional
 
+from .error_log import DEFAULT_ERROR_CLASS, ErrorLog
 
-@dataclass
+
+@dataclass(slots=True)
 class ChannelStats:
     """Statistics for a single channel processing session."""
 
@@ -12,7 +15,19 @@ class ChannelStats:
     unread_count: int = 0
     media_count: int = 0
     downloaded_count: int = 0
-    errors: List[str] = field(default_factory=list)
+    errors: ErrorLog = field(default_factory=ErrorLog)
+    bytes_downloaded: int = 0
+    retry_count: int = 0  # download retries made
+    recovered_count: int = 0  # messages downloaded by a retry
+    stalled_count: int = 0  # downloads cancelled for making no progress
+    corrupted_count: int = 0  # downloads that did not match Telegram's hashes
+    skipped_count: int = 0  # messages skipped while the channel's circuit was open
+    start_time: Optional[datetime] = None
+    end_time: Optional[datetime] = None
+
+    def __post_init__(self) -> None:
+        """Accept a plain list of error messages."""
+        self.errors = ErrorLog.coerce(self.errors)
 
     @property
     def success_rate(self) -> float:
@@ -21,19 +36,40 @@ class ChannelStats:
             return 100.0
         return (self.downloaded_count / self.media_count) * 100
 
+    @property
+    def elapsed_seconds(self) -> float:
+        """Get time spent processing the channel in seconds."""
+        if self.start_time is None or self.end_time is None:
+            return 0.0
+        return (self.end_time - self.start_time).total_seconds()
+
+    @property
+    def bytes_per_second(self) -> float:
+        """Calculate download throughput in bytes per second."""
+        elapsed = self.elapsed_seconds
+        if elapsed <= 0:
+            return 0.0
+        return self.bytes_downloaded / elapsed
+
     @property
     def has_errors(self) -> bool:
         """Check if there were any errors during processing."""
-        return len(self.errors) > 0
+        return bool(self.errors)
 
     @property
     def error_count(self) -> int:
         """Get number of errors."""
         return len(self.errors)
 
-    def add_error(self, error: str) -> None:
-        """Add an error message to the stats."""
-        self.errors.append(error)
+    def add_error(self, error: str, error_class: Optional[str] = None) -> None:
+        """
+        Add an error message to the stats.
+
+        Args:
+            error: Error message
+            error_class: Error class used for grouping (e.g. exception name)
+        """
+        self.errors.add(error, error_class or DEFAULT_ERROR_CLASS)
 
     def __str__(self) -> str:
         """Human-readable string representation."""
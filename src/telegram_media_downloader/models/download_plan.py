@@ -0,0 +1,79 @@
+"""Data models for dry-run download plans."""
+
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import timedelta
+from pathlib import Path
+from typing import Dict, List, Optional
+
+
+@dataclass
+class ChannelPlan:
+    """Media a channel would download, computed without downloading it."""
+
+    name: str
+    candidate_count: int = 0
+    media_count: int = 0
+    existing_count: int = 0
+    total_bytes: int = 0
+    mime_counts: Dict[str, int] = field(default_factory=dict)
+
+    def add_media(self, mime_type: Optional[str], size: int) -> None:
+        """Add a file that would be downloaded."""
+        key = mime_type or "unknown"
+        self.media_count += 1
+        self.total_bytes += size
+        self.mime_counts[key] = self.mime_counts.get(key, 0) + 1
+
+
+@dataclass
+class DownloadPlan:
+    """Dry-run estimate of a download session."""
+
+    download_path: Path
+    channels: List[ChannelPlan]
+    free_bytes: Optional[int] = None
+    bytes_per_second: Optional[float] = None
+
+    @property
+    def total_files(self) -> int:
+        """Get the number of files that would be downloaded."""
+        return sum(channel.media_count for channel in self.channels)
+
+    @property
+    def total_bytes(self) -> int:
+        """Get the number of bytes that would be downloaded."""
+        return sum(channel.total_bytes for channel in self.channels)
+
+    @property
+    def mime_counts(self) -> Dict[str, int]:
+        """Get file counts per MIME type across all channels, most common first."""
+        counts: Counter[str] = Counter()
+        for channel in self.channels:
+            counts.update(channel.mime_counts)
+        return dict(counts.most_common())
+
+    @property
+    def estimated_duration(self) -> Optional[timedelta]:
+        """Estimate the download time from historical throughput."""
+        if not self.bytes_per_second:
+            return None
+        return timedelta(seconds=round(self.total_bytes / self.bytes_per_second))
+
+    @property
+    def has_enough_space(self) -> bool:
+        """Check if the download fits in the free space of the download path."""
+        return self.free_bytes is None or self.total_bytes <= self.free_bytes
+
+    def get_warnings(self) -> List[str]:
+        """Get warnings about the plan."""
+        warnings = []
+        if not self.has_enough_space:
+            warnings.append(
+                f"Insufficient free space under {self.download_path}: "
+                f"{self.total_bytes / 1024**3:.2f} GB needed, "
+                f"{(self.free_bytes or 0) / 1024**3:.2f} GB free"
+            )
+        if self.bytes_per_second is None and self.total_bytes:
+            warnings.append("No session history to estimate the download duration")
+        return warnings
@@ -2,14 +2,21 @@
 
 from dataclasses import dataclass, field
 from datetime import datetime, timedelta
-from typing import List
+from typing import Iterable, List, Optional
 
 from .channel_stats import ChannelStats
+from .error_log import DEFAULT_ERROR_CLASS, ErrorLog
 
 
-@dataclass
+@dataclass(slots=True)
 class DownloadSession:
-    """Summary of a complete download session."""
+    """Summary of a complete download session.
+
+    Per-channel aggregates are folded in incrementally the first time they
+    are read after ``channel_stats`` grows, so reading them repeatedly does
+    not rescan every channel. Channel stats are treated as final once added;
+    call ``refresh_aggregates`` after mutating them in place.
+    """
 
     total_channels: int
     total_unread: int
@@ -18,7 +25,75 @@ class DownloadSession:
     channel_stats: List[ChannelStats]
     start_time: datetime
     end_time: datetime
-    errors: List[str] = field(default_factory=list)
+    errors: ErrorLog = field(default_factory=ErrorLog)
+
+    # Running aggregates over channel_stats[:_aggregated]
+    _aggregated: int = field(default=0, init=False, repr=False, compare=False)
+    _with_downloads: List[ChannelStats] = field(
+        default_factory=list, init=False, repr=False, compare=False
+    )
+    _with_errors: List[ChannelStats] = field(
+        default_factory=list, init=False, repr=False, compare=False
+    )
+    _channel_errors: int = field(default=0, init=False, repr=False, compare=False)
+    _bytes_downloaded: int = field(default=0, init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        """Accept a plain list of error messages."""
+        self.errors = ErrorLog.coerce(self.errors)
+
+    @classmethod
+    def merge(cls, sessions: Iterable["DownloadSession"]) -> "DownloadSession":
+        """
+        Merge sessions that ran side by side into one session.
+
+        Args:
+            sessions: Sessions of workers or accounts
+
+        Returns:
+            Session with summed totals, all channel stats and merged errors
+        """
+        sessions = list(sessions)
+        if not sessions:
+            raise ValueError("No sessions to merge")
+
+        errors = ErrorLog()
+        channel_stats: List[ChannelStats] = []
+        for session in sessions:
+            errors.merge(session.errors)
+            channel_stats.extend(session.channel_stats)
+
+        return cls(
+            total_channels=sum(s.total_channels for s in sessions),
+            total_unread=sum(s.total_unread for s in sessions),
+            total_media=sum(s.total_media for s in sessions),
+            total_downloaded=sum(s.total_downloaded for s in sessions),
+            channel_stats=channel_stats,
+            start_time=min(s.start_time for s in sessions),
+            end_time=max(s.end_time for s in sessions),
+            errors=errors,
+        )
+
+    def _update_aggregates(self) -> None:
+        """Fold channel stats added since the last read into the aggregates."""
+        if self._aggregated > len(self.channel_stats):
+            self.refresh_aggregates()
+        for stats in self.channel_stats[self._aggregated :]:
+            if stats.downloaded_count > 0:
+                self._with_downloads.append(stats)
+            if stats.has_errors:
+                self._with_errors.append(stats)
+            self._channel_errors += stats.error_count
+            self._bytes_downloaded += stats.bytes_downloaded
+        self._aggregated = len(self.channel_stats)
+
+    def refresh_aggregates(self) -> None:
+        """Recompute the aggregates from scratch on the next read."""
+        self._aggregated = 0
+        self._with_downloads = []
+        self._with_errors = []
+        self._channel_errors = 0
+        self._bytes_downloaded = 0
 
     @property
     def duration(self) -> timedelta:
@@ -32,36 +107,62 @@ class DownloadSession:
             return 100.0
         return (self.total_downloaded / self.total_media) * 100
 
+    @property
+    def total_bytes_downloaded(self) -> int:
+        """Get total bytes downloaded across all channels."""
+        self._update_aggregates()
+        return self._bytes_downloaded
+
+    @property
+    def bytes_per_second(self) -> float:
+        """Calculate overall download throughput in bytes per second."""
+        elapsed = self.duration.total_seconds()
+        if elapsed <= 0:
+            return 0.0
+        return self.total_bytes_downloaded / elapsed
+
     @property
     def channels_with_downloads(self) -> List[ChannelStats]:
         """Get channels that had successful downloads."""
-        return [stats for stats in self.channel_stats if stats.downloaded_count > 0]
+        self._update_aggregates()
+        return list(self._with_downloads)
 
     @property
     def channels_with_errors(self) -> List[ChannelStats]:
         """Get channels that had errors."""
-        return [stats for stats in self.channel_stats if stats.has_errors]
+        self._update_aggregates()
+        return list(self._with_errors)
 
     @property
     def total_errors(self) -> int:
         """Get total number of errors (session + channel errors)."""
-        channel_errors = sum(len(stats.errors) for stats in self.channel_stats)
-        return len(self.errors) + channel_errors
+        self._update_aggregates()
+        return len(self.errors) + self._channel_errors
 
     @property
     def average_files_per_channel(self) -> float:
         """Calculate average files downloaded per channel."""
-        active_channels = len([s for s in self.channel_stats if s.downloaded_count > 0])
+        self._update_aggregates()
+        active_channels = len(self._with_downloads)
         if active_channels == 0:
             return 0.0
         return self.total_downloaded / active_channels
 
-    def add_session_error(self, error: str) -> None:
+    def get_error_counts_by_class(self) -> dict:
+        """Get session and channel error counts grouped by error class."""
+        self._update_aggregates()
+        counts = self.errors.counts.copy()
+        for stats in self._with_errors:
+            counts.update(stats.errors.counts)
+        return dict(counts.most_common())
+
+    def add_session_error(self, error: str, error_class: Optional[str] = None) -> None:
         """Add a session-level error."""
-        self.errors.append(error)
+        self.errors.add(error, error_class or DEFAULT_ERROR_CLASS)
 
     def get_summary_dict(self) -> dict:
         """Get session summary as dictionary."""
+        self._update_aggregates()
         return {
             "duration": str(self.duration),
             "channels_processed": self.total_channels,
@@ -69,8 +170,8 @@ class DownloadSession:
             "media_messages": self.total_media,
             "files_downloaded": self.total_downloaded,
             "success_rate": f"{self.success_rate:.1f}%",
-            "channels_with_downloads": len(self.channels_with_downloads),
-            "channels_with_errors": len(self.channels_with_errors),
+            "channels_with_downloads": len(self._with_downloads),
+            "channels_with_errors": len(self._with_errors),
             "total_errors": self.total_errors,
             "avg_files_per_channel": f"{self.average_files_per_channel:.1f}",
         }
@@ -0,0 +1,118 @@
+"""Data models for bounded error records."""
+
+from collections import Counter, deque
+from typing import Deque, Dict, Iterable, Iterator, List, Union, overload
+
+DEFAULT_ERROR_CLASS = "Error"
+DEFAULT_MAX_ERROR_SAMPLES = 20
+
+
+class ErrorLog:
+    """Bounded record of errors.
+
+    Every error is counted by error class, but only the most recent
+    ``max_samples`` messages are kept. The log behaves like the list of
+    messages it replaces: ``len()`` is the total number of errors recorded,
+    while iteration and indexing cover the retained samples only.
+    """
+
+    __slots__ = ("counts", "samples", "total")
+
+    def __init__(
+        self,
+        errors: Iterable[str] = (),
+        max_samples: int = DEFAULT_MAX_ERROR_SAMPLES,
+    ) -> None:
+        """
+        Initialize error log.
+
+        Args:
+            errors: Initial error messages
+            max_samples: Maximum number of messages kept
+        """
+        self.counts: Counter[str] = Counter()
+        self.samples: Deque[str] = deque(maxlen=max_samples)
+        self.total = 0
+        self.extend(errors)
+
+    @classmethod
+    def coerce(cls, errors: Union["ErrorLog", Iterable[str]]) -> "ErrorLog":
+        """Return ``errors`` as an error log, wrapping plain message lists."""
+        return errors if isinstance(errors, ErrorLog) else cls(errors)
+
+    @property
+    def max_samples(self) -> int:
+        """Get the maximum number of messages kept."""
+        return self.samples.maxlen or 0
+
+    @property
+    def dropped(self) -> int:
+        """Get the number of messages that were not retained."""
+        return self.total - len(self.samples)
+
+    def add(self, error: str, error_class: str = DEFAULT_ERROR_CLASS) -> None:
+        """
+        Record an error.
+
+        Args:
+            error: Error message
+            error_class: Error class used for grouping (e.g. exception name)
+        """
+        self.counts[error_class] += 1
+        self.samples.append(error)
+        self.total += 1
+
+    def append(self, error: str) -> None:
+        """Record an error of the default class (list compatibility)."""
+        self.add(error)
+
+    def extend(self, errors: Iterable[str]) -> None:
+        """Record several errors of the default class."""
+        for error in errors:
+            self.add(error)
+
+    def merge(self, other: "ErrorLog") -> None:
+        """Add the counts and samples of another error log to this one."""
+        self.counts.update(other.counts)
+        self.samples.extend(other.samples)
+        self.total += other.total
+
+    def get_counts_by_class(self) -> Dict[str, int]:
+        """Get error counts by class, most frequent first."""
+        return dict(self.counts.most_common())
+
+    def __len__(self) -> int:
+        return self.total
+
+    def __bool__(self) -> bool:
+        return self.total > 0
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.samples)
+
+    @overload
+    def __getitem__(self, index: int) -> str: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> List[str]: ...
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[str, List[str]]:
+        return list(self.samples)[index]
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, ErrorLog):
+            return (
+                self.total == other.total
+                and self.counts == other.counts
+                and list(self.samples) == list(other.samples)
+            )
+        if isinstance(other, list):
+            return self.total == len(other) and list(self.samples) == other
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return (
+            f"ErrorLog(total={self.total}, "
+            f"counts={dict(self.counts)}, "
+            f"samples={list(self.samples)!r})"
+        )
@@ -18,6 +18,16 @@ class MediaInfo:
     text: Optional[str] = None
     mime_type: Optional[str] = None
     file_size: Optional[int] = None
+    channel_id: Optional[int] = None
+    preview_of: Optional[str] = None  # original filename when a preview
+    photo_size: Optional[str] = None  # size type of the downloaded photo variant
+    album_id: Optional[int] = None  # grouped_id of the album the media is in
+    sha256: Optional[str] = None  # hex digest computed while the file was written
+
+    @property
+    def is_preview(self) -> bool:
+        """Check if the file is a preview of the original media."""
+        return self.preview_of is not None
 
     @property
     def file_exists(self) -> bool:
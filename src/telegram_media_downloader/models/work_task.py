@@ -0,0 +1,27 @@
+"""Data model for tasks of the shared work queue."""
+
+from dataclasses import dataclass
+from typing import Optional
+
+
+@dataclass
+class WorkTask:
+    """A range of channel messages leased to one worker."""
+
+    task_id: int
+    channel_id: int
+    channel_name: str
+    first_id: int
+    last_id: int
+    attempts: int = 0
+    lease_token: Optional[str] = None
+    lease_expires: Optional[float] = None
+
+    @property
+    def message_count(self) -> int:
+        """Get the number of message ids covered by the task."""
+        return self.last_id - self.first_id + 1
+
+    def __str__(self) -> str:
+        """String representation of the task."""
+        return f"{self.channel_name} [{self.first_id}-{self.last_id}]"
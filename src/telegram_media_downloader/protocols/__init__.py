@@ -2,5 +2,6 @@
 
 from .file_namer import FileNamer
 from .media_filter import MediaFilter
+from .work_queue import WorkQueue
 
-__all__ = ["MediaFilter", "FileNamer"]
+__all__ = ["MediaFilter", "FileNamer", "WorkQueue"]
@@ -0,0 +1,107 @@
+"""Protocol definition for shared work queues."""
+
+from typing import Dict, Optional, Protocol
+
+from ..models.work_task import WorkTask
+
+
+class WorkQueue(Protocol):
+    """Protocol for queues of message ranges shared by several workers.
+
+    Tasks are leased for a limited time. A worker acknowledges a task when it
+    is done; tasks whose lease expires (e.g. because the worker died) are
+    handed out again.
+    """
+
+    def enqueue(
+        self, channel_id: int, channel_name: str, first_id: int, last_id: int
+    ) -> bool:
+        """
+        Add a message range of a channel to the queue.
+
+        Args:
+            channel_id: Channel id
+            channel_name: Channel title
+            first_id: Lowest message id (inclusive)
+            last_id: Highest message id (inclusive)
+
+        Returns:
+            True if the task was added, False if it was already queued
+        """
+        ...
+
+    def queued_up_to(self, channel_id: int) -> int:
+        """
+        Get the highest message id queued for a channel.
+
+        Args:
+            channel_id: Channel id
+
+        Returns:
+            Highest queued message id, or 0 if nothing was queued
+        """
+        ...
+
+    def done_up_to(self, channel_id: int) -> int:
+        """
+        Get the highest message id below which every range of a channel is done.
+
+        Args:
+            channel_id: Channel id
+
+        Returns:
+            Highest message id of the done ranges, or 0 if none is done
+        """
+        ...
+
+    def lease(self, worker_id: str, lease_seconds: float) -> Optional[WorkTask]:
+        """
+        Lease the next available task.
+
+        Args:
+            worker_id: Identifier of the leasing worker
+            lease_seconds: Lease duration
+
+        Returns:
+            Leased task, or None if no task is available
+        """
+        ...
+
+    def renew(self, task: WorkTask, lease_seconds: float) -> bool:
+        """
+        Extend the lease of a task that is still being worked on.
+
+        Args:
+            task: Leased task
+            lease_seconds: New lease duration from now
+
+        Returns:
+            False if the lease was lost to another worker
+        """
+        ...
+
+    def ack(self, task: WorkTask) -> bool:
+        """
+        Mark a leased task as done.
+
+        Args:
+            task: Leased task
+
+        Returns:
+            False if the lease was lost to another worker
+        """
+        ...
+
+    def fail(self, task: WorkTask, error: str) -> None:
+        """
+        Release a leased task after an error so it can be retried.
+
+        Args:
+            task: Leased task
+            error: Error description
+        """
+        ...
+
+    def counts(self) -> Dict[str, int]:
+        """Get the number of tasks in each state."""
+        ...
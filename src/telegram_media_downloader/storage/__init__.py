@@ -0,0 +1,13 @@
+"""Persistent storage module."""
+
+from .checkpoints import CheckpointStore
+from .history import DEFAULT_HISTORY_FILENAME, SessionHistory
+from .work_queue import DEFAULT_WORK_QUEUE_FILENAME, SQLiteWorkQueue
+
+__all__ = [
+    "DEFAULT_HISTORY_FILENAME",
+    "DEFAULT_WORK_QUEUE_FILENAME",
+    "SessionHistory",
+    "CheckpointStore",
+    "SQLiteWorkQueue",
+]
@@ -0,0 +1,67 @@
+"""Resumable checkpoints for long-running jobs."""
+
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+
+__all__ = ["CheckpointStore"]
+
+
+class CheckpointStore:
+    """JSON file of per-job checkpoint records.
+
+    Each job is identified by a string key and stores a list of JSON objects
+    (e.g. one per partition). Writes replace the file atomically, so an
+    interrupted job resumes from its last saved state.
+    """
+
+    def __init__(self, path: Union[str, Path]) -> None:
+        """
+        Open (or start) a checkpoint file.
+
+        Args:
+            path: Checkpoint file path
+
+        Raises:
+            ValueError: If the file exists but is not a checkpoint file
+        """
+        self.path = Path(path)
+        self._jobs: Dict[str, List[Dict[str, Any]]] = {}
+        if self.path.exists():
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if not isinstance(data, dict):
+                raise ValueError(f"Not a checkpoint file: {self.path}")
+            self._jobs = data
+
+    def get(self, job_key: str) -> Optional[List[Dict[str, Any]]]:
+        """
+        Get the saved records of a job.
+
+        Args:
+            job_key: Job identifier
+
+        Returns:
+            Saved records, or None if the job has no checkpoint
+        """
+        return self._jobs.get(job_key)
+
+    def put(self, job_key: str, records: List[Dict[str, Any]]) -> None:
+        """
+        Replace the records of a job and save the file.
+
+        Args:
+            job_key: Job identifier
+            records: JSON-serialisable records
+        """
+        self._jobs[job_key] = records
+        self.save()
+
+    def save(self) -> None:
+        """Atomically write all jobs to disk."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(self.path.suffix + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self._jobs, f, indent=1)
+        os.replace(tmp_path, self.path)
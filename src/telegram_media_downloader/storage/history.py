@@ -0,0 +1,399 @@
+"""Local history of download sessions.
+
+Every finished ``DownloadSession`` is appended to a SQLite database together
+with its per-channel stats and timings, so throughput can be compared across
+runs.
+"""
+
+import json
+import sqlite3
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from pathlib import Path
+from types import TracebackType
+from typing import Any, Dict, Iterator, List, Optional, TextIO, Union
+
+from ..models.download_session import DownloadSession
+from ..utils.helpers import format_file_size
+from ..utils.session_export import (
+    channel_stats_to_dict,
+    iter_json_document,
+    session_to_dict,
+)
+
+__all__ = [
+    "DEFAULT_HISTORY_FILENAME",
+    "SessionHistory",
+    "DailyThroughput",
+    "ChannelThroughput",
+    "render_daily_throughput",
+    "render_channel_throughput",
+]
+
+DEFAULT_HISTORY_FILENAME = "session_history.db"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    start_time TEXT NOT NULL,
+    end_time TEXT NOT NULL,
+    elapsed_seconds REAL NOT NULL,
+    total_channels INTEGER NOT NULL,
+    total_unread INTEGER NOT NULL,
+    total_media INTEGER NOT NULL,
+    total_downloaded INTEGER NOT NULL,
+    total_bytes_downloaded INTEGER NOT NULL,
+    total_errors INTEGER NOT NULL,
+    errors_by_class TEXT NOT NULL,
+    session_errors TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS channel_stats (
+    session_id INTEGER NOT NULL REFERENCES sessions(id),
+    name TEXT NOT NULL,
+    unread_count INTEGER NOT NULL,
+    media_count INTEGER NOT NULL,
+    downloaded_count INTEGER NOT NULL,
+    bytes_downloaded INTEGER NOT NULL,
+    start_time TEXT,
+    end_time TEXT,
+    elapsed_seconds REAL NOT NULL,
+    error_count INTEGER NOT NULL,
+    errors_by_class TEXT NOT NULL,
+    error_samples TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_sessions_start_time ON sessions(start_time);
+CREATE INDEX IF NOT EXISTS idx_channel_stats_session ON channel_stats(session_id);
+"""
+
+_SESSION_COLUMNS = (
+    "start_time",
+    "end_time",
+    "elapsed_seconds",
+    "total_channels",
+    "total_unread",
+    "total_media",
+    "total_downloaded",
+    "total_bytes_downloaded",
+    "total_errors",
+)
+
+_CHANNEL_COLUMNS = (
+    "name",
+    "unread_count",
+    "media_count",
+    "downloaded_count",
+    "bytes_downloaded",
+    "start_time",
+    "end_time",
+    "elapsed_seconds",
+    "error_count",
+)
+
+
+@dataclass
+class DailyThroughput:
+    """Download throughput aggregated over one day."""
+
+    day: str
+    sessions: int
+    files: int
+    bytes_downloaded: int
+    elapsed_seconds: float
+    errors: int
+
+    @property
+    def mb_per_s(self) -> float:
+        """Get throughput in MB/s."""
+        if self.elapsed_seconds <= 0:
+            return 0.0
+        return self.bytes_downloaded / self.elapsed_seconds / (1024 * 1024)
+
+
+@dataclass
+class ChannelThroughput:
+    """Download throughput of one channel over a period."""
+
+    name: str
+    sessions: int
+    files: int
+    bytes_downloaded: int
+    elapsed_seconds: float
+    errors: int
+
+    @property
+    def mb_per_s(self) -> float:
+        """Get throughput in MB/s."""
+        if self.elapsed_seconds <= 0:
+            return 0.0
+        return self.bytes_downloaded / self.elapsed_seconds / (1024 * 1024)
+
+
+class SessionHistory:
+    """SQLite store of past download sessions."""
+
+    def __init__(self, path: Union[str, Path]) -> None:
+        """
+        Open (and create if needed) a session history database.
+
+        Args:
+            path: Database file path
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path))
+        self._conn.row_factory = sqlite3.Row
+        self._conn.executescript(_SCHEMA)
+
+    def __enter__(self) -> "SessionHistory":
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Optional[type],
+        exc_val: Optional[BaseException],
+        exc_tb: Optional[TracebackType],
+    ) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Close the database connection."""
+        self._conn.close()
+
+    def record(self, session: DownloadSession) -> int:
+        """
+        Append a session and its channel stats to the history.
+
+        Args:
+            session: Finished download session
+
+        Returns:
+            Id of the stored session
+        """
+        fields = session_to_dict(session)
+        with self._conn:
+            cursor = self._conn.execute(
+                f"INSERT INTO sessions ({', '.join(_SESSION_COLUMNS)}, "
+                "errors_by_class, session_errors) "
+                f"VALUES ({', '.join('?' * (len(_SESSION_COLUMNS) + 2))})",
+                [fields[column] for column in _SESSION_COLUMNS]
+                + [
+                    json.dumps(fields["errors_by_class"]),
+                    json.dumps(fields["session_errors"]),
+                ],
+            )
+            session_id = cursor.lastrowid
+            assert session_id is not None
+            self._conn.executemany(
+                f"INSERT INTO channel_stats (session_id, "
+                f"{', '.join(_CHANNEL_COLUMNS)}, errors_by_class, error_samples) "
+                f"VALUES ({', '.join('?' * (len(_CHANNEL_COLUMNS) + 3))})",
+                (
+                    [session_id]
+                    + [channel[column] for column in _CHANNEL_COLUMNS]
+                    + [
+                        json.dumps(channel["errors_by_class"]),
+                        json.dumps(channel["error_samples"]),
+                    ]
+                    for channel in map(channel_stats_to_dict, session.channel_stats)
+                ),
+            )
+        return session_id
+
+    def latest_session_id(self) -> Optional[int]:
+        """Get the id of the most recently recorded session."""
+        row = self._conn.execute("SELECT MAX(id) FROM sessions").fetchone()
+        return row[0] if row else None
+
+    def list_sessions(self, limit: int = 20) -> List[Dict[str, Any]]:
+        """
+        Get the most recent sessions, newest first.
+
+        Args:
+            limit: Maximum number of sessions
+
+        Returns:
+            List of session rows as dictionaries
+        """
+        rows = self._conn.execute(
+            f"SELECT id, {', '.join(_SESSION_COLUMNS)} FROM sessions "
+            "ORDER BY id DESC LIMIT ?",
+            (limit,),
+        )
+        return [dict(row) for row in rows]
+
+    def average_bytes_per_second(
+        self, days: int = 30, now: Optional[datetime] = None
+    ) -> Optional[float]:
+        """
+        Get the average download throughput of recent sessions.
+
+        Args:
+            days: Number of days to look back
+            now: Reference time (defaults to the current time)
+
+        Returns:
+            Bytes per second, or None without sessions that downloaded data
+        """
+        since = (now or datetime.now()) - timedelta(days=days)
+        total_bytes, seconds = self._conn.execute(
+            "SELECT SUM(total_bytes_downloaded), SUM(elapsed_seconds) FROM sessions "
+            "WHERE start_time >= ? AND total_bytes_downloaded > 0",
+            (since.isoformat(),),
+        ).fetchone()
+        if not total_bytes or not seconds:
+            return None
+        return float(total_bytes) / float(seconds)
+
+    def throughput_by_day(
+        self, days: int = 30, now: Optional[datetime] = None
+    ) -> List[DailyThroughput]:
+        """
+        Aggregate download throughput per day.
+
+        Args:
+            days: Number of days to look back
+            now: Reference time (defaults to the current time)
+
+        Returns:
+            One entry per day with recorded sessions, oldest first
+        """
+        since = (now or datetime.now()) - timedelta(days=days)
+        rows = self._conn.execute(
+            "SELECT substr(start_time, 1, 10) AS day, COUNT(*), "
+            "SUM(total_downloaded), SUM(total_bytes_downloaded), "
+            "SUM(elapsed_seconds), SUM(total_errors) "
+            "FROM sessions WHERE start_time >= ? GROUP BY day ORDER BY day",
+            (since.isoformat(),),
+        )
+        return [DailyThroughput(*row) for row in rows]
+
+    def slowest_channels(
+        self, days: int = 7, limit: int = 10, now: Optional[datetime] = None
+    ) -> List[ChannelThroughput]:
+        """
+        Find the channels with the lowest download throughput.
+
+        Channels that downloaded nothing in the period are not ranked.
+
+        Args:
+            days: Number of days to look back
+            limit: Maximum number of channels
+            now: Reference time (defaults to the current time)
+
+        Returns:
+            Channels ordered from slowest to fastest
+        """
+        since = (now or datetime.now()) - timedelta(days=days)
+        rows = self._conn.execute(
+            "SELECT c.name, COUNT(DISTINCT c.session_id), SUM(c.downloaded_count), "
+            "SUM(c.bytes_downloaded) AS bytes, SUM(c.elapsed_seconds) AS seconds, "
+            "SUM(c.error_count) "
+            "FROM channel_stats c JOIN sessions s ON s.id = c.session_id "
+            "WHERE s.start_time >= ? GROUP BY c.name "
+            "HAVING bytes > 0 AND seconds > 0 "
+            "ORDER BY CAST(bytes AS REAL) / seconds LIMIT ?",
+            (since.isoformat(), limit),
+        )
+        return [ChannelThroughput(*row) for row in rows]
+
+    def iter_session_json(self, session_id: int) -> Iterator[str]:
+        """
+        Export a stored session as JSON chunks, streaming its channel rows.
+
+        Args:
+            session_id: Stored session id
+
+        Yields:
+            Consecutive chunks of the JSON document
+
+        Raises:
+            KeyError: If the session does not exist
+        """
+        row = self._conn.execute(
+            "SELECT * FROM sessions WHERE id = ?", (session_id,)
+        ).fetchone()
+        if row is None:
+            raise KeyError(f"Session {session_id} not found")
+
+        fields = dict(row)
+        fields["errors_by_class"] = json.loads(fields["errors_by_class"])
+        fields["session_errors"] = json.loads(fields["session_errors"])
+
+        # Separate cursor so channel rows are fetched while the document is
+        # being written rather than all at once
+        cursor = self._conn.cursor()
+        cursor.execute(
+            "SELECT * FROM channel_stats WHERE session_id = ? ORDER BY rowid",
+            (session_id,),
+        )
+
+        def channels() -> Iterator[Dict[str, Any]]:
+            for channel_row in cursor:
+                channel = dict(channel_row)
+                del channel["session_id"]
+                channel["errors_by_class"] = json.loads(channel["errors_by_class"])
+                channel["error_samples"] = json.loads(channel["error_samples"])
+                yield channel
+
+        yield from iter_json_document(fields, channels())
+
+    def export_session(self, session_id: int, stream: TextIO) -> None:
+        """
+        Write a stored session as a JSON document to a text stream.
+
+        Args:
+            session_id: Stored session id
+            stream: Output stream
+        """
+        for chunk in self.iter_session_json(session_id):
+            stream.write(chunk)
+
+
+def render_daily_throughput(rows: List[DailyThroughput]) -> str:
+    """
+    Render per-day throughput as a text table.
+
+    Args:
+        rows: Output of ``SessionHistory.throughput_by_day``
+
+    Returns:
+        Formatted table
+    """
+    if not rows:
+        return "No sessions recorded in this period."
+    lines = [
+        f"{'Day':<12} {'Sessions':>8} {'Files':>8} {'Size':>10} {'MB/s':>8} "
+        f"{'Errors':>7}",
+        "-" * 58,
+    ]
+    for row in rows:
+        lines.append(
+            f"{row.day:<12} {row.sessions:>8} {row.files:>8} "
+            f"{format_file_size(row.bytes_downloaded):>10} {row.mb_per_s:>8.2f} "
+            f"{row.errors:>7}"
+        )
+    return "\n".join(lines)
+
+
+def render_channel_throughput(rows: List[ChannelThroughput]) -> str:
+    """
+    Render per-channel throughput as a text table.
+
+    Args:
+        rows: Output of ``SessionHistory.slowest_channels``
+
+    Returns:
+        Formatted table
+    """
+    if not rows:
+        return "No channel downloads recorded in this period."
+    lines = [
+        f"{'Channel':<35} {'Sessions':>8} {'Files':>8} {'Size':>10} {'MB/s':>8}",
+        "-" * 73,
+    ]
+    for row in rows:
+        lines.append(
+            f"{row.name[:34]:<35} {row.sessions:>8} {row.files:>8} "
+            f"{format_file_size(row.bytes_downloaded):>10} {row.mb_per_s:>8.2f}"
+        )
+    return "\n".join(lines)
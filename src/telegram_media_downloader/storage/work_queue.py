@@ -0,0 +1,288 @@
+"""SQLite work queue with leases, shared by several downloader processes.
+
+The database can live on a storage mount shared by several hosts. Every
+state change runs in an immediate transaction, so only one worker can lease
+a given task. Leases expire after a timeout and are handed out again, so
+tasks held by a crashed worker are not lost.
+"""
+
+import sqlite3
+import time
+import uuid
+from pathlib import Path
+from types import TracebackType
+from typing import Callable, Dict, Optional, Union
+
+from ..models.work_task import WorkTask
+
+__all__ = [
+    "DEFAULT_WORK_QUEUE_FILENAME",
+    "DEFAULT_MAX_ATTEMPTS",
+    "SQLiteWorkQueue",
+]
+
+DEFAULT_WORK_QUEUE_FILENAME = "work_queue.db"
+DEFAULT_MAX_ATTEMPTS = 5
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    channel_id INTEGER NOT NULL,
+    channel_name TEXT NOT NULL,
+    first_id INTEGER NOT NULL,
+    last_id INTEGER NOT NULL,
+    state TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    lease_owner TEXT,
+    lease_token TEXT,
+    lease_expires REAL,
+    last_error TEXT,
+    UNIQUE (channel_id, first_id, last_id)
+);
+CREATE INDEX IF NOT EXISTS idx_tasks_state ON tasks(state, lease_expires);
+"""
+
+_TASK_COLUMNS = (
+    "id, channel_id, channel_name, first_id, last_id, attempts, "
+    "lease_token, lease_expires"
+)
+
+
+class SQLiteWorkQueue:
+    """Durable queue of channel message ranges with leased tasks."""
+
+    def __init__(
+        self,
+        path: Union[str, Path],
+        max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+        busy_timeout: float = 30.0,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        """
+        Open (and create if needed) a work queue database.
+
+        Args:
+            path: Database file path
+            max_attempts: Leases per task before it is marked as failed
+            busy_timeout: Seconds to wait for a lock held by another process
+            clock: Wall clock in seconds (shared by every host)
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_attempts = max_attempts
+        self.clock = clock
+        # Transactions are opened explicitly with BEGIN IMMEDIATE
+        self._conn = sqlite3.connect(
+            str(self.path), timeout=busy_timeout, isolation_level=None
+        )
+        self._conn.executescript(_SCHEMA)
+
+    def __enter__(self) -> "SQLiteWorkQueue":
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Optional[type],
+        exc_val: Optional[BaseException],
+        exc_tb: Optional[TracebackType],
+    ) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Close the database connection."""
+        self._conn.close()
+
+    def _write(self, sql: str, params: tuple) -> sqlite3.Cursor:
+        """Run a statement in its own immediate transaction."""
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            cursor = self._conn.execute(sql, params)
+        except BaseException:
+            self._conn.execute("ROLLBACK")
+            raise
+        self._conn.execute("COMMIT")
+        return cursor
+
+    def enqueue(
+        self, channel_id: int, channel_name: str, first_id: int, last_id: int
+    ) -> bool:
+        """
+        Add a message range of a channel to the queue.
+
+        Enqueuing a range that is already queued (or done) is a no-op, so
+        discovery can safely run more than once.
+
+        Args:
+            channel_id: Channel id
+            channel_name: Channel title
+            first_id: Lowest message id (inclusive)
+            last_id: Highest message id (inclusive)
+
+        Returns:
+            True if the task was added, False if it was already queued
+        """
+        cursor = self._write(
+            "INSERT OR IGNORE INTO tasks (channel_id, channel_name, first_id, last_id) "
+            "VALUES (?, ?, ?, ?)",
+            (channel_id, channel_name, first_id, last_id),
+        )
+        return cursor.rowcount > 0
+
+    def queued_up_to(self, channel_id: int) -> int:
+        """
+        Get the highest message id queued for a channel in any state.
+
+        Args:
+            channel_id: Channel id
+
+        Returns:
+            Highest queued message id, or 0 if nothing was queued
+        """
+        row = self._conn.execute(
+            "SELECT MAX(last_id) FROM tasks WHERE channel_id = ?", (channel_id,)
+        ).fetchone()
+        return int(row[0] or 0)
+
+    def done_up_to(self, channel_id: int) -> int:
+        """
+        Get the highest message id below which every range of a channel is done.
+
+        Ranges finish in any order, so this stops before the lowest range
+        that is not done (pending, leased or failed).
+
+        Args:
+            channel_id: Channel id
+
+        Returns:
+            Highest message id of the done ranges, or 0 if none is done
+        """
+        row = self._conn.execute(
+            "SELECT MAX(last_id) FROM tasks WHERE channel_id = ? AND state = 'done' "
+            "AND last_id < COALESCE((SELECT MIN(first_id) FROM tasks "
+            "WHERE channel_id = ? AND state != 'done'), last_id + 1)",
+            (channel_id, channel_id),
+        ).fetchone()
+        return int(row[0] or 0)
+
+    def lease(self, worker_id: str, lease_seconds: float) -> Optional[WorkTask]:
+        """
+        Lease the oldest pending task, reclaiming expired leases first.
+
+        Args:
+            worker_id: Identifier of the leasing worker
+            lease_seconds: Lease duration
+
+        Returns:
+            Leased task, or None if no task is available
+        """
+        now = self.clock()
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            self._reclaim_expired(now)
+            row = self._conn.execute(
+                f"SELECT {_TASK_COLUMNS} FROM tasks WHERE state = 'pending' "
+                "ORDER BY id LIMIT 1"
+            ).fetchone()
+            if row is None:
+                self._conn.execute("COMMIT")
+                return None
+
+            task = WorkTask(*row)
+            task.attempts += 1
+            task.lease_token = uuid.uuid4().hex
+            task.lease_expires = now + lease_seconds
+            self._conn.execute(
+                "UPDATE tasks SET state = 'leased', attempts = ?, lease_owner = ?, "
+                "lease_token = ?, lease_expires = ? WHERE id = ?",
+                (
+                    task.attempts,
+                    worker_id,
+                    task.lease_token,
+                    task.lease_expires,
+                    task.task_id,
+                ),
+            )
+        except BaseException:
+            self._conn.execute("ROLLBACK")
+            raise
+        self._conn.execute("COMMIT")
+        return task
+
+    def _reclaim_expired(self, now: float) -> None:
+        """Return tasks with expired leases to the queue (inside a transaction)."""
+        self._conn.execute(
+            "UPDATE tasks SET state = 'failed', lease_owner = NULL, "
+            "lease_token = NULL, last_error = 'Lease expired' "
+            "WHERE state = 'leased' AND lease_expires < ? AND attempts >= ?",
+            (now, self.max_attempts),
+        )
+        self._conn.execute(
+            "UPDATE tasks SET state = 'pending', lease_owner = NULL, "
+            "lease_token = NULL WHERE state = 'leased' AND lease_expires < ?",
+            (now,),
+        )
+
+    def renew(self, task: WorkTask, lease_seconds: float) -> bool:
+        """
+        Extend the lease of a task that is still being worked on.
+
+        Args:
+            task: Leased task
+            lease_seconds: New lease duration from now
+
+        Returns:
+            False if the lease expired and was taken by another worker
+        """
+        expires = self.clock() + lease_seconds
+        cursor = self._write(
+            "UPDATE tasks SET lease_expires = ? "
+            "WHERE id = ? AND state = 'leased' AND lease_token = ?",
+            (expires, task.task_id, task.lease_token),
+        )
+        if cursor.rowcount:
+            task.lease_expires = expires
+        return cursor.rowcount > 0
+
+    def ack(self, task: WorkTask) -> bool:
+        """
+        Mark a leased task as done.
+
+        Args:
+            task: Leased task
+
+        Returns:
+            False if the lease expired and was taken by another worker
+        """
+        cursor = self._write(
+            "UPDATE tasks SET state = 'done', lease_owner = NULL, "
+            "lease_token = NULL, lease_expires = NULL "
+            "WHERE id = ? AND state = 'leased' AND lease_token = ?",
+            (task.task_id, task.lease_token),
+        )
+        return cursor.rowcount > 0
+
+    def fail(self, task: WorkTask, error: str) -> None:
+        """
+        Release a leased task after an error.
+
+        The task is retried by the next lease until it has been attempted
+        ``max_attempts`` times, after which it is marked as failed.
+
+        Args:
+            task: Leased task
+            error: Error description
+        """
+        state = "failed" if task.attempts >= self.max_attempts else "pending"
+        self._write(
+            "UPDATE tasks SET state = ?, lease_owner = NULL, lease_token = NULL, "
+            "lease_expires = NULL, last_error = ? "
+            "WHERE id = ? AND state = 'leased' AND lease_token = ?",
+            (state, error, task.task_id, task.lease_token),
+        )
+
+    def counts(self) -> Dict[str, int]:
+        """Get the number of tasks in each state."""
+        counts = {"pending": 0, "leased": 0, "done": 0, "failed": 0}
+        rows = self._conn.execute("SELECT state, COUNT(*) FROM tasks GROUP BY state")
+        counts.update({state: count for state, count in rows})
+        return counts
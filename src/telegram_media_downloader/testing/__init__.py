@@ -0,0 +1,29 @@
+"""Simulated Telegram components for tests and benchmarks."""
+
+from .fake_client import (
+    FakeChannelSpec,
+    FakeDialog,
+    FakeEntity,
+    FakeRawDialog,
+    FakeTelegramClient,
+    SimulatedNetwork,
+)
+from .memory import (
+    DEFAULT_BUDGET_BYTES_PER_MESSAGE,
+    MemoryReport,
+    PhaseMemory,
+    measure_session_memory,
+)
+
+__all__ = [
+    "FakeChannelSpec",
+    "FakeDialog",
+    "FakeEntity",
+    "FakeRawDialog",
+    "FakeTelegramClient",
+    "SimulatedNetwork",
+    "DEFAULT_BUDGET_BYTES_PER_MESSAGE",
+    "MemoryReport",
+    "PhaseMemory",
+    "measure_session_memory",
+]
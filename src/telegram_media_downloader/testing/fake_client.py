@@ -0,0 +1,590 @@
+"""Simulated TelegramClient stand-in for tests and benchmarks.
+
+Messages are generated lazily from channel specifications, so backlogs of
+millions of messages cost no memory until the code under test keeps them.
+Network behaviour (latency, bandwidth and flood waits) is simulated with
+``asyncio.sleep`` so concurrency in the code under test is exercised.
+"""
+
+import asyncio
+import hashlib
+import math
+import random
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Union
+
+from telethon import events
+from telethon.errors import FileReferenceExpiredError, FloodWaitError
+from telethon.tl.functions.upload import GetFileHashesRequest
+from telethon.tl.types import (
+    Document,
+    DocumentAttributeFilename,
+    DocumentAttributeVideo,
+    FileHash,
+    InputDocumentFileLocation,
+    Message,
+    MessageMediaDocument,
+    MessageMediaPhoto,
+    PeerChannel,
+    Photo,
+    PhotoSize,
+    PhotoStrippedSize,
+)
+
+__all__ = [
+    "SimulatedNetwork",
+    "FakeChannelSpec",
+    "FakeEntity",
+    "FakeDialog",
+    "FakeTelegramClient",
+]
+
+# Telegram returns history and dialogs in pages of up to 100 items
+PAGE_SIZE = 100
+
+# Granularity of simulated transfers and progress callbacks
+CHUNK_SIZE = 512 * 1024
+
+# Telegram hashes files in 128 KB blocks and returns up to 10 hashes a request
+FILE_HASH_BLOCK_SIZE = 128 * 1024
+FILE_HASHES_PER_REQUEST = 10
+
+BASE_DATE = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+# Inline thumbnail payload (header byte, height, width, JPEG body)
+STRIPPED_THUMB = bytes([1, 40, 30]) + bytes(32)
+
+
+@dataclass
+class SimulatedNetwork:
+    """Network characteristics of the simulated Telegram servers."""
+
+    latency: float = 0.0  # seconds per request round trip
+    latency_outlier_rate: float = 0.0  # probability that a request is an outlier
+    latency_outlier_seconds: float = 0.0  # extra latency of each outlier
+    bandwidth: float = 0.0  # bytes per second per transfer (0 = unlimited)
+    flood_wait_rate: float = 0.0  # probability that a request hits a flood wait
+    flood_wait_seconds: float = 0.0  # length of each injected flood wait
+    file_reference_lifetime: int = 0  # requests a file reference lasts (0 = forever)
+    corruption_rate: float = 0.0  # probability that a transfer serves a bad byte
+    seed: int = 0
+
+
+@dataclass
+class FakeChannelSpec:
+    """Description of a simulated channel and its message history."""
+
+    title: str
+    message_count: int
+    media_kind: str = "photo"  # photo, video, document, text or mixed
+    file_size: int = 200_000
+    unread_count: Optional[int] = None  # defaults to every message
+    channel_id: int = 0
+    username: Optional[str] = None
+    album_size: int = 1  # consecutive messages sent as one album
+
+    @property
+    def unread(self) -> int:
+        """Get number of unread messages."""
+        if self.unread_count is None:
+            return self.message_count
+        return min(self.unread_count, self.message_count)
+
+
+@dataclass
+class FakeEntity:
+    """Minimal channel entity."""
+
+    id: int
+    username: Optional[str] = None
+
+
+@dataclass
+class FakeRawDialog:
+    """Minimal raw ``Dialog`` carrying the read state of a dialog."""
+
+    top_message: int
+    read_inbox_max_id: int
+
+
+@dataclass
+class FakeDialog:
+    """Minimal dialog object as returned by ``iter_dialogs``."""
+
+    title: str
+    entity: FakeEntity
+    unread_count: int
+    dialog: Optional[FakeRawDialog] = None
+    is_channel: bool = True
+    is_group: bool = False
+    is_user: bool = False
+
+
+@dataclass
+class _ClientCounters:
+    """Request accounting for assertions and reports."""
+
+    requests: int = 0
+    downloads: int = 0
+    bytes_served: int = 0
+    flood_waits: int = 0
+    latency_outliers: int = 0
+    part_requests: int = 0
+    corrupted_transfers: int = 0
+    read_max_ids: Dict[int, int] = field(default_factory=dict)
+
+
+class FakeTelegramClient:
+    """In-memory stand-in for ``telethon.TelegramClient``."""
+
+    def __init__(
+        self,
+        channels: List[FakeChannelSpec],
+        network: Optional[SimulatedNetwork] = None,
+        write_files: bool = True,
+        flood_sleep_threshold: float = 60.0,
+    ) -> None:
+        """
+        Initialize the simulated client.
+
+        Args:
+            channels: Channels visible to the simulated account
+            network: Simulated network characteristics
+            write_files: Whether downloads create (sparse) files on disk
+            flood_sleep_threshold: Flood waits up to this length are slept
+                through, longer ones raise FloodWaitError (as in Telethon)
+        """
+        self.network = network or SimulatedNetwork()
+        self.write_files = write_files
+        self.flood_sleep_threshold = flood_sleep_threshold
+        self.counters = _ClientCounters()
+        self._rng = random.Random(self.network.seed)
+        self._connected = True
+        self._disconnected: Optional["asyncio.Future[None]"] = None
+        self._event_handlers: List[Callable[[Any], Any]] = []
+
+        self.channels: Dict[int, FakeChannelSpec] = {}
+        for index, spec in enumerate(channels, 1):
+            if not spec.channel_id:
+                spec.channel_id = 1_000_000 + index
+            self.channels[spec.channel_id] = spec
+
+    # Connection lifecycle
+
+    def is_connected(self) -> bool:
+        """Check if the simulated client is connected."""
+        return self._connected
+
+    async def connect(self) -> None:
+        """Reconnect the simulated client."""
+        self._connected = True
+        self._disconnected = None
+
+    async def disconnect(self) -> None:
+        """Disconnect the simulated client."""
+        self.drop_connection()
+
+    def drop_connection(self) -> None:
+        """Simulate losing the connection (updates are missed until reconnect)."""
+        self._connected = False
+        if self._disconnected is not None and not self._disconnected.done():
+            self._disconnected.set_result(None)
+
+    @property
+    def disconnected(self) -> "asyncio.Future[None]":
+        """Future that resolves upon disconnection."""
+        if self._disconnected is None:
+            self._disconnected = asyncio.get_running_loop().create_future()
+            if not self._connected:
+                self._disconnected.set_result(None)
+        return self._disconnected
+
+    # Update events
+
+    def add_event_handler(
+        self, callback: Callable[[Any], Any], event: Any = None
+    ) -> None:
+        """Register a handler for new message events (event filters are ignored)."""
+        self._event_handlers.append(callback)
+
+    def remove_event_handler(
+        self, callback: Callable[[Any], Any], event: Any = None
+    ) -> int:
+        """Unregister a handler."""
+        before = len(self._event_handlers)
+        self._event_handlers = [h for h in self._event_handlers if h != callback]
+        return before - len(self._event_handlers)
+
+    async def publish_messages(self, entity: Any, count: int = 1) -> List[Message]:
+        """
+        Append new messages to a channel and dispatch NewMessage events.
+
+        Events are only delivered while connected, as with a real client.
+        """
+        spec = self._resolve(entity)
+        messages = []
+        for _ in range(count):
+            spec.message_count += 1
+            message = self._build_message(spec, spec.message_count)
+            messages.append(message)
+            if self._connected:
+                for handler in list(self._event_handlers):
+                    await handler(events.NewMessage.Event(message))
+        return messages
+
+    # Simulated network
+
+    async def _round_trip(self) -> None:
+        """Simulate a single request, including injected flood waits."""
+        self.counters.requests += 1
+
+        if self.network.flood_wait_rate and (
+            self._rng.random() < self.network.flood_wait_rate
+        ):
+            self.counters.flood_waits += 1
+            if self.network.flood_wait_seconds > self.flood_sleep_threshold:
+                raise FloodWaitError(
+                    request=None, capture=math.ceil(self.network.flood_wait_seconds)
+                )
+            await asyncio.sleep(self.network.flood_wait_seconds)
+
+        latency = self.network.latency
+        if self.network.latency_outlier_rate and (
+            self._rng.random() < self.network.latency_outlier_rate
+        ):
+            self.counters.latency_outliers += 1
+            latency += self.network.latency_outlier_seconds
+        if latency:
+            await asyncio.sleep(latency)
+
+    async def _transfer(
+        self, size: int, progress_callback: Optional[Callable[[int, int], Any]]
+    ) -> None:
+        """Simulate transferring ``size`` bytes in chunks."""
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        received = 0
+        while received < size:
+            chunk = min(CHUNK_SIZE, size - received)
+            received += chunk
+            if self.network.bandwidth:
+                # Pace against the transfer deadline rather than per chunk, so
+                # sleep granularity does not dominate fast simulated links
+                delay = started + received / self.network.bandwidth - loop.time()
+                if delay > 0.001 or (received == size and delay > 0):
+                    await asyncio.sleep(delay)
+            if progress_callback is not None:
+                result = progress_callback(received, size)
+                if asyncio.iscoroutine(result):
+                    await result
+        self.counters.bytes_served += size
+
+    # Message generation
+
+    def _build_message(self, spec: FakeChannelSpec, message_id: int) -> Message:
+        """Build a Telethon message for a simulated channel."""
+        kind = spec.media_kind
+        if kind == "mixed":
+            kind = ("photo", "video", "photo", "text")[message_id % 4]
+
+        date = BASE_DATE + timedelta(minutes=message_id)
+        # File references record when they were handed out
+        file_reference = str(self.counters.requests).encode()
+        media: Any = None
+        if kind == "photo":
+            media = MessageMediaPhoto(
+                photo=Photo(
+                    id=spec.channel_id * 10_000_000 + message_id,
+                    access_hash=message_id,
+                    file_reference=file_reference,
+                    date=date,
+                    sizes=[
+                        PhotoStrippedSize("i", STRIPPED_THUMB),
+                        PhotoSize("m", 320, 240, max(1, spec.file_size // 9)),
+                        PhotoSize("x", 800, 600, max(1, spec.file_size // 3)),
+                        PhotoSize("y", 1280, 960, spec.file_size),
+                    ],
+                    dc_id=2,
+                )
+            )
+        elif kind in ("video", "document"):
+            is_video = kind == "video"
+            attributes: List[Any] = [
+                DocumentAttributeFilename(
+                    f"file_{message_id}.{'mp4' if is_video else 'pdf'}"
+                )
+            ]
+            if is_video:
+                attributes.insert(0, DocumentAttributeVideo(60.0, 1280, 720))
+            media = MessageMediaDocument(
+                document=Document(
+                    id=spec.channel_id * 10_000_000 + message_id,
+                    access_hash=message_id,
+                    file_reference=file_reference,
+                    date=date,
+                    mime_type="video/mp4" if is_video else "application/pdf",
+                    size=spec.file_size,
+                    dc_id=2,
+                    attributes=attributes,
+                    thumbs=(
+                        [PhotoSize("m", 320, 180, max(1, spec.file_size // 100))]
+                        if is_video
+                        else None
+                    ),
+                )
+            )
+
+        # Albums share a grouped_id and only their first message has a caption
+        grouped_id = None
+        text = f"Message {message_id} in {spec.title}"
+        if spec.album_size > 1 and media is not None:
+            first_id = message_id - (message_id - 1) % spec.album_size
+            grouped_id = spec.channel_id * 10_000_000 + first_id
+            if message_id != first_id:
+                text = ""
+
+        message = Message(
+            id=message_id,
+            peer_id=PeerChannel(spec.channel_id),
+            date=date,
+            message=text,
+            media=media,
+            grouped_id=grouped_id,
+        )
+        # Message.text is only filled in by a real client's parse mode
+        message._text = text
+        return message
+
+    def _resolve(self, entity: Any) -> FakeChannelSpec:
+        """Resolve an entity, dialog or channel id to its specification."""
+        entity = getattr(entity, "entity", entity)
+        channel_id = getattr(entity, "id", entity)
+        if isinstance(entity, PeerChannel):
+            channel_id = entity.channel_id
+        try:
+            return self.channels[channel_id]
+        except KeyError:
+            raise ValueError(f"Unknown channel: {entity!r}") from None
+
+    # TelegramClient API surface
+
+    async def iter_dialogs(self) -> AsyncIterator[FakeDialog]:
+        """Yield a dialog for every simulated channel."""
+        for index, spec in enumerate(self.channels.values()):
+            if index % PAGE_SIZE == 0:
+                await self._round_trip()
+            yield FakeDialog(
+                title=spec.title,
+                entity=FakeEntity(id=spec.channel_id, username=spec.username),
+                unread_count=spec.unread,
+                dialog=FakeRawDialog(
+                    top_message=spec.message_count,
+                    read_inbox_max_id=spec.message_count - spec.unread,
+                ),
+            )
+
+    async def iter_messages(
+        self,
+        entity: Any,
+        limit: Optional[int] = None,
+        offset_date: Optional[datetime] = None,
+        offset_id: int = 0,
+        max_id: int = 0,
+        min_id: int = 0,
+        reverse: bool = False,
+    ) -> AsyncIterator[Message]:
+        """Yield messages newest first (oldest first when ``reverse``)."""
+        spec = self._resolve(entity)
+
+        upper = spec.message_count
+        lower = 1
+        if max_id:
+            upper = min(upper, max_id - 1)
+        if min_id:
+            lower = max(lower, min_id + 1)
+        if offset_date is not None:
+            minutes = int((offset_date - BASE_DATE).total_seconds() // 60)
+            if reverse:
+                lower = max(lower, minutes)
+            else:
+                upper = min(upper, minutes - 1)
+        if offset_id:
+            if reverse:
+                lower = max(lower, offset_id + 1)
+            else:
+                upper = min(upper, offset_id - 1)
+
+        ids = range(lower, upper + 1) if reverse else range(upper, lower - 1, -1)
+        for count, message_id in enumerate(ids):
+            if limit is not None and count >= limit:
+                break
+            if count % PAGE_SIZE == 0:
+                await self._round_trip()
+            yield self._build_message(spec, message_id)
+
+    async def get_messages(
+        self, entity: Any, ids: Union[int, List[int]]
+    ) -> Union[Optional[Message], List[Optional[Message]]]:
+        """Fetch messages by id in a single request."""
+        spec = self._resolve(entity)
+        await self._round_trip()
+
+        def build(message_id: int) -> Optional[Message]:
+            if 1 <= message_id <= spec.message_count:
+                return self._build_message(spec, message_id)
+            return None
+
+        if isinstance(ids, int):
+            return build(ids)
+        return [build(message_id) for message_id in ids]
+
+    async def download_media(
+        self,
+        message: Any,
+        file: Any = None,
+        progress_callback: Optional[Callable[[int, int], Any]] = None,
+        thumb: Any = None,
+    ) -> Optional[Any]:
+        """Simulate downloading the media of a message."""
+        media = getattr(message, "media", None)
+        if media is None:
+            return None
+
+        size = self._media_size(media, thumb)
+        await self._round_trip()
+        self._check_file_reference(media)
+        await self._transfer(size, progress_callback)
+        self.counters.downloads += 1
+
+        corrupt = self._corrupt()
+        if file is None:
+            return self._payload(size, corrupt)
+        if hasattr(file, "write"):
+            remaining = size
+            while remaining:
+                chunk = min(CHUNK_SIZE, remaining)
+                file.write(self._payload(chunk, corrupt and remaining == size))
+                remaining -= chunk
+            return file
+
+        path = Path(file)
+        if self.write_files:
+            with open(path, "wb") as f:
+                f.truncate(size)  # sparse file, no data written
+                if corrupt and size:
+                    f.write(b"\1")
+        return str(path)
+
+    async def iter_download(
+        self,
+        file: Any,
+        offset: int = 0,
+        limit: Optional[int] = None,
+        request_size: int = CHUNK_SIZE,
+        file_size: Optional[int] = None,
+        dc_id: Optional[int] = None,
+    ) -> AsyncIterator[bytes]:
+        """Simulate downloading a file location in parts, one request each."""
+        if file_size is None:
+            raise ValueError("The simulated client needs the file size")
+        count = 0
+        while offset < file_size and (limit is None or count < limit):
+            part = min(request_size, file_size - offset)
+            await self._round_trip()
+            self._check_file_reference(file)
+            await self._transfer(part, None)
+            self.counters.part_requests += 1
+            yield self._payload(part, self._corrupt())
+            offset += part
+            count += 1
+
+    async def __call__(self, request: Any) -> Any:
+        """Simulate a raw API request (only upload.getFileHashes)."""
+        if not isinstance(request, GetFileHashesRequest):
+            raise NotImplementedError(type(request).__name__)
+        await self._round_trip()
+
+        # Served files are all zero bytes
+        size = self._location_size(request.location)
+        hashes: List[FileHash] = []
+        offset = request.offset - request.offset % FILE_HASH_BLOCK_SIZE
+        while offset < size and len(hashes) < FILE_HASHES_PER_REQUEST:
+            block = bytes(min(FILE_HASH_BLOCK_SIZE, size - offset))
+            hashes.append(
+                FileHash(offset, FILE_HASH_BLOCK_SIZE, hashlib.sha256(block).digest())
+            )
+            offset += FILE_HASH_BLOCK_SIZE
+        return hashes
+
+    def _location_size(self, location: Any) -> int:
+        """Get the size of the file an input file location points to."""
+        channel_id, message_id = divmod(location.id, 10_000_000)
+        media = self._build_message(self.channels[channel_id], message_id).media
+        if isinstance(location, InputDocumentFileLocation):
+            return int(media.document.size)
+        for photo_size in media.photo.sizes:
+            if photo_size.type == location.thumb_size:
+                return int(photo_size.size)
+        raise ValueError(f"Unknown photo size: {location.thumb_size}")
+
+    def _corrupt(self) -> bool:
+        """Decide whether the next transfer is corrupted."""
+        if self.network.corruption_rate and (
+            self._rng.random() < self.network.corruption_rate
+        ):
+            self.counters.corrupted_transfers += 1
+            return True
+        return False
+
+    @staticmethod
+    def _payload(size: int, corrupt: bool) -> bytes:
+        """Get the served bytes of a transfer (zeros, one bad if corrupt)."""
+        if corrupt and size:
+            return b"\1" + bytes(size - 1)
+        return bytes(size)
+
+    def _check_file_reference(self, media: Any) -> None:
+        """Raise FileReferenceExpiredError if the media's reference is too old."""
+        lifetime = self.network.file_reference_lifetime
+        item = getattr(media, "photo", None) or getattr(media, "document", None)
+        reference = getattr(item or media, "file_reference", None)
+        if not lifetime or reference is None:
+            return
+        if self.counters.requests - int(reference) > lifetime:
+            raise FileReferenceExpiredError(request=None)
+
+    def _media_size(self, media: Any, thumb: Any) -> int:
+        """Get the number of bytes a download of ``media`` transfers."""
+        if isinstance(media, MessageMediaPhoto):
+            sizes = sorted(media.photo.sizes, key=lambda s: getattr(s, "size", 0) or 0)
+            if thumb is None:
+                return int(sizes[-1].size)
+            if isinstance(thumb, int):
+                return int(sizes[thumb].size)
+            return int(getattr(thumb, "size", sizes[-1].size))
+        if isinstance(media, MessageMediaDocument):
+            if thumb is not None:
+                return int(getattr(thumb, "size", 0))
+            return int(media.document.size)
+        return 0
+
+    async def send_read_acknowledge(
+        self, entity: Any, message: Any = None, max_id: Optional[int] = None
+    ) -> bool:
+        """Record a read acknowledgement."""
+        spec = self._resolve(entity)
+        await self._round_trip()
+
+        if max_id is None:
+            if isinstance(message, list):
+                max_id = max(m.id for m in message) if message else 0
+            elif message is not None:
+                max_id = message.id
+            else:
+                max_id = spec.message_count
+
+        previous = self.counters.read_max_ids.get(spec.channel_id, 0)
+        self.counters.read_max_ids[spec.channel_id] = max(previous, max_id)
+        return True
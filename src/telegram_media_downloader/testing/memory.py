@@ -0,0 +1,189 @@
+"""Per-phase memory measurement of download sessions against the fake client."""
+
+import os
+import sys
+import tracemalloc
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import List, Optional
+
+from ..config.settings import TelegramConfig
+from ..core.downloader import TelegramMediaDownloader
+from ..utils.helpers import create_download_summary_file
+from .fake_client import FakeChannelSpec, FakeTelegramClient
+
+__all__ = [
+    "DEFAULT_BUDGET_BYTES_PER_MESSAGE",
+    "PhaseMemory",
+    "MemoryReport",
+    "measure_session_memory",
+]
+
+# Peak traced bytes allowed per unread message over a whole session; override
+# with TELEGRAM_MEMORY_BUDGET_BYTES_PER_MESSAGE
+DEFAULT_BUDGET_BYTES_PER_MESSAGE = int(
+    os.getenv("TELEGRAM_MEMORY_BUDGET_BYTES_PER_MESSAGE", "4096")
+)
+
+
+@dataclass
+class PhaseMemory:
+    """Memory usage of a single session phase."""
+
+    name: str
+    peak_bytes: int  # traced peak above the phase's starting point
+    retained_bytes: int  # traced bytes still allocated when the phase ended
+    peak_rss_kb: int  # process high-water mark after the phase
+    top_allocators: List[str] = field(default_factory=list)
+
+
+@dataclass
+class MemoryReport:
+    """Memory usage of a session, broken down by phase."""
+
+    message_count: int
+    phases: List[PhaseMemory] = field(default_factory=list)
+
+    @property
+    def peak_bytes(self) -> int:
+        """Get the largest traced peak of any phase."""
+        return max((phase.peak_bytes for phase in self.phases), default=0)
+
+    @property
+    def peak_bytes_per_message(self) -> float:
+        """Get the largest phase peak divided by the number of messages."""
+        if self.message_count == 0:
+            return 0.0
+        return self.peak_bytes / self.message_count
+
+    def get_phase(self, name: str) -> Optional[PhaseMemory]:
+        """Get a phase by name."""
+        for phase in self.phases:
+            if phase.name == name:
+                return phase
+        return None
+
+
+def _peak_rss_kb() -> int:
+    """Get the process peak resident set size in KiB (0 where unsupported)."""
+    try:
+        import resource
+    except ImportError:  # Windows
+        return 0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS reports bytes, Linux reports KiB
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+
+class _PhaseRecorder:
+    """Records tracemalloc usage between phase boundaries."""
+
+    def __init__(self, report: MemoryReport, top: int) -> None:
+        self.report = report
+        self.top = top
+        self._name = ""
+        self._start = 0
+        self._snapshot: Optional[tracemalloc.Snapshot] = None
+
+    def _take_snapshot(self) -> tracemalloc.Snapshot:
+        return tracemalloc.take_snapshot().filter_traces(
+            [tracemalloc.Filter(False, tracemalloc.__file__)]
+        )
+
+    def begin(self, name: str) -> None:
+        self._name = name
+        self._snapshot = self._take_snapshot()
+        tracemalloc.reset_peak()
+        self._start = tracemalloc.get_traced_memory()[0]
+
+    def end(self) -> None:
+        current, peak = tracemalloc.get_traced_memory()
+        assert self._snapshot is not None
+        # Allocators of memory that was allocated during the phase and is
+        # still alive at its end
+        stats = self._take_snapshot().compare_to(self._snapshot, "lineno")
+        self.report.phases.append(
+            PhaseMemory(
+                name=self._name,
+                peak_bytes=max(0, peak - self._start),
+                retained_bytes=max(0, current - self._start),
+                peak_rss_kb=_peak_rss_kb(),
+                top_allocators=[
+                    str(stat) for stat in stats[: self.top] if stat.size_diff > 0
+                ],
+            )
+        )
+
+
+async def measure_session_memory(
+    message_count: int,
+    download_path: Path,
+    channels: int = 1,
+    media_kind: str = "photo",
+    top: int = 5,
+) -> MemoryReport:
+    """
+    Drive a download session through the fake client and record memory.
+
+    Phases are ``iter_dialogs``, ``iter_messages`` (listing one channel's
+    backlog), ``download_session`` (a full ``download_all_unread_media`` run)
+    and ``summary`` (writing the session summary file).
+
+    Args:
+        message_count: Total unread messages, split evenly across channels
+        download_path: Directory for downloads and the summary file
+        channels: Number of simulated channels
+        media_kind: Media kind of the simulated messages
+        top: Number of top allocators recorded per phase
+
+    Returns:
+        MemoryReport with per-phase measurements
+    """
+    per_channel = max(1, message_count // channels)
+    client = FakeTelegramClient(
+        [
+            FakeChannelSpec(
+                title=f"Memory {index}",
+                message_count=per_channel,
+                media_kind=media_kind,
+            )
+            for index in range(channels)
+        ],
+        write_files=False,
+    )
+    downloader = TelegramMediaDownloader(
+        config=TelegramConfig(api_id=1, api_hash="memory", phone_number="+10000000000"),
+        download_path=str(download_path),
+    )
+    downloader.connection.client = client
+
+    report = MemoryReport(message_count=per_channel * channels)
+    recorder = _PhaseRecorder(report, top)
+    was_tracing = tracemalloc.is_tracing()
+    if not was_tracing:
+        tracemalloc.start()
+
+    try:
+        recorder.begin("iter_dialogs")
+        dialogs = await downloader.channel_manager.get_all_channels()
+        recorder.end()
+
+        recorder.begin("iter_messages")
+        messages = await downloader.channel_manager.get_unread_messages(dialogs[0])
+        recorder.end()
+        del messages
+
+        recorder.begin("download_session")
+        session = await downloader.download_all_unread_media(mark_as_read=True)
+        recorder.end()
+
+        recorder.begin("summary")
+        create_download_summary_file(
+            session, str(download_path / "download_summary.txt")
+        )
+        recorder.end()
+    finally:
+        if not was_tracing:
+            tracemalloc.stop()
+
+    return report
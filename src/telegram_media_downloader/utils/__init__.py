@@ -4,11 +4,16 @@ from .helpers import (
     create_download_summary_file,
     format_file_size,
     print_available_channels,
+    print_download_plan,
     print_session_summary,
     sanitize_filename,
     validate_channel_names,
 )
 from .logging import get_logger, setup_colored_logging, setup_logging
+from .media import PhotoSizePolicy
+from .progress import JsonProgressRenderer, ProgressTracker, TtyProgressRenderer
+from .session_export import iter_session_json, write_session_json
+from .tracing import JsonFileSpanExporter, Tracer, render_trace_summary
 
 __all__ = [
     "setup_logging",
@@ -19,5 +24,15 @@ __all__ = [
     "validate_channel_names",
     "create_download_summary_file",
     "print_available_channels",
+    "print_download_plan",
     "sanitize_filename",
+    "PhotoSizePolicy",
+    "Tracer",
+    "JsonFileSpanExporter",
+    "render_trace_summary",
+    "ProgressTracker",
+    "TtyProgressRenderer",
+    "JsonProgressRenderer",
+    "iter_session_json",
+    "write_session_json",
 ]
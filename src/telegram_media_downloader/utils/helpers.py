@@ -4,6 +4,7 @@ from pathlib import Path
 from typing import List
 
 from ..models.channel_stats import ChannelStats
+from ..models.download_plan import DownloadPlan
 from ..models.download_session import DownloadSession
 
 
@@ -31,6 +32,17 @@ def print_session_summary(session: DownloadSession) -> None:
             f"Average files per active channel: {session.average_files_per_channel:.1f}"
         )
 
+    retries = sum(stats.retry_count for stats in session.channel_stats)
+    if retries:
+        recovered = sum(stats.recovered_count for stats in session.channel_stats)
+        print(f"Download retries: {retries} ({recovered} recovered)")
+    stalls = sum(stats.stalled_count for stats in session.channel_stats)
+    if stalls:
+        print(f"Stalled downloads cancelled: {stalls}")
+    corrupted = sum(stats.corrupted_count for stats in session.channel_stats)
+    if corrupted:
+        print(f"Corrupted downloads retried: {corrupted}")
+
     # Channel breakdown
     if session.channel_stats:
         print(f"\n{'='*60}")
@@ -67,7 +79,7 @@ def print_session_summary(session: DownloadSession) -> None:
         print(f"{'='*60}")
         for stats in error_channels:
             print(f"⚠ {stats.name}: {stats.error_count} errors")
-            for error in stats.errors[:3]:  # Show first 3 errors
+            for error in stats.errors[:3]:  # Show 3 sample errors
                 print(f"    - {error}")
             if len(stats.errors) > 3:
                 print(f"    ... and {len(stats.errors) - 3} more errors")
@@ -83,6 +95,57 @@ def print_session_summary(session: DownloadSession) -> None:
     print(f"\n{'='*60}")
 
 
+def print_download_plan(plan: DownloadPlan) -> None:
+    """
+    Print a dry-run download plan.
+
+    Args:
+        plan: DownloadPlan to print
+    """
+    print(f"\n{'='*60}")
+    print("TELEGRAM MEDIA DOWNLOADER - DOWNLOAD PLAN")
+    print(f"{'='*60}")
+
+    print(f"Files to download: {plan.total_files}")
+    print(f"Total size: {format_file_size(plan.total_bytes)}")
+    if plan.free_bytes is not None:
+        print(f"Free space: {format_file_size(plan.free_bytes)}")
+    duration = plan.estimated_duration
+    if duration is not None and plan.bytes_per_second:
+        print(
+            f"Estimated duration: {duration} "
+            f"(at {format_file_size(int(plan.bytes_per_second))}/s)"
+        )
+
+    if plan.channels:
+        print(f"\n{'='*60}")
+        print("PER-CHANNEL PLAN")
+        print(f"{'='*60}")
+        print(
+            f"{'Channel':<35} {'Unread':<8} {'Files':<8} {'Existing':<10} {'Size':<10}"
+        )
+        print(f"{'-'*75}")
+        for channel in plan.channels:
+            print(
+                f"{channel.name[:34]:<35} {channel.candidate_count:<8} "
+                f"{channel.media_count:<8} {channel.existing_count:<10} "
+                f"{format_file_size(channel.total_bytes):<10}"
+            )
+
+    mime_counts = plan.mime_counts
+    if mime_counts:
+        print(f"\n{'='*60}")
+        print("FILES PER MIME TYPE")
+        print(f"{'='*60}")
+        for mime_type, count in mime_counts.items():
+            print(f"{mime_type:<35} {count}")
+
+    for warning in plan.get_warnings():
+        print(f"\n⚠️  {warning}")
+
+    print(f"\n{'='*60}")
+
+
 def format_file_size(size_bytes: int) -> str:
     """
     Format file size in human-readable format.
@@ -105,6 +168,28 @@ def format_file_size(size_bytes: int) -> str:
     return f"{size_bytes:.1f} {size_names[i]}"
 
 
+def parse_file_size(text: str) -> int:
+    """
+    Parse a human-readable file size.
+
+    Args:
+        text: Size such as "1500", "500KB", "1.5 GB" (binary units)
+
+    Returns:
+        Size in bytes
+
+    Raises:
+        ValueError: If the size cannot be parsed
+    """
+    units = {"": 1, "B": 1, "KB": 1024, "MB": 1024**2, "GB": 1024**3, "TB": 1024**4}
+    value = text.strip().upper()
+    number = value.rstrip("KMGTB").strip()
+    unit = value[len(number) :].strip()
+    if unit not in units or not number:
+        raise ValueError(f"Invalid file size: {text!r}")
+    return int(float(number) * units[unit])
+
+
 def validate_channel_names(
     channel_names: List[str], available_channels: List[str]
 ) -> List[str]:
@@ -170,8 +255,12 @@ def create_download_summary_file(session: DownloadSession, filepath: str) -> Non
 
             if stats.errors:
                 f.write(f"  Errors ({len(stats.errors)}):\n")
+                for error_class, count in stats.errors.get_counts_by_class().items():
+                    f.write(f"    {error_class}: {count}\n")
                 for error in stats.errors:
                     f.write(f"    - {error}\n")
+                if stats.errors.dropped:
+                    f.write(f"    ... {stats.errors.dropped} more not retained\n")
             f.write("\n")
 
         # Session errors
@@ -0,0 +1,353 @@
+"""Helpers for inspecting message media without downloading it."""
+
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+
+from telethon.tl.types import (
+    DocumentAttributeVideo,
+    MessageMediaDocument,
+    MessageMediaPhoto,
+    PhotoCachedSize,
+    PhotoSize,
+    PhotoSizeProgressive,
+    PhotoStrippedSize,
+)
+from telethon.utils import stripped_photo_to_jpg
+
+from ..protocols.telegram_message import TelegramMessage
+
+__all__ = [
+    "get_mime_type",
+    "get_photo_size_bytes",
+    "get_downloadable_photo_sizes",
+    "get_media_size",
+    "get_media_duration",
+    "get_media_resolution",
+    "get_preview_sizes",
+    "get_inline_thumbnail",
+    "PHOTO_SIZE_MODES",
+    "PhotoSizePolicy",
+    "get_album_id",
+    "group_albums",
+]
+
+PHOTO_SIZE_MODES = ("largest", "max-dimension", "max-bytes", "type")
+
+
+def get_mime_type(message: TelegramMessage) -> Optional[str]:
+    """
+    Get MIME type from message media.
+
+    Args:
+        message: Telegram message object
+
+    Returns:
+        MIME type string or None
+    """
+    if isinstance(message.media, MessageMediaDocument):
+        return message.media.document.mime_type
+    elif isinstance(message.media, MessageMediaPhoto):
+        return "image/jpeg"
+    return None
+
+
+def get_photo_size_bytes(size: Any) -> int:
+    """
+    Get the byte size of a photo size variant.
+
+    Args:
+        size: PhotoSize, PhotoSizeProgressive or PhotoCachedSize
+
+    Returns:
+        Size in bytes (0 for variants without a known size)
+    """
+    if isinstance(size, PhotoSize):
+        return int(size.size)
+    if isinstance(size, PhotoSizeProgressive):
+        return int(max(size.sizes, default=0))
+    if isinstance(size, PhotoCachedSize):
+        return len(size.bytes)
+    return 0
+
+
+def get_downloadable_photo_sizes(photo: Any) -> List[Any]:
+    """
+    Get the downloadable size variants of a photo, smallest first.
+
+    Stripped and vector thumbnails are excluded.
+
+    Args:
+        photo: Telethon Photo object
+
+    Returns:
+        Photo size variants ordered by byte size
+    """
+    return _downloadable_sizes(getattr(photo, "sizes", None) or [])
+
+
+def _downloadable_sizes(sizes: Iterable[Any]) -> List[Any]:
+    """Keep the downloadable size variants, smallest first."""
+    downloadable = [
+        size
+        for size in sizes
+        if isinstance(size, (PhotoSize, PhotoSizeProgressive, PhotoCachedSize))
+    ]
+    return sorted(downloadable, key=get_photo_size_bytes)
+
+
+def _video_attribute(message: TelegramMessage) -> Optional[DocumentAttributeVideo]:
+    """Get the video attribute of a document message."""
+    media = message.media
+    if isinstance(media, MessageMediaDocument) and media.document is not None:
+        for attribute in getattr(media.document, "attributes", None) or []:
+            if isinstance(attribute, DocumentAttributeVideo):
+                return attribute
+    return None
+
+
+def get_media_duration(message: TelegramMessage) -> Optional[float]:
+    """
+    Get the duration of video media in seconds.
+
+    Args:
+        message: Telegram message object
+
+    Returns:
+        Duration, or None for media without a video attribute
+    """
+    attribute = _video_attribute(message)
+    return float(attribute.duration) if attribute is not None else None
+
+
+def get_media_resolution(message: TelegramMessage) -> Optional[Tuple[int, int]]:
+    """
+    Get the width and height of video or photo media.
+
+    Photos report their largest size variant.
+
+    Args:
+        message: Telegram message object
+
+    Returns:
+        (width, height), or None when unknown
+    """
+    attribute = _video_attribute(message)
+    if attribute is not None:
+        return int(attribute.w), int(attribute.h)
+    media = message.media
+    if isinstance(media, MessageMediaPhoto) and media.photo is not None:
+        sizes = [
+            size
+            for size in get_downloadable_photo_sizes(media.photo)
+            if hasattr(size, "w")
+        ]
+        if sizes:
+            return int(sizes[-1].w), int(sizes[-1].h)
+    return None
+
+
+def _thumbnail_sizes(media: Any) -> List[Any]:
+    """Get the photo sizes or document thumbnails of message media."""
+    if isinstance(media, MessageMediaPhoto) and media.photo is not None:
+        return list(getattr(media.photo, "sizes", None) or [])
+    if isinstance(media, MessageMediaDocument) and media.document is not None:
+        return list(getattr(media.document, "thumbs", None) or [])
+    return []
+
+
+def get_preview_sizes(media: Any) -> List[Any]:
+    """
+    Get the downloadable preview variants of message media, smallest first.
+
+    Photos offer their size variants; documents (e.g. videos) their
+    thumbnails.
+
+    Args:
+        media: Message media
+
+    Returns:
+        Downloadable size variants ordered by byte size
+    """
+    return _downloadable_sizes(_thumbnail_sizes(media))
+
+
+def get_inline_thumbnail(media: Any) -> Optional[bytes]:
+    """
+    Get a thumbnail sent inline with the message, as JPEG bytes.
+
+    Cached sizes are complete JPEGs; stripped sizes are expanded with the
+    standard JPEG header. Neither needs a download.
+
+    Args:
+        media: Message media
+
+    Returns:
+        JPEG bytes, or None without an inline thumbnail
+    """
+    sizes = _thumbnail_sizes(media)
+    for size in sizes:
+        if isinstance(size, PhotoCachedSize):
+            return bytes(size.bytes)
+    for size in sizes:
+        if isinstance(size, PhotoStrippedSize):
+            return bytes(stripped_photo_to_jpg(size.bytes))
+    return None
+
+
+@dataclass(frozen=True)
+class PhotoSizePolicy:
+    """Which size variant of a photo to download.
+
+    Modes:
+        largest: The largest variant (what ``download_media`` fetches)
+        max-dimension: The largest variant whose longer side is at most
+            ``value`` pixels
+        max-bytes: The largest variant of at most ``value`` bytes
+        type: The variant with size type ``value`` (e.g. "x")
+
+    When no variant satisfies a limit the smallest one is used; when the
+    requested type is missing the largest one is used. The chosen type is
+    recorded with each download, so "type=<recorded>" fetches the same
+    variant again.
+    """
+
+    mode: str = "largest"
+    value: Optional[Union[int, str]] = None
+
+    def __post_init__(self) -> None:
+        if self.mode not in PHOTO_SIZE_MODES:
+            raise ValueError(f"Unknown photo size mode: {self.mode!r}")
+        if self.mode != "largest" and self.value is None:
+            raise ValueError(f"Photo size mode {self.mode!r} needs a value")
+
+    @classmethod
+    def parse(cls, text: str) -> "PhotoSizePolicy":
+        """
+        Parse a policy such as "largest", "max-dimension=1280",
+        "max-bytes=300KB" or "type=x".
+
+        Args:
+            text: Policy text
+
+        Returns:
+            Parsed policy
+
+        Raises:
+            ValueError: If the policy cannot be parsed
+        """
+        mode, _, value = text.strip().partition("=")
+        if mode == "largest":
+            return cls()
+        if mode == "max-dimension":
+            return cls(mode, int(value))
+        if mode == "max-bytes":
+            from .helpers import parse_file_size
+
+            return cls(mode, parse_file_size(value))
+        return cls(mode, value or None)
+
+    @property
+    def is_default(self) -> bool:
+        """Check if the policy selects what a plain download fetches."""
+        return self.mode == "largest"
+
+    def select(self, photo: Any) -> Optional[Any]:
+        """
+        Select the size variant of a photo to download.
+
+        Args:
+            photo: Telethon Photo object
+
+        Returns:
+            Chosen size variant, or None for photos without one
+        """
+        sizes = get_downloadable_photo_sizes(photo)
+        if not sizes:
+            return None
+        if self.mode == "type":
+            matching = [size for size in sizes if size.type == self.value]
+            return matching[-1] if matching else sizes[-1]
+
+        fitting = sizes
+        if self.mode == "max-dimension":
+            assert isinstance(self.value, int)
+            fitting = [s for s in sizes if max(s.w, s.h) <= self.value]
+        elif self.mode == "max-bytes":
+            assert isinstance(self.value, int)
+            fitting = [s for s in sizes if get_photo_size_bytes(s) <= self.value]
+        return fitting[-1] if fitting else sizes[0]
+
+    def __str__(self) -> str:
+        """String representation of the policy."""
+        if self.value is None:
+            return self.mode
+        return f"{self.mode}={self.value}"
+
+
+def get_album_id(message: TelegramMessage) -> Optional[int]:
+    """
+    Get the id of the album (``grouped_id``) a message belongs to.
+
+    Args:
+        message: Telegram message object
+
+    Returns:
+        Album id, or None for messages outside an album
+    """
+    return getattr(message, "grouped_id", None)
+
+
+def group_albums(messages: Iterable[TelegramMessage]) -> List[List[TelegramMessage]]:
+    """
+    Group the messages of each album together.
+
+    Groups keep the order in which their first message appears; album
+    members are sorted by message id. Messages outside an album form a group
+    of their own.
+
+    Args:
+        messages: Telegram message objects
+
+    Returns:
+        Message groups
+    """
+    groups: List[List[TelegramMessage]] = []
+    albums: Dict[int, List[TelegramMessage]] = {}
+    for message in messages:
+        album_id = get_album_id(message)
+        if album_id is None:
+            groups.append([message])
+        elif album_id in albums:
+            albums[album_id].append(message)
+        else:
+            albums[album_id] = [message]
+            groups.append(albums[album_id])
+    for group in groups:
+        group.sort(key=lambda message: message.id)
+    return groups
+
+
+def get_media_size(
+    message: TelegramMessage, photo_size_policy: Optional[PhotoSizePolicy] = None
+) -> int:
+    """
+    Get the number of bytes a download of the message media transfers.
+
+    Documents report ``document.size``; photos report the variant chosen by
+    the photo size policy (the largest one by default, which is what
+    ``download_media`` fetches).
+
+    Args:
+        message: Telegram message object
+        photo_size_policy: Photo size policy of the download
+
+    Returns:
+        Size in bytes (0 when unknown or without media)
+    """
+    media = message.media
+    if isinstance(media, MessageMediaDocument) and media.document is not None:
+        return int(getattr(media.document, "size", 0) or 0)
+    if isinstance(media, MessageMediaPhoto) and media.photo is not None:
+        size = (photo_size_policy or PhotoSizePolicy()).select(media.photo)
+        return get_photo_size_bytes(size) if size is not None else 0
+    return 0
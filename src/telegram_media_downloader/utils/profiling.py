@@ -0,0 +1,233 @@
+"""Profiling utilities for whole download sessions."""
+
+import asyncio
+import cProfile
+import logging
+import sys
+import threading
+import time
+import traceback
+from collections import Counter
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator, Optional, Union
+
+__all__ = [
+    "PROFILE_MODES",
+    "DEFAULT_SLOW_CALLBACK_THRESHOLD",
+    "SamplingProfiler",
+    "SlowCallbackDetector",
+    "default_profile_output",
+    "profile_session",
+]
+
+PROFILE_MODES = ("cprofile", "sample")
+
+DEFAULT_SLOW_CALLBACK_THRESHOLD = 0.1
+
+
+class SamplingProfiler:
+    """Low-overhead statistical profiler for a single thread.
+
+    A background thread periodically captures the target thread's stack and
+    counts identical stacks, producing the "collapsed stacks" format read by
+    flamegraph.pl, speedscope and similar tools.
+    """
+
+    def __init__(self, interval: float = 0.005) -> None:
+        """
+        Initialize sampling profiler.
+
+        Args:
+            interval: Seconds between samples
+        """
+        self.interval = interval
+        self.samples: Counter[str] = Counter()
+        self._target_thread_id = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        """Start sampling the calling thread."""
+        self._target_thread_id = threading.get_ident()
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="sampling-profiler", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop sampling."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self) -> None:
+        """Sampling loop executed in the background thread."""
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self._target_thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(
+                    f"{code.co_name} ({Path(code.co_filename).name}:"
+                    f"{code.co_firstlineno})"
+                )
+                frame = frame.f_back
+            if stack:
+                self.samples[";".join(reversed(stack))] += 1
+
+    def write(self, path: Union[str, Path]) -> None:
+        """
+        Write samples in collapsed stack format.
+
+        Args:
+            path: Output file path
+        """
+        with open(path, "w", encoding="utf-8") as f:
+            for stack, count in self.samples.most_common():
+                f.write(f"{stack} {count}\n")
+
+
+class SlowCallbackDetector:
+    """Logs event loop callbacks that block the loop for too long.
+
+    A heartbeat scheduled on the loop records when it last ran. A watcher
+    thread captures the loop thread's stack while a heartbeat is overdue, and
+    the late heartbeat logs how long the loop was blocked and where.
+    """
+
+    def __init__(
+        self,
+        threshold: float = DEFAULT_SLOW_CALLBACK_THRESHOLD,
+        logger: Optional[logging.Logger] = None,
+    ) -> None:
+        """
+        Initialize slow callback detector.
+
+        Args:
+            threshold: Seconds a callback may block the loop before it is logged
+            logger: Logger for slow callback reports
+        """
+        self.threshold = threshold
+        self.logger = logger or logging.getLogger(self.__class__.__name__)
+        self.slow_callbacks = 0
+        self._interval = threshold / 2
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._handle: Optional[asyncio.TimerHandle] = None
+        self._loop_thread_id = 0
+        self._expected_beat = 0.0
+        self._blocked_stack: Optional[str] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        """Start monitoring the running event loop."""
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        self._stop.clear()
+        self._schedule_beat()
+        self._thread = threading.Thread(
+            target=self._watch, name="slow-callback-detector", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop monitoring."""
+        self._stop.set()
+        if self._handle is not None:
+            self._handle.cancel()
+            self._handle = None
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _schedule_beat(self) -> None:
+        assert self._loop is not None
+        self._expected_beat = time.monotonic() + self._interval
+        self._handle = self._loop.call_later(self._interval, self._beat)
+
+    def _beat(self) -> None:
+        """Heartbeat callback; reports how late it ran."""
+        blocked = time.monotonic() - self._expected_beat
+        if blocked > self.threshold:
+            self.slow_callbacks += 1
+            self.logger.warning(
+                f"Event loop blocked for {blocked:.3f}s "
+                f"(threshold {self.threshold:.3f}s)"
+                + (
+                    f"; blocking stack:\n{self._blocked_stack}"
+                    if self._blocked_stack
+                    else ""
+                )
+            )
+        self._blocked_stack = None
+        if not self._stop.is_set():
+            self._schedule_beat()
+
+    def _watch(self) -> None:
+        """Capture the loop thread's stack while a heartbeat is overdue."""
+        while not self._stop.wait(self.threshold / 4):
+            overdue = time.monotonic() - self._expected_beat
+            if overdue > self.threshold and self._blocked_stack is None:
+                frame = sys._current_frames().get(self._loop_thread_id)
+                if frame is not None:
+                    self._blocked_stack = "".join(traceback.format_stack(frame)[-8:])
+
+
+def default_profile_output(mode: str, download_path: Union[str, Path]) -> Path:
+    """
+    Get the default profile output path, next to ``download_summary.txt``.
+
+    Args:
+        mode: Profiling mode (``cprofile`` or ``sample``)
+        download_path: Download directory
+
+    Returns:
+        Output file path
+    """
+    suffix = "prof" if mode == "cprofile" else "collapsed"
+    return Path(download_path) / f"profile.{suffix}"
+
+
+@contextmanager
+def profile_session(
+    mode: Optional[str], output: Optional[Union[str, Path]] = None
+) -> Iterator[None]:
+    """
+    Profile the enclosed code and write the result to ``output``.
+
+    Args:
+        mode: ``cprofile`` (deterministic, pstats output), ``sample``
+            (statistical, collapsed stacks output) or None to disable
+        output: Output file path (profiling is disabled when None)
+    """
+    if mode is None or output is None:
+        yield
+        return
+    if mode not in PROFILE_MODES:
+        raise ValueError(f"Unknown profile mode: {mode}")
+
+    output = Path(output)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    logger = logging.getLogger("Profiler")
+
+    if mode == "cprofile":
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            yield
+        finally:
+            profiler.disable()
+            profiler.dump_stats(str(output))
+            logger.info(f"cProfile stats written to {output}")
+    else:
+        sampler = SamplingProfiler()
+        sampler.start()
+        try:
+            yield
+        finally:
+            sampler.stop()
+            sampler.write(output)
+            logger.info(f"Sampled stacks written to {output}")
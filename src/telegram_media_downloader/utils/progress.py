@@ -0,0 +1,360 @@
+"""Throttled live progress reporting for download sessions.
+
+Download progress callbacks only store the latest byte count of their
+transfer; aggregation and rendering happen on a fixed interval in a single
+background task, so hundreds of concurrent downloads cost a few attribute
+writes per chunk rather than a redraw each.
+"""
+
+import asyncio
+import json
+import sys
+import time
+from dataclasses import asdict, dataclass, field
+from typing import Callable, Dict, List, Optional, Protocol, TextIO, Tuple
+
+from .helpers import format_file_size
+
+__all__ = [
+    "PROGRESS_MODES",
+    "ProgressSnapshot",
+    "ProgressRenderer",
+    "TtyProgressRenderer",
+    "JsonProgressRenderer",
+    "ProgressTracker",
+    "create_progress_tracker",
+]
+
+PROGRESS_MODES = ("tty", "json", "none")
+
+
+@dataclass
+class ProgressSnapshot:
+    """Point-in-time progress of a channel or the whole session."""
+
+    name: str
+    files_done: int = 0
+    files_failed: int = 0
+    files_total: int = 0
+    files_in_flight: int = 0
+    bytes_done: int = 0
+    files_per_s: float = 0.0
+    bytes_per_s: float = 0.0
+    eta_s: Optional[float] = None
+
+    @property
+    def mb_per_s(self) -> float:
+        """Get transfer rate in MB/s."""
+        return self.bytes_per_s / (1024 * 1024)
+
+
+@dataclass(slots=True)
+class _Transfer:
+    """A single in-flight download."""
+
+    received: int
+    total: int
+
+
+@dataclass
+class _ChannelProgress:
+    """Running counters for one channel."""
+
+    files_done: int = 0
+    files_failed: int = 0
+    files_total: int = 0
+    bytes_finished: int = 0
+    started: float = field(default_factory=time.monotonic)
+    transfers: Dict[int, _Transfer] = field(default_factory=dict)
+    last_bytes: int = 0
+    last_time: float = field(default_factory=time.monotonic)
+    rate: float = 0.0
+
+
+class ProgressRenderer(Protocol):
+    """Protocol for progress renderers."""
+
+    def render(
+        self, overall: ProgressSnapshot, channels: List[ProgressSnapshot]
+    ) -> None:
+        """Render a progress update."""
+        ...
+
+    def close(self) -> None:
+        """Finish rendering (e.g. move past the progress lines)."""
+        ...
+
+
+def _format_eta(seconds: Optional[float]) -> str:
+    """Format an ETA as H:MM:SS."""
+    if seconds is None:
+        return "--:--"
+    minutes, secs = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}:{minutes:02d}:{secs:02d}" if hours else f"{minutes:02d}:{secs:02d}"
+
+
+class TtyProgressRenderer:
+    """Redraws an overall line and per-channel lines in place on a terminal."""
+
+    def __init__(self, stream: Optional[TextIO] = None, max_channels: int = 5) -> None:
+        """
+        Initialize TTY renderer.
+
+        Args:
+            stream: Terminal stream (defaults to stderr)
+            max_channels: Maximum number of active channels shown
+        """
+        self.stream = stream or sys.stderr
+        self.max_channels = max_channels
+        self._lines_drawn = 0
+
+    def _format(self, snapshot: ProgressSnapshot) -> str:
+        return (
+            f"{snapshot.name[:30]:<30} "
+            f"{snapshot.files_done + snapshot.files_failed}/{snapshot.files_total} "
+            f"files  {format_file_size(snapshot.bytes_done):>9}  "
+            f"{snapshot.files_per_s:6.1f} files/s  "
+            f"{snapshot.mb_per_s:7.2f} MB/s  "
+            f"ETA {_format_eta(snapshot.eta_s)}"
+        )
+
+    def render(
+        self, overall: ProgressSnapshot, channels: List[ProgressSnapshot]
+    ) -> None:
+        """Redraw the progress block."""
+        active = [c for c in channels if c.files_in_flight][: self.max_channels]
+        lines = [self._format(overall)] + [f"  {self._format(c)}" for c in active]
+
+        # Move to the start of the previous block, redraw each line and clear
+        # anything left over from a taller previous block
+        output = "\x1b[F" * max(0, self._lines_drawn - 1) + "\r"
+        output += "\n".join(f"\x1b[K{line}" for line in lines) + "\x1b[J"
+
+        self.stream.write(output)
+        self.stream.flush()
+        self._lines_drawn = len(lines)
+
+    def close(self) -> None:
+        """Move the cursor below the progress block."""
+        if self._lines_drawn:
+            self.stream.write("\n")
+            self.stream.flush()
+            self._lines_drawn = 0
+
+
+class JsonProgressRenderer:
+    """Writes one JSON object per update (for log shippers and dashboards)."""
+
+    def __init__(self, stream: Optional[TextIO] = None) -> None:
+        """
+        Initialize JSON renderer.
+
+        Args:
+            stream: Output stream (defaults to stdout)
+        """
+        self.stream = stream or sys.stdout
+
+    def render(
+        self, overall: ProgressSnapshot, channels: List[ProgressSnapshot]
+    ) -> None:
+        """Write a progress line."""
+        record = {
+            "timestamp": time.time(),
+            "overall": asdict(overall),
+            "channels": [asdict(c) for c in channels if c.files_in_flight],
+        }
+        self.stream.write(json.dumps(record, separators=(",", ":")) + "\n")
+        self.stream.flush()
+
+    def close(self) -> None:
+        """Nothing to finish for line-oriented output."""
+
+
+class ProgressTracker:
+    """Collects download progress and renders it periodically."""
+
+    def __init__(
+        self,
+        renderer: Optional[ProgressRenderer] = None,
+        interval: float = 0.5,
+        smoothing: float = 0.3,
+    ) -> None:
+        """
+        Initialize progress tracker.
+
+        Args:
+            renderer: Output renderer (progress is only collected when None)
+            interval: Seconds between renders
+            smoothing: Weight of the newest sample in the MB/s moving average
+        """
+        self.renderer = renderer
+        self.interval = interval
+        self.smoothing = smoothing
+        self.started = time.monotonic()
+        self._channels: Dict[str, _ChannelProgress] = {}
+        self._task: Optional["asyncio.Task[None]"] = None
+        self._overall_last: Tuple[float, int] = (self.started, 0)
+        self._overall_rate = 0.0
+
+    def _channel(self, channel_name: str) -> _ChannelProgress:
+        progress = self._channels.get(channel_name)
+        if progress is None:
+            progress = self._channels[channel_name] = _ChannelProgress()
+        return progress
+
+    # Hooks called by the downloader
+
+    def add_expected(self, channel_name: str, files: int) -> None:
+        """Register the number of files a channel is expected to download."""
+        self._channel(channel_name).files_total += files
+
+    def callback(
+        self, channel_name: str, message_id: int
+    ) -> Callable[[int, int], None]:
+        """
+        Create a ``progress_callback`` for a single download.
+
+        The returned callable only records the latest byte count.
+        """
+        transfer = _Transfer(0, 0)
+        self._channel(channel_name).transfers[message_id] = transfer
+
+        def update(received: int, total: int) -> None:
+            transfer.received = received
+            transfer.total = total
+
+        return update
+
+    def file_finished(
+        self, channel_name: str, message_id: int, success: bool = True
+    ) -> None:
+        """Record the end of a download."""
+        progress = self._channel(channel_name)
+        transfer = progress.transfers.pop(message_id, None)
+        if success:
+            progress.files_done += 1
+            if transfer is not None:
+                progress.bytes_finished += transfer.received
+        else:
+            progress.files_failed += 1
+
+    # Aggregation and rendering
+
+    def _snapshot(
+        self, name: str, progress: _ChannelProgress, now: float
+    ) -> ProgressSnapshot:
+        in_flight = sum(t.received for t in progress.transfers.values())
+        bytes_done = progress.bytes_finished + in_flight
+
+        elapsed = now - progress.last_time
+        if elapsed > 0:
+            rate = (bytes_done - progress.last_bytes) / elapsed
+            progress.rate += self.smoothing * (rate - progress.rate)
+            progress.last_bytes = bytes_done
+            progress.last_time = now
+
+        processed = progress.files_done + progress.files_failed
+        files_per_s = processed / max(now - progress.started, 1e-9)
+        remaining = max(0, progress.files_total - processed)
+        eta = remaining / files_per_s if files_per_s > 0 else None
+
+        return ProgressSnapshot(
+            name=name,
+            files_done=progress.files_done,
+            files_failed=progress.files_failed,
+            files_total=progress.files_total,
+            files_in_flight=len(progress.transfers),
+            bytes_done=bytes_done,
+            files_per_s=files_per_s,
+            bytes_per_s=max(0.0, progress.rate),
+            eta_s=eta,
+        )
+
+    def snapshot(self) -> Tuple[ProgressSnapshot, List[ProgressSnapshot]]:
+        """
+        Aggregate the current progress.
+
+        Returns:
+            Tuple of (overall snapshot, per-channel snapshots)
+        """
+        now = time.monotonic()
+        channels = [
+            self._snapshot(name, progress, now)
+            for name, progress in self._channels.items()
+        ]
+
+        overall = ProgressSnapshot(name="Overall")
+        for channel in channels:
+            overall.files_done += channel.files_done
+            overall.files_failed += channel.files_failed
+            overall.files_total += channel.files_total
+            overall.files_in_flight += channel.files_in_flight
+            overall.bytes_done += channel.bytes_done
+
+        last_time, last_bytes = self._overall_last
+        if now > last_time:
+            rate = (overall.bytes_done - last_bytes) / (now - last_time)
+            self._overall_rate += self.smoothing * (rate - self._overall_rate)
+            self._overall_last = (now, overall.bytes_done)
+        overall.bytes_per_s = max(0.0, self._overall_rate)
+
+        processed = overall.files_done + overall.files_failed
+        overall.files_per_s = processed / max(now - self.started, 1e-9)
+        remaining = max(0, overall.files_total - processed)
+        if overall.files_per_s > 0:
+            overall.eta_s = remaining / overall.files_per_s
+
+        return overall, channels
+
+    def render(self) -> None:
+        """Render the current progress immediately."""
+        if self.renderer is not None:
+            overall, channels = self.snapshot()
+            self.renderer.render(overall, channels)
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            self.render()
+
+    def start(self) -> None:
+        """Start periodic rendering in the running event loop."""
+        if self.renderer is not None and self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop periodic rendering after a final update."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self.renderer is not None:
+            self.render()
+            self.renderer.close()
+
+
+def create_progress_tracker(
+    mode: str, interval: float = 0.5
+) -> Optional[ProgressTracker]:
+    """
+    Create a progress tracker for a CLI progress mode.
+
+    Args:
+        mode: ``tty`` (in-place lines on stderr), ``json`` (one JSON line per
+            update on stdout) or ``none``
+        interval: Seconds between renders
+
+    Returns:
+        Progress tracker, or None when progress is disabled
+    """
+    if mode == "none":
+        return None
+    if mode == "tty":
+        return ProgressTracker(TtyProgressRenderer(), interval=interval)
+    if mode == "json":
+        return ProgressTracker(JsonProgressRenderer(), interval=interval)
+    raise ValueError(f"Unknown progress mode: {mode}")
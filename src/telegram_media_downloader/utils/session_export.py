@@ -0,0 +1,134 @@
+"""Machine-readable session export.
+
+Sessions are serialised as a JSON document whose ``channels`` array is
+written one channel at a time, so exporting a session with thousands of
+channels never holds more than one channel's JSON in memory.
+"""
+
+import json
+from datetime import datetime
+from typing import Any, Dict, Iterable, Iterator, Optional, TextIO
+
+from ..models.channel_stats import ChannelStats
+from ..models.download_session import DownloadSession
+
+__all__ = [
+    "channel_stats_to_dict",
+    "session_to_dict",
+    "iter_json_document",
+    "iter_session_json",
+    "write_session_json",
+]
+
+
+def _isoformat(value: Optional[datetime]) -> Optional[str]:
+    return value.isoformat() if value is not None else None
+
+
+def channel_stats_to_dict(stats: ChannelStats) -> Dict[str, Any]:
+    """
+    Convert channel stats to a JSON-serialisable dictionary.
+
+    Args:
+        stats: Channel statistics
+
+    Returns:
+        Dictionary of channel stats, timings and error counts
+    """
+    return {
+        "name": stats.name,
+        "unread_count": stats.unread_count,
+        "media_count": stats.media_count,
+        "downloaded_count": stats.downloaded_count,
+        "bytes_downloaded": stats.bytes_downloaded,
+        "retry_count": stats.retry_count,
+        "recovered_count": stats.recovered_count,
+        "stalled_count": stats.stalled_count,
+        "corrupted_count": stats.corrupted_count,
+        "skipped_count": stats.skipped_count,
+        "success_rate": stats.success_rate,
+        "start_time": _isoformat(stats.start_time),
+        "end_time": _isoformat(stats.end_time),
+        "elapsed_seconds": stats.elapsed_seconds,
+        "bytes_per_second": stats.bytes_per_second,
+        "error_count": stats.error_count,
+        "errors_by_class": stats.errors.get_counts_by_class(),
+        "error_samples": list(stats.errors),
+    }
+
+
+def session_to_dict(session: DownloadSession) -> Dict[str, Any]:
+    """
+    Convert session totals to a JSON-serialisable dictionary.
+
+    Channel stats are not included; see ``iter_session_json``.
+
+    Args:
+        session: Download session
+
+    Returns:
+        Dictionary of session totals, timings and error counts
+    """
+    return {
+        "start_time": _isoformat(session.start_time),
+        "end_time": _isoformat(session.end_time),
+        "elapsed_seconds": session.duration.total_seconds(),
+        "total_channels": session.total_channels,
+        "total_unread": session.total_unread,
+        "total_media": session.total_media,
+        "total_downloaded": session.total_downloaded,
+        "total_bytes_downloaded": session.total_bytes_downloaded,
+        "bytes_per_second": session.bytes_per_second,
+        "success_rate": session.success_rate,
+        "total_errors": session.total_errors,
+        "errors_by_class": session.get_error_counts_by_class(),
+        "session_errors": list(session.errors),
+    }
+
+
+def iter_json_document(
+    fields: Dict[str, Any], channels: Iterable[Dict[str, Any]]
+) -> Iterator[str]:
+    """
+    Encode ``fields`` plus a streamed ``channels`` array as JSON chunks.
+
+    Args:
+        fields: Top-level fields of the document
+        channels: Channel dictionaries, consumed lazily
+
+    Yields:
+        Consecutive chunks of the JSON document
+    """
+    head = json.dumps(fields, ensure_ascii=False)
+    yield head[:-1] + (', "channels": [' if fields else '"channels": [')
+    for index, channel in enumerate(channels):
+        yield ("," if index else "") + json.dumps(channel, ensure_ascii=False)
+    yield "]}"
+
+
+def iter_session_json(session: DownloadSession) -> Iterator[str]:
+    """
+    Encode a session as JSON chunks, one channel at a time.
+
+    Args:
+        session: Download session
+
+    Yields:
+        Consecutive chunks of the JSON document
+    """
+    return iter_json_document(
+        session_to_dict(session),
+        (channel_stats_to_dict(stats) for stats in session.channel_stats),
+    )
+
+
+def write_session_json(session: DownloadSession, stream: TextIO) -> None:
+    """
+    Write a session as a JSON document to a text stream.
+
+    Args:
+        session: Download session
+        stream: Output stream
+    """
+    for chunk in iter_session_json(session):
+        stream.write(chunk)
@@ -0,0 +1,427 @@
+"""Lightweight span tracing for download sessions.
+
+Spans are written as OpenTelemetry (OTLP/JSON) ``ExportTraceServiceRequest``
+lines, the same layout the OpenTelemetry Collector file exporter produces, so
+trace files can be loaded by standard tooling as well as summarised locally.
+"""
+
+import contextvars
+import json
+import os
+import random
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Protocol, Tuple, Union
+
+__all__ = [
+    "Span",
+    "SpanExporter",
+    "JsonFileSpanExporter",
+    "Tracer",
+    "load_spans",
+    "render_trace_summary",
+]
+
+SERVICE_NAME = "telegram-media-downloader"
+SCOPE_NAME = "telegram_media_downloader"
+
+# OTLP status codes
+STATUS_UNSET = 0
+STATUS_ERROR = 2
+
+_current_span: contextvars.ContextVar[Optional["Span"]] = contextvars.ContextVar(
+    "telegram_media_downloader_current_span", default=None
+)
+
+
+@dataclass
+class Span:
+    """A single timed operation within a trace."""
+
+    name: str
+    trace_id: str = ""
+    span_id: str = ""
+    parent_span_id: Optional[str] = None
+    start_time_ns: int = 0
+    end_time_ns: int = 0
+    attributes: Dict[str, Any] = field(default_factory=dict)
+    status_code: int = STATUS_UNSET
+    status_message: str = ""
+    sampled: bool = True
+
+    @property
+    def duration_ns(self) -> int:
+        """Get span duration in nanoseconds."""
+        return max(0, self.end_time_ns - self.start_time_ns)
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        """Attach an attribute to the span (no-op when not sampled)."""
+        if self.sampled:
+            self.attributes[key] = value
+
+    def record_error(self, error: BaseException) -> None:
+        """Mark the span as failed."""
+        if self.sampled:
+            self.status_code = STATUS_ERROR
+            self.status_message = f"{type(error).__name__}: {error}"
+
+    def to_otlp(self) -> Dict[str, Any]:
+        """Convert the span to its OTLP/JSON representation."""
+        span: Dict[str, Any] = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": 1,  # SPAN_KIND_INTERNAL
+            "startTimeUnixNano": str(self.start_time_ns),
+            "endTimeUnixNano": str(self.end_time_ns),
+            "attributes": [
+                {"key": key, "value": _to_any_value(value)}
+                for key, value in self.attributes.items()
+            ],
+            "status": {"code": self.status_code},
+        }
+        if self.parent_span_id:
+            span["parentSpanId"] = self.parent_span_id
+        if self.status_message:
+            span["status"]["message"] = self.status_message
+        return span
+
+    @classmethod
+    def from_otlp(cls, data: Dict[str, Any]) -> "Span":
+        """Create a span from its OTLP/JSON representation."""
+        status = data.get("status", {})
+        return cls(
+            name=data.get("name", ""),
+            trace_id=data.get("traceId", ""),
+            span_id=data.get("spanId", ""),
+            parent_span_id=data.get("parentSpanId") or None,
+            start_time_ns=int(data.get("startTimeUnixNano", 0)),
+            end_time_ns=int(data.get("endTimeUnixNano", 0)),
+            attributes={
+                attr["key"]: _from_any_value(attr.get("value", {}))
+                for attr in data.get("attributes", [])
+            },
+            status_code=int(status.get("code", STATUS_UNSET)),
+            status_message=status.get("message", ""),
+        )
+
+
+# Shared placeholder used for spans that are not recorded
+_NON_RECORDING_SPAN = Span(name="", sampled=False)
+
+
+def _to_any_value(value: Any) -> Dict[str, Any]:
+    """Encode a Python value as an OTLP ``AnyValue``."""
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def _from_any_value(value: Dict[str, Any]) -> Any:
+    """Decode an OTLP ``AnyValue`` into a Python value."""
+    if "intValue" in value:
+        return int(value["intValue"])
+    if "doubleValue" in value:
+        return float(value["doubleValue"])
+    if "boolValue" in value:
+        return bool(value["boolValue"])
+    return value.get("stringValue")
+
+
+class SpanExporter(Protocol):
+    """Protocol for span exporters."""
+
+    def export(self, span: Span) -> None:
+        """Queue a finished span for export."""
+        ...
+
+    def flush(self) -> None:
+        """Write any queued spans."""
+        ...
+
+
+class JsonFileSpanExporter:
+    """Append spans to a local file as OTLP/JSON lines."""
+
+    def __init__(self, path: Union[str, Path], batch_size: int = 512) -> None:
+        """
+        Initialize file exporter.
+
+        Args:
+            path: Trace file to append to
+            batch_size: Number of spans buffered before writing a line
+        """
+        self.path = Path(path)
+        self.batch_size = batch_size
+        self._buffer: List[Span] = []
+
+    def export(self, span: Span) -> None:
+        """Queue a finished span, writing a batch when the buffer is full."""
+        self._buffer.append(span)
+        if len(self._buffer) >= self.batch_size:
+            self.flush()
+
+    def flush(self) -> None:
+        """Write all buffered spans as a single OTLP request line."""
+        if not self._buffer:
+            return
+
+        request = {
+            "resourceSpans": [
+                {
+                    "resource": {
+                        "attributes": [
+                            {
+                                "key": "service.name",
+                                "value": {"stringValue": SERVICE_NAME},
+                            }
+                        ]
+                    },
+                    "scopeSpans": [
+                        {
+                            "scope": {"name": SCOPE_NAME},
+                            "spans": [span.to_otlp() for span in self._buffer],
+                        }
+                    ],
+                }
+            ]
+        }
+        self._buffer = []
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(request, separators=(",", ":")) + "\n")
+
+
+class Tracer:
+    """Creates spans and propagates the active span through async code."""
+
+    def __init__(
+        self, exporter: Optional[SpanExporter] = None, sample_rate: float = 1.0
+    ) -> None:
+        """
+        Initialize tracer.
+
+        Args:
+            exporter: Destination for finished spans (tracing is off when None)
+            sample_rate: Fraction of sampling points (e.g. individual messages)
+                whose span subtree is recorded, between 0.0 and 1.0
+        """
+        self.exporter = exporter
+        self.sample_rate = min(max(sample_rate, 0.0), 1.0)
+
+    @property
+    def enabled(self) -> bool:
+        """Check if spans are being recorded."""
+        return self.exporter is not None
+
+    @contextmanager
+    def span(
+        self,
+        name: str,
+        attributes: Optional[Dict[str, Any]] = None,
+        sampling_point: bool = False,
+    ) -> Iterator[Span]:
+        """
+        Open a span as a child of the currently active span.
+
+        Args:
+            name: Operation name
+            attributes: Initial span attributes
+            sampling_point: Whether the sampling decision is made at this span;
+                when it is not sampled, the span and its children are dropped
+
+        Yields:
+            The active span
+        """
+        if self.exporter is None:
+            yield _NON_RECORDING_SPAN
+            return
+
+        parent = _current_span.get()
+        sampled = parent.sampled if parent is not None else True
+        if sampled and sampling_point and self.sample_rate < 1.0:
+            sampled = random.random() < self.sample_rate
+
+        if not sampled:
+            token = _current_span.set(_NON_RECORDING_SPAN)
+            try:
+                yield _NON_RECORDING_SPAN
+            finally:
+                _current_span.reset(token)
+            return
+
+        span = Span(
+            name=name,
+            trace_id=parent.trace_id if parent is not None else os.urandom(16).hex(),
+            span_id=os.urandom(8).hex(),
+            parent_span_id=parent.span_id if parent is not None else None,
+            start_time_ns=time.time_ns(),
+            attributes=dict(attributes or {}),
+        )
+        if parent is None:
+            span.attributes["sampling.rate"] = self.sample_rate
+
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.record_error(e)
+            raise
+        finally:
+            _current_span.reset(token)
+            span.end_time_ns = time.time_ns()
+            self.exporter.export(span)
+
+    def flush(self) -> None:
+        """Write any buffered spans."""
+        if self.exporter is not None:
+            self.exporter.flush()
+
+
+def load_spans(path: Union[str, Path]) -> List[Span]:
+    """
+    Load spans from an OTLP/JSON lines trace file.
+
+    Args:
+        path: Trace file path
+
+    Returns:
+        List of spans in file order
+    """
+    spans: List[Span] = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            request = json.loads(line)
+            for resource_spans in request.get("resourceSpans", []):
+                for scope_spans in resource_spans.get("scopeSpans", []):
+                    for data in scope_spans.get("spans", []):
+                        spans.append(Span.from_otlp(data))
+    return spans
+
+
+def _critical_path(
+    span: Span,
+    children: Dict[str, List[Span]],
+    window_start: int,
+    window_end: int,
+    totals: Dict[str, int],
+) -> None:
+    """
+    Attribute the critical path of a span to operation names.
+
+    Walks backwards from the end of the window, repeatedly following the
+    child that finished last; time not covered by a child is the span's own.
+    """
+    cursor = window_end
+    for child in sorted(
+        children.get(span.span_id, []), key=lambda s: s.end_time_ns, reverse=True
+    ):
+        if cursor <= window_start:
+            break
+        if child.start_time_ns >= cursor:
+            continue
+
+        child_end = min(child.end_time_ns, cursor)
+        child_start = max(child.start_time_ns, window_start)
+        if child_end <= child_start:
+            continue
+
+        totals[span.name] += cursor - child_end
+        _critical_path(child, children, child_start, child_end, totals)
+        cursor = child_start
+
+    totals[span.name] += max(0, cursor - window_start)
+
+
+def render_trace_summary(
+    spans: List[Span], trace_id: Optional[str] = None, width: int = 30
+) -> str:
+    """
+    Render a flame-style summary and critical-path breakdown of a trace.
+
+    Args:
+        spans: Spans loaded from a trace file
+        trace_id: Trace to summarise (defaults to the most recent session)
+        width: Width of the duration bars
+
+    Returns:
+        Formatted summary as string
+    """
+    roots = [s for s in spans if s.parent_span_id is None]
+    if trace_id:
+        roots = [s for s in roots if s.trace_id == trace_id]
+    if not roots:
+        return "No traces found."
+
+    root = max(roots, key=lambda s: s.start_time_ns)
+    trace_spans = [s for s in spans if s.trace_id == root.trace_id]
+
+    children: Dict[str, List[Span]] = defaultdict(list)
+    for span in trace_spans:
+        if span.parent_span_id:
+            children[span.parent_span_id].append(span)
+
+    # Aggregate the span tree by name path (flame graph "collapsed stacks")
+    totals: Dict[Tuple[str, ...], int] = defaultdict(int)
+    self_times: Dict[Tuple[str, ...], int] = defaultdict(int)
+    counts: Dict[Tuple[str, ...], int] = defaultdict(int)
+    stack: List[Tuple[Span, Tuple[str, ...]]] = [(root, (root.name,))]
+    while stack:
+        span, path = stack.pop()
+        kids = children.get(span.span_id, [])
+        totals[path] += span.duration_ns
+        self_times[path] += max(0, span.duration_ns - sum(k.duration_ns for k in kids))
+        counts[path] += 1
+        for kid in kids:
+            stack.append((kid, path + (kid.name,)))
+
+    root_ns = max(root.duration_ns, 1)
+    lines = []
+    lines.append(
+        f"Trace {root.trace_id}: {root.name} "
+        f"{root.duration_ns / 1e9:.3f}s ({len(trace_spans)} spans, "
+        f"sample rate {root.attributes.get('sampling.rate', 1.0)})"
+    )
+    lines.append("")
+    lines.append("SPAN TREE (total / self / count)")
+    lines.append("-" * 30)
+
+    def render_node(path: Tuple[str, ...]) -> None:
+        share = totals[path] / root_ns
+        bar = "█" * max(1, round(share * width)) if totals[path] else ""
+        label = "  " * (len(path) - 1) + path[-1]
+        lines.append(
+            f"{label:<40} {bar:<{width}} {share * 100:5.1f}% "
+            f"{totals[path] / 1e9:10.3f}s self {self_times[path] / 1e9:.3f}s "
+            f"x{counts[path]}"
+        )
+        kids = [p for p in totals if len(p) == len(path) + 1 and p[:-1] == path]
+        for kid in sorted(kids, key=lambda p: totals[p], reverse=True):
+            render_node(kid)
+
+    render_node((root.name,))
+
+    # Critical path, attributed to operation names
+    critical: Dict[str, int] = defaultdict(int)
+    _critical_path(root, children, root.start_time_ns, root.end_time_ns, critical)
+
+    lines.append("")
+    lines.append("CRITICAL PATH BY OPERATION")
+    lines.append("-" * 30)
+    for name, ns in sorted(critical.items(), key=lambda item: item[1], reverse=True):
+        share = ns / root_ns
+        bar = "█" * max(1, round(share * width)) if ns else ""
+        lines.append(f"{name:<40} {bar:<{width}} {share * 100:5.1f}% {ns / 1e9:.3f}s")
+
+    return "\n".join(lines)
@@ -1,3 +1,5 @@
+import pytest
+
 from telegram_media_downloader.config.settings import TelegramConfig
 
 
@@ -43,3 +45,60 @@ def test_repr_hides_sensitive():
     assert "api_id=1" in r
     assert "+12*****" in r
     assert "api_hash" not in r
+
+
+def test_accounts_from_yaml(tmp_path):
+    path = tmp_path / "config.yaml"
+    path.write_text(
+        "api_id: 1\n"
+        "api_hash: shared\n"
+        "accounts:\n"
+        "  - phone_number: '+100'\n"
+        "  - phone_number: '+200'\n"
+        "    session_name: second\n"
+    )
+    first, second = TelegramConfig.accounts_from_yaml(path)
+    assert (first.api_id, first.api_hash, first.phone_number) == (1, "shared", "+100")
+    assert first.session_name == "telegram_session_0"
+    assert second.session_name == "second"
+    assert TelegramConfig.from_yaml(path).phone_number == "+100"
+
+
+def test_accounts_source_precedence(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("TELEGRAM_PHONE", "+300")
+    assert TelegramConfig.accounts_from_env()[0].phone_number == "+300"
+
+    (tmp_path / "config.yaml").write_text("phone_number: '+100'\n")
+    assert TelegramConfig.accounts_from_env()[0].phone_number == "+100"
+
+    explicit = tmp_path / "other.yaml"
+    explicit.write_text("phone_number: '+200'\n")
+    assert TelegramConfig.accounts_from_env(explicit)[0].phone_number == "+200"
+
+
+def test_accounts_from_yaml_requires_distinct_sessions(tmp_path):
+    path = tmp_path / "config.yaml"
+    path.write_text("accounts:\n  - session_name: same\n  - session_name: same\n")
+    with pytest.raises(ValueError):
+        TelegramConfig.accounts_from_yaml(path)
+
+
+def test_part_download_caps_from_yaml(tmp_path):
+    path = tmp_path / "config.yaml"
+    path.write_text("max_part_size: 131072\nmax_parts_in_flight: 4\n")
+    config = TelegramConfig.from_yaml(path)
+    assert (config.max_part_size, config.max_parts_in_flight) == (131072, 4)
+
+
+def test_validate_part_download_caps():
+    config = TelegramConfig(
+        api_id=1,
+        api_hash="h",
+        phone_number="+1",
+        max_part_size=100_000,
+        max_parts_in_flight=0,
+    )
+    errors = config.validate()
+    assert "MAX_PART_SIZE" in errors[0]
+    assert "MAX_PARTS_IN_FLIGHT" in errors[1]
@@ -0,0 +1,168 @@
+import pytest
+from telethon.errors import ChannelPrivateError, FloodWaitError
+
+from telegram_media_downloader.config.settings import TelegramConfig
+from telegram_media_downloader.core.accounts import (
+    AccountScheduler,
+    MultiAccountDownloader,
+)
+from telegram_media_downloader.core.downloader import TelegramMediaDownloader
+from telegram_media_downloader.core.retry import RetryPolicy
+from telegram_media_downloader.testing import FakeChannelSpec, FakeTelegramClient
+
+
+def _spec(title, channel_id, count=10, unread=None):
+    return FakeChannelSpec(
+        title=title, message_count=count, channel_id=channel_id, unread_count=unread
+    )
+
+
+def _multi(tmp_path, *clients, **kwargs):
+    downloaders = []
+    for index, client in enumerate(clients):
+        config = TelegramConfig(
+            api_id=123,
+            api_hash="abc",
+            phone_number=f"+{index}",
+            session_name=f"session_{index}",
+        )
+        downloader = TelegramMediaDownloader(
+            config, download_path=str(tmp_path), **kwargs
+        )
+        downloader.connection.client = client
+        downloaders.append(downloader)
+    return MultiAccountDownloader([], downloaders=downloaders)
+
+
+def test_scheduler_prefers_least_loaded_unblocked_account():
+    now = [0.0]
+    scheduler = AccountScheduler(3, clock=lambda: now[0])
+    assert scheduler.assign([0, 1, 2], 10) == 0
+    assert scheduler.assign([0, 1, 2], 5) == 1
+    assert scheduler.assign([0, 1], 1) == 1
+    assert scheduler.loads == [10, 6, 0]
+
+    scheduler.block(2, 30)
+    assert scheduler.assign([1, 2], 1) == 1
+    scheduler.block(1, 10)
+    assert scheduler.assign([1, 2], 1) == 1  # all blocked: available first
+    now[0] = 30
+    assert scheduler.assign([1, 2], 1) == 2
+
+
+@pytest.mark.asyncio
+async def test_overlapping_channels_downloaded_once(tmp_path):
+    first = FakeTelegramClient([_spec("A", 1), _spec("Shared", 3)])
+    second = FakeTelegramClient([_spec("B", 2, count=30), _spec("Shared", 3)])
+    multi = _multi(tmp_path, first, second)
+
+    session = await multi.download_all_unread_media()
+
+    assert session.total_channels == 3
+    assert session.total_downloaded == 50
+    assert first.counters.downloads + second.counters.downloads == 50
+    # B loads the second account, so the shared channel goes to the first
+    assert first.counters.downloads == 20
+    assert first.counters.read_max_ids[3] == second.counters.read_max_ids[3] == 10
+
+
+@pytest.mark.asyncio
+async def test_flood_wait_fails_over_to_other_account(tmp_path):
+    first = FakeTelegramClient([_spec("Shared", 1), _spec("Other", 2)])
+    second = FakeTelegramClient([_spec("Shared", 1), _spec("Other", 2)])
+    download = first.download_media
+    calls = []
+
+    async def flood_on_third(*args, **kwargs):
+        calls.append(args)
+        if len(calls) == 3:
+            raise FloodWaitError(request=None, capture=600)
+        return await download(*args, **kwargs)
+
+    first.download_media = flood_on_third
+    multi = _multi(tmp_path, first, second)
+
+    session = await multi.download_all_unread_media()
+
+    assert session.total_downloaded == 20
+    assert first.counters.downloads == 2
+    assert second.counters.downloads == 18
+    assert session.get_error_counts_by_class() == {"FloodWaitError": 1}
+    assert multi.scheduler.wait_time(0) > 0
+
+
+@pytest.mark.asyncio
+async def test_failed_downloads_are_retried_and_hold_read_checkpoint(tmp_path):
+    spec = FakeChannelSpec("Albums", 10, channel_id=1, album_size=2)
+    first = FakeTelegramClient([spec])
+    second = FakeTelegramClient([spec])
+    download = first.download_media
+    failures = {3: ConnectionError("reset"), 7: ValueError("broken")}
+
+    async def fail_some(message, *args, **kwargs):
+        error = failures.pop(message.id, None)
+        if message.id == 7:
+            failures[7] = error or ValueError("broken")
+        if error is not None:
+            raise error
+        return await download(message, *args, **kwargs)
+
+    first.download_media = fail_some
+    multi = _multi(tmp_path, first, second, retry_policy=RetryPolicy(base_delay=0.01))
+
+    session = await multi.download_all_unread_media()
+
+    stats = session.channel_stats[0]
+    assert stats.retry_count == 1  # the transient error, not the broken one
+    assert first.counters.downloads == 9
+    assert session.total_downloaded == 9
+    # The broken message holds the checkpoint on both accounts
+    assert first.counters.read_max_ids[1] == second.counters.read_max_ids[1] == 6
+
+
+@pytest.mark.asyncio
+async def test_download_options_apply_to_every_account(tmp_path):
+    configs = [
+        TelegramConfig(api_id=123, api_hash="abc", phone_number=f"+{i}") for i in (1, 2)
+    ]
+    multi = MultiAccountDownloader(configs, tmp_path, preview=True, ack_every=4)
+    acks = []
+    for downloader in multi.downloaders:
+        client = FakeTelegramClient([_spec("Shared", 1)])
+        acknowledge = client.send_read_acknowledge
+
+        async def record(entity, message=None, max_id=None, acknowledge=acknowledge):
+            acks.append(max_id)
+            return await acknowledge(entity, message, max_id)
+
+        client.send_read_acknowledge = record
+        downloader.connection.client = client
+
+    session = await multi.download_all_unread_media()
+
+    assert session.total_downloaded == 10
+    assert len(list(tmp_path.rglob("previews/*.jpg"))) == 10
+    # Acknowledged every 4 messages, on both accounts
+    assert sorted(acks) == [4, 4, 8, 8, 10, 10]
+
+
+@pytest.mark.asyncio
+async def test_failing_channel_does_not_abort_the_session(tmp_path):
+    first = FakeTelegramClient([_spec("Private", 1), _spec("A", 2)])
+    second = FakeTelegramClient([_spec("B", 3)])
+    multi = _multi(tmp_path, first, second)
+    manager = multi.downloaders[0].channel_manager
+    get_unread_messages = manager.get_unread_messages
+
+    async def private(channel):
+        if channel.entity.id == 1:
+            raise ChannelPrivateError(request=None)
+        return await get_unread_messages(channel)
+
+    manager.get_unread_messages = private
+    session = await multi.download_all_unread_media()
+
+    assert session.total_channels == 3
+    assert session.total_downloaded == 20
+    assert session.get_error_counts_by_class() == {"ChannelPrivateError": 1}
+    assert 1 not in first.counters.read_max_ids
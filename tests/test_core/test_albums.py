@@ -0,0 +1,81 @@
+import asyncio
+
+import pytest
+
+from telegram_media_downloader.config.settings import TelegramConfig
+from telegram_media_downloader.core.downloader import TelegramMediaDownloader
+from telegram_media_downloader.core.media_downloader import MediaDownloader
+from telegram_media_downloader.testing import FakeChannelSpec, FakeTelegramClient
+from telegram_media_downloader.utils.media import group_albums
+
+ALBUMS = FakeChannelSpec(title="Albums", message_count=7, channel_id=1, album_size=3)
+
+
+def _downloader(tmp_path, client, preview=False):
+    config = TelegramConfig(api_id=123, api_hash="abc", phone_number="+1234567890")
+    downloader = TelegramMediaDownloader(
+        config=config, download_path=str(tmp_path), preview=preview
+    )
+    downloader.connection.client = client
+    return downloader
+
+
+def test_group_albums_keeps_order_and_sorts_members():
+    client = FakeTelegramClient([ALBUMS])
+    messages = [client._build_message(ALBUMS, i) for i in (7, 6, 5, 4, 3, 2, 1)]
+
+    groups = group_albums(messages)
+
+    assert [[m.id for m in group] for group in groups] == [[7], [4, 5, 6], [1, 2, 3]]
+
+
+@pytest.mark.asyncio
+async def test_album_members_downloaded_concurrently_with_one_record(tmp_path):
+    client = FakeTelegramClient([ALBUMS])
+    download = client.download_media
+    in_flight = []
+    peak = []
+
+    async def tracked(*args, **kwargs):
+        in_flight.append(1)
+        peak.append(len(in_flight))
+        await asyncio.sleep(0.01)
+        try:
+            return await download(*args, **kwargs)
+        finally:
+            in_flight.pop()
+
+    client.download_media = tracked
+    session = await _downloader(tmp_path, client).download_all_unread_media()
+
+    assert session.total_downloaded == 7
+    assert max(peak) == 3
+    channel_dir = tmp_path / "Albums"
+    records = sorted(channel_dir.glob("album_*.txt"))
+    assert [r.name for r in records] == ["album_10000001.txt", "album_10000004.txt"]
+    # Only the message outside an album gets a metadata file of its own
+    assert len(list(channel_dir.glob("*_msg*.txt"))) == 1
+
+    record = records[0].read_text(encoding="utf-8")
+    assert record.count("Message ID:") == 3
+    assert record.count("Message 1 in Albums") == 1
+
+    member = next(channel_dir.glob("*_msg2.jpg"))
+    metadata = MediaDownloader.read_metadata(member)
+    assert metadata["Message ID"] == "2"
+    assert metadata["Album ID"] == "10000001"
+    assert metadata["Channel ID"] == "1"
+    assert metadata["Text"] == "Message 1 in Albums"
+
+
+@pytest.mark.asyncio
+async def test_album_previews_resolve_to_originals(tmp_path):
+    client = FakeTelegramClient([ALBUMS])
+    await _downloader(tmp_path, client, preview=True).download_all_unread_media()
+
+    previews = sorted((tmp_path / "Albums" / "previews").glob("*.jpg"))
+    originals_client = FakeTelegramClient([ALBUMS])
+    session = await _downloader(tmp_path, originals_client).download_originals(previews)
+
+    assert session.total_downloaded == 7
+    assert originals_client.counters.downloads == 7
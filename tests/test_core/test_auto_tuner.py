@@ -0,0 +1,140 @@
+import asyncio
+
+import pytest
+from telethon.errors import FloodWaitError
+
+from telegram_media_downloader.config.settings import TelegramConfig
+from telegram_media_downloader.core.auto_tuner import (
+    TUNING_JOB_KEY,
+    AutoTuner,
+    TransferLimits,
+)
+from telegram_media_downloader.core.connection import TelegramConnection
+from telegram_media_downloader.core.part_downloader import PartDownloader
+from telegram_media_downloader.storage.checkpoints import CheckpointStore
+from telegram_media_downloader.testing import (
+    FakeChannelSpec,
+    FakeTelegramClient,
+    SimulatedNetwork,
+)
+
+KB = 1024
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def _window(tuner, clock, dc_id=2, rtt=0.1, parts=4):
+    limits = tuner.limits(dc_id)
+    for _ in range(parts):
+        clock.now += rtt / limits.in_flight
+        tuner.record_part(dc_id, limits.part_size, limits.part_size, rtt)
+    return tuner.limits(dc_id)
+
+
+def test_limits_increase_additively_up_to_the_caps():
+    clock = FakeClock()
+    tuner = AutoTuner(256 * KB, 4, window=4, clock=clock)
+    assert tuner.limits(2) == TransferLimits(128 * KB, 2)
+
+    assert _window(tuner, clock) == TransferLimits(256 * KB, 3)
+    assert _window(tuner, clock) == TransferLimits(256 * KB, 4)
+    assert _window(tuner, clock) == TransferLimits(256 * KB, 4)
+
+
+def test_flood_waits_and_inflated_round_trips_decrease_multiplicatively():
+    clock = FakeClock()
+    tuner = AutoTuner(512 * KB, 16, window=4, clock=clock)
+    for _ in range(4):
+        _window(tuner, clock)
+    assert tuner.limits(2) == TransferLimits(512 * KB, 6)
+
+    tuner.record_flood(2)
+    assert tuner.limits(2) == TransferLimits(512 * KB, 3)
+
+    assert _window(tuner, clock, rtt=0.5) == TransferLimits(512 * KB, 1)
+    tuner.record_flood(2)
+    assert tuner.limits(2) == TransferLimits(256 * KB, 1)
+    assert tuner.limits(4) == TransferLimits(128 * KB, 2)  # other DCs unaffected
+
+
+def test_limits_are_saved_per_dc_and_clamped_on_load(tmp_path):
+    clock = FakeClock()
+    store = CheckpointStore(tmp_path / "tuning.json")
+    tuner = AutoTuner(512 * KB, 16, store=store, window=4, clock=clock)
+    for _ in range(3):
+        _window(tuner, clock, dc_id=2)
+    _window(tuner, clock, dc_id=4)
+
+    reloaded = CheckpointStore(tmp_path / "tuning.json")
+    assert AutoTuner(512 * KB, 16, store=reloaded).limits(2) == TransferLimits(
+        512 * KB, 5
+    )
+    capped = AutoTuner(64 * KB, 2, store=reloaded)
+    assert capped.limits(2) == TransferLimits(64 * KB, 2)
+    assert capped.limits(4) == TransferLimits(64 * KB, 2)
+
+
+def _part_downloader(client, tuner):
+    connection = TelegramConnection(
+        TelegramConfig(api_id=123, api_hash="abc", phone_number="+1234567890")
+    )
+    connection.client = client
+    return PartDownloader(connection, auto_tuner=tuner)
+
+
+@pytest.mark.asyncio
+async def test_part_downloads_follow_tuned_limits(tmp_path):
+    client = FakeTelegramClient([], network=SimulatedNetwork(latency=0.002))
+    spec = FakeChannelSpec("Docs", 6, media_kind="document", file_size=2048 * KB)
+    tuner = AutoTuner(512 * KB, 8, window=4)
+    downloader = _part_downloader(client, tuner)
+
+    # The part size of a file is fixed when its download starts
+    requests = []
+    for message_id in range(1, 7):
+        before = client.counters.part_requests
+        await downloader.download(
+            client._build_message(spec, message_id), tmp_path / f"{message_id}.pdf"
+        )
+        requests.append(client.counters.part_requests - before)
+        assert (tmp_path / f"{message_id}.pdf").stat().st_size == 2048 * KB
+
+    assert requests[0] == 16
+    assert requests[-1] < requests[0]
+    assert tuner.limits(2).in_flight > 2
+
+
+@pytest.mark.asyncio
+async def test_flood_wait_lowers_parts_in_flight(tmp_path):
+    client = FakeTelegramClient([])
+    iter_download = client.iter_download
+    active = []
+
+    async def floods_above_two(location, **kwargs):
+        active.append(location)
+        try:
+            await asyncio.sleep(0.001)
+            if len(active) > 2:
+                raise FloodWaitError(request=None, capture=60)
+            async for chunk in iter_download(location, **kwargs):
+                yield chunk
+        finally:
+            active.remove(location)
+
+    client.iter_download = floods_above_two
+    spec = FakeChannelSpec("Docs", 1, media_kind="document", file_size=4 * 1024 * KB)
+    store = CheckpointStore(tmp_path / "tuning.json")
+    store.put(TUNING_JOB_KEY, [{"dc_id": 2, "part_size": 128 * KB, "in_flight": 8}])
+    tuner = AutoTuner(512 * KB, 8, store=store)
+
+    with pytest.raises(FloodWaitError):
+        await _part_downloader(client, tuner).download(
+            client._build_message(spec, 1), tmp_path / "file.pdf"
+        )
+    assert tuner.limits(2).in_flight <= 4
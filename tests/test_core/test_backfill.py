@@ -0,0 +1,178 @@
+import json
+from datetime import timedelta
+
+import pytest
+
+from telegram_media_downloader.config.settings import TelegramConfig
+from telegram_media_downloader.core.backfill import ChannelBackfill, split_id_range
+from telegram_media_downloader.core.downloader import TelegramMediaDownloader
+from telegram_media_downloader.core.retry import RetryPolicy
+from telegram_media_downloader.filters.size_filter import SizeFilter
+from telegram_media_downloader.testing import FakeChannelSpec, FakeTelegramClient
+from telegram_media_downloader.testing.fake_client import BASE_DATE
+
+
+@pytest.fixture
+def config():
+    return TelegramConfig(api_id=123, api_hash="abc", phone_number="+1234567890")
+
+
+def _downloader(config, tmp_path, client, **kwargs):
+    downloader = TelegramMediaDownloader(
+        config=config, download_path=str(tmp_path), **kwargs
+    )
+    downloader.connection.client = client
+    return downloader
+
+
+def test_split_id_range():
+    assert split_id_range(1, 10, 3) == [(1, 4), (5, 8), (9, 10)]
+    assert split_id_range(5, 5, 8) == [(5, 5)]
+    assert split_id_range(10, 1, 4) == []
+
+
+@pytest.mark.asyncio
+async def test_backfill_date_range(config, tmp_path):
+    client = FakeTelegramClient([FakeChannelSpec(title="Archive", message_count=100)])
+    backfill = ChannelBackfill(
+        _downloader(config, tmp_path, client),
+        "Archive",
+        start_date=BASE_DATE + timedelta(minutes=10),
+        end_date=BASE_DATE + timedelta(minutes=20),
+        partitions=3,
+    )
+    session = await backfill.run()
+
+    assert session.total_downloaded == 10  # messages 10-19
+    assert client.counters.downloads == 10
+    assert not session.errors
+
+
+@pytest.mark.asyncio
+async def test_backfill_resumes_and_retries_failures(config, tmp_path):
+    client = FakeTelegramClient([FakeChannelSpec(title="Archive", message_count=40)])
+    downloader = _downloader(config, tmp_path, client)
+    original = downloader.media_downloader.download_media_from_message
+
+    async def flaky(message, channel_name):
+        if message.id == 7:
+            return None
+        return await original(message, channel_name)
+
+    downloader.media_downloader.download_media_from_message = flaky
+    session = await ChannelBackfill(downloader, "Archive", partitions=4).run()
+    assert session.total_downloaded == 39
+    assert session.channel_stats[0].error_count == 1
+
+    checkpoint = json.loads((tmp_path / "backfill_checkpoints.json").read_text())
+    (partitions,) = checkpoint.values()
+    assert [p["done_up_to"] for p in partitions] == [10, 20, 30, 40]
+    assert partitions[0]["failed_ids"] == [7]
+
+    # The next run only retries the failed message
+    downloader.media_downloader.download_media_from_message = original
+    session = await ChannelBackfill(
+        _downloader(config, tmp_path, client), "Archive", partitions=4
+    ).run()
+    assert session.total_downloaded == 1
+    assert client.counters.downloads == 40
+
+
+@pytest.mark.asyncio
+async def test_backfill_resumes_after_new_posts(config, tmp_path):
+    client = FakeTelegramClient([FakeChannelSpec(title="Archive", message_count=40)])
+    downloader = _downloader(config, tmp_path, client)
+    original = downloader.media_downloader.download_media_from_message
+
+    async def flaky(message, channel_name):
+        if message.id in (7, 33):
+            return None
+        return await original(message, channel_name)
+
+    downloader.media_downloader.download_media_from_message = flaky
+    await ChannelBackfill(downloader, "Archive", partitions=4).run()
+    client.channels[next(iter(client.channels))].message_count += 5
+    checkpoint_file = tmp_path / "backfill_checkpoints.json"
+
+    async def checks_checkpoint(message, channel_name):
+        # Failed ids stay checkpointed while they are retried
+        (partitions,) = json.loads(checkpoint_file.read_text()).values()
+        failed = [i for p in partitions for i in p["failed_ids"]]
+        assert message.id in failed
+        if message.id == 33:
+            return None
+        return await original(message, channel_name)
+
+    downloader = _downloader(config, tmp_path, client)
+    downloader.media_downloader.download_media_from_message = checks_checkpoint
+    session = await ChannelBackfill(downloader, "Archive", partitions=4).run()
+
+    assert session.total_unread == 2  # only the failed messages
+    assert session.total_downloaded == 1
+    key, partitions = json.loads(checkpoint_file.read_text()).popitem()
+    assert key.endswith(":1-latest")
+    assert partitions[-1]["last_id"] == 40
+    assert [p["failed_ids"] for p in partitions] == [[], [], [], [33]]
+
+
+@pytest.mark.asyncio
+async def test_backfill_gives_up_on_messages_that_keep_failing(config, tmp_path):
+    client = FakeTelegramClient([FakeChannelSpec(title="Archive", message_count=20)])
+    checkpoint_file = tmp_path / "backfill_checkpoints.json"
+
+    async def broken(message, channel_name):
+        if message.id == 3:
+            raise ValueError("unsupported media")
+        if message.id == 5:
+            raise ConnectionError("reset by peer")
+        if message.id == 7:
+            return None
+        return await original(message, channel_name)
+
+    for run in range(2):
+        downloader = _downloader(
+            config, tmp_path, client, retry_policy=RetryPolicy(max_attempts=1)
+        )
+        original = downloader.media_downloader.download_media_from_message
+        downloader.media_downloader.download_media_from_message = broken
+        await ChannelBackfill(downloader, "Archive", partitions=2).run()
+
+        (partitions,) = json.loads(checkpoint_file.read_text()).values()
+        if run == 0:
+            # Permanent errors are not retried
+            assert partitions[0]["failed_ids"] == [5, 7]
+            assert partitions[0]["attempts"] == {"5": 1, "7": 1}
+
+    # Retries are exhausted, so the partition is complete
+    assert partitions[0]["failed_ids"] == []
+    assert partitions[0]["attempts"] == {}
+
+    session = await ChannelBackfill(
+        _downloader(config, tmp_path, client), "Archive", partitions=2
+    ).run()
+    assert session.total_unread == 0
+
+
+@pytest.mark.asyncio
+async def test_backfill_keeps_media_over_the_budget_for_the_next_run(config, tmp_path):
+    spec = FakeChannelSpec("Archive", 6, media_kind="video", file_size=1_000_000)
+    client = FakeTelegramClient([spec])
+    downloader = _downloader(
+        config,
+        tmp_path,
+        client,
+        media_filter=SizeFilter(channel_budget_bytes=4_000_000),
+    )
+    session = await ChannelBackfill(downloader, "Archive", partitions=2).run()
+    assert session.total_downloaded == 4
+
+    (partitions,) = json.loads(
+        (tmp_path / "backfill_checkpoints.json").read_text()
+    ).values()
+    # Partitions run concurrently, so any two messages can be over the budget
+    assert sum(len(p["failed_ids"]) for p in partitions) == 2
+
+    session = await ChannelBackfill(
+        _downloader(config, tmp_path, client), "Archive", partitions=2
+    ).run()
+    assert session.total_downloaded == 2
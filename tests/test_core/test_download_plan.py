@@ -0,0 +1,56 @@
+import shutil
+from collections import namedtuple
+from datetime import timedelta
+
+import pytest
+
+from telegram_media_downloader.config.settings import TelegramConfig
+from telegram_media_downloader.core.downloader import TelegramMediaDownloader
+from telegram_media_downloader.testing import FakeChannelSpec, FakeTelegramClient
+
+
+@pytest.fixture
+def downloader(tmp_path):
+    config = TelegramConfig(api_id=123, api_hash="abc", phone_number="+1234567890")
+    downloader = TelegramMediaDownloader(config=config, download_path=str(tmp_path))
+    downloader.connection.client = FakeTelegramClient(
+        [
+            FakeChannelSpec(title="Photos", message_count=5, file_size=9000),
+            FakeChannelSpec(title="Mixed", message_count=8, media_kind="mixed"),
+        ]
+    )
+    return downloader
+
+
+@pytest.mark.asyncio
+async def test_plan_reads_sizes_without_downloading(downloader):
+    plan = await downloader.plan_unread_media(bytes_per_second=1000)
+
+    photos, mixed = plan.channels
+    assert photos.media_count == 5
+    assert photos.total_bytes == 5 * 9000  # largest photo size
+    assert mixed.candidate_count == 8
+    assert mixed.media_count == 6  # text messages are filtered out
+    assert plan.mime_counts == {"image/jpeg": 9, "video/mp4": 2}
+    assert plan.estimated_duration == timedelta(seconds=plan.total_bytes // 1000)
+    assert plan.has_enough_space
+    assert downloader.connection.client.counters.downloads == 0
+
+
+@pytest.mark.asyncio
+async def test_plan_skips_existing_files_and_warns_on_low_space(
+    downloader, monkeypatch
+):
+    await downloader.download_from_specific_channels(["Photos"], mark_as_read=False)
+    usage = namedtuple("usage", "total used free")
+    monkeypatch.setattr(shutil, "disk_usage", lambda path: usage(0, 0, 1000))
+
+    plan = await downloader.plan_unread_media()
+
+    photos, mixed = plan.channels
+    assert photos.existing_count == 5
+    assert photos.media_count == 0
+    assert not plan.has_enough_space
+    warnings = plan.get_warnings()
+    assert any("Insufficient free space" in w for w in warnings)
+    assert any("No session history" in w for w in warnings)
@@ -33,7 +33,7 @@ async def test_download_all_unread_media_success(config):
         mock_message.media = MessageMediaPhoto()
         mock_chan_mgr.get_unread_messages = AsyncMock(return_value=[mock_message])
         mock_media_downloader.download_media_from_message = AsyncMock(return_value=True)
-        mock_chan_mgr.mark_messages_as_read = AsyncMock()
+        mock_chan_mgr.mark_read_up_to = AsyncMock()
         downloader = TelegramMediaDownloader(config=config)
         async with downloader:
             session = await downloader.download_all_unread_media()
@@ -85,7 +85,7 @@ async def test_download_from_specific_channels(config):
         mock_message.media = MessageMediaPhoto()
         mock_chan_mgr.get_unread_messages = AsyncMock(return_value=[mock_message])
         mock_media_downloader.download_media_from_message = AsyncMock(return_value=True)
-        mock_chan_mgr.mark_messages_as_read = AsyncMock()
+        mock_chan_mgr.mark_read_up_to = AsyncMock()
         downloader = TelegramMediaDownloader(config=config)
         async with downloader:
             session = await downloader.download_from_specific_channels(["A"])
@@ -0,0 +1,90 @@
+import pytest
+from telethon.errors import FileReferenceExpiredError
+
+from telegram_media_downloader.config.settings import TelegramConfig
+from telegram_media_downloader.core.downloader import TelegramMediaDownloader
+from telegram_media_downloader.core.retry import RetryPolicy
+from telegram_media_downloader.testing import (
+    FakeChannelSpec,
+    FakeTelegramClient,
+    SimulatedNetwork,
+)
+
+
+def _downloader(tmp_path, client):
+    config = TelegramConfig(api_id=123, api_hash="abc", phone_number="+1234567890")
+    downloader = TelegramMediaDownloader(
+        config=config,
+        download_path=str(tmp_path),
+        retry_policy=RetryPolicy(base_delay=0.01),
+    )
+    downloader.connection.client = client
+    return downloader
+
+
+def _track_requests(client):
+    get_messages, download_media = client.get_messages, client.download_media
+    refetches, expired = [], []
+
+    async def tracked_get_messages(entity, ids):
+        refetches.append(ids)
+        return await get_messages(entity, ids=ids)
+
+    async def tracked_download_media(message, *args, **kwargs):
+        try:
+            return await download_media(message, *args, **kwargs)
+        except FileReferenceExpiredError:
+            expired.append(message.id)
+            raise
+
+    client.get_messages = tracked_get_messages
+    client.download_media = tracked_download_media
+    return refetches, expired
+
+
+@pytest.mark.asyncio
+async def test_stale_backlog_is_refreshed_in_bulk(tmp_path):
+    client = FakeTelegramClient(
+        [FakeChannelSpec("News", 250, channel_id=1)],
+        network=SimulatedNetwork(file_reference_lifetime=60),
+    )
+    refetches, expired = _track_requests(client)
+
+    session = await _downloader(tmp_path, client).download_all_unread_media()
+
+    stats = session.channel_stats[0]
+    assert session.total_downloaded == 250
+    assert not stats.has_errors
+    assert stats.retry_count == stats.recovered_count == len(expired)
+    assert client.counters.read_max_ids == {1: 250}
+
+    # Each expiry refreshes the rest of the backlog, so only a few downloads
+    # fail, and messages are re-fetched in batches rather than one by one
+    assert 0 < len(expired) <= 5
+    assert all(len(ids) <= 100 for ids in refetches)
+    assert len(refetches) < 250 / 10
+
+
+@pytest.mark.asyncio
+async def test_deleted_messages_are_dropped_on_refresh(tmp_path):
+    spec = FakeChannelSpec("News", 30, channel_id=1)
+    client = FakeTelegramClient(
+        [spec], network=SimulatedNetwork(file_reference_lifetime=10)
+    )
+    _, expired = _track_requests(client)
+    download_media = client.download_media
+
+    async def delete_tail(message, *args, **kwargs):
+        try:
+            return await download_media(message, *args, **kwargs)
+        except FileReferenceExpiredError:
+            spec.message_count = 25  # messages 26-30 were deleted meanwhile
+            raise
+
+    client.download_media = delete_tail
+    session = await _downloader(tmp_path, client).download_all_unread_media()
+
+    assert expired
+    assert session.total_downloaded == 25
+    assert not session.channel_stats[0].has_errors
+    assert client.counters.read_max_ids == {1: 30}
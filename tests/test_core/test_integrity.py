@@ -0,0 +1,145 @@
+import hashlib
+import io
+
+import pytest
+from telethon.errors import FloodWaitError, RPCError
+
+from telegram_media_downloader.config.settings import TelegramConfig
+from telegram_media_downloader.core.connection import TelegramConnection
+from telegram_media_downloader.core.downloader import TelegramMediaDownloader
+from telegram_media_downloader.core.integrity import (
+    CorruptDownloadError,
+    HashingWriter,
+    IntegrityVerifier,
+)
+from telegram_media_downloader.core.media_downloader import MediaDownloader
+from telegram_media_downloader.core.part_downloader import PartDownloader
+from telegram_media_downloader.core.retry import TRANSIENT, RetryPolicy, classify_error
+from telegram_media_downloader.testing import (
+    FakeChannelSpec,
+    FakeTelegramClient,
+    SimulatedNetwork,
+)
+
+CONFIG = TelegramConfig(api_id=123, api_hash="abc", phone_number="+1234567890")
+BLOCK = 128 * 1024
+
+
+def _downloader(tmp_path, client, **kwargs):
+    downloader = TelegramMediaDownloader(
+        config=CONFIG,
+        download_path=str(tmp_path),
+        retry_policy=RetryPolicy(base_delay=0.01),
+        verify_integrity=True,
+        **kwargs,
+    )
+    downloader.connection.client = client
+    return downloader
+
+
+def test_writer_hashes_whole_file_and_blocks():
+    data = bytes(range(256)) * 1500  # 384000 bytes, a short last block
+    target = io.BytesIO()
+    writer = HashingWriter(target)
+    for start in range(0, len(data), 100_000):
+        writer.write(data[start : start + 100_000])
+
+    assert target.getvalue() == data
+    assert writer.hexdigest() == hashlib.sha256(data).hexdigest()
+    assert len(writer.block_hashes) == 2
+    for offset in (0, BLOCK, 2 * BLOCK):
+        expected = hashlib.sha256(data[offset : offset + BLOCK]).digest()
+        assert writer.block_digest(offset, BLOCK) == expected
+    assert writer.block_digest(3 * BLOCK, BLOCK) is None
+    assert writer.block_digest(100, BLOCK) is None
+
+
+@pytest.mark.asyncio
+async def test_hash_is_stored_in_media_info_and_metadata(tmp_path):
+    spec = FakeChannelSpec("News", 3, channel_id=1, album_size=2)
+    client = FakeTelegramClient([spec])
+    downloader = _downloader(tmp_path, client)
+
+    session = await downloader.download_all_unread_media()
+
+    assert session.total_downloaded == 3
+    for path in (tmp_path / "News").glob("*.jpg"):
+        sha256 = hashlib.sha256(path.read_bytes()).hexdigest()
+        assert MediaDownloader.read_metadata(path)["SHA-256"] == sha256
+
+    info = await downloader.media_downloader.download_media_from_message(
+        client._build_message(spec, 3), "Other"
+    )
+    assert info.sha256 == hashlib.sha256(bytes(info.file_size)).hexdigest()
+
+
+@pytest.mark.asyncio
+async def test_corrupted_transfers_are_retried(tmp_path):
+    network = SimulatedNetwork(corruption_rate=0.3, seed=3)
+    client = FakeTelegramClient(
+        [FakeChannelSpec("Videos", 8, media_kind="video", file_size=300_000)],
+        network=network,
+    )
+    downloader = _downloader(tmp_path, client)
+
+    session = await downloader.download_all_unread_media()
+
+    stats = session.channel_stats[0]
+    assert client.counters.corrupted_transfers > 0
+    assert stats.corrupted_count == client.counters.corrupted_transfers
+    assert stats.retry_count == stats.corrupted_count
+    assert session.total_downloaded == 8
+    for path in (tmp_path / "Videos").glob("*.mp4"):
+        assert path.read_bytes() == bytes(300_000)
+
+
+@pytest.mark.asyncio
+async def test_part_downloads_are_verified(tmp_path):
+    spec = FakeChannelSpec("Docs", 1, media_kind="document", file_size=3 * BLOCK)
+    client = FakeTelegramClient([spec], network=SimulatedNetwork(corruption_rate=1))
+    connection = TelegramConnection(CONFIG)
+    connection.client = client
+    message = client._build_message(spec, 1)
+
+    with open(tmp_path / "file.pdf", "wb") as f:
+        writer = HashingWriter(f)
+        await PartDownloader(connection, part_size=BLOCK).download(message, writer)
+    with pytest.raises(CorruptDownloadError) as excinfo:
+        await IntegrityVerifier(connection).verify(message, writer)
+    assert classify_error(excinfo.value) == TRANSIENT
+
+
+class NoHashesClient(FakeTelegramClient):
+    async def __call__(self, request):
+        raise RPCError(request, "FILE_HASHES_UNAVAILABLE", 400)
+
+
+@pytest.mark.asyncio
+async def test_files_without_hashes_are_not_verified(tmp_path):
+    client = NoHashesClient([FakeChannelSpec("News", 2, channel_id=1)])
+    downloader = _downloader(tmp_path, client)
+
+    session = await downloader.download_all_unread_media()
+
+    assert session.total_downloaded == 2
+    assert not session.channel_stats[0].has_errors
+    for path in (tmp_path / "News").glob("*.jpg"):
+        assert "SHA-256" in MediaDownloader.read_metadata(path)
+
+
+class FloodWaitClient(FakeTelegramClient):
+    async def __call__(self, request):
+        raise FloodWaitError(request, capture=30)
+
+
+@pytest.mark.asyncio
+async def test_flood_waits_for_hashes_are_raised():
+    spec = FakeChannelSpec("Docs", 1, media_kind="document", file_size=BLOCK)
+    client = FloodWaitClient([spec])
+    connection = TelegramConnection(CONFIG)
+    connection.client = client
+    message = client._build_message(spec, 1)
+
+    # Raised for the retry queue rather than treated as missing hashes
+    with pytest.raises(FloodWaitError):
+        await IntegrityVerifier(connection).verify(message, HashingWriter(io.BytesIO()))
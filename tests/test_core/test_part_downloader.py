@@ -0,0 +1,166 @@
+import asyncio
+import time
+
+import pytest
+
+from telegram_media_downloader.config.settings import TelegramConfig
+from telegram_media_downloader.core.connection import TelegramConnection
+from telegram_media_downloader.core.downloader import TelegramMediaDownloader
+from telegram_media_downloader.core.part_downloader import (
+    HedgePolicy,
+    LatencyTracker,
+    PartDownloader,
+)
+from telegram_media_downloader.testing import (
+    FakeChannelSpec,
+    FakeTelegramClient,
+    SimulatedNetwork,
+)
+
+CONFIG = TelegramConfig(api_id=123, api_hash="abc", phone_number="+1234567890")
+PART = 4096
+
+
+def _part_downloader(client, **kwargs):
+    connection = TelegramConnection(CONFIG)
+    connection.client = client
+    return PartDownloader(connection, part_size=PART, **kwargs)
+
+
+def _document(client, parts):
+    spec = FakeChannelSpec("Docs", 1, media_kind="document", file_size=parts * PART)
+    return client._build_message(spec, 1)
+
+
+def test_latency_tracker_percentile():
+    tracker = LatencyTracker(window=100)
+    assert tracker.percentile(0.95) is None
+    for ms in range(1, 101):
+        tracker.record(ms / 1000)
+    assert tracker.percentile(0.95) == pytest.approx(0.096)
+    assert tracker.percentile(0.5) == pytest.approx(0.051)
+
+
+@pytest.mark.asyncio
+async def test_parts_are_written_in_order(tmp_path):
+    client = FakeTelegramClient([], network=SimulatedNetwork(latency=0.001))
+    message = _document(client, 10)
+    progress = []
+
+    target = tmp_path / "file.pdf"
+    await _part_downloader(client, max_in_flight=4).download(
+        message, target, progress_callback=lambda done, total: progress.append(done)
+    )
+
+    assert target.stat().st_size == 10 * PART
+    assert client.counters.part_requests == 10
+    assert progress == [n * PART for n in range(1, 11)]
+
+
+@pytest.mark.asyncio
+async def test_first_copy_wins_and_the_other_is_cancelled(tmp_path):
+    client = FakeTelegramClient([])
+    iter_download = client.iter_download
+    calls, cancelled = [], []
+
+    async def stuck_once(location, offset=0, **kwargs):
+        calls.append(offset)
+        if offset == 20 * PART and calls.count(offset) == 1:
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.append(offset)
+                raise
+        async for chunk in iter_download(location, offset=offset, **kwargs):
+            yield chunk
+
+    client.iter_download = stuck_once
+    downloader = _part_downloader(
+        client, max_in_flight=1, hedge_policy=HedgePolicy(budget=0.1)
+    )
+
+    started = time.monotonic()
+    await downloader.download(_document(client, 30), tmp_path / "file.pdf")
+
+    assert time.monotonic() - started < 2
+    assert (downloader.hedges, downloader.hedge_wins) == (1, 1)
+    assert cancelled == [20 * PART]
+    assert (tmp_path / "file.pdf").stat().st_size == 30 * PART
+
+
+async def _timed_download(tmp_path, hedge_policy):
+    network = SimulatedNetwork(
+        latency=0.002,
+        latency_outlier_rate=0.03,
+        latency_outlier_seconds=0.3,
+        seed=7,
+    )
+    client = FakeTelegramClient([], network=network)
+    downloader = _part_downloader(client, max_in_flight=1, hedge_policy=hedge_policy)
+
+    started = time.monotonic()
+    await downloader.download(_document(client, 150), tmp_path / "file.pdf")
+    return time.monotonic() - started, client.counters, downloader
+
+
+@pytest.mark.asyncio
+async def test_hedging_cuts_latency_outliers(tmp_path):
+    plain, plain_counters, _ = await _timed_download(tmp_path, None)
+    hedged, counters, downloader = await _timed_download(
+        tmp_path, HedgePolicy(min_samples=10, budget=0.1)
+    )
+
+    assert plain_counters.latency_outliers and counters.latency_outliers
+    assert downloader.hedge_wins > 0
+    assert downloader.hedges <= 0.1 * downloader.requests
+    assert hedged < plain / 2
+
+
+@pytest.mark.asyncio
+async def test_hedges_stay_within_budget(tmp_path):
+    client = FakeTelegramClient([])
+    iter_download = client.iter_download
+    requests = []
+
+    async def slowing_down(location, offset=0, **kwargs):
+        # Every request after the warm-up is slower than the recent p95
+        requests.append(offset)
+        await asyncio.sleep(0.001 if len(requests) <= 20 else 0.01)
+        async for chunk in iter_download(location, offset=offset, **kwargs):
+            yield chunk
+
+    client.iter_download = slowing_down
+    downloader = _part_downloader(
+        client, max_in_flight=1, hedge_policy=HedgePolicy(budget=0.05)
+    )
+    await downloader.download(_document(client, 100), tmp_path / "file.pdf")
+
+    assert downloader.hedges > 0
+    assert downloader.hedges <= 0.05 * downloader.requests
+    assert len(requests) == downloader.requests
+
+
+@pytest.mark.asyncio
+async def test_downloader_uses_parallel_parts(tmp_path):
+    spec = FakeChannelSpec("Videos", 3, media_kind="video", file_size=5 * PART + 10)
+    client = FakeTelegramClient([spec])
+    downloader = TelegramMediaDownloader(
+        config=CONFIG, download_path=str(tmp_path), parts_in_flight=4
+    )
+    downloader.connection.client = client
+    downloader.part_downloader.part_size = PART
+
+    session = await downloader.download_all_unread_media()
+
+    assert session.total_downloaded == 3
+    assert client.counters.downloads == 0  # no download_media calls
+    assert client.counters.part_requests == 3 * 6
+    sizes = [path.stat().st_size for path in (tmp_path / "Videos").glob("*.mp4")]
+    assert sizes == [5 * PART + 10] * 3
+
+
+def test_part_size_must_be_valid_for_telegram():
+    connection = TelegramConnection(CONFIG)
+    for part_size in (1000, 12 * 1024, 1024 * 1024):
+        with pytest.raises(ValueError):
+            PartDownloader(connection, part_size=part_size)
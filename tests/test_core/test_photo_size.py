@@ -0,0 +1,72 @@
+import pytest
+
+from telegram_media_downloader.config.settings import TelegramConfig
+from telegram_media_downloader.core.downloader import TelegramMediaDownloader
+from telegram_media_downloader.core.media_downloader import MediaDownloader
+from telegram_media_downloader.testing import FakeChannelSpec, FakeTelegramClient
+from telegram_media_downloader.utils.media import PhotoSizePolicy
+
+CHANNELS = [FakeChannelSpec(title="Photos", message_count=3, file_size=90_000)]
+
+
+def _downloader(tmp_path, client, policy):
+    config = TelegramConfig(api_id=123, api_hash="abc", phone_number="+1234567890")
+    downloader = TelegramMediaDownloader(
+        config=config, download_path=str(tmp_path), photo_size_policy=policy
+    )
+    downloader.connection.client = client
+    return downloader
+
+
+@pytest.mark.parametrize(
+    "text, expected",
+    [
+        ("largest", "y"),
+        ("max-dimension=1000", "x"),
+        ("max-dimension=100", "m"),  # nothing fits: smallest
+        ("max-bytes=30000", "x"),
+        ("max-bytes=29KB", "m"),
+        ("type=m", "m"),
+        ("type=w", "y"),  # missing type: largest
+    ],
+)
+def test_policy_selects_variant(text, expected):
+    message = FakeTelegramClient(CHANNELS)._build_message(CHANNELS[0], 1)
+    assert PhotoSizePolicy.parse(text).select(message.media.photo).type == expected
+
+
+def test_policy_rejects_invalid_modes():
+    with pytest.raises(ValueError):
+        PhotoSizePolicy.parse("medium")
+    with pytest.raises(ValueError):
+        PhotoSizePolicy.parse("type")
+
+
+@pytest.mark.asyncio
+async def test_download_fetches_and_records_chosen_variant(tmp_path):
+    client = FakeTelegramClient(CHANNELS)
+    policy = PhotoSizePolicy.parse("max-dimension=1000")
+    downloader = _downloader(tmp_path, client, policy)
+
+    plan = await downloader.plan_unread_media()
+    session = await downloader.download_all_unread_media()
+
+    assert plan.total_bytes == 3 * 30_000
+    assert session.total_downloaded == 3
+    assert client.counters.bytes_served == 3 * 30_000
+    files = sorted((tmp_path / "Photos").glob("*.jpg"))
+    metadata = MediaDownloader.read_metadata(files[0])
+    assert metadata["Photo Size"] == "x"
+    assert PhotoSizePolicy.parse(f"type={metadata['Photo Size']}") == PhotoSizePolicy(
+        "type", "x"
+    )
+
+
+@pytest.mark.asyncio
+async def test_default_policy_records_largest_variant(tmp_path):
+    client = FakeTelegramClient(CHANNELS)
+    await _downloader(tmp_path, client, None).download_all_unread_media()
+
+    assert client.counters.bytes_served == 3 * 90_000
+    files = sorted((tmp_path / "Photos").glob("*.jpg"))
+    assert MediaDownloader.read_metadata(files[0])["Photo Size"] == "y"
@@ -0,0 +1,72 @@
+import pytest
+
+from telegram_media_downloader.config.settings import TelegramConfig
+from telegram_media_downloader.core.downloader import TelegramMediaDownloader
+from telegram_media_downloader.core.media_downloader import MediaDownloader
+from telegram_media_downloader.testing import FakeChannelSpec, FakeTelegramClient
+
+CHANNELS = [
+    FakeChannelSpec(title="Photos", message_count=5, channel_id=1),
+    FakeChannelSpec(
+        title="Videos",
+        message_count=4,
+        media_kind="video",
+        file_size=10_000_000,
+        channel_id=2,
+    ),
+]
+
+
+@pytest.fixture
+def config():
+    return TelegramConfig(api_id=123, api_hash="abc", phone_number="+1234567890")
+
+
+def _downloader(config, tmp_path, client, preview):
+    downloader = TelegramMediaDownloader(
+        config=config, download_path=str(tmp_path), preview=preview
+    )
+    downloader.connection.client = client
+    return downloader
+
+
+@pytest.mark.asyncio
+async def test_preview_uses_inline_and_smallest_thumbnails(config, tmp_path):
+    client = FakeTelegramClient(CHANNELS)
+    session = await _downloader(
+        config, tmp_path, client, True
+    ).download_all_unread_media()
+
+    assert session.total_downloaded == 9
+    # Photos come from inline stripped thumbnails, videos from their thumbnail
+    assert client.counters.downloads == 4
+    assert client.counters.bytes_served == 4 * 100_000
+
+    previews = sorted((tmp_path / "Photos" / "previews").glob("*.jpg"))
+    assert len(previews) == 5
+    assert previews[0].read_bytes()[:2] == b"\xff\xd8"
+    metadata = MediaDownloader.read_metadata(previews[0])
+    assert metadata["Channel ID"] == "1"
+    assert metadata["Preview Of"].endswith(".jpg")
+    assert not (tmp_path / "Photos" / metadata["Preview Of"]).exists()
+
+
+@pytest.mark.asyncio
+async def test_originals_fetched_from_preview_references(config, tmp_path):
+    client = FakeTelegramClient(CHANNELS)
+    await _downloader(config, tmp_path, client, True).download_all_unread_media()
+
+    previews = sorted((tmp_path / "Videos" / "previews").glob("*.jpg"))[:2]
+    originals_client = FakeTelegramClient(CHANNELS)
+    session = await _downloader(
+        config, tmp_path, originals_client, False
+    ).download_originals(previews + [tmp_path / "missing.jpg"])
+
+    assert session.total_downloaded == 2
+    assert originals_client.counters.bytes_served == 2 * 10_000_000
+    assert session.get_error_counts_by_class() == {"FileNotFoundError": 1}
+    for preview in previews:
+        original = (
+            tmp_path / "Videos" / MediaDownloader.read_metadata(preview)["Preview Of"]
+        )
+        assert original.stat().st_size == 10_000_000
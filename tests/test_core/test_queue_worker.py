@@ -0,0 +1,148 @@
+import asyncio
+
+import pytest
+
+from telegram_media_downloader.config.settings import TelegramConfig
+from telegram_media_downloader.core.downloader import TelegramMediaDownloader
+from telegram_media_downloader.core.queue_worker import (
+    QueueWorker,
+    enqueue_unread_ranges,
+)
+from telegram_media_downloader.filters.size_filter import SizeFilter
+from telegram_media_downloader.storage.work_queue import SQLiteWorkQueue
+from telegram_media_downloader.testing import FakeChannelSpec, FakeTelegramClient
+
+CHANNELS = [
+    FakeChannelSpec(title="A", message_count=120, unread_count=90, channel_id=1),
+    FakeChannelSpec(title="B", message_count=40, channel_id=2),
+    FakeChannelSpec(title="C", message_count=10, unread_count=0, channel_id=3),
+]
+
+
+@pytest.fixture
+def config():
+    return TelegramConfig(api_id=123, api_hash="abc", phone_number="+1234567890")
+
+
+def _downloader(config, tmp_path):
+    downloader = TelegramMediaDownloader(config=config, download_path=str(tmp_path))
+    downloader.connection.client = FakeTelegramClient(CHANNELS)
+    return downloader
+
+
+@pytest.mark.asyncio
+async def test_discovery_enqueues_unread_ranges_once(config, tmp_path):
+    downloader = _downloader(config, tmp_path)
+    with SQLiteWorkQueue(tmp_path / "queue.db") as queue:
+        assert await enqueue_unread_ranges(downloader, queue, chunk_size=50) == 3
+        assert await enqueue_unread_ranges(downloader, queue, chunk_size=50) == 0
+        ranges = []
+        while (task := queue.lease("w", 60)) is not None:
+            ranges.append((task.channel_name, task.first_id, task.last_id))
+
+    assert ranges == [("A", 31, 80), ("A", 81, 120), ("B", 1, 40)]
+
+
+@pytest.mark.asyncio
+async def test_workers_share_queue(config, tmp_path):
+    path = tmp_path / "queue.db"
+    with SQLiteWorkQueue(path) as queue:
+        await enqueue_unread_ranges(_downloader(config, tmp_path), queue, chunk_size=20)
+
+    downloaders = [_downloader(config, tmp_path) for _ in range(2)]
+    queues = [SQLiteWorkQueue(path) for _ in range(2)]
+    sessions = await asyncio.gather(
+        *(
+            QueueWorker(downloader, queue, worker_id=f"w{i}").run()
+            for i, (downloader, queue) in enumerate(zip(downloaders, queues))
+        )
+    )
+
+    assert sum(s.total_downloaded for s in sessions) == 130
+    assert sum(d.connection.client.counters.downloads for d in downloaders) == 130
+    assert queues[0].counts()["done"] == 7
+    read_max_ids = {}
+    for downloader in downloaders:
+        for (
+            channel_id,
+            max_id,
+        ) in downloader.connection.client.counters.read_max_ids.items():
+            read_max_ids[channel_id] = max(read_max_ids.get(channel_id, 0), max_id)
+    assert read_max_ids == {1: 120, 2: 40}
+    for queue in queues:
+        queue.close()
+
+
+@pytest.mark.asyncio
+async def test_failed_downloads_release_the_range(config, tmp_path):
+    downloader = _downloader(config, tmp_path)
+    client = downloader.connection.client
+    download = client.download_media
+    acknowledge = client.send_read_acknowledge
+    failures = {25: 1, 65: 99}  # failed attempts per message id
+    acks = []
+
+    async def flaky(message, *args, **kwargs):
+        if failures.get(message.id):
+            failures[message.id] -= 1
+            raise ConnectionError("reset")
+        return await download(message, *args, **kwargs)
+
+    async def record(entity, message=None, max_id=None):
+        acks.append(max_id)
+        return await acknowledge(entity, message, max_id)
+
+    client.download_media = flaky
+    client.send_read_acknowledge = record
+    with SQLiteWorkQueue(tmp_path / "queue.db", max_attempts=2) as queue:
+        await enqueue_unread_ranges(downloader, queue, chunk_size=20)
+        session = await QueueWorker(downloader, queue).run()
+        counts = queue.counts()
+
+    # B [21-40] succeeded on its second lease, A [51-70] failed both times
+    assert (counts["done"], counts["failed"]) == (6, 1)
+    assert session.total_downloaded == 129 + 19 + 19  # with the repeated ranges
+    # Failed ranges are only read up to the message before the failure
+    assert acks.count(64) == 2
+    assert acks.count(24) == 1
+    assert 70 not in acks
+    assert client.counters.read_max_ids == {1: 64, 2: 40}
+
+
+@pytest.mark.asyncio
+async def test_ranges_are_only_read_once_earlier_ranges_are_done(config, tmp_path):
+    downloader = _downloader(config, tmp_path)
+    client = downloader.connection.client
+    with SQLiteWorkQueue(tmp_path / "queue.db", max_attempts=1) as queue:
+        queue.enqueue(2, "B", 1, 20)
+        queue.enqueue(2, "B", 21, 40)
+        earlier = queue.lease("other", 60)
+
+        session = await QueueWorker(downloader, queue).run()
+        assert session.total_downloaded == 20
+        assert 2 not in client.counters.read_max_ids
+
+        # The earlier range fails for good, so neither range is read
+        queue.fail(earlier, "boom")
+        assert queue.counts()["failed"] == 1
+        await QueueWorker(downloader, queue).run()
+    assert 2 not in client.counters.read_max_ids
+
+
+@pytest.mark.asyncio
+async def test_ranges_over_the_channel_budget_are_not_done(config, tmp_path):
+    spec = FakeChannelSpec("V", 10, media_kind="video", file_size=1_000_000)
+    downloader = TelegramMediaDownloader(
+        config=config,
+        download_path=str(tmp_path),
+        media_filter=SizeFilter(channel_budget_bytes=3_000_000),
+    )
+    client = downloader.connection.client = FakeTelegramClient([spec])
+    with SQLiteWorkQueue(tmp_path / "queue.db", max_attempts=1) as queue:
+        await enqueue_unread_ranges(downloader, queue, chunk_size=5)
+        session = await QueueWorker(downloader, queue).run()
+        counts = queue.counts()
+
+    assert session.total_downloaded == 3
+    assert counts["failed"] == 2
+    assert client.counters.read_max_ids == {spec.channel_id: 3}
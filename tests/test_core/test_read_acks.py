@@ -0,0 +1,104 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from telegram_media_downloader.config.settings import TelegramConfig
+from telegram_media_downloader.core.downloader import TelegramMediaDownloader
+from telegram_media_downloader.core.read_acks import ReadAcknowledger
+from telegram_media_downloader.testing import FakeChannelSpec, FakeTelegramClient
+
+
+class RecordingChannelManager:
+    def __init__(self):
+        self.calls = []
+        self.in_flight = 0
+        self.peak = 0
+
+    async def mark_read_up_to(self, channel, max_id):
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        await asyncio.sleep(0)
+        self.in_flight -= 1
+        self.calls.append((channel.entity.id, max_id))
+
+
+def _dialog(channel_id):
+    return SimpleNamespace(entity=SimpleNamespace(id=channel_id))
+
+
+@pytest.mark.asyncio
+async def test_checkpoint_stops_before_failed_message():
+    manager = RecordingChannelManager()
+    acks = ReadAcknowledger(manager, every=100, interval=3600)
+    dialog = _dialog(1)
+    acks.track(dialog, [1, 2, 3, 5, 6])
+
+    for message_id, success in ((2, True), (1, True), (3, False), (5, True)):
+        await acks.record(dialog, message_id, success)
+    await acks.flush()
+
+    assert acks.get_checkpoint(dialog) == 2
+    assert manager.calls == [(1, 2)]
+
+
+@pytest.mark.asyncio
+async def test_checkpoints_are_batched_and_sent_concurrently():
+    manager = RecordingChannelManager()
+    acks = ReadAcknowledger(manager, every=4, interval=3600)
+    first, second = _dialog(1), _dialog(2)
+    acks.track(first, range(1, 4))
+    acks.track(second, range(10, 13))
+
+    for message_id in (1, 2, 10):
+        await acks.record(first if message_id < 10 else second, message_id)
+    assert manager.calls == []
+    await acks.record(second, 11)
+
+    assert sorted(manager.calls) == [(1, 2), (2, 11)]
+    assert manager.peak == 2
+    await acks.flush()
+    assert len(manager.calls) == 2  # nothing new to acknowledge
+
+
+def _downloader(tmp_path, client, ack_every):
+    config = TelegramConfig(api_id=123, api_hash="abc", phone_number="+1234567890")
+    downloader = TelegramMediaDownloader(
+        config=config, download_path=str(tmp_path), ack_every=ack_every
+    )
+    downloader.connection.client = client
+    return downloader
+
+
+@pytest.mark.asyncio
+async def test_failed_download_is_not_marked_as_read(tmp_path):
+    client = FakeTelegramClient([FakeChannelSpec("News", 10, channel_id=1)])
+    download = client.download_media
+
+    async def fail_fifth(message, *args, **kwargs):
+        if message.id == 5:
+            return None
+        return await download(message, *args, **kwargs)
+
+    client.download_media = fail_fifth
+    session = await _downloader(tmp_path, client, 3).download_all_unread_media()
+
+    assert session.total_downloaded == 9
+    assert client.counters.read_max_ids == {1: 4}
+
+
+@pytest.mark.asyncio
+async def test_progress_is_checkpointed_before_a_crash(tmp_path):
+    client = FakeTelegramClient([FakeChannelSpec("News", 10, channel_id=1)])
+    download = client.download_media
+
+    async def crash_on_eighth(message, *args, **kwargs):
+        if message.id == 8:
+            raise asyncio.CancelledError()
+        return await download(message, *args, **kwargs)
+
+    client.download_media = crash_on_eighth
+    with pytest.raises(asyncio.CancelledError):
+        await _downloader(tmp_path, client, 3).download_all_unread_media()
+
+    assert client.counters.read_max_ids == {1: 6}
@@ -0,0 +1,202 @@
+import asyncio
+import random
+from functools import partial
+
+import pytest
+from telethon.errors import FileReferenceExpiredError, FloodWaitError
+
+from telegram_media_downloader.config.settings import TelegramConfig
+from telegram_media_downloader.core import downloader as downloader_module
+from telegram_media_downloader.core.downloader import TelegramMediaDownloader
+from telegram_media_downloader.core.retry import (
+    FILE_REFERENCE_EXPIRED,
+    FLOOD,
+    PERMANENT,
+    TRANSIENT,
+    CircuitBreaker,
+    RetryPolicy,
+    RetryQueue,
+    classify_error,
+)
+from telegram_media_downloader.testing import FakeChannelSpec, FakeTelegramClient
+from telegram_media_downloader.utils.progress import ProgressTracker
+
+FAST_RETRIES = RetryPolicy(max_attempts=2, base_delay=0.01, max_delay=0.02)
+
+
+def test_classify_error():
+    assert classify_error(ConnectionError()) == TRANSIENT
+    assert classify_error(asyncio.TimeoutError()) == TRANSIENT
+    assert classify_error(FloodWaitError(request=None, capture=5)) == FLOOD
+    assert (
+        classify_error(FileReferenceExpiredError(request=None))
+        == FILE_REFERENCE_EXPIRED
+    )
+    assert classify_error(ValueError()) == PERMANENT
+
+
+def test_backoff_doubles_with_jitter():
+    policy = RetryPolicy(base_delay=2.0, max_delay=10.0)
+    rng = random.Random(1)
+    for attempt, cap in ((1, 2.0), (2, 4.0), (3, 8.0), (4, 10.0), (5, 10.0)):
+        delay = policy.backoff(attempt, rng)
+        assert cap / 2 <= delay <= cap
+
+
+def test_circuit_breaker_opens_and_half_opens():
+    now = [0.0]
+    breaker = CircuitBreaker(threshold=2, cooldown=10, clock=lambda: now[0])
+    breaker.record_failure("a")
+    assert not breaker.is_open("a")
+    breaker.record_failure("a")
+    assert breaker.is_open("a")
+    assert not breaker.is_open("b")
+
+    now[0] = 10
+    assert not breaker.is_open("a")  # one attempt is let through
+    breaker.record_failure("a")
+    assert breaker.is_open("a")
+    breaker.record_success("a")
+    assert not breaker.is_open("a")
+
+
+def _downloader(tmp_path, client, policy=FAST_RETRIES, **kwargs):
+    config = TelegramConfig(api_id=123, api_hash="abc", phone_number="+1234567890")
+    downloader = TelegramMediaDownloader(
+        config=config, download_path=str(tmp_path), retry_policy=policy, **kwargs
+    )
+    downloader.connection.client = client
+    return downloader
+
+
+def _fail_first_attempt(client, error, ids):
+    download = client.download_media
+    failed = set()
+
+    async def flaky(message, *args, **kwargs):
+        if message.id in ids and message.id not in failed:
+            failed.add(message.id)
+            raise error
+        return await download(message, *args, **kwargs)
+
+    client.download_media = flaky
+
+
+@pytest.mark.asyncio
+async def test_transient_failures_are_retried(tmp_path):
+    client = FakeTelegramClient([FakeChannelSpec("News", 5, channel_id=1)])
+    _fail_first_attempt(client, ConnectionError("reset"), {2, 3})
+
+    session = await _downloader(tmp_path, client).download_all_unread_media()
+
+    stats = session.channel_stats[0]
+    assert session.total_downloaded == 5
+    assert (stats.retry_count, stats.recovered_count) == (2, 2)
+    assert not stats.has_errors
+    assert client.counters.read_max_ids == {1: 5}
+    assert len(list((tmp_path / "News").glob("*.jpg"))) == 5
+
+
+@pytest.mark.asyncio
+async def test_failed_attempts_are_reported_to_progress(tmp_path):
+    client = FakeTelegramClient([FakeChannelSpec("News", 5, channel_id=1)])
+    _fail_first_attempt(client, ConnectionError("reset"), {2, 3})
+    tracker = ProgressTracker()
+
+    await _downloader(tmp_path, client, progress=tracker).download_all_unread_media()
+
+    # Each retry is expected anew, so every attempt is accounted for
+    overall, (channel,) = tracker.snapshot()
+    assert (overall.files_total, overall.files_done, overall.files_failed) == (7, 5, 2)
+    assert channel.files_in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_expired_file_references_are_refreshed(tmp_path):
+    client = FakeTelegramClient([FakeChannelSpec("News", 3, channel_id=1)])
+    _fail_first_attempt(client, FileReferenceExpiredError(request=None), {1})
+    get_messages = client.get_messages
+    refreshed = []
+
+    async def tracked(entity, ids):
+        refreshed.append(ids)
+        return await get_messages(entity, ids=ids)
+
+    client.get_messages = tracked
+    session = await _downloader(tmp_path, client).download_all_unread_media()
+
+    assert session.total_downloaded == 3
+    assert refreshed == [[1, 2, 3]]  # the stale rest of the listing too
+
+
+@pytest.mark.asyncio
+async def test_permanent_failures_are_not_retried(tmp_path):
+    client = FakeTelegramClient([FakeChannelSpec("News", 3, channel_id=1)])
+    _fail_first_attempt(client, ValueError("unsupported"), {2})
+
+    session = await _downloader(tmp_path, client).download_all_unread_media()
+
+    stats = session.channel_stats[0]
+    assert session.total_downloaded == 2
+    assert stats.retry_count == 0
+    assert stats.errors.get_counts_by_class() == {"DownloadFailed": 1}
+    assert client.counters.read_max_ids == {1: 1}
+
+
+@pytest.mark.asyncio
+async def test_circuit_breaker_skips_a_broken_channel(tmp_path):
+    client = FakeTelegramClient(
+        [FakeChannelSpec("Broken", 6, channel_id=1), FakeChannelSpec("OK", 2)]
+    )
+    download = client.download_media
+
+    async def broken(message, *args, **kwargs):
+        if message.peer_id.channel_id == 1:
+            raise ConnectionError("reset")
+        return await download(message, *args, **kwargs)
+
+    client.download_media = broken
+    policy = RetryPolicy(base_delay=0.01, breaker_threshold=3, breaker_cooldown=60)
+    session = await _downloader(tmp_path, client, policy).download_all_unread_media()
+
+    broken_stats, ok_stats = session.channel_stats
+    assert broken_stats.retry_count == 0
+    assert broken_stats.skipped_count == 6
+    assert broken_stats.errors.get_counts_by_class() == {"CircuitOpen": 4}
+    assert ok_stats.downloaded_count == 2
+    assert 1 not in client.counters.read_max_ids
+
+
+@pytest.mark.asyncio
+async def test_flood_wait_pauses_the_pass(tmp_path, monkeypatch):
+    now = [0.0]
+    sleeps = []
+
+    async def sleep(seconds):
+        sleeps.append(seconds)
+        now[0] += seconds
+
+    monkeypatch.setattr(
+        downloader_module,
+        "RetryQueue",
+        partial(RetryQueue, clock=lambda: now[0], sleep=sleep),
+    )
+    client = FakeTelegramClient(
+        [FakeChannelSpec("News", 50, channel_id=1), FakeChannelSpec("Other", 5)]
+    )
+    _fail_first_attempt(client, FloodWaitError(request=None, capture=3600), {3})
+    download = client.download_media
+    attempts = []
+
+    async def timed(message, *args, **kwargs):
+        attempts.append(now[0])
+        return await download(message, *args, **kwargs)
+
+    client.download_media = timed
+    session = await _downloader(tmp_path, client).download_all_unread_media()
+
+    assert session.total_downloaded == 55
+    assert sleeps == [3600]
+    # Nothing was requested during the flood wait
+    assert attempts[:3] == [0.0, 0.0, 0.0]
+    assert all(at == 3600 for at in attempts[3:])
@@ -0,0 +1,158 @@
+import os
+from collections import Counter
+from datetime import timedelta
+from functools import partial
+
+import pytest
+
+from telegram_media_downloader.config.settings import TelegramConfig
+from telegram_media_downloader.core.downloader import TelegramMediaDownloader
+from telegram_media_downloader.core.sharding import (
+    ShardedDownloader,
+    prepare_worker_session,
+    shard_for,
+)
+from telegram_media_downloader.models.download_session import (
+    ChannelStats,
+    DownloadSession,
+)
+from telegram_media_downloader.testing import FakeChannelSpec, FakeTelegramClient
+from telegram_media_downloader.testing.fake_client import BASE_DATE
+
+CHANNELS = [
+    FakeChannelSpec(title=f"Channel {i}", message_count=5, channel_id=1_000_001 + i)
+    for i in range(6)
+]
+
+
+class FailFirstWorker:
+    """Client factory whose first call fails, in whichever worker process."""
+
+    def __init__(self, marker):
+        self.marker = marker
+
+    def __call__(self):
+        try:
+            os.close(os.open(self.marker, os.O_CREAT | os.O_EXCL))
+        except FileExistsError:
+            return FakeTelegramClient(CHANNELS)
+        raise PermissionError("session is not authorised")
+
+
+@pytest.fixture
+def config():
+    return TelegramConfig(api_id=123, api_hash="abc", phone_number="+1234567890")
+
+
+def test_shard_for_is_stable_and_spread():
+    assignments = [shard_for(channel_id, 4) for channel_id in range(1000)]
+    assert assignments == [shard_for(channel_id, 4) for channel_id in range(1000)]
+    assert min(Counter(assignments).values()) > 200
+
+    # Adding a shard only moves keys onto the new shard
+    for channel_id, shard in enumerate(assignments):
+        assert shard_for(channel_id, 5) in (shard, 4)
+
+
+def test_prepare_worker_session_copies_once(config, tmp_path):
+    config.session_name = str(tmp_path / "account")
+    config.max_parts_in_flight = 4
+    with pytest.raises(FileNotFoundError):
+        prepare_worker_session(config, 0)
+
+    (tmp_path / "account.session").write_text("main")
+    worker = prepare_worker_session(config, 1)
+    assert worker.session_name == str(tmp_path / "account.worker1")
+    assert (tmp_path / "account.worker1.session").read_text() == "main"
+    assert worker.max_parts_in_flight == 4
+
+    # Existing worker sessions keep their own cache
+    (tmp_path / "account.worker1.session").write_text("warm")
+    prepare_worker_session(config, 1)
+    assert (tmp_path / "account.worker1.session").read_text() == "warm"
+
+
+def _session(name, downloaded, start):
+    return DownloadSession(
+        total_channels=1,
+        total_unread=downloaded,
+        total_media=downloaded,
+        total_downloaded=downloaded,
+        channel_stats=[ChannelStats(name=name, downloaded_count=downloaded)],
+        start_time=start,
+        end_time=start + timedelta(minutes=1),
+    )
+
+
+def test_merge_sessions():
+    first = _session("a", 2, BASE_DATE)
+    first.add_session_error("boom", "RPCError")
+    second = _session("b", 3, BASE_DATE + timedelta(seconds=30))
+
+    merged = DownloadSession.merge([first, second])
+    assert merged.total_channels == 2
+    assert merged.total_downloaded == 5
+    assert [stats.name for stats in merged.channel_stats] == ["a", "b"]
+    assert merged.get_error_counts_by_class() == {"RPCError": 1}
+    assert merged.start_time == BASE_DATE
+    assert merged.end_time == BASE_DATE + timedelta(seconds=90)
+
+
+@pytest.mark.asyncio
+async def test_shards_partition_channels(config, tmp_path):
+    seen = []
+    for index in range(3):
+        downloader = TelegramMediaDownloader(
+            config=config, download_path=str(tmp_path), shard=(index, 3)
+        )
+        downloader.connection.client = FakeTelegramClient(CHANNELS)
+        session = await downloader.download_all_unread_media(mark_as_read=False)
+        seen.extend(stats.name for stats in session.channel_stats)
+
+    assert sorted(seen) == sorted(spec.title for spec in CHANNELS)
+
+
+@pytest.mark.asyncio
+async def test_sharded_downloader_merges_workers(config, tmp_path):
+    sharded = ShardedDownloader(
+        config,
+        tmp_path,
+        processes=2,
+        client_factory=partial(FakeTelegramClient, CHANNELS),
+    )
+    session = await sharded.download_all_unread_media(mark_as_read=False)
+
+    assert session.total_channels == len(CHANNELS)
+    assert session.total_downloaded == 5 * len(CHANNELS)
+    assert len(session.channel_stats) == len(CHANNELS)
+
+
+@pytest.mark.asyncio
+async def test_sharded_downloader_passes_download_options(config, tmp_path):
+    sharded = ShardedDownloader(
+        config,
+        tmp_path,
+        processes=2,
+        client_factory=partial(FakeTelegramClient, CHANNELS[:2]),
+        preview=True,
+    )
+    session = await sharded.download_all_unread_media(mark_as_read=False)
+
+    assert session.total_downloaded == 10
+    previews = list(tmp_path.rglob("previews/*.jpg"))
+    assert len(previews) == 10
+
+
+@pytest.mark.asyncio
+async def test_failed_worker_keeps_other_shards(config, tmp_path):
+    sharded = ShardedDownloader(
+        config,
+        tmp_path,
+        processes=2,  # both shards have channels
+        client_factory=FailFirstWorker(str(tmp_path / "failed")),
+    )
+    session = await sharded.download_all_unread_media(mark_as_read=False)
+
+    assert session.get_error_counts_by_class() == {"PermissionError": 1}
+    assert session.total_channels in (1, 5)  # the other worker's shard
+    assert session.total_downloaded == 5 * session.total_channels
@@ -0,0 +1,84 @@
+import asyncio
+import time
+
+import pytest
+
+from telegram_media_downloader.config.settings import TelegramConfig
+from telegram_media_downloader.core.downloader import TelegramMediaDownloader
+from telegram_media_downloader.core.retry import TRANSIENT, RetryPolicy, classify_error
+from telegram_media_downloader.core.stall_watchdog import (
+    DownloadStalledError,
+    StallWatchdog,
+)
+from telegram_media_downloader.testing import FakeChannelSpec, FakeTelegramClient
+
+
+@pytest.mark.asyncio
+async def test_watchdog_cancels_download_without_progress():
+    watchdog = StallWatchdog(timeout=0.05)
+    cancelled = asyncio.Event()
+    received = []
+
+    async def dead_connection(progress_callback):
+        progress_callback(100, 1000)
+        try:
+            await asyncio.Event().wait()
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    with pytest.raises(DownloadStalledError) as excinfo:
+        await watchdog.run(dead_connection, lambda done, total: received.append(done))
+
+    assert cancelled.is_set()
+    assert received == [100]
+    assert watchdog.stalls == 1
+    assert watchdog.in_flight == 0
+    assert classify_error(excinfo.value) == TRANSIENT
+
+
+@pytest.mark.asyncio
+async def test_watchdog_lets_slow_download_with_progress_finish():
+    watchdog = StallWatchdog(timeout=0.05)
+
+    async def slow(progress_callback):
+        for received in range(1, 9):
+            await asyncio.sleep(0.02)
+            progress_callback(received, 8)
+        return "done"
+
+    assert await watchdog.run(slow) == "done"
+    assert watchdog.stalls == 0
+
+
+@pytest.mark.asyncio
+async def test_stalled_download_is_retried(tmp_path):
+    client = FakeTelegramClient([FakeChannelSpec("News", 4, channel_id=1)])
+    download = client.download_media
+    hung = set()
+
+    async def hangs_once(message, *args, **kwargs):
+        if message.id == 2 and not hung:
+            hung.add(message.id)
+            await asyncio.Event().wait()
+        return await download(message, *args, **kwargs)
+
+    client.download_media = hangs_once
+    config = TelegramConfig(api_id=123, api_hash="abc", phone_number="+1234567890")
+    downloader = TelegramMediaDownloader(
+        config=config,
+        download_path=str(tmp_path),
+        retry_policy=RetryPolicy(base_delay=0.01),
+        stall_timeout=0.1,
+    )
+    downloader.connection.client = client
+
+    started = time.monotonic()
+    session = await downloader.download_all_unread_media()
+
+    stats = session.channel_stats[0]
+    assert time.monotonic() - started < 5
+    assert session.total_downloaded == 4
+    assert (stats.stalled_count, stats.retry_count, stats.recovered_count) == (1, 1, 1)
+    assert not stats.has_errors
+    assert len(list((tmp_path / "News").glob("*.jpg"))) == 4
@@ -0,0 +1,220 @@
+import asyncio
+import json
+
+import pytest
+
+from telegram_media_downloader.config.settings import TelegramConfig
+from telegram_media_downloader.core.downloader import TelegramMediaDownloader
+from telegram_media_downloader.core.watcher import ChannelWatcher
+from telegram_media_downloader.filters.size_filter import SizeFilter
+from telegram_media_downloader.testing import FakeChannelSpec, FakeTelegramClient
+
+
+@pytest.fixture
+def config():
+    return TelegramConfig(api_id=123, api_hash="abc", phone_number="+1234567890")
+
+
+async def _wait_for(predicate, timeout=5.0):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not predicate():
+        assert asyncio.get_running_loop().time() < deadline, "timed out"
+        await asyncio.sleep(0.01)
+
+
+def _downloader(config, tmp_path, client, **kwargs):
+    downloader = TelegramMediaDownloader(
+        config=config, download_path=str(tmp_path), **kwargs
+    )
+    downloader.connection.client = client
+    return downloader
+
+
+@pytest.mark.asyncio
+async def test_watch_downloads_new_messages_and_catches_up_after_reconnect(
+    config, tmp_path
+):
+    client = FakeTelegramClient(
+        [
+            FakeChannelSpec(title="News", message_count=10),
+            FakeChannelSpec(title="Other", message_count=5),
+        ]
+    )
+    news = next(iter(client.channels))
+    watcher = ChannelWatcher(
+        _downloader(config, tmp_path, client),
+        channel_names=["News"],
+        reconnect_delay=0.01,
+    )
+    stop = asyncio.Event()
+    task = asyncio.create_task(watcher.run(stop))
+    await _wait_for(lambda: client._event_handlers)
+
+    # Live updates
+    await client.publish_messages(news, 3)
+    await _wait_for(lambda: client.counters.downloads == 3)
+
+    # Updates published while disconnected are fetched after reconnecting
+    client.drop_connection()
+    await client.publish_messages(news, 2)
+    await _wait_for(lambda: client.counters.downloads == 5)
+
+    stop.set()
+    session = await task
+
+    assert session.total_channels == 1
+    assert session.total_downloaded == 5
+    assert client.counters.read_max_ids[news] == 15
+    assert not client._event_handlers
+    state = json.loads((tmp_path / "watch_state.json").read_text())
+    assert list(state.values()) == [15]
+
+
+@pytest.mark.asyncio
+async def test_watch_resumes_from_saved_checkpoint(config, tmp_path):
+    client = FakeTelegramClient([FakeChannelSpec(title="News", message_count=10)])
+    news = next(iter(client.channels))
+
+    stop = asyncio.Event()
+    stop.set()
+    await ChannelWatcher(_downloader(config, tmp_path, client)).run(stop)
+
+    # Messages arrive while the watcher is not running
+    client.channels[news].message_count += 4
+
+    watcher = ChannelWatcher(_downloader(config, tmp_path, client))
+    stop = asyncio.Event()
+    task = asyncio.create_task(watcher.run(stop))
+    await _wait_for(lambda: client.counters.downloads == 4)
+    stop.set()
+    session = await task
+
+    assert session.total_unread == 4
+    assert session.total_downloaded == 4
+
+
+@pytest.mark.asyncio
+async def test_live_messages_during_catch_up_wait_for_the_backlog(config, tmp_path):
+    client = FakeTelegramClient([FakeChannelSpec(title="News", message_count=10)])
+    news = next(iter(client.channels))
+    stop = asyncio.Event()
+    stop.set()
+    await ChannelWatcher(_downloader(config, tmp_path, client)).run(stop)
+    client.channels[news].message_count += 4
+
+    iter_messages = client.iter_messages
+
+    async def publishes_while_listing(*args, **kwargs):
+        async for message in iter_messages(*args, **kwargs):
+            if message.id == 11:
+                await client.publish_messages(news)
+            yield message
+
+    client.iter_messages = publishes_while_listing
+    watcher = ChannelWatcher(_downloader(config, tmp_path, client))
+    stop = asyncio.Event()
+    task = asyncio.create_task(watcher.run(stop))
+    await _wait_for(lambda: client.counters.downloads == 5)
+    stop.set()
+    session = await task
+
+    assert session.total_downloaded == 5
+    assert client.counters.read_max_ids[news] == 15
+
+
+@pytest.mark.asyncio
+async def test_failed_download_holds_checkpoint_until_retried(config, tmp_path):
+    client = FakeTelegramClient([FakeChannelSpec(title="News", message_count=10)])
+    news = next(iter(client.channels))
+    download = client.download_media
+    failed = []
+
+    async def fails_once(message, *args, **kwargs):
+        if message.id == 12 and not failed:
+            failed.append(message.id)
+            raise ConnectionError("connection reset")
+        return await download(message, *args, **kwargs)
+
+    client.download_media = fails_once
+    watcher = ChannelWatcher(
+        _downloader(config, tmp_path, client), catch_up_interval=0.2
+    )
+    stop = asyncio.Event()
+    task = asyncio.create_task(watcher.run(stop))
+    await _wait_for(lambda: client._event_handlers)
+
+    await client.publish_messages(news, 3)
+    await _wait_for(lambda: failed and client.counters.downloads == 2)
+    assert client.counters.read_max_ids[news] == 11
+    state = json.loads((tmp_path / "watch_state.json").read_text())
+    assert list(state.values()) == [11]
+
+    await _wait_for(lambda: client.counters.downloads == 3)
+    stop.set()
+    session = await task
+
+    assert session.total_downloaded == 3
+    assert session.channel_stats[0].retry_count == 1
+    assert client.counters.read_max_ids[news] == 13
+
+
+@pytest.mark.asyncio
+async def test_media_over_the_budget_holds_checkpoint(config, tmp_path):
+    spec = FakeChannelSpec("News", 10, media_kind="video", file_size=1_000_000)
+    client = FakeTelegramClient([spec])
+    news = next(iter(client.channels))
+    downloader = _downloader(
+        config,
+        tmp_path,
+        client,
+        media_filter=SizeFilter(channel_budget_bytes=2_000_000),
+    )
+    watcher = ChannelWatcher(downloader, catch_up_interval=0.05)
+    stop = asyncio.Event()
+    task = asyncio.create_task(watcher.run(stop))
+    await _wait_for(lambda: client._event_handlers)
+
+    await client.publish_messages(news, 4)
+    await _wait_for(lambda: client.counters.downloads == 2)
+    await asyncio.sleep(0.2)  # a few catch-ups
+    stop.set()
+    session = await task
+
+    assert session.total_downloaded == 2
+    assert session.channel_stats[0].retry_count == 0
+    assert client.counters.read_max_ids[news] == 12
+    state = json.loads((tmp_path / "watch_state.json").read_text())
+    assert list(state.values()) == [12]
+
+
+@pytest.mark.asyncio
+async def test_permanent_failure_does_not_block_checkpoint(config, tmp_path):
+    client = FakeTelegramClient([FakeChannelSpec(title="News", message_count=10)])
+    news = next(iter(client.channels))
+    download = client.download_media
+    attempts = []
+
+    async def broken(message, *args, **kwargs):
+        if message.id == 12:
+            attempts.append(message.id)
+            raise ValueError("unsupported media")
+        return await download(message, *args, **kwargs)
+
+    client.download_media = broken
+    watcher = ChannelWatcher(
+        _downloader(config, tmp_path, client), catch_up_interval=0.05
+    )
+    stop = asyncio.Event()
+    task = asyncio.create_task(watcher.run(stop))
+    await _wait_for(lambda: client._event_handlers)
+
+    await client.publish_messages(news, 3)
+    await _wait_for(lambda: client.counters.read_max_ids.get(news) == 13)
+    await asyncio.sleep(0.2)  # a few catch-ups
+    stop.set()
+    session = await task
+
+    assert attempts == [12]
+    assert session.total_downloaded == 2
+    state = json.loads((tmp_path / "watch_state.json").read_text())
+    assert list(state.values()) == [13]
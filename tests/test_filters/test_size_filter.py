@@ -0,0 +1,92 @@
+from datetime import datetime
+
+import pytest
+from telethon.tl.types import (
+    Document,
+    DocumentAttributeVideo,
+    Message,
+    MessageMediaDocument,
+    PeerChannel,
+)
+
+from telegram_media_downloader.config.settings import TelegramConfig
+from telegram_media_downloader.core.downloader import TelegramMediaDownloader
+from telegram_media_downloader.filters.size_filter import SizeFilter
+from telegram_media_downloader.testing import FakeChannelSpec, FakeTelegramClient
+
+
+def video_message(message_id, size, duration=60.0, w=1280, h=720, channel_id=1):
+    document = Document(
+        id=message_id,
+        access_hash=0,
+        file_reference=b"",
+        date=datetime.now(),
+        mime_type="video/mp4",
+        size=size,
+        dc_id=2,
+        attributes=[DocumentAttributeVideo(duration, w, h)],
+    )
+    return Message(
+        id=message_id,
+        peer_id=PeerChannel(channel_id),
+        date=datetime.now(),
+        message="",
+        media=MessageMediaDocument(document=document),
+    )
+
+
+def test_size_limits():
+    size_filter = SizeFilter(min_bytes=1_000, max_bytes=10_000)
+    assert not size_filter.should_download(video_message(1, 999))
+    assert size_filter.should_download(video_message(2, 5_000))
+    assert not size_filter.should_download(video_message(3, 10_001))
+    assert not size_filter.is_deferred(video_message(3, 10_001))
+
+
+def test_duration_and_resolution_limits():
+    size_filter = SizeFilter(max_duration=120, max_resolution=1080)
+    assert size_filter.should_download(video_message(1, 1, duration=120))
+    assert not size_filter.should_download(video_message(2, 1, duration=121))
+    assert size_filter.should_download(video_message(3, 1, w=1080, h=1920))
+    assert not size_filter.should_download(video_message(4, 1, w=3840, h=2160))
+
+
+def test_channel_budget_is_per_channel_and_idempotent():
+    size_filter = SizeFilter(channel_budget_bytes=10_000)
+    first = video_message(1, 6_000)
+    assert size_filter.should_download(first)
+    assert size_filter.should_download(first)  # re-checked before download
+    assert not size_filter.should_download(video_message(2, 6_000))
+    assert size_filter.is_deferred(video_message(2, 6_000))
+    assert size_filter.should_download(video_message(3, 4_000))
+    assert not size_filter.is_deferred(video_message(3, 4_000))
+    assert size_filter.should_download(video_message(4, 6_000, channel_id=2))
+    assert size_filter.get_spent_bytes(1) == 10_000
+
+
+@pytest.mark.asyncio
+async def test_rejected_media_is_never_transferred(tmp_path):
+    client = FakeTelegramClient(
+        [
+            FakeChannelSpec(
+                title="Videos",
+                message_count=10,
+                media_kind="video",
+                file_size=1_000_000,
+                channel_id=1,
+            )
+        ]
+    )
+    downloader = TelegramMediaDownloader(
+        config=TelegramConfig(api_id=1, api_hash="abc", phone_number="+1"),
+        download_path=str(tmp_path),
+        media_filter=SizeFilter(channel_budget_bytes=3_500_000),
+    )
+    downloader.connection.client = client
+
+    session = await downloader.download_all_unread_media()
+
+    assert session.total_downloaded == 3
+    assert client.counters.bytes_served == 3_000_000
+    # Messages over the budget are left unread for a later run
+    assert client.counters.read_max_ids == {1: 3}
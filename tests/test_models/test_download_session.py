@@ -0,0 +1,43 @@
+from datetime import datetime
+
+from telegram_media_downloader.models.channel_stats import ChannelStats
+from telegram_media_downloader.models.download_session import DownloadSession
+
+
+def _session(channel_stats):
+    now = datetime.now()
+    return DownloadSession(
+        total_channels=len(channel_stats),
+        total_unread=0,
+        total_media=0,
+        total_downloaded=sum(s.downloaded_count for s in channel_stats),
+        channel_stats=channel_stats,
+        start_time=now,
+        end_time=now,
+        errors=["session error"],
+    )
+
+
+def test_session_aggregates():
+    ok = ChannelStats(name="ok", downloaded_count=4)
+    bad = ChannelStats(name="bad", downloaded_count=2)
+    bad.add_error("boom", "TimeoutError")
+    bad.add_error("boom again", "TimeoutError")
+    session = _session([ok, bad, ChannelStats(name="empty")])
+
+    assert session.channels_with_downloads == [ok, bad]
+    assert session.channels_with_errors == [bad]
+    assert session.total_errors == 3
+    assert session.average_files_per_channel == 3.0
+    assert session.get_error_counts_by_class() == {"TimeoutError": 2, "Error": 1}
+    assert session.get_summary_dict()["channels_with_errors"] == 1
+
+
+def test_session_aggregates_follow_appended_channels():
+    session = _session([ChannelStats(name="a", downloaded_count=1)])
+    assert len(session.channels_with_downloads) == 1
+
+    late = ChannelStats(name="b", errors=["err"])
+    session.channel_stats.append(late)
+    assert session.channels_with_errors == [late]
+    assert session.total_errors == 2
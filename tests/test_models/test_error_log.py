@@ -0,0 +1,25 @@
+from telegram_media_downloader.models.error_log import ErrorLog
+
+
+def test_error_log_counts_all_errors_but_keeps_bounded_samples():
+    log = ErrorLog(max_samples=3)
+    for i in range(10):
+        log.add(f"error {i}", "TimeoutError" if i % 2 else "RPCError")
+
+    assert len(log) == 10
+    assert log.dropped == 7
+    assert list(log) == ["error 7", "error 8", "error 9"]
+    assert log[:2] == ["error 7", "error 8"]
+    assert log.get_counts_by_class() == {"RPCError": 5, "TimeoutError": 5}
+
+
+def test_error_log_list_compatibility():
+    log = ErrorLog(["a", "b"])
+    assert log == ["a", "b"]
+    assert log
+    assert not ErrorLog()
+
+    other = ErrorLog(["c"])
+    log.merge(other)
+    assert len(log) == 3
+    assert log[-1] == "c"
@@ -0,0 +1,106 @@
+import io
+import json
+from datetime import datetime, timedelta
+
+import pytest
+
+from telegram_media_downloader.config.settings import TelegramConfig
+from telegram_media_downloader.core.downloader import TelegramMediaDownloader
+from telegram_media_downloader.models.channel_stats import ChannelStats
+from telegram_media_downloader.models.download_session import DownloadSession
+from telegram_media_downloader.storage.history import (
+    SessionHistory,
+    render_channel_throughput,
+    render_daily_throughput,
+)
+from telegram_media_downloader.testing import FakeChannelSpec, FakeTelegramClient
+
+MB = 1024 * 1024
+
+
+def _session(start, channels):
+    channel_stats = []
+    for name, size, seconds in channels:
+        stats = ChannelStats(
+            name=name,
+            media_count=2,
+            downloaded_count=2,
+            bytes_downloaded=size,
+            start_time=start,
+            end_time=start + timedelta(seconds=seconds),
+        )
+        channel_stats.append(stats)
+    channel_stats[-1].add_error("timed out", "TimeoutError")
+    return DownloadSession(
+        total_channels=len(channel_stats),
+        total_unread=4,
+        total_media=2 * len(channel_stats),
+        total_downloaded=2 * len(channel_stats),
+        channel_stats=channel_stats,
+        start_time=start,
+        end_time=start + timedelta(seconds=sum(c[2] for c in channels)),
+    )
+
+
+@pytest.fixture
+def history(tmp_path):
+    with SessionHistory(tmp_path / "history.db") as history:
+        yield history
+
+
+def test_throughput_by_day_and_slowest_channels(history):
+    now = datetime(2026, 3, 10, 12, 0)
+    history.record(_session(now - timedelta(days=1), [("fast", 10 * MB, 1)]))
+    history.record(
+        _session(now, [("fast", 20 * MB, 2), ("slow", 1 * MB, 10)]),
+    )
+    history.record(_session(now - timedelta(days=40), [("old", MB, 100)]))
+
+    days = history.throughput_by_day(days=30, now=now)
+    assert [d.day for d in days] == ["2026-03-09", "2026-03-10"]
+    assert days[0].mb_per_s == pytest.approx(10.0)
+    assert days[1].files == 4
+    assert days[1].errors == 1
+
+    slowest = history.slowest_channels(days=7, now=now)
+    assert [c.name for c in slowest] == ["slow", "fast"]
+    assert slowest[1].sessions == 2
+    assert slowest[1].mb_per_s == pytest.approx(10.0)
+
+    assert "2026-03-10" in render_daily_throughput(days)
+    assert "slow" in render_channel_throughput(slowest)
+    assert "No sessions" in render_daily_throughput([])
+
+
+def test_export_session_streams_json(history):
+    session_id = history.record(
+        _session(datetime(2026, 3, 10), [("a", MB, 1), ("b", MB, 2)])
+    )
+
+    stream = io.StringIO()
+    history.export_session(session_id, stream)
+    document = json.loads(stream.getvalue())
+
+    assert document["id"] == session_id
+    assert document["total_bytes_downloaded"] == 2 * MB
+    assert [c["name"] for c in document["channels"]] == ["a", "b"]
+    assert document["channels"][1]["errors_by_class"] == {"TimeoutError": 1}
+
+    with pytest.raises(KeyError):
+        history.export_session(session_id + 1, io.StringIO())
+
+
+@pytest.mark.asyncio
+async def test_recorded_session_has_channel_timings(history, tmp_path):
+    config = TelegramConfig(api_id=123, api_hash="abc", phone_number="+1234567890")
+    downloader = TelegramMediaDownloader(config=config, download_path=str(tmp_path))
+    downloader.connection.client = FakeTelegramClient(
+        [FakeChannelSpec(title="Photos", message_count=3, file_size=1000)]
+    )
+    session = await downloader.download_all_unread_media()
+
+    history.record(session)
+    (row,) = history.list_sessions()
+    assert row["total_bytes_downloaded"] == 3000
+    (channel,) = session.channel_stats
+    assert channel.elapsed_seconds > 0
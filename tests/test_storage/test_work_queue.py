@@ -0,0 +1,102 @@
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+from telegram_media_downloader.storage.work_queue import SQLiteWorkQueue
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_lease_ack_and_dedupe(tmp_path):
+    with SQLiteWorkQueue(tmp_path / "queue.db") as queue:
+        assert queue.enqueue(1, "A", 1, 100)
+        assert not queue.enqueue(1, "A", 1, 100)
+        assert queue.enqueue(1, "A", 101, 150)
+        assert queue.queued_up_to(1) == 150
+        assert queue.queued_up_to(2) == 0
+
+        task = queue.lease("w1", 60)
+        assert (task.first_id, task.last_id, task.attempts) == (1, 100, 1)
+        assert queue.lease("w2", 60).first_id == 101
+        assert queue.lease("w3", 60) is None
+
+        assert queue.ack(task)
+        assert queue.counts() == {"pending": 0, "leased": 1, "done": 1, "failed": 0}
+
+
+def test_expired_lease_is_reclaimed(tmp_path):
+    clock = FakeClock()
+    with SQLiteWorkQueue(tmp_path / "queue.db", clock=clock) as queue:
+        queue.enqueue(1, "A", 1, 10)
+        stale = queue.lease("crashed", 60)
+
+        clock.now += 30
+        assert queue.renew(stale, 60)
+        clock.now += 61
+        task = queue.lease("w2", 60)
+        assert task.task_id == stale.task_id
+        assert task.attempts == 2
+
+        # The original worker lost its lease and cannot finish the task
+        assert not queue.ack(stale)
+        assert not queue.renew(stale, 60)
+        assert queue.ack(task)
+
+
+def test_failed_task_is_retried_until_max_attempts(tmp_path):
+    with SQLiteWorkQueue(tmp_path / "queue.db", max_attempts=2) as queue:
+        queue.enqueue(1, "A", 1, 10)
+        queue.fail(queue.lease("w1", 60), "boom")
+        assert queue.counts()["pending"] == 1
+        queue.fail(queue.lease("w1", 60), "boom")
+        assert queue.counts()["failed"] == 1
+        assert queue.lease("w1", 60) is None
+
+
+def test_done_up_to_stops_at_the_first_unfinished_range(tmp_path):
+    with SQLiteWorkQueue(tmp_path / "queue.db", max_attempts=1) as queue:
+        for start in (1, 11, 21):
+            queue.enqueue(1, "A", start, start + 9)
+        first, second, third = (queue.lease("w", 60) for _ in range(3))
+        assert queue.done_up_to(1) == 0
+
+        queue.ack(third)
+        assert queue.done_up_to(1) == 0
+        queue.ack(first)
+        assert queue.done_up_to(1) == 10
+        queue.fail(second, "boom")
+        assert queue.done_up_to(1) == 10
+        assert queue.done_up_to(2) == 0
+
+
+def _drain(path, worker_id):
+    done = []
+    with SQLiteWorkQueue(path) as queue:
+        while True:
+            task = queue.lease(worker_id, 60)
+            if task is None:
+                return done
+            assert queue.ack(task)
+            done.append(task.task_id)
+
+
+def test_processes_share_queue_without_duplicates(tmp_path):
+    path = tmp_path / "queue.db"
+    with SQLiteWorkQueue(path) as queue:
+        for start in range(1, 4001, 50):
+            queue.enqueue(1, "A", start, start + 49)
+
+    with ProcessPoolExecutor(
+        max_workers=4, mp_context=multiprocessing.get_context("spawn")
+    ) as pool:
+        results = list(pool.map(_drain, [path] * 4, [f"worker{i}" for i in range(4)]))
+
+    done = [task_id for result in results for task_id in result]
+    assert sorted(done) == list(range(1, 81))
+    with SQLiteWorkQueue(path) as queue:
+        assert queue.counts()["done"] == 80
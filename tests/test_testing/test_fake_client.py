@@ -0,0 +1,62 @@
+import pytest
+from telethon.errors import FloodWaitError
+
+from telegram_media_downloader.config.settings import TelegramConfig
+from telegram_media_downloader.core.downloader import TelegramMediaDownloader
+from telegram_media_downloader.testing import (
+    FakeChannelSpec,
+    FakeTelegramClient,
+    SimulatedNetwork,
+)
+
+
+@pytest.fixture
+def config():
+    return TelegramConfig(api_id=123, api_hash="abc", phone_number="+1234567890")
+
+
+@pytest.mark.asyncio
+async def test_session_against_fake_client(config, tmp_path):
+    client = FakeTelegramClient(
+        [
+            FakeChannelSpec(title="Photos", message_count=30, unread_count=10),
+            FakeChannelSpec(title="Mixed", message_count=8, media_kind="mixed"),
+        ]
+    )
+    downloader = TelegramMediaDownloader(config=config, download_path=str(tmp_path))
+    downloader.connection.client = client
+
+    session = await downloader.download_all_unread_media()
+
+    assert session.total_channels == 2
+    assert session.total_unread == 18
+    assert session.total_downloaded == 16  # every 4th mixed message is text
+    assert client.counters.downloads == 16
+    assert client.counters.read_max_ids == {1_000_001: 30, 1_000_002: 8}
+    assert len(list((tmp_path / "Photos").glob("*.jpg"))) == 10
+
+
+@pytest.mark.asyncio
+async def test_iter_messages_ranges():
+    client = FakeTelegramClient([FakeChannelSpec(title="A", message_count=50)])
+    entity = next(iter(client.channels))
+
+    newest = [m.id async for m in client.iter_messages(entity, limit=3)]
+    assert newest == [50, 49, 48]
+
+    window = [m.id async for m in client.iter_messages(entity, offset_id=10, min_id=6)]
+    assert window == [9, 8, 7]
+
+    oldest = [m.id async for m in client.iter_messages(entity, limit=2, reverse=True)]
+    assert oldest == [1, 2]
+
+
+@pytest.mark.asyncio
+async def test_long_flood_waits_raise():
+    client = FakeTelegramClient(
+        [FakeChannelSpec(title="A", message_count=1)],
+        SimulatedNetwork(flood_wait_rate=1.0, flood_wait_seconds=120),
+    )
+    with pytest.raises(FloodWaitError):
+        await client.get_messages(next(iter(client.channels)), ids=[1])
+    assert client.counters.flood_waits == 1
@@ -0,0 +1,33 @@
+import pytest
+
+from telegram_media_downloader.testing import (
+    DEFAULT_BUDGET_BYTES_PER_MESSAGE,
+    measure_session_memory,
+)
+
+
+@pytest.mark.asyncio
+async def test_session_memory_per_message_within_budget(tmp_path):
+    report = await measure_session_memory(1_000, tmp_path)
+
+    assert [phase.name for phase in report.phases] == [
+        "iter_dialogs",
+        "iter_messages",
+        "download_session",
+        "summary",
+    ]
+    assert report.peak_bytes_per_message <= DEFAULT_BUDGET_BYTES_PER_MESSAGE, "\n".join(
+        f"{phase.name}: {phase.peak_bytes} B peak\n  "
+        + "\n  ".join(phase.top_allocators)
+        for phase in report.phases
+    )
+
+
+@pytest.mark.asyncio
+async def test_session_memory_does_not_retain_messages(tmp_path):
+    report = await measure_session_memory(1_000, tmp_path)
+
+    session = report.get_phase("download_session")
+    assert session is not None
+    # Messages are released once the session ends; only the summary remains
+    assert session.retained_bytes < session.peak_bytes / 4
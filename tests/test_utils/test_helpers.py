@@ -0,0 +1,17 @@
+import pytest
+
+from telegram_media_downloader.utils.helpers import format_file_size, parse_file_size
+
+
+def test_parse_file_size():
+    assert parse_file_size("1500") == 1500
+    assert parse_file_size("10B") == 10
+    assert parse_file_size("500KB") == 500 * 1024
+    assert parse_file_size("1.5 gb") == int(1.5 * 1024**3)
+    assert format_file_size(parse_file_size("2MB")) == "2.0 MB"
+
+
+@pytest.mark.parametrize("text", ["", "MB", "12XB", "ten"])
+def test_parse_file_size_rejects_invalid(text):
+    with pytest.raises(ValueError):
+        parse_file_size(text)
@@ -0,0 +1,66 @@
+import asyncio
+import logging
+import pstats
+import time
+
+from telegram_media_downloader.utils.profiling import (
+    SamplingProfiler,
+    SlowCallbackDetector,
+    default_profile_output,
+    profile_session,
+)
+
+
+def _busy(seconds: float) -> None:
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        pass
+
+
+def test_sampling_profiler_collects_collapsed_stacks(tmp_path):
+    profiler = SamplingProfiler(interval=0.001)
+    profiler.start()
+    _busy(0.1)
+    profiler.stop()
+
+    output = tmp_path / "profile.collapsed"
+    profiler.write(output)
+    lines = output.read_text().splitlines()
+    assert lines
+    assert any("_busy" in line for line in lines)
+    stack, count = lines[0].rsplit(" ", 1)
+    assert int(count) > 0
+
+
+def test_slow_callback_detector_logs_blocking_callback(caplog):
+    async def run() -> SlowCallbackDetector:
+        detector = SlowCallbackDetector(threshold=0.05)
+        detector.start()
+        await asyncio.sleep(0.06)
+        _busy(0.2)  # blocks the loop
+        await asyncio.sleep(0.06)
+        detector.stop()
+        return detector
+
+    with caplog.at_level(logging.WARNING):
+        detector = asyncio.run(run())
+
+    assert detector.slow_callbacks >= 1
+    assert "Event loop blocked" in caplog.text
+    assert "_busy" in caplog.text
+
+
+def test_profile_session_cprofile(tmp_path):
+    output = default_profile_output("cprofile", tmp_path)
+    with profile_session("cprofile", output):
+        _busy(0.01)
+
+    assert output.name == "profile.prof"
+    stats = pstats.Stats(str(output))
+    assert any(func[2] == "_busy" for func in stats.stats)
+
+
+def test_profile_session_disabled(tmp_path):
+    with profile_session(None, tmp_path / "unused.prof"):
+        pass
+    assert not (tmp_path / "unused.prof").exists()
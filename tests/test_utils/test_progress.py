@@ -0,0 +1,101 @@
+import io
+import json
+
+import pytest
+
+from telegram_media_downloader.config.settings import TelegramConfig
+from telegram_media_downloader.core.downloader import TelegramMediaDownloader
+from telegram_media_downloader.testing import FakeChannelSpec, FakeTelegramClient
+from telegram_media_downloader.utils.progress import (
+    JsonProgressRenderer,
+    ProgressTracker,
+    TtyProgressRenderer,
+    create_progress_tracker,
+)
+
+
+def test_callbacks_are_coalesced_into_snapshots():
+    tracker = ProgressTracker()
+    tracker.add_expected("A", 4)
+
+    update = tracker.callback("A", 1)
+    for received in range(0, 1001, 100):
+        update(received, 1000)
+    tracker.file_finished("A", 1)
+
+    in_flight = tracker.callback("A", 2)
+    in_flight(250, 1000)
+    tracker.callback("A", 3)
+    tracker.file_finished("A", 3, success=False)
+
+    overall, channels = tracker.snapshot()
+    (channel,) = channels
+    assert channel.files_done == 1
+    assert channel.files_failed == 1
+    assert channel.files_in_flight == 1
+    assert channel.bytes_done == 1250
+    assert overall.files_total == 4
+    assert overall.bytes_done == 1250
+    assert overall.eta_s is not None and overall.eta_s > 0
+
+
+def test_json_renderer_writes_one_line_per_update():
+    stream = io.StringIO()
+    tracker = ProgressTracker(JsonProgressRenderer(stream))
+    tracker.add_expected("A", 2)
+    tracker.callback("A", 1)(10, 20)
+    tracker.render()
+    tracker.render()
+
+    lines = stream.getvalue().splitlines()
+    assert len(lines) == 2
+    record = json.loads(lines[0])
+    assert record["overall"]["bytes_done"] == 10
+    assert record["channels"][0]["name"] == "A"
+
+
+def test_tty_renderer_redraws_in_place():
+    stream = io.StringIO()
+    renderer = TtyProgressRenderer(stream)
+    tracker = ProgressTracker(renderer)
+    tracker.add_expected("A", 1)
+    tracker.callback("A", 1)(5, 10)
+    tracker.render()
+    tracker.render()
+    renderer.close()
+
+    output = stream.getvalue()
+    assert output.count("Overall") == 2
+    assert "\x1b[F" in output
+    assert output.endswith("\n")
+
+
+def test_create_progress_tracker_modes():
+    assert create_progress_tracker("none") is None
+    assert isinstance(create_progress_tracker("json").renderer, JsonProgressRenderer)
+    with pytest.raises(ValueError):
+        create_progress_tracker("fancy")
+
+
+@pytest.mark.asyncio
+async def test_downloader_reports_progress(tmp_path):
+    config = TelegramConfig(api_id=123, api_hash="abc", phone_number="+1234567890")
+    client = FakeTelegramClient(
+        [FakeChannelSpec(title="Photos", message_count=5, file_size=4096)]
+    )
+    stream = io.StringIO()
+    tracker = ProgressTracker(JsonProgressRenderer(stream), interval=0.01)
+    downloader = TelegramMediaDownloader(
+        config=config, download_path=str(tmp_path), progress=tracker
+    )
+    downloader.connection.client = client
+
+    tracker.start()
+    await downloader.download_all_unread_media()
+    await tracker.stop()
+
+    overall, _ = tracker.snapshot()
+    assert overall.files_total == 5
+    assert overall.files_done == 5
+    assert overall.bytes_done == 5 * 4096
+    assert json.loads(stream.getvalue().splitlines()[-1])["overall"]["files_done"] == 5
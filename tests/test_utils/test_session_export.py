@@ -0,0 +1,37 @@
+import io
+import json
+from datetime import datetime
+
+from telegram_media_downloader.models.channel_stats import ChannelStats
+from telegram_media_downloader.models.download_session import DownloadSession
+from telegram_media_downloader.utils.session_export import (
+    iter_session_json,
+    write_session_json,
+)
+
+
+def test_session_json_is_streamed_per_channel():
+    now = datetime(2026, 1, 1)
+    session = DownloadSession(
+        total_channels=3,
+        total_unread=0,
+        total_media=0,
+        total_downloaded=0,
+        channel_stats=[ChannelStats(name=f"channel {i}") for i in range(3)],
+        start_time=now,
+        end_time=now,
+        errors=["failed"],
+    )
+
+    chunks = list(iter_session_json(session))
+    assert len(chunks) == 5  # header, three channels, footer
+
+    stream = io.StringIO()
+    write_session_json(session, stream)
+    document = json.loads(stream.getvalue())
+    assert document["session_errors"] == ["failed"]
+    assert [c["name"] for c in document["channels"]] == [
+        "channel 0",
+        "channel 1",
+        "channel 2",
+    ]
@@ -0,0 +1,80 @@
+import asyncio
+
+from telegram_media_downloader.utils.tracing import (
+    JsonFileSpanExporter,
+    Tracer,
+    load_spans,
+    render_trace_summary,
+)
+
+
+def test_spans_are_nested_and_exported(tmp_path):
+    trace_file = tmp_path / "trace.jsonl"
+    tracer = Tracer(JsonFileSpanExporter(trace_file))
+
+    async def run():
+        with tracer.span("download_session"):
+            with tracer.span("process_channel", {"channel": "A"}):
+                await asyncio.gather(
+                    *(asyncio.sleep(0) for _ in range(2)),
+                )
+                with tracer.span("download_media", {"bytes": 10}):
+                    pass
+
+    asyncio.run(run())
+    tracer.flush()
+
+    spans = {span.name: span for span in load_spans(trace_file)}
+    assert set(spans) == {"download_session", "process_channel", "download_media"}
+    root = spans["download_session"]
+    assert root.parent_span_id is None
+    assert spans["process_channel"].parent_span_id == root.span_id
+    assert spans["download_media"].parent_span_id == spans["process_channel"].span_id
+    assert spans["download_media"].trace_id == root.trace_id
+    assert spans["download_media"].attributes["bytes"] == 10
+    assert spans["process_channel"].attributes["channel"] == "A"
+
+
+def test_unsampled_subtrees_are_dropped(tmp_path):
+    trace_file = tmp_path / "trace.jsonl"
+    tracer = Tracer(JsonFileSpanExporter(trace_file), sample_rate=0.0)
+
+    with tracer.span("download_session"):
+        for _ in range(5):
+            with tracer.span("download_media_from_message", sampling_point=True):
+                with tracer.span("download_media"):
+                    pass
+    tracer.flush()
+
+    assert [span.name for span in load_spans(trace_file)] == ["download_session"]
+
+
+def test_disabled_tracer_writes_nothing(tmp_path):
+    tracer = Tracer()
+    with tracer.span("download_session") as span:
+        span.set_attribute("ignored", True)
+    tracer.flush()
+    assert not tracer.enabled
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_render_trace_summary_reports_critical_path(tmp_path):
+    trace_file = tmp_path / "trace.jsonl"
+    tracer = Tracer(JsonFileSpanExporter(trace_file))
+
+    with tracer.span("download_session"):
+        with tracer.span("iter_dialogs"):
+            pass
+        with tracer.span("download_media"):
+            pass
+    tracer.flush()
+
+    summary = render_trace_summary(load_spans(trace_file))
+    assert "SPAN TREE" in summary
+    assert "CRITICAL PATH BY OPERATION" in summary
+    assert "iter_dialogs" in summary
+    assert "download_media" in summary
+
+
+def test_render_trace_summary_empty():
+    assert render_trace_summary([]) == "No traces found."